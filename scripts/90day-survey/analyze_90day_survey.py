@@ -1,26 +1,38 @@
 import pandas as pd
 import numpy as np
 from collections import Counter
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from qualtrics_reader import read_qualtrics
+from response_quality import assess_quality, kpi_sensitivity, summarize_flags
+from survey_store import OVERALL, SurveyStore
+
+# Qualtrics ImportIds are stable across re-exports, so columns are selected by id, not position
+EXPORT_COLUMNS = {
+    'StartDate': ('startDate', 'datetime'),
+    'EndDate': ('endDate', 'datetime'),
+    'Duration (in seconds)': ('duration', 'int'),
+    'ResponseId': ('_recordId', 'text'),
+    'Q4': ('QID4', 'likert'),
+    'Q6': ('QID6', 'likert'),
+    'Q8': ('QID8', 'likert'),
+    'Q10': ('QID10', 'likert'),
+    'Q12': ('QID12', 'likert'),
+    'Q14': ('QID14', 'likert'),
+    'Q16': ('QID16', 'likert'),
+    'Q18': ('QID18', 'likert'),
+    'Q20': ('QID20', 'likert'),
+    'Q22': ('QID22', 'likert'),
+    'Q24': ('QID24', 'likert'),
+    'Q24_liked': ('QID26_TEXT', 'text'),
+    'Q25_improve': ('QID27_TEXT', 'text')
+}
 
-# Read the CSV file, skip first 2 rows (header and metadata)
-df = pd.read_csv('90-day-survey-analysis.csv', skiprows=[0, 2])
-
-# The column names are now in the first row after skipping
-df.columns = ['StartDate', 'EndDate', 'Status', 'IPAddress', 'Progress', 'Duration (in seconds)',
-              'Finished', 'RecordedDate', 'ResponseId', 'RecipientLastName', 'RecipientFirstName',
-              'RecipientEmail', 'ExternalReference', 'LocationLatitude', 'LocationLongitude',
-              'DistributionChannel', 'UserLanguage', 'Q4', 'Q6', 'Q8', 'Q10', 'Q12', 'Q14',
-              'Q16', 'Q18', 'Q20', 'Q22', 'Q24', 'Q24_liked', 'Q25_improve']
-
-# Filter out incomplete responses and test responses
-df = df[df['Finished'] == True].copy()
-df['Progress'] = pd.to_numeric(df['Progress'], errors='coerce')
-df = df[df['Progress'] == 100].copy()
-
-# Convert date columns
-df['StartDate'] = pd.to_datetime(df['StartDate'], errors='coerce')
-df['EndDate'] = pd.to_datetime(df['EndDate'], errors='coerce')
+# Typed projection of the export; incomplete responses are dropped while reading
+df = read_qualtrics('90-day-survey-analysis.csv', EXPORT_COLUMNS, complete_only=True)
 
 # Define question columns (Q4-Q24 are the Likert scale questions)
 likert_questions = {
@@ -51,6 +63,40 @@ print(f"\nResponses by Year:")
 for year, count in responses_by_year.items():
     print(f"  {year}: {count} responses")
 
+print("\n" + "="*80)
+print("RESPONSE QUALITY SCREENING")
+print("="*80)
+
+# Notre Dame fiscal years start July 1 (FY24 = Jul 2023 - Jun 2024); cohorts for duration norms
+df['FiscalYear'] = df['StartDate'].dt.year + (df['StartDate'].dt.month >= 7).astype(int)
+
+item_cols = list(likert_questions.keys())
+quality = assess_quality(df, item_cols, reverse_items=['Q22'], cohort_col='FiscalYear')
+flags = summarize_flags(quality)
+print(f"\nSpeeders (duration z <= -2 within FY cohort, or < 2s/item): {flags['speeders']}")
+print(f"Straight-liners (identical answer on every item): {flags['straightliners']}")
+print(f"Inconsistent on reverse-keyed Q22 (roadblocks): {flags['inconsistent']}")
+print(f"Down-weighted: {flags['down_weighted']} | Excluded (2+ flags): {flags['excluded']}")
+
+sensitivity = kpi_sensitivity(df, item_cols, quality, reverse_items=['Q22'])
+moved = sensitivity[(sensitivity['mean_delta'].abs() >= 0.01) | (sensitivity['positive_delta'].abs() >= 0.1)]
+if len(moved):
+    print("\nKPI movement after down-weighting (raw -> weighted):")
+    for _, row in moved.iterrows():
+        print(f"  {likert_questions[row['item']]}: mean {row['mean_raw']:.2f} -> {row['mean_weighted']:.2f}, "
+              f"positive {row['positive_raw']:.1f}% -> {row['positive_weighted']:.1f}%")
+else:
+    print("\nNo KPI moves after down-weighting")
+
+quality.insert(0, 'ResponseId', df['ResponseId'])
+quality.to_csv('90day_response_quality.csv', index=False)
+print("\n[OK] Exported: 90day_response_quality.csv")
+
+# Score only respondents that passed screening, each at its quality weight (one flag counts half)
+df = df[quality['quality_weight'] > 0].copy()
+weights = quality.loc[df.index, 'quality_weight']
+print(f"Scoring {len(df)} responses ({flags['down_weighted']} down-weighted)")
+
 print("\n" + "="*80)
 print("QUANTITATIVE INSIGHTS - LIKERT SCALE ANALYSIS")
 print("="*80)
@@ -67,7 +113,12 @@ def calculate_sentiment_score(series):
         'Yes': 5,
         'No': 1
     }
-    return series.map(mapping)
+    return series.map(mapping).astype(float)
+
+def weighted_mean(values, w):
+    """Mean of the non-missing values under weights w"""
+    valid = values.notna()
+    return (values[valid] * w[valid]).sum() / w[valid].sum()
 
 results = []
 for q_code, q_text in likert_questions.items():
@@ -81,17 +132,14 @@ for q_code, q_text in likert_questions.items():
 
             # Calculate sentiment score
             numeric_scores = calculate_sentiment_score(responses)
-            avg_score = numeric_scores.mean()
-
-            # Calculate positive response rate (Strongly agree + Agree + Yes)
-            positive_responses = responses.isin(['Strongly agree', 'Agree', 'Yes']).sum()
-            positive_rate = (positive_responses / len(responses)) * 100
+            w = weights[responses.index]
+            avg_score = weighted_mean(numeric_scores, w)
 
-            # For Q22 (roadblocks), invert the logic - Disagree is good
-            if q_code == 'Q22':
-                negative_responses = responses.isin(['Strongly agree', 'Agree', 'Yes']).sum()
-                negative_rate = (negative_responses / len(responses)) * 100
-                positive_rate = 100 - negative_rate
+            # Calculate positive response rate (Strongly agree + Agree + Yes). For Q22 (roadblocks), invert the
+            # logic: Disagree is good and "Neither" is not positive, as in the stored wave KPIs below
+            keyed_scores = 6 - numeric_scores if q_code == 'Q22' else numeric_scores
+            positive_responses = w[keyed_scores >= 4].sum()
+            positive_rate = (positive_responses / w.sum()) * 100
 
             results.append({
                 'question': q_text,
@@ -253,7 +301,7 @@ print("-" * 80)
 for q in key_questions:
     if q in df.columns:
         quarterly_scores = df.groupby('Quarter')[q].apply(
-            lambda x: calculate_sentiment_score(x).mean()
+            lambda x: weighted_mean(calculate_sentiment_score(x), weights[x.index])
         )
         print(f"\n{likert_questions[q]}:")
         for quarter, score in quarterly_scores.items():
@@ -289,6 +337,41 @@ for theme, count in sorted_improve[:5]:
     if count > 0 and 'nothing' not in theme.lower():
         print(f"   - {theme}")
 
+print("\n" + "="*80)
+print("PERSISTING FISCAL-YEAR COHORT WAVES")
+print("="*80)
+
+# Stored scores are keyed so that higher is better: Q22 (roadblocks) is reversed (6 - score)
+score_cols = list(likert_questions.keys())
+for q_code in score_cols:
+    score = calculate_sentiment_score(df[q_code])
+    df[f'{q_code}_score'] = 6 - score if q_code == 'Q22' else score
+
+with SurveyStore() as store:
+    for fiscal_year, cohort in df.dropna(subset=['FiscalYear']).groupby('FiscalYear'):
+        cohort_kpis = []
+        for q_code in score_cols:
+            responses = cohort[q_code].dropna()
+            if len(responses) == 0:
+                continue
+            scores = cohort[f'{q_code}_score'].dropna()
+            w = weights[scores.index]
+            cohort_kpis.append({
+                'department': OVERALL,
+                'metric': q_code,
+                'mean_score': round(weighted_mean(scores, w), 2),
+                'positive_pct': round(w[scores >= 4].sum() / w.sum() * 100, 1),   # "Neither" (3) is not positive
+                'n_responses': len(responses),
+                'scale': '1-5'
+            })
+
+        wave_id = f'90day-FY{int(fiscal_year) % 100:02d}'
+        respondents = pd.DataFrame({'ResponseId': cohort['ResponseId'], **{q: cohort[f'{q}_score'] for q in score_cols}})
+        store.ingest_wave(wave_id, '90day', respondents, pd.DataFrame(cohort_kpis), score_cols,
+                          respondent_col='ResponseId', label=f'90-Day Onboarding FY{int(fiscal_year) % 100:02d}',
+                          period=(cohort['StartDate'].min(), cohort['StartDate'].max()))
+        print(f"  Stored {wave_id}: {len(cohort)} respondents")
+
 print("\n" + "="*80)
 print("END OF ANALYSIS")
 print("="*80)
@@ -1,23 +1,43 @@
 import pandas as pd
 import json
+import os
+import sys
 
-# Read the CSV file
-df = pd.read_csv('90-day-survey-analysis.csv', skiprows=[0, 2])
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from qualtrics_reader import read_qualtrics
+from response_quality import assess_quality, summarize_flags
+from payload_invariants import assert_payload
+from pii_redaction import Redactor
+from survey_weights import effective_n, load_margins, rake, summarize_raking
+from topic_discovery import discover_topics
 
-df.columns = ['StartDate', 'EndDate', 'Status', 'IPAddress', 'Progress', 'Duration (in seconds)',
-              'Finished', 'RecordedDate', 'ResponseId', 'RecipientLastName', 'RecipientFirstName',
-              'RecipientEmail', 'ExternalReference', 'LocationLatitude', 'LocationLongitude',
-              'DistributionChannel', 'UserLanguage', 'Q4', 'Q6', 'Q8', 'Q10', 'Q12', 'Q14',
-              'Q16', 'Q18', 'Q20', 'Q22', 'Q24', 'Q24_liked', 'Q25_improve']
+# Qualtrics ImportIds are stable across re-exports, so columns are selected by id, not position
+EXPORT_COLUMNS = {
+    'StartDate': ('startDate', 'datetime'),
+    'EndDate': ('endDate', 'datetime'),
+    'Duration (in seconds)': ('duration', 'int'),
+    'ResponseId': ('_recordId', 'text'),
+    'Q4': ('QID4', 'likert'),
+    'Q6': ('QID6', 'likert'),
+    'Q8': ('QID8', 'likert'),
+    'Q10': ('QID10', 'likert'),
+    'Q12': ('QID12', 'likert'),
+    'Q14': ('QID14', 'likert'),
+    'Q16': ('QID16', 'likert'),
+    'Q18': ('QID18', 'likert'),
+    'Q20': ('QID20', 'likert'),
+    'Q22': ('QID22', 'likert'),
+    'Q24': ('QID24', 'likert'),
+    'Q24_liked': ('QID26_TEXT', 'text'),
+    'Q25_improve': ('QID27_TEXT', 'text')
+}
 
-# Filter completed responses
-df = df[df['Finished'] == True].copy()
-df['Progress'] = pd.to_numeric(df['Progress'], errors='coerce')
-df = df[df['Progress'] == 100].copy()
+# Read the completed responses (typed projection, no unused/PII columns)
+df = read_qualtrics('90-day-survey-analysis.csv', EXPORT_COLUMNS, complete_only=True)
 
-# Convert dates
-df['StartDate'] = pd.to_datetime(df['StartDate'], errors='coerce')
+# Date parts; Notre Dame fiscal years start July 1 (FY24 = Jul 2023 - Jun 2024)
 df['Year'] = df['StartDate'].dt.year
+df['FiscalYear'] = df['StartDate'].dt.year + (df['StartDate'].dt.month >= 7).astype(int)
 df['Quarter'] = df['StartDate'].dt.to_period('Q').astype(str)
 
 # Sentiment scoring function
@@ -32,7 +52,11 @@ def calculate_sentiment_score(series):
         'No': 1,
         'Strong disagree': 1
     }
-    return series.map(mapping)
+    return series.map(mapping).astype(float)
+
+def weighted_mean(scores, weights):
+    scored = scores.notna()
+    return (scores[scored] * weights[scored]).sum() / weights[scored].sum()
 
 # Question labels
 questions = {
@@ -49,6 +73,20 @@ questions = {
     'Q24': 'Manager discussed progress'
 }
 
+# Screen speeders, straight-liners and Q22 inconsistency before scoring
+# (same fiscal-year duration cohorts as analyze_90day_survey.py); flagged respondents keep a reduced weight
+quality = assess_quality(df, list(questions.keys()), reverse_items=['Q22'], cohort_col='FiscalYear')
+quality_summary = summarize_flags(quality)
+df = df[quality['quality_weight'] > 0].copy()
+quality_weight = quality.loc[df.index, 'quality_weight']
+
+# Survey weights: rake to new-hire headcounts (env ONBOARDING_MARGINS: margin, category, headcount),
+# starting from the quality weights. The export carries no department, so margins name export columns
+# such as Year (hire cohort); others are skipped.
+margins_path = os.environ.get('ONBOARDING_MARGINS')
+raking = rake(df, load_margins(margins_path), base_weights=quality_weight) if margins_path else None
+weights = pd.Series(raking.weights, index=df.index) if raking else quality_weight
+
 # Calculate overall satisfaction scores
 satisfaction_data = []
 for q_code, q_label in questions.items():
@@ -56,16 +94,13 @@ for q_code, q_label in questions.items():
         responses = df[q_code].dropna()
         if len(responses) > 0:
             numeric_scores = calculate_sentiment_score(responses)
-            avg_score = numeric_scores.mean()
-
-            # Calculate positive rate
-            positive = responses.isin(['Strongly agree', 'Agree', 'Yes']).sum()
-            positive_rate = (positive / len(responses)) * 100
+            w = weights[responses.index]
+            avg_score = weighted_mean(numeric_scores, w)
 
-            # For Q22, invert the logic
-            if q_code == 'Q22':
-                negative = responses.isin(['Strongly agree', 'Agree', 'Yes']).sum()
-                positive_rate = 100 - ((negative / len(responses)) * 100)
+            # Calculate positive rate; for Q22, invert the logic (Disagree is positive, "Neither" is not)
+            keyed_scores = 6 - numeric_scores if q_code == 'Q22' else numeric_scores
+            positive = w[keyed_scores >= 4].sum()
+            positive_rate = (positive / w.sum()) * 100
 
             satisfaction_data.append({
                 'question': q_label,
@@ -73,6 +108,8 @@ for q_code, q_label in questions.items():
                 'positiveRate': round(positive_rate, 1),
                 'responses': len(responses)
             })
+            if raking:
+                satisfaction_data[-1]['effectiveResponses'] = round(effective_n(w), 1)
 
 # Sort by positive rate
 satisfaction_data = sorted(satisfaction_data, key=lambda x: x['positiveRate'], reverse=True)
@@ -95,7 +132,7 @@ for quarter in df['Quarter'].unique():
             responses = quarter_df[q_code].dropna()
             if len(responses) > 0:
                 numeric_scores = calculate_sentiment_score(responses)
-                quarter_data[q_label] = round(numeric_scores.mean(), 2)
+                quarter_data[q_label] = round(weighted_mean(numeric_scores, weights[responses.index]), 2)
 
     time_trends.append(quarter_data)
 
@@ -108,79 +145,80 @@ year_data = [{'year': int(year), 'count': int(count)} for year, count in respons
 
 # Qualitative themes - LIKED
 liked_responses = df['Q24_liked'].dropna()
-liked_themes = {
-    'Team & colleagues': 0,
-    'Meetings & introductions': 0,
-    'Manager & leadership': 0,
-    'Structure & organization': 0,
-    'Check-ins & touchpoints': 0,
-    'Training & learning': 0,
-    'Welcoming & hospitality': 0,
-    'Intentional & thoughtful': 0
+LIKED_THEME_KEYWORDS = {
+    'Team & colleagues': ['team', 'colleague', 'coworker', 'people'],
+    'Meetings & introductions': ['meeting', 'meet', 'introduction', 'intro'],
+    'Manager & leadership': ['manager', 'boss', 'nancy', 'claudia', 'leadership'],
+    'Structure & organization': ['structure', 'organized', 'plan'],
+    'Check-ins & touchpoints': ['check-in', 'checking', 'touch', 'reaching out'],
+    'Training & learning': ['training', 'learning', 'education'],
+    'Welcoming & hospitality': ['welcome', 'hospitality', 'warm', 'friendly'],
+    'Intentional & thoughtful': ['intentional', 'thoughtful', 'effort']
 }
+liked_themes = {theme: 0 for theme in LIKED_THEME_KEYWORDS}
+liked_weights = {theme: 0.0 for theme in LIKED_THEME_KEYWORDS}
+liked_labels = []
 
-for response in liked_responses:
+for idx, response in liked_responses.items():
     response_lower = str(response).lower()
-    if any(word in response_lower for word in ['team', 'colleague', 'coworker', 'people']):
-        liked_themes['Team & colleagues'] += 1
-    if any(word in response_lower for word in ['meeting', 'meet', 'introduction', 'intro']):
-        liked_themes['Meetings & introductions'] += 1
-    if any(word in response_lower for word in ['manager', 'boss', 'nancy', 'claudia', 'leadership']):
-        liked_themes['Manager & leadership'] += 1
-    if any(word in response_lower for word in ['structure', 'organized', 'plan']):
-        liked_themes['Structure & organization'] += 1
-    if any(word in response_lower for word in ['check-in', 'checking', 'touch', 'reaching out']):
-        liked_themes['Check-ins & touchpoints'] += 1
-    if any(word in response_lower for word in ['training', 'learning', 'education']):
-        liked_themes['Training & learning'] += 1
-    if any(word in response_lower for word in ['welcome', 'hospitality', 'warm', 'friendly']):
-        liked_themes['Welcoming & hospitality'] += 1
-    if any(word in response_lower for word in ['intentional', 'thoughtful', 'effort']):
-        liked_themes['Intentional & thoughtful'] += 1
+    labels = {theme: any(word in response_lower for word in words) for theme, words in LIKED_THEME_KEYWORDS.items()}
+    for theme, hit in labels.items():
+        liked_themes[theme] += hit
+        liked_weights[theme] += weights[idx] * hit
+    liked_labels.append(labels)
 
+liked_total = weights[liked_responses.index].sum()
 liked_theme_data = [
-    {'theme': theme, 'count': count, 'percentage': round((count/len(liked_responses))*100, 1)}
+    {'theme': theme, 'count': count, 'percentage': round((liked_weights[theme]/liked_total)*100, 1)}
     for theme, count in sorted(liked_themes.items(), key=lambda x: x[1], reverse=True)
     if count > 0
 ]
 
 # Qualitative themes - IMPROVEMENT
 improve_responses = df['Q25_improve'].dropna()
-improve_themes = {
-    'Timeline & wait time': 0,
-    'Time management': 0,
-    'Connection with new hires': 0,
-    'Benefits & HR': 0,
-    'Automation & tasks': 0,
-    'Overview of NDR teams': 0,
-    'Integration & sources': 0
+IMPROVE_THEME_KEYWORDS = {
+    'Timeline & wait time': ['wait', 'timeline', 'long', 'months'],
+    'Time management': ['time', 'first week', 'dedicated'],
+    'Connection with new hires': ['new employee', 'new hire', 'cohort'],
+    'Benefits & HR': ['benefits', 'hr', 'health'],
+    'Automation & tasks': ['automated', 'task', 'fix'],
+    'Overview of NDR teams': ['overview', 'team', 'area'],
+    'Integration & sources': ['integration', 'overlap', 'confusion']
 }
+improve_themes = {theme: 0 for theme in IMPROVE_THEME_KEYWORDS}
+improve_weights = {theme: 0.0 for theme in IMPROVE_THEME_KEYWORDS}
+improve_labels = []
 
-for response in improve_responses:
+for idx, response in improve_responses.items():
     response_lower = str(response).lower()
     if 'n/a' in response_lower or 'nothing' in response_lower or 'no change' in response_lower:
+        improve_labels.append({theme: False for theme in IMPROVE_THEME_KEYWORDS})
         continue
-    if any(word in response_lower for word in ['wait', 'timeline', 'long', 'months']):
-        improve_themes['Timeline & wait time'] += 1
-    if any(word in response_lower for word in ['time', 'first week', 'dedicated']):
-        improve_themes['Time management'] += 1
-    if any(word in response_lower for word in ['new employee', 'new hire', 'cohort']):
-        improve_themes['Connection with new hires'] += 1
-    if any(word in response_lower for word in ['benefits', 'hr', 'health']):
-        improve_themes['Benefits & HR'] += 1
-    if any(word in response_lower for word in ['automated', 'task', 'fix']):
-        improve_themes['Automation & tasks'] += 1
-    if any(word in response_lower for word in ['overview', 'team', 'area']):
-        improve_themes['Overview of NDR teams'] += 1
-    if any(word in response_lower for word in ['integration', 'overlap', 'confusion']):
-        improve_themes['Integration & sources'] += 1
+    labels = {theme: any(word in response_lower for word in words) for theme, words in IMPROVE_THEME_KEYWORDS.items()}
+    for theme, hit in labels.items():
+        improve_themes[theme] += hit
+        improve_weights[theme] += weights[idx] * hit
+    improve_labels.append(labels)
 
+improve_total = weights[improve_responses.index].sum()
 improve_theme_data = [
-    {'theme': theme, 'count': count, 'percentage': round((count/len(improve_responses))*100, 1)}
+    {'theme': theme, 'count': count, 'percentage': round((improve_weights[theme]/improve_total)*100, 1)}
     for theme, count in sorted(improve_themes.items(), key=lambda x: x[1], reverse=True)
     if count > 0
 ]
 
+# Redact names and contact details before comment text reaches an export (keyword themes above still see names)
+redactor = Redactor(['nancy', 'claudia', 'jeff', 'rhoads'], roster=os.environ.get('PII_ROSTER'))
+liked_responses = redactor.redact_series(liked_responses)
+improve_responses = redactor.redact_series(improve_responses)
+
+# Discovered topics across both open-ended questions (TF-IDF + NMF), compared with the keyword themes above
+topic_labels = pd.DataFrame(liked_labels + improve_labels,
+                            columns=list(LIKED_THEME_KEYWORDS) + list(IMPROVE_THEME_KEYWORDS)).fillna(False).astype(bool)
+topics, _ = discover_topics(pd.concat([liked_responses, improve_responses], ignore_index=True).astype(str),
+                            n_topics=6, labels=topic_labels)
+topics.to_csv('onboarding_topics.csv', index=False)
+
 # Compile all data
 visualization_data = {
     'summary': {
@@ -189,7 +227,8 @@ visualization_data = {
             'start': df['StartDate'].min().strftime('%Y-%m-%d'),
             'end': df['StartDate'].max().strftime('%Y-%m-%d')
         },
-        'overallSatisfaction': round(satisfaction_data[0]['positiveRate'], 1) if satisfaction_data else 0
+        'overallSatisfaction': round(satisfaction_data[0]['positiveRate'], 1) if satisfaction_data else 0,
+        'responseQuality': quality_summary
     },
     'satisfactionScores': satisfaction_data,
     'timeTrends': time_trends,
@@ -197,14 +236,27 @@ visualization_data = {
     'likedThemes': liked_theme_data,
     'improvementThemes': improve_theme_data
 }
+if raking:
+    visualization_data['summary']['weighting'] = {
+        'margins': raking.margins.to_dict(orient='records'),
+        'effectiveResponses': round(effective_n(raking.weights), 1),
+        'designEffect': round(len(raking.weights) / effective_n(raking.weights), 2)
+    }
+
+# Fail before publishing if the payload breaks an invariant
+n_invariants = assert_payload(visualization_data, 'onboarding')
 
 # Save to JSON
 with open('onboarding_data.json', 'w') as f:
     json.dump(visualization_data, f, indent=2)
 
 print("Data prepared successfully!")
-print(f"Total responses: {len(df)}")
+print(f"Invariants checked: {n_invariants}")
+print(f"Total responses: {len(df)} ({quality_summary['excluded']} excluded by quality screening)")
 print(f"Satisfaction metrics: {len(satisfaction_data)}")
 print(f"Quarterly trends: {len(time_trends)}")
 print(f"Liked themes: {len(liked_theme_data)}")
 print(f"Improvement themes: {len(improve_theme_data)}")
+print(f"Weighting: {summarize_raking(raking) if raking else 'none (set ONBOARDING_MARGINS to rake to headcounts)'}")
+print(f"PII: {redactor.report()}")
+print(f"Discovered topics: {len(topics)} ({int(topics['emerging'].sum()) if len(topics) else 0} outside the keyword themes) -> onboarding_topics.csv")
@@ -1,9 +1,15 @@
-import json
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from notebook_analysis import CellCache, analyze_notebook, cells_with
+from notebook_reader import read_notebook
 
 # Load the notebook
-with open(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb', encoding='utf-8') as f:
-    nb = json.load(f)
+nb = read_notebook(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb')
+
+# One AST pass over the code cells (cached per cell) feeds the code-level checks below
+code = analyze_notebook(nb['cells'], CellCache())
 
 print("="*80)
 print("CAPITAL ONE DATA CHALLENGE - NOTEBOOK ANALYSIS")
@@ -106,19 +112,18 @@ print("\n" + "="*80)
 print("DATA QUALITY CHECKS")
 print("="*80)
 quality_checks = 0
+quality_ops = {}
+for i, check in code['data_quality']:
+    strategy = f"({check['strategy']})" if check.get('strategy') else ''
+    quality_ops.setdefault(i, []).append(check['op'] + strategy)
 for i, cell in enumerate(nb['cells']):
     source = ''.join(cell['source'])
-    if 'null' in source.lower() or 'missing' in source.lower() or 'duplicat' in source.lower():
-        if cell['cell_type'] == 'code':
-            print(f"\nCell {i}:")
-            print(source[:300] if len(source) > 300 else source)
-            quality_checks += 1
-    elif 'data quality' in source.lower() or 'data cleaning' in source.lower():
-        print(f"\nCell {i} ({cell['cell_type']}):")
+    if i in quality_ops:
+        print(f"\nCell {i}: {', '.join(quality_ops[i])}")
         print(source[:300] if len(source) > 300 else source)
         quality_checks += 1
-    elif 'isnull' in source.lower() or 'isna' in source.lower():
-        print(f"\nCell {i}:")
+    elif cell['cell_type'] == 'markdown' and ('data quality' in source.lower() or 'data cleaning' in source.lower()):
+        print(f"\nCell {i} ({cell['cell_type']}):")
         print(source[:300] if len(source) > 300 else source)
         quality_checks += 1
 
@@ -128,16 +133,12 @@ print("\n" + "="*80)
 print("FUNCTIONS (Reusability)")
 print("="*80)
 functions_found = []
-for i, cell in enumerate(nb['cells']):
-    if cell['cell_type'] == 'code':
-        source = ''.join(cell['source'])
-        # Find function definitions
-        matches = re.findall(r'def\s+(\w+)\s*\(', source)
-        if matches:
-            for func in matches:
-                print(f"\nCell {i}: Function '{func}'")
-                print(source[:400] if len(source) > 400 else source)
-                functions_found.append(func)
+for i, func in code['functions']:
+    source = ''.join(nb['cells'][i]['source'])
+    owner = f"{func['class']}." if 'class' in func else ''
+    print(f"\nCell {i}: {func['kind'].capitalize()} '{owner}{func['name']}' (complexity {func['complexity']})")
+    print(source[:400] if len(source) > 400 else source)
+    functions_found.append(func['name'])
 
 print(f"\nTotal functions defined: {len(functions_found)}")
 
@@ -145,14 +146,11 @@ print("\n" + "="*80)
 print("VISUALIZATIONS")
 print("="*80)
 viz_count = 0
-for i, cell in enumerate(nb['cells']):
-    if cell['cell_type'] == 'code':
-        source = ''.join(cell['source'])
-        if 'plt.' in source or 'plot' in source or 'chart' in source.lower() or 'fig' in source:
-            if 'import' not in source or 'matplotlib' in source or 'seaborn' in source or 'plotly' in source:
-                print(f"\nCell {i}:")
-                print(source[:300] if len(source) > 300 else source)
-                viz_count += 1
+for i in cells_with(code, 'plots'):
+    source = ''.join(nb['cells'][i]['source'])
+    print(f"\nCell {i}:")
+    print(source[:300] if len(source) > 300 else source)
+    viz_count += 1
 
 print(f"\nTotal visualization cells: {viz_count}")
 
@@ -0,0 +1,120 @@
+"""
+Data Challenge - Batch Submission Audit
+Audits a cohort of challenge notebooks and flags submissions that share code
+
+Usage:
+    python audit_submissions.py submissions/ [--template starter.ipynb] [--output submission_audit.json]
+                                             [--workers 4] [--min-cells 3] [--no-cache]
+
+Every *.ipynb under the folder is streamed once through notebook_reader.
+Its code cells go through the cached AST audit (functions, plots,
+data-quality operations) and into a MinHash/LSH similarity index, so
+cross-submission overlap is found without comparing every pair of notebooks.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from notebook_analysis import CACHE_PATH, CellCache, analyze_notebook, cell_source, cells_with
+from notebook_reader import image_count, read_notebook
+from notebook_similarity import SimilarityIndex
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+OUTPUT_PATH = 'submission_audit.json'
+MIN_MATCHED_CELLS = 3   # report a pair once it shares this many cells...
+MIN_OVERLAP = 0.3       # ...or this much of its code outside cohort-wide boilerplate
+
+# ============================================================================
+# AUDIT
+# ============================================================================
+
+def find_notebooks(root):
+    found = []
+    for folder, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d != '.ipynb_checkpoints']
+        found.extend(os.path.join(folder, name) for name in sorted(names) if name.endswith('.ipynb'))
+    return sorted(found)
+
+def code_cells(nb):
+    return [(i, cell_source(cell)) for i, cell in enumerate(nb['cells'])
+            if cell['cell_type'] == 'code' and cell_source(cell).strip()]
+
+def summarize(nb, report):
+    return {
+        'cells': len(nb['cells']),
+        'code_cells': sum(cell['cell_type'] == 'code' for cell in nb['cells']),
+        'markdown_cells': sum(cell['cell_type'] == 'markdown' for cell in nb['cells']),
+        'functions': len(report['functions']),
+        'plot_cells': len(cells_with(report, 'plots')),
+        'images': sum(image_count(cell) for cell in nb['cells']),
+        'data_quality_ops': len(report['data_quality']),
+        'unparsed_cells': len(report['unparsed']),
+        'cyclomatic': report['complexity']['cyclomatic'],
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit a folder of challenge notebooks and flag shared code')
+    parser.add_argument('folder')
+    parser.add_argument('--template', help='Starter notebook whose code is not counted as shared')
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='Signature processes (default: CPU count)')
+    parser.add_argument('--min-cells', type=int, default=MIN_MATCHED_CELLS)
+    parser.add_argument('--min-overlap', type=float, default=MIN_OVERLAP)
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every cell')
+    args = parser.parse_args()
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    paths = find_notebooks(args.folder)
+    if not paths:
+        raise SystemExit(f'No notebooks found under {args.folder}')
+
+    print("=" * 80)
+    print("DATA CHALLENGE - BATCH SUBMISSION AUDIT")
+    print("=" * 80)
+
+    cache = CellCache(CACHE_PATH, enabled=not args.no_cache)
+    template = [source for _, source in code_cells(read_notebook(args.template))] if args.template else ()
+    index = SimilarityIndex(template_sources=template)
+    submissions, cells = {}, {}
+    for path in paths:
+        name = os.path.relpath(path, args.folder)
+        nb = read_notebook(path)
+        submissions[name] = summarize(nb, analyze_notebook(nb['cells'], cache, save=False))
+        cells[name] = code_cells(nb)
+    cache.save()
+    index.add_many(cells, args.workers)
+
+    # Every reported pair has a matching non-boilerplate cell, so overlap alone never flags shared imports
+    pairs = [pair for pair in index.similar_pairs(min_cells=1)
+             if pair['matched_cells'] >= args.min_cells or pair['overlap'] >= args.min_overlap]
+
+    print(f"\nSubmissions: {len(submissions)} ({cache.hits} cells from cache, {cache.misses} parsed)")
+    print(f"\n{'Notebook':<40} {'Code':>5} {'Funcs':>6} {'Plots':>6} {'DQ ops':>7} {'Cyclo':>6}")
+    for name, row in submissions.items():
+        print(f"{name[:40]:<40} {row['code_cells']:>5} {row['functions']:>6} {row['plot_cells']:>6} "
+              f"{row['data_quality_ops']:>7} {row['cyclomatic']:>6}")
+
+    print(f"\nShared code: {len(pairs)} pair(s) "
+          f"(>= {args.min_cells} matching cells or >= {args.min_overlap:.0%} overlap outside boilerplate)")
+    for pair in pairs:
+        print(f"  [!] {pair['notebook_a']} <> {pair['notebook_b']}: {pair['overlap']:.0%} overlap, "
+              f"{pair['matched_cells']} matching cells")
+        for match in pair['matches'][:10]:
+            print(f"      cell {match['cell_a']} ~ cell {match['cell_b']} ({match['similarity']:.0%})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'submissions': submissions, 'similar_pairs': pairs}, f, indent=2)
+    print(f"\n[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
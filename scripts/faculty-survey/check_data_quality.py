@@ -1,10 +1,12 @@
-import json
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from notebook_reader import read_notebook
+
 sys.stdout.reconfigure(encoding='utf-8')
 
-with open(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb', encoding='utf-8') as f:
-    nb = json.load(f)
+nb = read_notebook(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb')
 
 def get_cell_source(cell):
     return ''.join(cell['source'])
@@ -1,10 +1,12 @@
-import json
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from notebook_reader import image_count, read_notebook
+
 sys.stdout.reconfigure(encoding='utf-8')
 
-with open(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb', encoding='utf-8') as f:
-    nb = json.load(f)
+nb = read_notebook(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb')
 
 def get_cell_source(cell):
     return ''.join(cell['source'])
@@ -16,7 +18,7 @@ print("="*80)
 viz_cells = [48, 49, 52, 72, 82, 86, 90, 94]
 
 for cell_num in viz_cells:
-    print(f"\n>>> CELL {cell_num}")
+    print(f"\n>>> CELL {cell_num} ({image_count(nb['cells'][cell_num])} rendered images)")
     source = get_cell_source(nb['cells'][cell_num])
     print(source[:800] if len(source) > 800 else source)
     print("-" * 80)
@@ -0,0 +1,226 @@
+"""
+Faculty Survey - Batched Key-Driver Analysis
+Standardized regression coefficients and relative weights for every subgroup,
+solved as one stacked linear-algebra problem
+"""
+
+import argparse
+import os
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                                          'static', 'faculty-survey-dashboard', 'faculty_survey_data.csv'))
+
+OUTCOMES = {
+    'Q8_OverallSatisfaction': 'Overall Satisfaction',
+    'Q9_LikelihoodToRecommend': 'Likelihood to Recommend'
+}
+
+DRIVERS = {
+    'Q12_WorkloadManageable': 'Workload Manageable',
+    'Q13_WorkLifeBalance': 'Work-Life Balance',
+    'Q14_WeeklyHours': 'Weekly Hours',
+    'Q15_ServiceLoad': 'Service Load',
+    'Q16_TeachingResources': 'Teaching Resources',
+    'Q17_Facilities': 'Facilities',
+    'Q18_ResearchFunding': 'Research Funding',
+    'Q19_ProfDevelopment': 'Professional Development',
+    'Q20_Mentorship': 'Mentorship',
+    'Q21_Collaboration': 'Collaboration',
+    'Q22_Compensation': 'Compensation',
+    'Q23_TenureClarity': 'Tenure Clarity',
+    'Q24_TenureFairness': 'Tenure Fairness',
+    'Q25_HiringEffectiveness': 'Hiring Effectiveness'
+}
+
+# Weekly hours is banded text; use band midpoints (same as the dashboard)
+HOURS_MAP = {'40-49 hours': 45, '50-59 hours': 55, '60-69 hours': 65, '70+ hours': 75}
+
+SUBGROUP_DIMENSIONS = ['College', 'Rank', 'Gender', 'Race']
+
+# Slices smaller than this are reported as suppressed rather than solved
+MIN_SLICE_N = 30
+
+# Diagonal loading keeps pairwise-deletion correlation matrices invertible
+RIDGE = 1e-6
+
+# ============================================================================
+# SLICES
+# ============================================================================
+
+def build_slices(df, dimensions=SUBGROUP_DIMENSIONS, cross=False):
+    """Slice labels and a (slices x respondents) 0/1 membership matrix"""
+    labels = [('Overall', 'All')]
+    masks = [np.ones(len(df), dtype=bool)]
+
+    for dim in dimensions:
+        for value in sorted(df[dim].dropna().unique()):
+            labels.append((dim, value))
+            masks.append((df[dim] == value).to_numpy())
+
+    if cross:
+        for dim_a, dim_b in combinations(dimensions, 2):
+            pairs = df[[dim_a, dim_b]].dropna().drop_duplicates().sort_values([dim_a, dim_b])
+            for value_a, value_b in pairs.itertuples(index=False):
+                labels.append((f'{dim_a} x {dim_b}', f'{value_a} | {value_b}'))
+                masks.append(((df[dim_a] == value_a) & (df[dim_b] == value_b)).to_numpy())
+
+    return labels, np.vstack(masks).astype(float)
+
+# ============================================================================
+# BATCHED SOLVER
+# ============================================================================
+
+def _slice_moment(membership, a, b):
+    """sum_n membership[s, n] * a[n, j] * b[n, k] as a single matrix product"""
+    n_rows, p = a.shape
+    outer = (a[:, :, None] * b[:, None, :]).reshape(n_rows, p * p)
+    return (membership @ outer).reshape(-1, p, p)
+
+def pairwise_correlations(membership, values):
+    """
+    Pairwise-complete correlation matrices for every slice at once.
+
+    membership is (S x n), values is (n x p) with NaN for missing answers.
+    Each moment is one matrix product over the slice axis, so S slices cost
+    the same number of passes as one.
+    """
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    v = valid.astype(float)
+
+    n = _slice_moment(membership, v, v)
+    sum_j = _slice_moment(membership, x, v)
+    sum_sq_j = _slice_moment(membership, x * x, v)
+    sum_jk = _slice_moment(membership, x, x)
+    sum_k = np.swapaxes(sum_j, 1, 2)
+    sum_sq_k = np.swapaxes(sum_sq_j, 1, 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_jk - sum_j * sum_k / n
+        var_j = sum_sq_j - sum_j ** 2 / n
+        var_k = sum_sq_k - sum_k ** 2 / n
+        corr = cov / np.sqrt(var_j * var_k)
+    return corr, n
+
+def solve_drivers(corr, n_drivers):
+    """
+    Standardized betas and Johnson relative weights for all slices and outcomes.
+
+    corr is (S x p x p) over [drivers..., outcomes...]. The normal equations
+    R_xx b = r_xy are solved for every slice and outcome in one batched call.
+    """
+    r_xx = corr[:, :n_drivers, :n_drivers].copy()
+    r_xy = corr[:, :n_drivers, n_drivers:]
+
+    bad = ~np.isfinite(r_xx).all(axis=(1, 2)) | ~np.isfinite(r_xy).all(axis=(1, 2))
+    r_xx[bad] = np.eye(n_drivers)
+    r_xy = np.where(bad[:, None, None], 0.0, r_xy)
+    r_xx += RIDGE * np.eye(n_drivers)
+
+    betas = np.linalg.solve(r_xx, r_xy)
+    r2 = np.einsum('sjo,sjo->so', r_xy, betas)
+
+    # Relative weights: orthogonalize via the symmetric square root of R_xx
+    eigvals, eigvecs = np.linalg.eigh(r_xx)
+    eigvals = np.clip(eigvals, RIDGE, None)
+    lam = eigvecs @ (np.sqrt(eigvals)[:, :, None] * np.swapaxes(eigvecs, 1, 2))
+    beta_orth = np.linalg.solve(lam, r_xy)
+    weights = np.einsum('sjk,sko->sjo', lam ** 2, beta_orth ** 2)
+
+    betas[bad] = np.nan
+    weights[bad] = np.nan
+    r2[bad] = np.nan
+    return betas, weights, r2
+
+def run_driver_analysis(df, dimensions=SUBGROUP_DIMENSIONS, cross=False, min_n=MIN_SLICE_N):
+    """Long table of driver importance for every slice x outcome x driver"""
+    data = df.copy()
+    data['Q14_WeeklyHours'] = data['Q14_WeeklyHours'].map(HOURS_MAP)
+    driver_cols = list(DRIVERS)
+    outcome_cols = list(OUTCOMES)
+    values = data[driver_cols + outcome_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+    labels, membership = build_slices(data, dimensions, cross)
+    corr, pair_n = pairwise_correlations(membership, values)
+
+    p = len(driver_cols)
+    slice_n = membership.sum(axis=1).astype(int)
+    small = slice_n < min_n
+    corr[small] = np.nan
+    betas, weights, r2 = solve_drivers(corr, p)
+
+    # Smallest pairwise n within each slice's driver block (tenure items are sparse)
+    min_pair_n = pair_n[:, :p, :p].reshape(len(labels), -1).min(axis=1).astype(int)
+
+    n_slices, n_outcomes = len(labels), len(outcome_cols)
+    s_idx, j_idx, o_idx = np.meshgrid(np.arange(n_slices), np.arange(p), np.arange(n_outcomes), indexing='ij')
+    s_idx, j_idx, o_idx = s_idx.ravel(), j_idx.ravel(), o_idx.ravel()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = weights / weights.sum(axis=1, keepdims=True) * 100
+
+    results = pd.DataFrame({
+        'dimension': [labels[s][0] for s in s_idx],
+        'subgroup': [labels[s][1] for s in s_idx],
+        'outcome': [outcome_cols[o] for o in o_idx],
+        'driver': [driver_cols[j] for j in j_idx],
+        'driver_label': [DRIVERS[driver_cols[j]] for j in j_idx],
+        'n': slice_n[s_idx],
+        'min_pairwise_n': min_pair_n[s_idx],
+        'r': np.round(corr[s_idx, j_idx, p + o_idx], 3),
+        'std_beta': np.round(betas[s_idx, j_idx, o_idx], 3),
+        'relative_weight': np.round(weights[s_idx, j_idx, o_idx], 4),
+        'relative_weight_pct': np.round(share[s_idx, j_idx, o_idx], 1),
+        'r_squared': np.round(r2[s_idx, o_idx], 3),
+        'suppressed': small[s_idx]
+    })
+    results['rank'] = results.groupby(['dimension', 'subgroup', 'outcome'])['relative_weight'].rank(ascending=False, method='first')
+    return results
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched key-driver analysis for the faculty survey')
+    parser.add_argument('--input', default=DATA_PATH)
+    parser.add_argument('--output', default='faculty_driver_importance.csv')
+    parser.add_argument('--cross', action='store_true', help='Also solve every two-way crossing of the subgroup dimensions')
+    parser.add_argument('--min-n', type=int, default=MIN_SLICE_N)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, usecols=SUBGROUP_DIMENSIONS + list(DRIVERS) + list(OUTCOMES))
+
+    start = time.perf_counter()
+    results = run_driver_analysis(df, cross=args.cross, min_n=args.min_n)
+    elapsed = time.perf_counter() - start
+
+    n_slices = results[['dimension', 'subgroup']].drop_duplicates().shape[0]
+    n_solved = results.loc[~results['suppressed'], ['dimension', 'subgroup']].drop_duplicates().shape[0]
+
+    print("=" * 80)
+    print("FACULTY SURVEY - KEY DRIVER ANALYSIS")
+    print("=" * 80)
+    print(f"\nSlices: {n_slices} ({n_solved} solved, {n_slices - n_solved} suppressed with n<{args.min_n})")
+    print(f"Solved {n_solved * len(OUTCOMES)} regressions in {elapsed * 1000:.1f} ms")
+
+    for outcome, label in OUTCOMES.items():
+        overall = results[(results['dimension'] == 'Overall') & (results['outcome'] == outcome)].sort_values('rank')
+        print(f"\n{label} (R² = {overall['r_squared'].iloc[0]:.2f}) - top drivers:")
+        for _, row in overall.head(5).iterrows():
+            print(f"  {int(row['rank'])}. {row['driver_label']}: {row['relative_weight_pct']:.1f}% of R² (beta={row['std_beta']:.2f})")
+
+    results.to_csv(args.output, index=False)
+    print(f"\n[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,18 @@
-import json
+import os
 import sys
-import re
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from notebook_analysis import CellCache, analyze_notebook, cells_with
+from notebook_reader import read_notebook
 
 # Set UTF-8 output
 sys.stdout.reconfigure(encoding='utf-8')
 
 # Load the notebook
-with open(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb', encoding='utf-8') as f:
-    nb = json.load(f)
+nb = read_notebook(r'C:\Users\USER\Desktop\Capital One\Abhigyan_ghosh_Capital_One_data_Challenge.ipynb')
+
+# One AST pass over the code cells (cached per cell) feeds the code-level checks below
+code = analyze_notebook(nb['cells'], CellCache())
 
 def get_cell_source(cell):
     """Get cell source as string"""
@@ -103,13 +108,10 @@ print(f"\nQ5 Status: {'FOUND' if q5_cells else 'NOT FOUND'}")
 
 # Data Quality Checks
 print_section("DATA QUALITY CHECKS")
-dq_keywords = ['null', 'missing', 'duplicat', 'isnull', 'isna', 'quality', 'cleaning']
-dq_cells = set()
+dq_cells = set(cells_with(code, 'data_quality'))
 for i, cell in enumerate(nb['cells']):
-    source = get_cell_source(cell).lower()
-    if any(kw in source for kw in dq_keywords):
-        if cell['cell_type'] == 'code' or 'quality' in source:
-            dq_cells.add(i)
+    if cell['cell_type'] == 'markdown' and 'quality' in get_cell_source(cell).lower():
+        dq_cells.add(i)
 
 print(f"Cells with data quality checks: {len(dq_cells)}")
 print(f"Cells: {sorted(list(dq_cells))[:20]}")
@@ -117,24 +119,16 @@ print(f"Cells: {sorted(list(dq_cells))[:20]}")
 # Functions
 print_section("REUSABLE FUNCTIONS")
 functions = []
-for i, cell in enumerate(nb['cells']):
-    if cell['cell_type'] == 'code':
-        source = get_cell_source(cell)
-        matches = re.findall(r'def\s+(\w+)\s*\(', source)
-        for func in matches:
-            functions.append((i, func))
-            print(f"Cell {i}: def {func}()")
+for i, func in code['functions']:
+    owner = f"{func['class']}." if 'class' in func else ''
+    functions.append((i, func['name']))
+    print(f"Cell {i}: {func['kind']} {owner}{func['name']}() - complexity {func['complexity']}")
 
 print(f"\nTotal functions: {len(functions)}")
 
 # Visualizations
 print_section("VISUALIZATIONS")
-viz_count = 0
-for i, cell in enumerate(nb['cells']):
-    if cell['cell_type'] == 'code':
-        source = get_cell_source(cell)
-        if any(kw in source for kw in ['plt.', '.plot(', 'fig', 'chart', 'sns.']):
-            viz_count += 1
+viz_count = len(cells_with(code, 'plots'))
 
 print(f"Visualization cells found: {viz_count}")
 
@@ -0,0 +1,282 @@
+"""
+Faculty Survey - Filter Cube Builder
+Precomputes additive aggregates for every filter combination on the interactive
+dashboard, suppresses small cells and their complements, and writes a keyed
+payload for O(1) lookups
+"""
+
+import argparse
+import json
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                                          'static', 'faculty-survey-dashboard', 'faculty_survey_data.csv'))
+PAYLOAD_PATH = os.path.join(os.path.dirname(DATA_PATH), 'faculty_cube.json')
+
+# Cube dimension -> id of the matching <select> on interactive.html
+FILTER_DIMENSIONS = {
+    'College': 'collegeFilter',
+    'Rank': 'rankFilter',
+    'Discipline': 'disciplineFilter',
+    'Gender': 'genderFilter',
+    'Race': 'raceFilter',
+    'YearsAtInstitution': 'yearsFilter'
+}
+
+# The minimum-satisfaction slider is a cumulative dimension: level k keeps Q8 >= k
+SATISFACTION_COL = 'Q8_OverallSatisfaction'
+SATISFACTION_LEVELS = [1, 2, 3, 4, 5]
+
+# Cells with fewer respondents than this are never published
+MIN_CELL_N = 5
+
+MEAN_METRICS = [
+    'Q8_OverallSatisfaction',
+    'Q13_WorkLifeBalance',
+    'Q22_Compensation',
+    'Q26_PsychologicalSafety',
+    'Q27_Belonging'
+]
+
+# Chart 5 correlation matrix (complete cases across these items)
+CORR_METRICS = [
+    'Q8_OverallSatisfaction',
+    'Q13_WorkLifeBalance',
+    'Q22_Compensation',
+    'Q27_Belonging',
+    'Q26_PsychologicalSafety'
+]
+
+HOURS_COL = 'Q14_WeeklyHours'
+HOURS_MAP = {'40-49 hours': 45, '50-59 hours': 55, '60-69 hours': 65, '70+ hours': 75}
+HOURS_DEFAULT = 55
+
+# ============================================================================
+# PER-RESPONDENT STATISTICS
+# ============================================================================
+
+def respondent_stats(df):
+    """One row per respondent of additive statistics; any cell is a column sum"""
+    stats = {'n': np.ones(len(df), dtype=np.int64)}
+
+    leaving = pd.to_numeric(df['Q10_ConsideredLeaving'], errors='coerce')
+    stats['n_leaving'] = (leaving >= 4).astype(np.int64)
+
+    # eNPS on the 5-point Q9: 4-5 promoters, 1-2 detractors (same rule as the dashboard)
+    recommend = pd.to_numeric(df['Q9_LikelihoodToRecommend'], errors='coerce')
+    stats['n_nps'] = recommend.notna().astype(np.int64)
+    stats['promoters'] = (recommend >= 4).astype(np.int64)
+    stats['detractors'] = (recommend <= 2).astype(np.int64)
+
+    hours = df[HOURS_COL]
+    stats['n_hours'] = hours.notna().astype(np.int64)
+    stats['sum_hours'] = hours.map(HOURS_MAP).fillna(HOURS_DEFAULT).where(hours.notna(), 0).astype(np.int64)
+    stats['n_hours_70'] = (hours == '70+ hours').astype(np.int64)
+
+    for metric in MEAN_METRICS:
+        values = pd.to_numeric(df[metric], errors='coerce')
+        stats[f'n:{metric}'] = values.notna().astype(np.int64)
+        stats[f'sum:{metric}'] = values.fillna(0)
+
+    corr = df[CORR_METRICS].apply(pd.to_numeric, errors='coerce')
+    complete = corr.notna().all(axis=1)
+    corr = corr.where(complete, 0)
+    stats['n_cc'] = complete.astype(np.int64)
+    for i, a in enumerate(CORR_METRICS):
+        stats[f'sx:{a}'] = corr[a]
+        for b in CORR_METRICS[i:]:
+            stats[f'sxy:{a}|{b}'] = corr[a] * corr[b]
+
+    # Chart 7: reasons for leaving (Q11), among everyone and among those considering leaving, and reason pairs
+    from faculty_reasons import REASON_COLS, combination_masks, contains_all, pack_reasons
+    masks = pack_reasons(df)
+    selected = contains_all(masks, (1 << np.arange(len(REASON_COLS))).astype(np.uint16))
+    for i, reason in enumerate(REASON_COLS):
+        stats[f'reason:{reason}'] = selected[:, i].astype(np.int64)
+        stats[f'leaving_reason:{reason}'] = (selected[:, i] & (leaving >= 4).to_numpy()).astype(np.int64)
+    pairs, pair_masks = combination_masks(len(REASON_COLS), 2)
+    for (i, j), both in zip(pairs, contains_all(masks, pair_masks).T):
+        stats[f'pair:{REASON_COLS[i]}|{REASON_COLS[j]}'] = both.astype(np.int64)
+
+    return pd.DataFrame(stats, index=df.index)
+
+# ============================================================================
+# CUBE
+# ============================================================================
+
+def encode_dimensions(df):
+    """Integer codes per filter dimension (0 is reserved for 'all')"""
+    values = {}
+    codes = pd.DataFrame(index=df.index)
+    for dim in FILTER_DIMENSIONS:
+        cats = sorted(df[dim].dropna().unique())
+        values[dim] = cats
+        codes[dim] = df[dim].map({v: i + 1 for i, v in enumerate(cats)}).fillna(-1).astype(np.int64)
+    return codes, values
+
+def build_cube(df, min_n=MIN_CELL_N):
+    """
+    Aggregate every filter combination including 'all' roll-ups.
+
+    Leaf cells are summed once with a single groupby; each of the 2^d roll-ups
+    is then a groupby over the (much smaller) leaf table. Cell keys are
+    mixed-radix integers so the dashboard computes a key instead of searching.
+    Small cells, and the complementary cells that would let them be recovered
+    by subtraction, are suppressed (see suppress_complements).
+    """
+    stats = respondent_stats(df)
+    fields = list(stats.columns)
+    codes, values = encode_dimensions(df)
+    dims = list(FILTER_DIMENSIONS)
+
+    radix = [len(values[dim]) + 1 for dim in dims] + [len(SATISFACTION_LEVELS)]
+    strides = np.cumprod([1] + radix[:-1]).tolist()
+
+    satisfaction = pd.to_numeric(df[SATISFACTION_COL], errors='coerce')
+    cells = {}
+    all_keys, all_rows = [], []
+
+    for level_idx, level in enumerate(SATISFACTION_LEVELS):
+        # Level 1 is the slider's resting position and keeps every respondent
+        keep = (satisfaction >= level) if level_idx > 0 else pd.Series(True, index=df.index)
+        keep &= (codes >= 0).all(axis=1)
+        if not keep.any():
+            continue
+
+        leaf = pd.concat([codes[keep], stats[keep]], axis=1).groupby(dims, sort=False)[fields].sum()
+        leaf = leaf.reset_index()
+
+        for r in range(len(dims) + 1):
+            for subset in combinations(range(len(dims)), r):
+                group_cols = [dims[i] for i in subset]
+                if group_cols:
+                    agg = leaf.groupby(group_cols, sort=False)[fields].sum().reset_index()
+                else:
+                    agg = leaf[fields].sum().to_frame().T
+
+                keys = np.full(len(agg), level_idx * strides[-1], dtype=np.int64)
+                for i in subset:
+                    keys += agg[dims[i]].to_numpy(dtype=np.int64) * strides[i]
+
+                all_keys.append(keys)
+                all_rows.append(agg[fields].to_numpy())
+
+    keys = np.concatenate(all_keys)
+    matrix = np.concatenate(all_rows)
+    hidden = suppress_complements(keys, matrix[:, fields.index('n')], radix, strides, min_n)
+    suppressed = keys[hidden].tolist()
+    for key, row in zip(keys[~hidden], matrix[~hidden]):
+        cells[str(int(key))] = [_compact(x) for x in row]
+
+    return {
+        'min_cell_n': int(min_n),
+        'n_total': int(len(df)),
+        'dimensions': [
+            {'name': dim, 'filter': FILTER_DIMENSIONS[dim], 'values': values[dim]} for dim in dims
+        ] + [
+            {'name': SATISFACTION_COL, 'filter': 'satisfactionSlider', 'values': SATISFACTION_LEVELS, 'cumulative': True}
+        ],
+        'radix': radix,
+        'strides': strides,
+        'fields': fields,
+        'hours_map': HOURS_MAP,
+        'cells': cells,
+        # Sorted suppressed keys, delta-encoded (the dashboard rebuilds them with a running sum)
+        'suppressed_deltas': np.diff(sorted(set(suppressed)), prepend=0).tolist()
+    }
+
+def suppress_complements(keys, n, radix, strides, min_n=MIN_CELL_N):
+    """
+    Mask of cells to suppress: every cell under min_n, plus complements.
+
+    Suppressing small cells alone is undone by subtraction. Consecutive
+    published satisfaction levels of one filter combination differ by the
+    respondents at the lower level, and a published roll-up minus its
+    published children is the total of its suppressed children. Whenever such
+    a difference is a group of 1 to min_n - 1 respondents, one more cell is
+    suppressed: the higher satisfaction level, or the roll-up's smallest
+    published child. Both checks repeat until neither finds a group.
+    Cells absent from the cube are known to be empty, so they count as 0.
+    """
+    coords = pd.DataFrame((keys[:, None] // np.array(strides)) % np.array(radix),
+                          columns=[f'c{i}' for i in range(len(radix))])
+    coords['n'] = n
+    coords['hidden'] = n < min_n
+    filters, level = list(coords.columns[:len(radix) - 1]), coords.columns[len(radix) - 1]
+    coords = coords.sort_values(filters + [level])
+
+    changed = True
+    while changed:
+        changed = False
+
+        # Satisfaction levels: each published cell against the next lower published level
+        shown = coords[~coords['hidden']]
+        lower = shown.groupby(filters, sort=False)['n'].shift()
+        gap = lower - shown['n']
+        leaks = shown.index[(gap > 0) & (gap < min_n)]
+        if len(leaks):
+            coords.loc[leaks, 'hidden'] = True
+            changed = True
+            continue
+
+        # Roll-ups: the suppressed children of a published 'all' cell must not total under min_n
+        for dim in filters:
+            line = [col for col in filters + [level] if col != dim]
+            children = coords[coords[dim] > 0]
+            hidden_total = children['n'].where(children['hidden'], 0).groupby([children[c] for c in line]).sum()
+            parents = coords[(coords[dim] == 0) & ~coords['hidden']].set_index(line)
+            exposed = hidden_total.reindex(parents.index).fillna(0)
+            exposed = exposed[(exposed > 0) & (exposed < min_n)]
+            if not len(exposed):
+                continue
+            candidates = children[~children['hidden']]
+            candidates = candidates[pd.MultiIndex.from_frame(candidates[line]).isin(exposed.index)]
+            coords.loc[candidates.groupby(line, sort=False)['n'].idxmin(), 'hidden'] = True
+            changed = True
+    return coords['hidden'].sort_index().to_numpy()
+
+def _compact(x):
+    """Integers stay integers in the JSON; other sums keep 4 decimals"""
+    x = float(x)
+    return int(x) if x.is_integer() else round(x, 4)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the faculty dashboard filter cube')
+    parser.add_argument('--input', default=DATA_PATH)
+    parser.add_argument('--output', default=PAYLOAD_PATH)
+    parser.add_argument('--min-n', type=int, default=MIN_CELL_N, help='Suppress cells with fewer respondents')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    cube = build_cube(df, args.min_n)
+
+    n_possible = int(np.prod(cube['radix']))
+    print("=" * 80)
+    print("FACULTY SURVEY - FILTER CUBE")
+    print("=" * 80)
+    print(f"\nRespondents: {cube['n_total']}")
+    dims = ' x '.join(f"{d['name']} ({len(d['values'])})" for d in cube['dimensions'])
+    print(f"Dimensions: {dims}")
+    print(f"Addressable cells: {n_possible:,}")
+    n_suppressed = len(cube['suppressed_deltas'])
+    print(f"Published cells: {len(cube['cells']):,} | Suppressed (n<{args.min_n} or complementary): {n_suppressed:,} | "
+          f"Empty: {n_possible - len(cube['cells']) - n_suppressed:,}")
+
+    with open(args.output, 'w') as f:
+        json.dump(cube, f, separators=(',', ':'))
+    print(f"\n[OK] Exported: {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+if __name__ == '__main__':
+    main()
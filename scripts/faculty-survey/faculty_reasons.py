@@ -0,0 +1,179 @@
+"""
+Faculty Survey - Reasons for Leaving Engine
+Packs the Q11 multi-select flags into per-respondent bitmasks and precomputes
+whole-survey prevalence and co-occurrence; per-group counts live in the
+suppressed filter cube (faculty_cube.py), never in this public payload
+"""
+
+import argparse
+import json
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from faculty_cube import MIN_CELL_N
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                                        'static', 'faculty-survey-dashboard', 'faculty_survey_data.csv'))
+PAYLOAD_PATH = os.path.join(os.path.dirname(DATA_PATH), 'faculty_reasons.json')
+
+# Bit i of a respondent's mask is set when REASON_COLS[i] == 1
+REASON_COLS = [
+    'Q11_Workload',
+    'Q11_Compensation',
+    'Q11_ResearchSupport',
+    'Q11_TeachingSupport',
+    'Q11_DeptClimate',
+    'Q11_TenurePromotion',
+    'Q11_LimitedAdvancement',
+    'Q11_Geographic',
+    'Q11_BetterOpportunity',
+    'Q11_LackRecognition'
+]
+
+REASON_LABELS = {
+    'Q11_Workload': 'Workload/Work-Life',
+    'Q11_Compensation': 'Compensation',
+    'Q11_ResearchSupport': 'Research Support',
+    'Q11_TeachingSupport': 'Teaching Support',
+    'Q11_DeptClimate': 'Dept. Climate',
+    'Q11_TenurePromotion': 'Tenure & Promotion',
+    'Q11_LimitedAdvancement': 'Limited Advancement',
+    'Q11_Geographic': 'Geographic',
+    'Q11_BetterOpportunity': 'Better Opportunity',
+    'Q11_LackRecognition': 'Lack of Recognition'
+}
+
+# Q10 is a 1-5 scale; 4-5 counts as having considered leaving (same rule as the dashboards)
+LEAVING_COL = 'Q10_ConsideredLeaving'
+LEAVING_MIN = 4
+
+# Highest co-occurrence order to precompute (2 = pairs, 3 = triples)
+MAX_ORDER = 3
+
+# ============================================================================
+# BITMASK ENCODING
+# ============================================================================
+
+def pack_reasons(df, reason_cols=REASON_COLS):
+    """Pack 0/1 reason flags into one uint16 bitmask per respondent"""
+    flags = df[reason_cols].fillna(0).to_numpy(dtype=np.uint16) & 1
+    bits = (np.uint16(1) << np.arange(len(reason_cols), dtype=np.uint16))
+    return (flags * bits).sum(axis=1).astype(np.uint16)
+
+def popcount(masks):
+    """Number of reasons selected per respondent"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int64)
+    table = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.int64)
+    return table[masks]
+
+def combination_masks(n_reasons, order):
+    """All reason combinations of one order as (index tuples, bitmasks)"""
+    combos = list(combinations(range(n_reasons), order))
+    masks = np.array([sum(1 << i for i in combo) for combo in combos], dtype=np.uint16)
+    return combos, masks
+
+def contains_all(masks, combo_masks):
+    """Respondents x combinations matrix: respondent selected every reason in combo"""
+    return (masks[:, None] & combo_masks[None, :]) == combo_masks[None, :]
+
+# ============================================================================
+# PAYLOAD
+# ============================================================================
+
+def build_payload(df, min_n=MIN_CELL_N):
+    """
+    Labels, combinations and the whole-survey summary for the dashboard.
+
+    Counts for any filter come from the cube, where small and complementary
+    cells are suppressed; no per-group slice is published here, and reason
+    pairs and sets chosen by fewer than min_n faculty are left out.
+    """
+    masks = pack_reasons(df)
+    leaving = (pd.to_numeric(df[LEAVING_COL], errors='coerce') >= LEAVING_MIN).to_numpy()
+    order_combos = {order: combination_masks(len(REASON_COLS), order)[0] for order in range(2, MAX_ORDER + 1)}
+    return {
+        'reasons': REASON_COLS,
+        'labels': [REASON_LABELS[col] for col in REASON_COLS],
+        'leaving_rule': f'{LEAVING_COL} >= {LEAVING_MIN}',
+        'combinations': {str(order): [list(combo) for combo in combos] for order, combos in order_combos.items()},
+        'min_count': int(min_n),
+        'overall': overall_summary(masks, leaving, min_n)
+    }
+
+def overall_summary(masks, leaving, min_n=MIN_CELL_N):
+    """Whole-survey prevalence, lift and the most common exact reason sets (counts under min_n left out)"""
+    n = len(masks)
+    n_reasons = len(REASON_COLS)
+    reason_bits = contains_all(masks, (1 << np.arange(n_reasons)).astype(np.uint16))
+    prevalence = reason_bits.mean(axis=0) * 100
+    leaving_prevalence = reason_bits[leaving].mean(axis=0) * 100 if leaving.any() else np.zeros(n_reasons)
+
+    # Exact reason sets: a histogram over the 2^10 possible masks
+    mask_counts = np.bincount(masks, minlength=1 << n_reasons)
+    multi = np.flatnonzero((mask_counts >= min_n) & (popcount(np.arange(1 << n_reasons, dtype=np.uint16)) >= 2))
+    top_sets = sorted(multi, key=lambda m: -mask_counts[m])[:15]
+
+    pairs, pair_masks = combination_masks(n_reasons, 2)
+    pair_counts = contains_all(masks, pair_masks).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = np.array([prevalence[i] * prevalence[j] / 100 ** 2 * n for i, j in pairs])
+        lift = np.where(expected > 0, pair_counts / expected, np.nan)
+
+    return {
+        'n': int(n),
+        'n_leaving': int(leaving.sum()),
+        'prevalence_pct': np.round(prevalence, 1).tolist(),
+        'leaving_prevalence_pct': np.round(leaving_prevalence, 1).tolist(),
+        'top_pairs': [
+            {'reasons': list(pairs[k]), 'count': int(pair_counts[k]), 'lift': round(float(lift[k]), 2)}
+            for k in np.argsort(-pair_counts)[:10] if pair_counts[k] >= min_n
+        ],
+        'top_reason_sets': [
+            {'reasons': [i for i in range(n_reasons) if m >> i & 1], 'count': int(mask_counts[m])}
+            for m in top_sets
+        ]
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute faculty reasons-for-leaving payload')
+    parser.add_argument('--input', default=DATA_PATH)
+    parser.add_argument('--output', default=PAYLOAD_PATH)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, usecols=[LEAVING_COL] + REASON_COLS)
+    payload = build_payload(df)
+
+    print("=" * 80)
+    print("FACULTY SURVEY - REASONS FOR LEAVING")
+    print("=" * 80)
+    overall = payload['overall']
+    print(f"\nRespondents: {overall['n']} | Considered leaving (Q10 >= {LEAVING_MIN}): {overall['n_leaving']}")
+
+    print("\nPrevalence (all / considered leaving):")
+    order = np.argsort(overall['prevalence_pct'])[::-1]
+    for i in order:
+        print(f"  {payload['labels'][i]}: {overall['prevalence_pct'][i]:.1f}% / {overall['leaving_prevalence_pct'][i]:.1f}%")
+
+    print("\nMost common reason pairs:")
+    for pair in overall['top_pairs'][:5]:
+        names = ' + '.join(payload['labels'][i] for i in pair['reasons'])
+        print(f"  {names}: {pair['count']} (lift {pair['lift']})")
+
+    with open(args.output, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    print(f"\n[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
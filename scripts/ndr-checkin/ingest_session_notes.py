@@ -0,0 +1,689 @@
+"""
+NDR Check-In Session Notes - Parallel, Incremental Ingestion
+Parses 30-Day and 6-Month .docx notes, codes each session with the reconciliation rubric and regenerates NDR_DATA
+
+Usage:
+    python ingest_session_notes.py --thirty-day "30 Day Notes" --six-month "6 month Check in\\6-month Check-In Notes"
+                                   [--apply] [--workers 4] [--rebase]
+
+Each .docx is read straight from its word/document.xml (no python-docx needed),
+split into sessions at date headers (one file may be a running log of several
+check-ins), and every answered question is coded with the rubric in
+static/ndr-checkin-dashboard/data-reconciliation.md section 3. Blank templates
+and fragments without question structure are excluded, as the analysts did.
+
+Sessions dated after a stage's `through` date in published_baseline.json are
+new; they are folded into the published figures with the session-weighted blend
+of section 7. Parsed files are remembered by content hash, so a re-run only
+opens notes that were added or edited. The result is written to
+ndr_sessions.generated.json next to the dashboard, and --apply writes it into
+the dashboard's data/ndr_data.json and rebuilds the hashed asset index.html
+loads. No names leave the parser: sessions are kept as dates, counts, units and
+codes.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from xml.etree import ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dashboard_assets import build_dashboard
+from payload_invariants import assert_payload
+from stage_cache import DEFAULT_DIR, code_digest, config_digest, file_digest
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.normpath(os.path.join(HERE, '..', '..', 'static', 'ndr-checkin-dashboard'))
+BASELINE_PATH = os.path.join(HERE, 'published_baseline.json')
+GENERATED_PATH = os.path.join(DASHBOARD_DIR, 'ndr_sessions.generated.json')
+DATA_PATH = os.path.join(DASHBOARD_DIR, 'data', 'ndr_data.json')
+MANIFEST_PATH = os.path.join(DEFAULT_DIR, 'ndr-session-notes.json')
+
+STAGES = ('thirtyDay', 'sixMonth')
+STAGE_NAMES = {'thirtyDay': '30-Day', 'sixMonth': '6-Month'}
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Question order of NDR_DATA.meta.questionReference; Q5 and Q6 are coded together
+QUESTIONS = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5-6', 'Q7', 'Q8', 'Q9', 'Q10', 'Q11']
+QUESTION_NUMBERS = {1: 'Q1', 2: 'Q2', 3: 'Q3', 4: 'Q4', 5: 'Q5-6', 6: 'Q5-6', 7: 'Q7', 8: 'Q8', 9: 'Q9', 10: 'Q10',
+                    11: 'Q11'}
+QUESTION_PATTERNS = [
+    ('Q4', r'roadblock'),
+    ('Q2', r'challenged|bored'),
+    ('Q3', r'welcom'),
+    ('Q1', r'what (?:you|they) expected|job .*expect'),
+    ('Q5-6', r'communicat|onboard'),
+    ('Q7', r'tools|training'),
+    ('Q8', r'culture'),
+    ('Q9', r'goals?\b'),
+    ('Q10', r'expertise|utiliz'),
+    ('Q11', r'adjust'),
+]
+EXPERIENCE_QUESTIONS = ('Q1', 'Q2', 'Q3', 'Q5-6')
+NEEDS_QUESTIONS = ('Q4', 'Q7', 'Q9', 'Q10', 'Q11')
+MIN_ANSWERED = 3  # fewer answered questions = fragment, excluded like the 5/21/25 log entry
+
+# Rubric evidence (data-reconciliation.md section 3). Negated phrases are removed first,
+# so "no concerns" or "never bored" do not count as evidence.
+NEGATIONS = (r"\b(?:not|never|no one|nobody|isn't|aren't|wasn't|hasn't)\s+(?:\w+\s+)?"
+             r"(?:bored|frustrated|confused|overwhelmed|disappointed|an issue|a problem|a concern)\b"
+             r"|\bno (?:complaints?|concerns?|issues?|problems?|roadblocks?|challenges?|requests?)\b"
+             r"|\bnothing (?:yet|needed|at this time|right now|comes to mind)\b")
+NEGATIVE_EVIDENCE = (r"frustrat|complain|unresolved|disappoint|not what (?:i|they|he|she) expected|\bbored\b|unwelcom"
+                     r"|isolat|left out|overwhelm|\bstruggl|limitation|\blimited\b|\black of\b|unclear")
+REQUEST_OR_CONCERN = (r"\bneed|would (?:like|love|be (?:nice|helpful|great|good))|\bwish|request"
+                      r"|\bwants? (?:more|to see|to have)|could use|\bissue|problem|concern|delay|waiting|\baccess\b"
+                      r"|missing|trouble|difficult|\bhard\b|confus|unclear|\black\b|should|suggest|haven't|not yet"
+                      r"|improv")
+IMPEDIMENT = (r"can't|cannot|unable|blocked|waiting (?:on|for)|delay|no access|not working|doesn't work|isn't working"
+              r"|broken|freez|haven't (?:received|gotten|been able)|still (?:no|not|waiting)")
+RESOLVED = r"resolved|fixed|sorted out|taken care of|now (?:working|has|have)|got answered|cleared up"
+DISSATISFACTION = (r"dissatisf|unhappy|disappoint|frustrat|toxic|siloed|unwelcom|don't (?:like|feel)"
+                   r"|not (?:a )?(?:good|great) (?:fit|culture)")
+
+# Roadblock slices per stage; an impediment matching none goes to the stage's last slice
+ROADBLOCK_CATEGORIES = {
+    'thirtyDay': [
+        ('HR/Benefits Confusion', r'benefit|\bhr\b|payroll|enrol|retirement|insurance|withholding'),
+        ('Training Gaps', r'training|orientation|acronym|jargon|documentation'),
+        ('IT/System Access', r'.'),
+    ],
+    'sixMonth': [
+        ('Leadership Transitions', r'leader|director|manager (?:left|depart)|transition|interim'),
+        # facilities/layout issues are folded into System/Tech (section 7)
+        ('System/Tech Issues', r'.'),
+    ],
+}
+NO_ROADBLOCKS_LABEL = 'No Roadblocks Reported'
+
+KPI_QUESTIONS = {
+    'Job Matches Expectations': 'Q1',
+    'Felt Welcomed': 'Q3',
+    'Engaged (Not Bored)': 'Q2',
+    'Communication Effective': 'Q5-6',
+    'Team Helped Onboarding': 'Q5-6',
+    'Culture Satisfaction': 'Q8',
+    'No Roadblocks': None,  # share of sessions without an actual impediment
+}
+FY_KPI_LABELS = {
+    'Job Match': 'Job Matches Expectations',
+    'Welcomed': 'Felt Welcomed',
+    'Engaged': 'Engaged (Not Bored)',
+    'Communication': 'Communication Effective',
+    'Team Support': 'Team Helped Onboarding',
+    'Culture': 'Culture Satisfaction',
+    'No Roadblocks': 'No Roadblocks',
+}
+OVERVIEW_METRICS = {
+    'Job expectations': 'Job Matches Expectations',
+    'Welcomed / belonging': 'Felt Welcomed',
+    'Engaged & challenged': 'Engaged (Not Bored)',
+    'Communication': 'Communication Effective',
+    'Team support': 'Team Helped Onboarding',
+    'Culture satisfaction': 'Culture Satisfaction',
+    'No roadblocks': 'No Roadblocks',
+}
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sept', 'Oct', 'Nov', 'Dec']
+MONTH_NUMBERS = {month[:3].lower(): number for number, month in enumerate(MONTHS, 1)}   # 'sep' for Sep/Sept/September
+DATE_RE = re.compile(r'(?<!\d)(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})(?!\d)')
+MONTH_DATE_RE = re.compile(r'\b(jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?\s+(\d{1,2}),?\s+(\d{4})\b',
+                           re.I)
+FY_FOLDER_RE = re.compile(r'\bFY\s*(\d{2})\b', re.I)
+ATTENDEES_RE = re.compile(r'^(?:attendees|participants|present|attendance|in attendance)\s*[:\-–]\s*(.+)$', re.I)
+HEADCOUNT_RE = re.compile(r'\b(\d{1,2})\s+(?:participants|attendees|people|employees|new hires)\b', re.I)
+
+RUBRIC_CONFIG = {
+    'questions': QUESTION_PATTERNS, 'min_answered': MIN_ANSWERED, 'negations': NEGATIONS,
+    'negative': NEGATIVE_EVIDENCE, 'request': REQUEST_OR_CONCERN, 'impediment': IMPEDIMENT, 'resolved': RESOLVED,
+    'dissatisfaction': DISSATISFACTION, 'roadblocks': ROADBLOCK_CATEGORIES,
+}
+
+# ============================================================================
+# DOCX READING
+# ============================================================================
+
+def read_paragraphs(path):
+    """Non-empty paragraph texts of a .docx, in document order"""
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    paragraphs = []
+    for para in root.iter(f'{W_NS}p'):
+        parts = []
+        for node in para.iter():
+            if node.tag == f'{W_NS}t' and node.text:
+                parts.append(node.text)
+            elif node.tag == f'{W_NS}tab':
+                parts.append('\t')
+            elif node.tag in (f'{W_NS}br', f'{W_NS}cr'):
+                parts.append('\n')
+        text = ''.join(parts).strip()
+        if text:
+            paragraphs.append(text)
+    return paragraphs
+
+# ============================================================================
+# SESSION SPLITTING
+# ============================================================================
+
+def parse_date(text):
+    """First m/d/yy, m.d.yyyy or 'December 13, 2024' date in text, else None"""
+    match = DATE_RE.search(text)
+    if match:
+        month, day, year = (int(part) for part in match.groups())
+        year += 2000 if year < 100 else 0
+    else:
+        match = MONTH_DATE_RE.search(text)
+        if not match:
+            return None
+        month = MONTH_NUMBERS[match[1].lower()[:3]]
+        day, year = int(match[2]), int(match[3])
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+def is_date_header(paragraph):
+    """A short line that is essentially a date ('12/13/24', 'Date: 1.31.25', '6-Month Check-In 3/24/25')"""
+    return len(paragraph) <= 60 and len(paragraph.split()) <= 6 and parse_date(paragraph) is not None
+
+def split_sessions(paragraphs, file_date):
+    """[(date, paragraphs)] split at date headers; text before the first header is dated by the filename"""
+    sessions = []
+    current_date, current = file_date, []
+    for paragraph in paragraphs:
+        if is_date_header(paragraph):
+            if current:
+                sessions.append((current_date, current))
+            current_date, current = parse_date(paragraph), []
+        else:
+            current.append(paragraph)
+    if current or current_date != file_date:
+        sessions.append((current_date, current))
+    return sessions
+
+def question_of(paragraph):
+    """(question id, inline answer) when the paragraph asks one of the check-in questions"""
+    numbered = re.match(r'^\s*(?:Q(?:uestion)?\s*)?(\d{1,2})\s*[.):]\s*(.*)$', paragraph, re.S | re.I)
+    if numbered and int(numbered[1]) in QUESTION_NUMBERS:
+        rest = numbered[2]
+        return QUESTION_NUMBERS[int(numbered[1])], rest.split('?', 1)[1].strip() if '?' in rest else ''
+    if '?' not in paragraph:
+        return None
+    asked, inline = paragraph.split('?', 1)
+    for question, pattern in QUESTION_PATTERNS:
+        if re.search(pattern, asked, re.I):
+            return question, inline.strip()
+    return None
+
+def session_answers(paragraphs):
+    """(answers by question id, participant count or None, units) for one session"""
+    answers = {}
+    participants, units = None, []
+    current = None
+    for paragraph in paragraphs:
+        attendees = ATTENDEES_RE.match(paragraph)
+        if attendees and current is None:
+            value = attendees[1]
+            units += [unit.strip() for unit in re.findall(r'\(([^)]+)\)', value)]
+            count = re.match(r'\s*(\d+)\b', value)
+            names = [name for name in re.split(r',|;|/|\band\b|\n', re.sub(r'\([^)]*\)', '', value)) if name.strip()]
+            participants = int(count[1]) if count else len(names)
+            continue
+        asked = question_of(paragraph)
+        if asked:
+            current = asked[0]
+            answers.setdefault(current, [])
+            if asked[1]:
+                answers[current].append(asked[1])
+        elif current is not None:
+            answers[current].append(paragraph)
+        elif participants is None and HEADCOUNT_RE.search(paragraph):
+            participants = int(HEADCOUNT_RE.search(paragraph)[1])
+    return {question: ' '.join(parts) for question, parts in answers.items() if parts}, participants, units
+
+# ============================================================================
+# RUBRIC
+# ============================================================================
+
+def code_answer(question, text):
+    """'positive' or 'mixed' for one answer under the adopted rubric"""
+    cleaned = re.sub(NEGATIONS, ' ', text.lower())
+    if question == 'Q8':
+        return 'mixed' if re.search(DISSATISFACTION, cleaned) else 'positive'
+    if question in EXPERIENCE_QUESTIONS:
+        return 'mixed' if re.search(NEGATIVE_EVIDENCE, cleaned) else 'positive'
+    return 'mixed' if re.search(REQUEST_OR_CONCERN, cleaned) else 'positive'
+
+def roadblock_of(stage, text):
+    """(is an actual impediment, slice label) for a Q4 answer"""
+    cleaned = re.sub(NEGATIONS, ' ', text.lower())
+    if not re.search(IMPEDIMENT, cleaned) or re.search(RESOLVED, cleaned):
+        return False, None
+    for label, pattern in ROADBLOCK_CATEGORIES[stage]:
+        if re.search(pattern, cleaned):
+            return True, label
+    return True, ROADBLOCK_CATEGORIES[stage][-1][0]
+
+def fiscal_year(relative_path, session_date):
+    """FY from the source folder (the analysts' grouping), else July-June by date"""
+    match = FY_FOLDER_RE.search(relative_path)
+    if match:
+        return f'FY{match[1]}'
+    return f'FY{(session_date.year + (session_date.month >= 7)) % 100:02d}'
+
+def ingest_file(path, relative_path, stage):
+    """Coded sessions and exclusions of one notes file (runs in a worker process)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    file_date = parse_date(stem)
+    try:
+        paragraphs = read_paragraphs(path)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        return {'sessions': [], 'excluded': [{'file': relative_path, 'date': None, 'reason': f'unreadable: {exc}'}]}
+
+    sessions, excluded = [], []
+    for session_date, body in split_sessions(paragraphs, file_date):
+        answers, participants, units = session_answers(body)
+        iso = session_date.isoformat() if session_date else None
+        if session_date is None:
+            excluded.append({'file': relative_path, 'date': None, 'reason': 'no session date'})
+            continue
+        if len(answers) < MIN_ANSWERED:
+            blank = all(question_of(paragraph) or ATTENDEES_RE.match(paragraph) for paragraph in body)
+            reason = 'blank template' if blank else 'fragment: no question structure'
+            excluded.append({'file': relative_path, 'date': iso, 'reason': reason})
+            continue
+        impediment, category = roadblock_of(stage, answers['Q4']) if 'Q4' in answers else (False, None)
+        sessions.append({
+            'file': relative_path,
+            'date': iso,
+            'fy': fiscal_year(relative_path, session_date),
+            'participants': participants,
+            'units': sorted(set(units)),
+            'format': 'Standard' if len(answers) >= len(QUESTIONS) - 1 else f'Custom ({len(answers)} Q)',
+            'codes': {question: code_answer(question, text) for question, text in answers.items()},
+            'impediment': impediment,
+            'roadblock': category,
+        })
+    return {'sessions': sessions, 'excluded': excluded}
+
+# ============================================================================
+# INCREMENTAL SWEEP
+# ============================================================================
+
+def parser_version():
+    """Changes whenever the parser, the rubric code or its terms change"""
+    code = code_digest([read_paragraphs, parse_date, is_date_header, split_sessions, question_of, session_answers,
+                        code_answer, roadblock_of, fiscal_year, ingest_file])
+    return config_digest({'code': code, 'rubric': RUBRIC_CONFIG})
+
+def find_notes(root):
+    """(path, path relative to root) of every .docx under root, skipping Word lock files"""
+    found = []
+    for folder, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.lower().endswith('.docx') and not name.startswith('~$'):
+                path = os.path.join(folder, name)
+                found.append((path, os.path.relpath(path, root)))
+    return sorted(found)
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_json(path, payload):
+    """Atomic JSON write"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+def sweep(roots, manifest_path, workers):
+    """Parse every changed notes file in a process pool; unchanged files come from the manifest"""
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+    version = parser_version()
+    results, todo = {}, []
+    for stage, root in roots.items():
+        for path, relative in find_notes(root):
+            key = f'{stage}:{os.path.abspath(path)}'
+            digest = file_digest(path)
+            entry = manifest.get(key)
+            if entry and entry['sha256'] == digest and entry['version'] == version:
+                results[key] = entry
+            else:
+                todo.append((key, digest, path, relative, stage))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, digest, pool.submit(ingest_file, path, relative, stage))
+                       for key, digest, path, relative, stage in todo]
+            for key, digest, future in futures:
+                results[key] = {'sha256': digest, 'version': version, **future.result()}
+    if manifest_path:
+        write_json(manifest_path, results)
+    return results, len(results) - len(todo), len(todo)
+
+# ============================================================================
+# MERGE
+# ============================================================================
+
+def js_round(value):
+    """Math.round, so merged figures match the reconciliation arithmetic"""
+    return int(value + 0.5) if value >= 0 else -int(-value + 0.5)
+
+def blend(published, published_n, hits, new_n):
+    """round((published x published_n + new x new_n) / total_n) with new = hits / new_n"""
+    if not new_n:
+        return published
+    return js_round((published * published_n + 100 * hits) / (published_n + new_n))
+
+def month_label(day):
+    return f'{MONTHS[day.month - 1]} {day.year}'
+
+def extend_range(date_range, last):
+    """'Sept 2023 – Jul 2026' with its end moved to the month of last"""
+    first = date_range.split(' – ')[0]
+    return first if first == month_label(last) else f'{first} – {month_label(last)}'
+
+def question_counts(sessions, question):
+    answered = [s for s in sessions if question in s['codes']]
+    return sum(s['codes'][question] == 'positive' for s in answered), len(answered)
+
+def kpi_counts(sessions, label):
+    if KPI_QUESTIONS[label] is None:
+        return sum(not s['impediment'] for s in sessions), len(sessions)
+    return question_counts(sessions, KPI_QUESTIONS[label])
+
+def merge_kpis(published, published_n, sessions):
+    return {label: blend(pct, published_n, *kpi_counts(sessions, label)) for label, pct in published.items()}
+
+def merge_sentiment(published, published_n, sessions):
+    rows = []
+    for row in published:
+        hits, n = question_counts(sessions, row['q'])
+        if not n:
+            rows.append(dict(row))
+            continue
+        positive = blend(row['positive'], published_n, hits, n)
+        rows.append({'q': row['q'], 'label': row['label'], 'positive': positive, 'mixed': 100 - positive,
+                     'flag': positive < 60 or 100 - positive > 40})
+    return rows
+
+def merge_roadblocks(published, published_n, sessions, none_pct):
+    """Blend each slice, keep 'none' equal to the No Roadblocks KPI and share the rest by largest remainder"""
+    if not sessions:
+        return [dict(row) for row in published]
+    total_n = published_n + len(sessions)
+    slices = [row for row in published if row['label'] != NO_ROADBLOCKS_LABEL]
+    exact = {row['label']: (row['pct'] * published_n + 100 * sum(s['roadblock'] == row['label'] for s in sessions))
+             / total_n for row in slices}
+    scale = (100 - none_pct) / (sum(exact.values()) or 1)
+    scaled = {label: value * scale for label, value in exact.items()}
+    floors = {label: int(value) for label, value in scaled.items()}
+    leftover = 100 - none_pct - sum(floors.values())
+    for label in sorted(scaled, key=lambda label: scaled[label] - floors[label], reverse=True)[:leftover]:
+        floors[label] += 1
+    return [{'label': NO_ROADBLOCKS_LABEL, 'pct': none_pct}] + [{'label': row['label'], 'pct': floors[row['label']]}
+                                                              for row in slices]
+
+def merge_stage(stage, published, sessions):
+    """Session-derived NDR_DATA fields of one stage: published figures plus the new sessions"""
+    n = published['sessions']
+    kpis = merge_kpis(published['kpis'], n, sessions)
+    last = max((date.fromisoformat(s['date']) for s in sessions), default=None)
+    out = {
+        'sessions': n + len(sessions),
+        'participants': published['participants'] + sum(s['participants'] or 0 for s in sessions),
+        'dateRange': extend_range(published['dateRange'], last) if sessions else published['dateRange'],
+        'kpis': [{'label': label, 'pct': pct} for label, pct in kpis.items()],
+        'sentiment': merge_sentiment(published['sentiment'], n, sessions),
+        'roadblockBreakdown': merge_roadblocks(published['roadblockBreakdown'], n, sessions, kpis['No Roadblocks']),
+        'newSessions': [{'date': s['date'], 'fy': s['fy'], 'format': s['format'], 'participants': s['participants']}
+                        for s in sessions],
+    }
+    if 'byFY' in published:
+        out['byFY'] = merge_fiscal_years(published['byFY'], sessions)
+    return out
+
+def merge_fiscal_years(published, sessions):
+    """Per-FY blend; a cohort missing from the baseline is built from its sessions alone"""
+    by_fy = {row['fy']: row for row in published}
+    for fy in sorted({s['fy'] for s in sessions} - set(by_fy)):
+        by_fy[fy] = {'fy': fy, 'dateRange': None, 'sessions': 0, 'participants': 0,
+                     'kpis': {key: 0 for key in FY_KPI_LABELS}}
+    rows = []
+    for fy in sorted(by_fy):
+        row = by_fy[fy]
+        cohort = sorted((s for s in sessions if s['fy'] == fy), key=lambda s: s['date'])
+        dates = [date.fromisoformat(s['date']) for s in cohort]
+        if row['dateRange'] is None:
+            first, last = month_label(dates[0]), month_label(dates[-1])
+            date_range = first if first == last else f'{first} – {last}'
+        else:
+            date_range = extend_range(row['dateRange'], dates[-1]) if cohort else row['dateRange']
+        rows.append({
+            'fy': fy,
+            'dateRange': date_range,
+            'sessions': row['sessions'] + len(cohort),
+            'participants': row['participants'] + sum(s['participants'] or 0 for s in cohort),
+            'kpis': {key: blend(pct, row['sessions'], *kpi_counts(cohort, FY_KPI_LABELS[key]))
+                     for key, pct in row['kpis'].items()},
+        })
+    return rows
+
+def new_sessions(stage, results, baseline):
+    """Sessions after the stage's baseline date; a date repeated within one file, or a session copied
+    verbatim (same date, participants and codes) into another file, counts once (first file wins)"""
+    through = baseline[stage]['through']
+    seen, fresh, covered, duplicates = set(), [], 0, []
+    for key in sorted(results):
+        if not key.startswith(f'{stage}:'):
+            continue
+        for session in results[key]['sessions']:
+            if session['date'] <= through:
+                covered += 1
+                continue
+            same_file = (session['date'], session['file'])
+            same_notes = (session['date'], session['participants'], json.dumps(session['codes'], sort_keys=True))
+            if same_file in seen or same_notes in seen:
+                duplicates.append(session)
+            else:
+                seen.update([same_file, same_notes])
+                fresh.append(session)
+    return sorted(fresh, key=lambda s: s['date']), covered, duplicates
+
+def build_generated(baseline, results):
+    """The generated artifact: merged figures per stage plus the overview cells derived from them"""
+    generated = {'stages': {}}
+    units = set()
+    for stage in STAGES:
+        fresh, _, _ = new_sessions(stage, results, baseline)
+        generated['stages'][stage] = merge_stage(stage, baseline[stage], fresh)
+        units.update(unit for s in fresh for unit in s['units'])
+    kpis = {stage: {row['label']: row['pct'] for row in generated['stages'][stage]['kpis']} for stage in STAGES}
+    generated['overview'] = {
+        'mappedMetrics': [{'metric': metric, 'd30': kpis['thirtyDay'][label], 'm6': kpis['sixMonth'][label]}
+                          for metric, label in OVERVIEW_METRICS.items()],
+    }
+    generated['units'] = sorted(units)
+    return generated
+
+def rebase(baseline, generated, results):
+    """Baseline that treats every ingested session as published (closes a reporting cycle)"""
+    rebased = json.loads(json.dumps(baseline))
+    for stage in STAGES:
+        merged = generated['stages'][stage]
+        fresh, _, _ = new_sessions(stage, results, baseline)
+        if not fresh:
+            continue
+        target = rebased[stage]
+        target.update({'through': fresh[-1]['date'], 'sessions': merged['sessions'],
+                       'participants': merged['participants'], 'dateRange': merged['dateRange'],
+                       'kpis': {row['label']: row['pct'] for row in merged['kpis']},
+                       'sentiment': merged['sentiment'], 'roadblockBreakdown': merged['roadblockBreakdown']})
+        if 'byFY' in merged:
+            target['byFY'] = merged['byFY']
+    return rebased
+
+# ============================================================================
+# NDR_DATA UPDATE
+# ============================================================================
+
+def by_key(rows, key):
+    return {row[key]: row for row in rows}
+
+def apply_stage(stage_data, merged):
+    """Overwrite one stage's session-derived fields, leaving the curated text alone"""
+    stage_data['sessions'] = merged['sessions']
+    stage_data['participants'] = f"~{merged['participants']}"
+    stage_data['dateRange'] = merged['dateRange']
+    note = re.sub(r'(from )\d+(?= sessions)', lambda m: m[1] + str(merged['sessions']), stage_data['dataNote'], count=1)
+    if 'byFY' in merged:
+        note = re.sub(r'(across )\d+(?= fiscal years)', lambda m: m[1] + str(len(merged['byFY'])), note, count=1)
+        stage_data['fiscalYears'] = len(merged['byFY'])
+    stage_data['dataNote'] = note
+
+    kpis = by_key(stage_data['kpis'], 'label')
+    for row in merged['kpis']:
+        kpis[row['label']]['pct'] = row['pct']
+    sentiment = by_key(stage_data['sentiment'], 'q')
+    for row in merged['sentiment']:
+        sentiment[row['q']].update(positive=row['positive'], mixed=row['mixed'], flag=row['flag'])
+    stage_data['roadblockBreakdown'] = [dict(row) for row in merged['roadblockBreakdown']]
+
+    if 'byFY' in merged:
+        cohorts = by_key(stage_data['byFY'], 'fy')
+        for row in merged['byFY']:
+            if row['fy'] not in cohorts:
+                cohorts[row['fy']] = {'fy': row['fy'], 'note': 'Generated from session notes; observations pending '
+                                                                'analyst review.', 'observations': [], 'roadblocks': []}
+                stage_data['byFY'].append(cohorts[row['fy']])
+            cohorts[row['fy']].update(dateRange=row['dateRange'], sessions=row['sessions'],
+                                      participants=f"~{row['participants']}", kpis=dict(row['kpis']))
+
+    if 'sessionsTable' in stage_data:
+        listed = {row['date'] for row in stage_data['sessionsTable']}
+        stage_data['sessionsTable'] += [{'date': us_date(row['date']), 'format': row['format'],
+                                         'participants': row['participants'] or 0}
+                                        for row in merged['newSessions'] if us_date(row['date']) not in listed]
+
+def apply_generated(data, generated):
+    """NDR_DATA with every session-derived field replaced by the generated figures"""
+    data = json.loads(json.dumps(data))
+    for stage in STAGES:
+        apply_stage(data[stage], generated['stages'][stage])
+
+    metrics = by_key(data['overview']['mappedMetrics'], 'metric')
+    for row in generated['overview']['mappedMetrics']:
+        metrics[row['metric']].update(d30=row['d30'], m6=row['m6'])
+    participation = by_key(data['overview']['participation'], 'stage')
+    for stage in STAGES:
+        merged = generated['stages'][stage]
+        participation[STAGE_NAMES[stage]]['detail'] = f"{merged['sessions']} sessions · ~{merged['participants']} participants"
+
+    units = data['meta']['unitsRepresented']
+    units += [unit for unit in generated['units'] if unit not in units]
+    return data
+
+def us_date(iso):
+    day = date.fromisoformat(iso)
+    return f'{day.month}/{day.day}/{day:%y}'
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def print_inventory(stage, results, baseline):
+    fresh, covered, duplicates = new_sessions(stage, results, baseline)
+    files = [entry for key, entry in results.items() if key.startswith(f'{stage}:')]
+    excluded = [item for entry in files for item in entry['excluded']]
+    print(f"\n{STAGE_NAMES[stage]}: {len(files)} file(s), {covered} baseline-covered session(s), "
+          f"{len(fresh)} new, {len(excluded)} excluded, {len(duplicates)} duplicate session(s)")
+    for session in fresh:
+        print(f"  + {us_date(session['date'])} {session['fy']} ({session['format']}, "
+              f"{session['participants'] if session['participants'] is not None else '?'} participants)")
+        if session['participants'] is None:
+            print(f"  [!] No attendee line in {session['file']}; counted as 0 participants")
+    for item in excluded:
+        print(f"  - {item['file']} {us_date(item['date']) if item['date'] else ''}: {item['reason']}")
+    for session in duplicates:
+        print(f"  [!] {session['file']}: {us_date(session['date'])} already ingested (repeated date or copied notes), skipped")
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest NDR check-in session notes into NDR_DATA')
+    parser.add_argument('--thirty-day', help='Folder of 30-Day notes (FY subfolders name the cohort)')
+    parser.add_argument('--six-month', help='Folder of 6-Month notes')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Published figures and the date they run through')
+    parser.add_argument('--output', default=GENERATED_PATH, help='Generated NDR_DATA fields (JSON)')
+    parser.add_argument('--data', default=DATA_PATH, help='Editable NDR_DATA source that --apply updates')
+    parser.add_argument('--apply', action='store_true',
+                        help='Write the generated figures into NDR_DATA and rebuild its hashed asset')
+    parser.add_argument('--rebase', action='store_true',
+                        help='Fold the new sessions into the baseline file (after the figures are published)')
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help='Content-hash record of parsed files')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parser processes')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("NDR CHECK-IN SESSION NOTES INGESTION")
+    print("=" * 80)
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    roots = {stage: root for stage, root in (('thirtyDay', args.thirty_day), ('sixMonth', args.six_month)) if root}
+    for stage, root in roots.items():
+        if not os.path.isdir(root):
+            raise SystemExit(f'Notes folder not found: {root}')
+
+    results, reused, parsed = sweep(roots, None if args.no_cache else args.manifest, args.workers)
+    print(f"\nFiles: {parsed} parsed, {reused} unchanged (content hash)")
+    for stage in roots:
+        print_inventory(stage, results, baseline)
+
+    generated = build_generated(baseline, results)
+    write_json(args.output, generated)
+    print(f"\n[OK] Exported: {args.output}")
+
+    for stage in STAGES:
+        merged = generated['stages'][stage]
+        kpis = ', '.join(f"{row['label']} {row['pct']}" for row in merged['kpis'])
+        print(f"  {STAGE_NAMES[stage]}: {merged['sessions']} sessions, ~{merged['participants']} participants | {kpis}")
+
+    if args.apply:
+        with open(args.data, encoding='utf-8') as f:
+            data = json.load(f)
+        updated = apply_generated(data, generated)
+        assert_payload(updated, 'ndr-checkin')
+        if updated != data:
+            write_json(args.data, updated)
+            print(f"[OK] Updated NDR_DATA: {args.data}")
+        else:
+            print(f"[OK] NDR_DATA already current: {args.data}")
+        static_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(args.data))))
+        for name, href, changed in build_dashboard('ndr-checkin', static_dir):
+            print(f"[OK] {'Built' if changed else 'Current'}: {href} (run node scripts/verify-data.mjs)")
+
+    if args.rebase:
+        write_json(args.baseline, rebase(baseline, generated, results))
+        print(f"[OK] Rebased: {args.baseline}")
+
+if __name__ == '__main__':
+    main()
@@ -5,17 +5,28 @@ Prepare comprehensive JSON data for D3.js dashboard
 import pandas as pd
 import json
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from respondent_export import read_respondents
+from payload_invariants import assert_payload
+from pii_redaction import is_pii_column
 
 # Load all the output files
 kpi_overall = pd.read_csv('output_kpi_overall.csv')
 kpi_by_dept = pd.read_csv('output_kpi_by_department.csv')
 themes_overall = pd.read_csv('output_themes_overall.csv')
 themes_by_dept = pd.read_csv('output_themes_by_department.csv')
-buckets_detail = pd.read_csv('output_buckets_detail.csv')
+# Only the sentiment column is read from the respondent-level export
+if os.path.exists('output_buckets_detail.parquet'):
+    buckets_detail = read_respondents('output_buckets_detail.parquet', columns=['sentiment_overall']).to_pandas()
+else:
+    buckets_detail = pd.read_csv('output_buckets_detail.csv', usecols=['sentiment_overall'])
 
 # Load original data for additional details
 file_path = r'C:\Users\USER\Downloads\Staff Development Day Survey 2025 (Responses).xlsx'
-df_raw = pd.read_excel(file_path)
+df_raw = pd.read_excel(file_path, usecols=lambda col: not is_pii_column(col))
 
 dept_col = 'Please indicate your department.'
 morning_breakout_col = 'Please select which morning breakout session you attended:'
@@ -175,11 +186,15 @@ for metric_dict in kpi_by_dept.to_dict(orient='records'):
             cleaned_metric[key] = value
     dashboard_data['kpi_by_department'].append(cleaned_metric)
 
+# Fail before publishing if the payload breaks an invariant
+n_invariants = assert_payload(dashboard_data, 'staff-dev')
+
 # Save to JSON
 with open('dashboard_data.json', 'w') as f:
     json.dump(dashboard_data, f, indent=2)
 
 print("Dashboard data prepared successfully!")
+print(f"Invariants checked: {n_invariants}")
 print(f"Total responses: {dashboard_data['metadata']['total_responses']}")
 print(f"Sessions tracked: {len(dashboard_data['session_performance'])}")
 print(f"Departments: {len(dashboard_data['department_comparison'])}")
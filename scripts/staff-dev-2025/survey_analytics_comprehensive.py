@@ -3,11 +3,34 @@ Staff Development Day 2025 - Comprehensive Survey Analytics
 Survey & People Analytics Analyst Approach
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import json
+import os
 import re
+import sys
 from collections import Counter, defaultdict
+from scipy import sparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+import respondent_export
+import pii_redaction
+import quote_selection
+import survey_backends
+import survey_stats
+import survey_store
+import survey_weights
+import topic_discovery
+from pii_redaction import Redactor, is_pii_column
+from quote_selection import select_quotes, theme_cells
+from respondent_export import respondent_table, write_compat_csv, write_respondents
+from stage_cache import DEFAULT_DIR, StageCache, file_digest
+from survey_backends import BACKENDS, get_backend, kpi_table, theme_table
+from survey_stats import bootstrap_kpi_cells, significant_gaps
+from survey_store import DEFAULT_STORE_PATH, OVERALL, SurveyStore
+from survey_weights import load_margins, rake, summarize_raking
+from topic_discovery import discover_topics
 
 # ============================================================================
 # CONFIGURATION & MAPPINGS
@@ -35,6 +58,11 @@ QUALITY_MAP = {
     'very poor': 1
 }
 
+# Scales handed to the execution backend: native points and the text map
+NPS_SCALE = {'points': (0, 10)}
+QUALITY_SCALE = {'points': (1, 5), 'map': QUALITY_MAP}
+AGREEMENT_SCALE = {'points': (1, 5), 'map': AGREEMENT_MAP}
+
 # Theme Taxonomy
 THEME_TAXONOMY = [
     'Session Timing & Duration',
@@ -69,95 +97,87 @@ POSITIVE_WORDS = ['great', 'excellent', 'fantastic', 'loved', 'appreciate', 'hel
 NEGATIVE_WORDS = ['disappointed', 'poor', 'rushed', 'boring', 'irrelevant', 'waste', 'frustrat', 'annoying', 'confusing', 'disjointed', 'ignored', 'refused']
 NEGATION_WORDS = ['not', 'no', 'never', 'nothing', 'neither', 'nobody', 'nowhere', "n't", 'barely', 'hardly', 'scarcely']
 
+# People named in comments (breakout facilitators); a roster file (--roster / env PII_ROSTER) adds more.
+# Keynote speakers are named in the questions themselves and are left as is.
+REDACT_NAMES = ['claudia', 'anna', 'amy', 'maureen', 'scott', 'chris', 'ashley', 'josh', 'matt']
+
+# Topics discovered in the open-ended feedback (TF-IDF + NMF), compared against THEME_KEYWORDS
+N_TOPICS = 8
+
+# Representative quotes per theme cell (centroid + MMR selection, max 25 words each)
+N_QUOTES = 3
+
+# Uncertainty settings (bootstrap replicates, smallest department reported in gaps)
+BOOTSTRAP_REPLICATES = 10000
+MIN_DEPT_N_FOR_GAPS = 5
+
+# Wave identity in the multi-wave survey store
+SURVEY_NAME = 'staff-dev'
+WAVE_ID = 'staff-dev-2025'
+
+CACHE_VERSION = 1
+
+INPUT_PATH = r'C:\Users\USER\Downloads\Staff Development Day Survey 2025 (Responses).xlsx'
+
+# Column definitions
+DEPT_COL = 'Please indicate your department.'
+
+# Raking margins (--margins / env SURVEY_MARGINS: margin, category, headcount) and the export column of each.
+# Any other margin names an export column directly; this export has no role question, so role margins are skipped.
+MARGIN_COLUMNS = {'department': DEPT_COL}
+WEIGHT_COL = 'weight'
+
+# NPS columns (already 0-10)
+NPS_COLS = {
+    'Overall_NPS': 'On a scale of 0-10, how likely are you to recommend Staff Development Day to a colleague?',
+    'Morning_Keynote_NPS': 'MORNING KEYNOTE SPEAKER - On a scale of 0-10, how likely are you to recommend the morning keynote speaker, Katie DeWulf : "Practical Strategies for Thriving Through Change" to a colleague?',
+    'Fireside_NPS': 'LUNCH AND FIRESIDE CHAT On a scale of 0-10, how likely are you to recommend the lunch and fireside chat: "Beyond the Buzz: Real Talk on AI" to a colleague?',
+    'Afternoon_Keynote_NPS': 'AFTERNOON KEYNOTE SPEAKER - On a scale of 0-10, how likely would you recommend the afternoon keynote speaker, Stuart MacDonald: "Continuous Improvement & Magic?":',
+    'Morning_Breakout_NPS': 'On a scale of 0-10, how likely do you recommend attending the morning breakout session you attended to a friend or colleague?',
+    'Afternoon_Breakout_NPS': 'On a scale of 0-10, how likely do you recommend attending the afternoon breakout session you attended to a friend or colleague?'
+}
+
+# Quality columns (need mapping to 1-5, then 0-10)
+QUALITY_COLS = {
+    'Organization_Flow': 'Regarding the Staff Development Day, how would you rate the following? [The organization and flow of the event?]',
+    'Venue': 'Regarding the Staff Development Day, how would you rate the following? [The venue of the event?]',
+    'Duration': 'Regarding the Staff Development Day, how would you rate the following? [The duration of the event?]'
+}
+
+# Likert agreement columns (need mapping to 1-5, then 0-10)
+LIKERT_COLS = {
+    'Morning_Keynote_Engaging': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [I thought the speaker was informative, engaging, and relatable.]',
+    'Morning_Keynote_Time': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [The time allotted for the keynote speaker was appropriate.]',
+    'Morning_Keynote_Relevant': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [The topic covered was relevant and informational.]',
+    'Fireside_Engaging': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The speakers were informative, engaging, and relatable.]',
+    'Fireside_Time': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The time allotted for the panel discussion was appropriate.]',
+    'Fireside_Relevant': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The topics covered were relevant and informational.]',
+    'Afternoon_Keynote_Engaging': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The speaker was informative, engaging, and relatable.]',
+    'Afternoon_Keynote_Time': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The time allotted for the keynote speaker was appropriate.]',
+    'Afternoon_Keynote_Relevant': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The topic covered was relevant and informational.]',
+    'Morning_Breakout_Engaging': 'Regarding the MORNING BREAKOUT SESSION you attended. [The speaker was informative, engaging, and relatable.]',
+    'Morning_Breakout_Time': 'Regarding the MORNING BREAKOUT SESSION you attended. [The time allotted for the speaker was appropriate.]',
+    'Morning_Breakout_Relevant': 'Regarding the MORNING BREAKOUT SESSION you attended. [The topic covered was relevant and informational.]',
+    'Afternoon_Breakout_Engaging': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The speaker was informative, engaging, and relatable.]',
+    'Afternoon_Breakout_Time': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The time allotted for the speaker was appropriate.]',
+    'Afternoon_Breakout_Relevant': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The topic covered was relevant and informational.]'
+}
+
+# Open-ended columns
+FEEDBACK_COL = 'Please provide any feedback as it relates to the schedule, content covered, or the overall experience.'
+FUTURE_COL = 'What other content or sessions would you like to see covered in future Staff Development Day events?'
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def clean_text(text):
-    """Clean and normalize text"""
-    if pd.isna(text):
-        return ''
-    return str(text).strip().lower()
-
-def normalize_likert_to_5(value):
-    """Normalize Likert agreement scale to 1-5"""
-    if pd.isna(value):
-        return np.nan
-
-    # If already numeric and in range 1-5
-    try:
-        num = float(value)
-        if 1 <= num <= 5:
-            return num
-    except (ValueError, TypeError):
-        pass
-
-    # Map text responses
-    cleaned = clean_text(value)
-    return AGREEMENT_MAP.get(cleaned, np.nan)
-
-def normalize_quality_to_5(value):
-    """Normalize quality scale to 1-5"""
-    if pd.isna(value):
-        return np.nan
-
-    # If already numeric and in range 1-5
-    try:
-        num = float(value)
-        if 1 <= num <= 5:
-            return num
-    except (ValueError, TypeError):
-        pass
-
-    # Map text responses
-    cleaned = clean_text(value)
-    return QUALITY_MAP.get(cleaned, np.nan)
-
-def convert_5_to_10(value):
-    """Convert 1-5 scale to 0-10 scale"""
-    if pd.isna(value):
-        return np.nan
-    return (value - 1) / 4 * 10
-
-def normalize_nps(value):
-    """Normalize NPS (0-10) values"""
-    if pd.isna(value):
-        return np.nan
-    try:
-        num = float(value)
-        if 0 <= num <= 10:
-            return num
-    except (ValueError, TypeError):
-        pass
-    return np.nan
-
-def get_nps_bucket(score):
-    """Categorize NPS score into Detractor/Passive/Promoter"""
-    if pd.isna(score):
-        return 'Missing'
-    if score <= 6:
-        return 'Detractor'
-    elif score <= 8:
-        return 'Passive'
-    else:
-        return 'Promoter'
-
-def get_sat_bucket(score):
-    """Categorize satisfaction score into Low/Medium/High"""
-    if pd.isna(score):
-        return 'Missing'
-    if score < 5.0:
-        return 'Low'
-    elif score < 8.0:
-        return 'Medium'
-    else:
-        return 'High'
+def nps_buckets(scores):
+    """Detractor (0-6) / Passive (7-8) / Promoter (9-10), Missing for blanks"""
+    return np.select([scores.isna(), scores <= 6, scores <= 8], ['Missing', 'Detractor', 'Passive'], 'Promoter')
 
-def is_top2_box(score):
-    """Check if score is Top-2 Box (>=8/10)"""
-    if pd.isna(score):
-        return False
-    return score >= 8.0
+def sat_buckets(scores):
+    """Low (<5) / Medium (5-7.9) / High (8+), Missing for blanks"""
+    return np.select([scores.isna(), scores < 5.0, scores < 8.0], ['Missing', 'Low', 'Medium'], 'High')
 
 def detect_sentiment(text):
     """Detect sentiment: Positive/Neutral/Negative"""
@@ -219,374 +239,206 @@ def extract_themes(text):
 
     return detected_themes
 
-def get_theme_sentiments(text, themes):
-    """Get sentiment for each theme mentioned"""
-    # For simplicity, apply overall sentiment to all themes
-    # In production, would do more granular sentence-level analysis
-    overall_sent = detect_sentiment(text)
-    return [{'theme': theme, 'sentiment': overall_sent} for theme in themes]
-
-def extract_quote(text, max_words=25):
-    """Extract a representative quote (max 25 words)"""
-    if pd.isna(text) or not text.strip():
-        return ''
-
-    # Take first sentence or up to max_words
-    sentences = re.split(r'[.!?]', text.strip())
-    first_sentence = sentences[0].strip()
-
-    words = first_sentence.split()
-    if len(words) <= max_words:
-        return first_sentence
-    else:
-        return ' '.join(words[:max_words]) + '...'
-
 # ============================================================================
-# MAIN ANALYSIS
+# PIPELINE STAGES
 # ============================================================================
+# Each stage is a pure function of its inputs; main() runs them through the
+# stage cache so a re-run only recomputes stages whose inputs, config or code changed.
 
-def main():
-    print("=" * 80)
-    print("STAFF DEVELOPMENT DAY 2025 - COMPREHENSIVE SURVEY ANALYTICS")
-    print("=" * 80)
-
-    # Load data
-    file_path = r'C:\Users\USER\Downloads\Staff Development Day Survey 2025 (Responses).xlsx'
-    df = pd.read_excel(file_path)
-
-    print(f"\nLoaded {len(df)} responses")
-
-    # Add respondent ID
+def stage_ingest(path):
+    """Read the export (without respondent e-mail columns) and number respondents"""
+    df = pd.read_excel(path, usecols=lambda col: not is_pii_column(col))
     df['respondent_id'] = range(1, len(df) + 1)
-
-    # ========================================================================
-    # A) NORMALIZE ALL SCALES
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("A) NORMALIZING ALL SCALES TO 0-10")
-    print("=" * 80)
-
-    # Column definitions
-    dept_col = 'Please indicate your department.'
-
-    # NPS columns (already 0-10)
-    nps_cols = {
-        'Overall_NPS': 'On a scale of 0-10, how likely are you to recommend Staff Development Day to a colleague?',
-        'Morning_Keynote_NPS': 'MORNING KEYNOTE SPEAKER - On a scale of 0-10, how likely are you to recommend the morning keynote speaker, Katie DeWulf : "Practical Strategies for Thriving Through Change" to a colleague?',
-        'Fireside_NPS': 'LUNCH AND FIRESIDE CHAT On a scale of 0-10, how likely are you to recommend the lunch and fireside chat: "Beyond the Buzz: Real Talk on AI" to a colleague?',
-        'Afternoon_Keynote_NPS': 'AFTERNOON KEYNOTE SPEAKER - On a scale of 0-10, how likely would you recommend the afternoon keynote speaker, Stuart MacDonald: "Continuous Improvement & Magic?":',
-        'Morning_Breakout_NPS': 'On a scale of 0-10, how likely do you recommend attending the morning breakout session you attended to a friend or colleague?',
-        'Afternoon_Breakout_NPS': 'On a scale of 0-10, how likely do you recommend attending the afternoon breakout session you attended to a friend or colleague?'
-    }
-
-    # Quality columns (need mapping to 1-5, then 0-10)
-    quality_cols = {
-        'Organization_Flow': 'Regarding the Staff Development Day, how would you rate the following? [The organization and flow of the event?]',
-        'Venue': 'Regarding the Staff Development Day, how would you rate the following? [The venue of the event?]',
-        'Duration': 'Regarding the Staff Development Day, how would you rate the following? [The duration of the event?]'
-    }
-
-    # Likert agreement columns (need mapping to 1-5, then 0-10)
-    likert_cols = {
-        'Morning_Keynote_Engaging': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [I thought the speaker was informative, engaging, and relatable.]',
-        'Morning_Keynote_Time': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [The time allotted for the keynote speaker was appropriate.]',
-        'Morning_Keynote_Relevant': 'Regarding the MORNING KEYNOTE SPEAKER - Katie DeWulf - The Big Apple Red: "Navigate the Shift: Practical Strategies for Thriving Through Change", please rate the following questions: [The topic covered was relevant and informational.]',
-        'Fireside_Engaging': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The speakers were informative, engaging, and relatable.]',
-        'Fireside_Time': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The time allotted for the panel discussion was appropriate.]',
-        'Fireside_Relevant': 'Regarding the LUNCH AND FIRESIDE CHAT - Beyond the Buzz: "Real Talk on AI", please rate the following questions: [The topics covered were relevant and informational.]',
-        'Afternoon_Keynote_Engaging': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The speaker was informative, engaging, and relatable.]',
-        'Afternoon_Keynote_Time': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The time allotted for the keynote speaker was appropriate.]',
-        'Afternoon_Keynote_Relevant': 'Regarding the AFTERNOON KEYNOTE SPEAKER - Stuart MacDonald: "Continuous Improvement and Magic," please rate the following questions: [The topic covered was relevant and informational.]',
-        'Morning_Breakout_Engaging': 'Regarding the MORNING BREAKOUT SESSION you attended. [The speaker was informative, engaging, and relatable.]',
-        'Morning_Breakout_Time': 'Regarding the MORNING BREAKOUT SESSION you attended. [The time allotted for the speaker was appropriate.]',
-        'Morning_Breakout_Relevant': 'Regarding the MORNING BREAKOUT SESSION you attended. [The topic covered was relevant and informational.]',
-        'Afternoon_Breakout_Engaging': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The speaker was informative, engaging, and relatable.]',
-        'Afternoon_Breakout_Time': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The time allotted for the speaker was appropriate.]',
-        'Afternoon_Breakout_Relevant': 'Regarding the AFTERNOON BREAKOUT SESSION you attended. [The topic covered was relevant and informational.]'
-    }
-
-    # Normalize NPS columns (already 0-10)
-    for new_col, orig_col in nps_cols.items():
-        if orig_col in df.columns:
-            df[new_col] = df[orig_col].apply(normalize_nps)
-            print(f"[OK] Normalized {new_col}: mean={df[new_col].mean():.2f}/10")
-
-    # Normalize Quality columns (map to 1-5, then convert to 0-10)
-    for new_col, orig_col in quality_cols.items():
-        if orig_col in df.columns:
-            df[f'{new_col}_5pt'] = df[orig_col].apply(normalize_quality_to_5)
-            df[new_col] = df[f'{new_col}_5pt'].apply(convert_5_to_10)
-            print(f"[OK] Normalized {new_col}: mean={df[new_col].mean():.2f}/10")
-
-    # Normalize Likert columns (map to 1-5, then convert to 0-10)
-    for new_col, orig_col in likert_cols.items():
-        if orig_col in df.columns:
-            df[f'{new_col}_5pt'] = df[orig_col].apply(normalize_likert_to_5)
-            df[new_col] = df[f'{new_col}_5pt'].apply(convert_5_to_10)
-            print(f"[OK] Normalized {new_col}: mean={df[new_col].mean():.2f}/10")
-
-    # ========================================================================
-    # B) BUCKETIZATION
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("B) APPLYING BUCKETIZATION")
-    print("=" * 80)
-
-    # NPS Buckets
-    for col in nps_cols.keys():
-        bucket_col = f'{col}_Bucket'
-        df[bucket_col] = df[col].apply(get_nps_bucket)
-        print(f"[OK] Created {bucket_col}")
-
-    # Satisfaction Buckets (for all other normalized columns)
-    all_other_cols = list(quality_cols.keys()) + list(likert_cols.keys())
-    for col in all_other_cols:
-        bucket_col = f'{col}_Bucket'
-        df[bucket_col] = df[col].apply(get_sat_bucket)
-        print(f"[OK] Created {bucket_col}")
-
-    # Top-2 Box flags
-    all_norm_cols = list(nps_cols.keys()) + all_other_cols
-    for col in all_norm_cols:
-        top2_col = f'{col}_Top2Box'
-        df[top2_col] = df[col].apply(is_top2_box)
-
-    print(f"\n[OK] Created Top-2 Box flags for all {len(all_norm_cols)} normalized columns")
-
-    # ========================================================================
-    # C) SENTIMENT & THEMES
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("C) ANALYZING SENTIMENT & THEMES")
-    print("=" * 80)
-
-    # Open-ended columns
-    feedback_col = 'Please provide any feedback as it relates to the schedule, content covered, or the overall experience.'
-    future_col = 'What other content or sessions would you like to see covered in future Staff Development Day events?'
-
-    # Combine both feedback columns
-    df['combined_feedback'] = df[feedback_col].fillna('') + ' ' + df[future_col].fillna('')
-
-    # Apply sentiment & theme analysis
-    df['sentiment_overall'] = df['combined_feedback'].apply(detect_sentiment)
-    df['themes'] = df['combined_feedback'].apply(extract_themes)
-    df['theme_sentiments'] = df.apply(lambda row: get_theme_sentiments(row['combined_feedback'], row['themes']), axis=1)
-    df['quote_short'] = df['combined_feedback'].apply(extract_quote)
-
-    sentiment_counts = df['sentiment_overall'].value_counts()
-    print(f"\nSentiment Distribution:")
-    for sent, count in sentiment_counts.items():
-        print(f"  {sent}: {count} ({count/len(df)*100:.1f}%)")
-
-    # Count theme prevalence
-    all_themes = [theme for themes_list in df['themes'] for theme in themes_list]
-    theme_counts = Counter(all_themes)
-    print(f"\nTop Themes:")
-    for theme, count in theme_counts.most_common(10):
-        print(f"  {theme}: {count} mentions ({count/len(df)*100:.1f}%)")
-
-    # ========================================================================
-    # D) AGGREGATIONS
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("D) GENERATING AGGREGATIONS")
-    print("=" * 80)
-
-    # --- KPI Overall ---
-    kpi_overall_data = []
-
-    for col in all_norm_cols:
-        if col in df.columns:
-            mean_score = df[col].mean()
-            top2_pct = df[f'{col}_Top2Box'].sum() / df[col].notna().sum() * 100 if df[col].notna().sum() > 0 else 0
-
-            row = {
-                'metric': col,
-                'mean_0_10': round(mean_score, 2),
-                'top2_box_pct': round(top2_pct, 1),
-                'n_responses': df[col].notna().sum()
-            }
-
-            # Add NPS breakdowns if applicable
-            if col in nps_cols.keys():
-                bucket_col = f'{col}_Bucket'
-                bucket_counts = df[bucket_col].value_counts()
-                total_valid = df[col].notna().sum()
-                row['detractor_pct'] = round(bucket_counts.get('Detractor', 0) / total_valid * 100, 1) if total_valid > 0 else 0
-                row['passive_pct'] = round(bucket_counts.get('Passive', 0) / total_valid * 100, 1) if total_valid > 0 else 0
-                row['promoter_pct'] = round(bucket_counts.get('Promoter', 0) / total_valid * 100, 1) if total_valid > 0 else 0
-                row['nps_score'] = row['promoter_pct'] - row['detractor_pct']
-
-            kpi_overall_data.append(row)
-
-    kpi_overall_df = pd.DataFrame(kpi_overall_data)
-    print(f"\n[OK] Generated overall KPIs for {len(kpi_overall_data)} metrics")
-
-    # --- KPI by Department ---
-    kpi_by_dept_data = []
-
-    departments = df[dept_col].dropna().unique()
-
-    for dept in departments:
-        dept_df = df[df[dept_col] == dept]
-
-        for col in all_norm_cols:
-            if col in dept_df.columns and dept_df[col].notna().sum() > 0:
-                mean_score = dept_df[col].mean()
-                top2_pct = dept_df[f'{col}_Top2Box'].sum() / dept_df[col].notna().sum() * 100
-
-                row = {
-                    'department': dept,
-                    'metric': col,
-                    'mean_0_10': round(mean_score, 2),
-                    'top2_box_pct': round(top2_pct, 1),
-                    'n_responses': dept_df[col].notna().sum()
-                }
-
-                # Add NPS breakdowns if applicable
-                if col in nps_cols.keys():
-                    bucket_col = f'{col}_Bucket'
-                    bucket_counts = dept_df[bucket_col].value_counts()
-                    total_valid = dept_df[col].notna().sum()
-                    row['detractor_pct'] = round(bucket_counts.get('Detractor', 0) / total_valid * 100, 1)
-                    row['passive_pct'] = round(bucket_counts.get('Passive', 0) / total_valid * 100, 1)
-                    row['promoter_pct'] = round(bucket_counts.get('Promoter', 0) / total_valid * 100, 1)
-                    row['nps_score'] = row['promoter_pct'] - row['detractor_pct']
-
-                kpi_by_dept_data.append(row)
-
-    kpi_by_dept_df = pd.DataFrame(kpi_by_dept_data)
-    print(f"[OK] Generated departmental KPIs: {len(kpi_by_dept_data)} records")
-
-    # --- Themes Overall ---
-    themes_overall_data = []
-
-    for theme in THEME_TAXONOMY:
-        # Count mentions
-        mentions = sum(1 for themes_list in df['themes'] if theme in themes_list)
-        if mentions == 0:
-            continue
-
-        prevalence_pct = mentions / len(df) * 100
-
-        # Get sentiment breakdown for this theme
-        pos_count = 0
-        neu_count = 0
-        neg_count = 0
-        sample_quotes = []
-
-        for idx, row in df.iterrows():
-            if theme in row['themes']:
-                sent = row['sentiment_overall']
-                if sent == 'Positive':
-                    pos_count += 1
-                elif sent == 'Neutral':
-                    neu_count += 1
-                elif sent == 'Negative':
-                    neg_count += 1
-
-                if row['quote_short'] and len(sample_quotes) < 3:
-                    sample_quotes.append(row['quote_short'])
-
-        themes_overall_data.append({
-            'theme': theme,
-            'prevalence_pct': round(prevalence_pct, 1),
-            'mentions': mentions,
-            'pos_pct': round(pos_count / mentions * 100, 1) if mentions > 0 else 0,
-            'neu_pct': round(neu_count / mentions * 100, 1) if mentions > 0 else 0,
-            'neg_pct': round(neg_count / mentions * 100, 1) if mentions > 0 else 0,
-            'sample_quote': sample_quotes[0] if sample_quotes else ''
-        })
-
-    themes_overall_df = pd.DataFrame(themes_overall_data).sort_values('prevalence_pct', ascending=False)
-    print(f"[OK] Generated theme analysis: {len(themes_overall_data)} themes")
-
-    # --- Themes by Department ---
-    themes_by_dept_data = []
-
-    for dept in departments:
-        dept_df = df[df[dept_col] == dept]
-
-        for theme in THEME_TAXONOMY:
-            mentions = sum(1 for themes_list in dept_df['themes'] if theme in themes_list)
-            if mentions == 0:
-                continue
-
-            prevalence_pct = mentions / len(dept_df) * 100
-
-            pos_count = sum(1 for idx, row in dept_df.iterrows() if theme in row['themes'] and row['sentiment_overall'] == 'Positive')
-            neu_count = sum(1 for idx, row in dept_df.iterrows() if theme in row['themes'] and row['sentiment_overall'] == 'Neutral')
-            neg_count = sum(1 for idx, row in dept_df.iterrows() if theme in row['themes'] and row['sentiment_overall'] == 'Negative')
-
-            themes_by_dept_data.append({
-                'department': dept,
-                'theme': theme,
-                'prevalence_pct': round(prevalence_pct, 1),
-                'mentions': mentions,
-                'pos_pct': round(pos_count / mentions * 100, 1) if mentions > 0 else 0,
-                'neu_pct': round(neu_count / mentions * 100, 1) if mentions > 0 else 0,
-                'neg_pct': round(neg_count / mentions * 100, 1) if mentions > 0 else 0
-            })
-
-    themes_by_dept_df = pd.DataFrame(themes_by_dept_data)
-    print(f"[OK] Generated departmental theme analysis: {len(themes_by_dept_data)} records")
-
-    # ========================================================================
-    # E) OUTPUTS
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("E) EXPORTING OUTPUTS")
-    print("=" * 80)
-
+    return df
+
+def scale_columns(columns):
+    """NPS is already 0-10; quality and agreement answers map to 1-5, then (x-1)/4*10"""
+    scale_cols = {}
+    for cols, scale in ((NPS_COLS, NPS_SCALE), (QUALITY_COLS, QUALITY_SCALE), (LIKERT_COLS, AGREEMENT_SCALE)):
+        scale_cols.update({new_col: (orig_col, scale) for new_col, orig_col in cols.items() if orig_col in columns})
+    return scale_cols
+
+def stage_normalize(raw, backend_name):
+    """0-10 scores for every rated item"""
+    scale_cols = scale_columns(raw.columns)
+    normalized = get_backend(backend_name).normalize(raw, scale_cols)
+    for new_col in scale_cols:
+        print(f"[OK] Normalized {new_col}: mean={normalized[new_col].mean():.2f}/10")
+    return normalized
+
+def stage_bucketize(scores):
+    """NPS / satisfaction buckets and Top-2 Box flags"""
+    buckets = {}
+    for col in NPS_COLS.keys():
+        buckets[f'{col}_Bucket'] = nps_buckets(scores[col])
+        print(f"[OK] Created {col}_Bucket")
+    for col in list(QUALITY_COLS.keys()) + list(LIKERT_COLS.keys()):
+        buckets[f'{col}_Bucket'] = sat_buckets(scores[col])
+        print(f"[OK] Created {col}_Bucket")
+
+    # Top-2 Box flags (>=8/10)
+    for col in scores.columns:
+        buckets[f'{col}_Top2Box'] = (scores[col] >= 8.0).to_numpy()
+    print(f"\n[OK] Created Top-2 Box flags for all {len(scores.columns)} normalized columns")
+    return pd.DataFrame(buckets, index=scores.index)
+
+def stage_text(raw, roster=None):
+    """Combined feedback, sentiment, themes and a short quote per respondent; comments are redacted"""
+    text = pd.DataFrame(index=raw.index)
+    # Joined on a line break so a quote never runs from one answer into the other
+    text['combined_feedback'] = raw[FEEDBACK_COL].fillna('') + '\n' + raw[FUTURE_COL].fillna('')
+    text['sentiment_overall'] = text['combined_feedback'].apply(detect_sentiment)
+    text['themes'] = text['combined_feedback'].apply(extract_themes)
+
+    # Everything downstream (topics, quotes, exports) sees the redacted comments
+    redactor = Redactor(REDACT_NAMES, roster=roster)
+    text['combined_feedback'] = redactor.redact_series(text['combined_feedback'])
+    print(f"[OK] {redactor.report()} in {len(text)} comments")
+
+    # The respondent's sentence closest to the centroid of one of their themes (max 25 words)
+    membership, _ = theme_cells(text['themes'])
+    _, text['quote_short'] = select_quotes(text['combined_feedback'], membership, n_quotes=0)
+    return text
+
+def stage_topics(text, n_topics):
+    """Topics discovered in the combined feedback, with their overlap with the keyword taxonomy"""
+    comments = text['combined_feedback'].str.strip()
+    answered = comments != ''
+    flags = pd.DataFrame({theme: [theme in themes for themes in text.loc[answered, 'themes']]
+                          for theme in THEME_KEYWORDS})
+    topics, _ = discover_topics(comments[answered], n_topics, labels=flags)
+    print(f"[OK] Discovered {len(topics)} topics in {answered.sum()} comments "
+          f"({int(topics['emerging'].sum()) if len(topics) else 0} outside the keyword taxonomy)")
+    return topics
+
+def stage_weights(raw, margins_path):
+    """Raking weights to the headcount margins, and the per-category report"""
+    raking = rake(raw, load_margins(margins_path), columns=MARGIN_COLUMNS)
+    print(f"[OK] {summarize_raking(raking)}")
+    return pd.Series(raking.weights, index=raw.index, name=WEIGHT_COL), raking.margins
+
+def stage_kpis(df, all_norm_cols, backend_name, weight_col=None):
+    """Overall and departmental KPI tables with bootstrap CIs (weighted estimates with a weight column)"""
+    backend = get_backend(backend_name)
+    kpi_overall_df = kpi_table(backend.kpi_sums(df, all_norm_cols, weight_col=weight_col), all_norm_cols, NPS_COLS.keys())
+    print(f"\n[OK] Generated overall KPIs for {len(kpi_overall_df)} metrics{' (weighted)' if weight_col else ''}")
+
+    kpi_by_dept_df = kpi_table(backend.kpi_sums(df, all_norm_cols, group_col=DEPT_COL, weight_col=weight_col),
+                               all_norm_cols, NPS_COLS.keys(), group_col=DEPT_COL).rename(columns={DEPT_COL: 'department'})
+    print(f"[OK] Generated departmental KPIs: {len(kpi_by_dept_df)} records")
+
+    # Confidence Intervals (every KPI cell, one batched bootstrap)
+    ci_cols = ['mean_ci_low', 'mean_ci_high', 'top2_ci_low', 'top2_ci_high', 'nps_ci_low', 'nps_ci_high']
+
+    overall_ci, _ = bootstrap_kpi_cells(df, all_norm_cols, nps_cols=NPS_COLS.keys(),
+                                        n_replicates=BOOTSTRAP_REPLICATES, weight_col=weight_col)
+    kpi_overall_df = kpi_overall_df.merge(overall_ci[['metric'] + ci_cols], on='metric', how='left')
+
+    dept_ci, dept_replicates = bootstrap_kpi_cells(df, all_norm_cols, nps_cols=NPS_COLS.keys(), group_col=DEPT_COL,
+                                                   n_replicates=BOOTSTRAP_REPLICATES, keep_replicates=['Overall_NPS'],
+                                                   weight_col=weight_col)
+    dept_ci = dept_ci.rename(columns={'group': 'department'})
+    if len(kpi_by_dept_df) > 0:
+        kpi_by_dept_df = kpi_by_dept_df.merge(dept_ci[['department', 'metric'] + ci_cols], on=['department', 'metric'], how='left')
+    print(f"[OK] Bootstrapped CIs for {len(overall_ci) + len(dept_ci)} KPI cells ({BOOTSTRAP_REPLICATES} replicates)")
+    return kpi_overall_df, kpi_by_dept_df, dept_replicates
+
+def add_quotes(table, quotes, keys):
+    """sample_quote, sample_quote_2, ... columns from {cell key: [quotes]}"""
+    cell_quotes = [quotes.get(key, []) for key in keys]
+    for i in range(N_QUOTES):
+        column = 'sample_quote' if i == 0 else f'sample_quote_{i + 1}'
+        table[column] = [picked[i] if i < len(picked) else '' for picked in cell_quotes]
+    return table
+
+def stage_themes(df, backend_name, weight_col=None):
+    """Overall and departmental theme prevalence, sentiment and representative quotes"""
+    backend = get_backend(backend_name)
+    theme_counts, theme_sizes = backend.theme_sums(df, weight_col=weight_col)
+    themes_overall_df = theme_table(theme_counts, theme_sizes, THEME_TAXONOMY)
+    print(f"[OK] Generated theme analysis: {len(themes_overall_df)} themes{' (weighted)' if weight_col else ''}")
+
+    theme_counts, theme_sizes = backend.theme_sums(df, group_col=DEPT_COL, weight_col=weight_col)
+    themes_by_dept_df = theme_table(theme_counts, theme_sizes, THEME_TAXONOMY, group_col=DEPT_COL).rename(columns={DEPT_COL: 'department'})
+    print(f"[OK] Generated departmental theme analysis: {len(themes_by_dept_df)} records")
+
+    # Quotes for every theme and theme x department cell in one batch
+    overall, overall_cells = theme_cells(df['themes'])
+    by_dept, dept_cells = theme_cells(df['themes'], df[DEPT_COL])
+    picked, _ = select_quotes(df['combined_feedback'], sparse.hstack([overall, by_dept]), n_quotes=N_QUOTES)
+    quotes = dict(zip(overall_cells + dept_cells, picked))
+    add_quotes(themes_overall_df, quotes, themes_overall_df['theme'])
+    add_quotes(themes_by_dept_df, quotes, zip(themes_by_dept_df['department'], themes_by_dept_df['theme']))
+    print(f"[OK] Selected quotes for {len(quotes)} theme cells")
+    return themes_overall_df, themes_by_dept_df
+
+def stage_outputs(df, all_norm_cols, kpi_overall_df, kpi_by_dept_df, themes_overall_df, themes_by_dept_df, topics_df,
+                  weighting, write_csv):
+    """Write every export and the store wave; returns {file: sha256} so a cache hit can verify them"""
     # --- Buckets Detail (row-level) ---
-    export_cols = ['respondent_id', dept_col, 'sentiment_overall', 'themes', 'theme_sentiments', 'quote_short']
+    # Parquet keeps themes as list<string> and theme_sentiments as list<struct<theme, sentiment>>
+    # (each theme carries the respondent's overall sentiment)
+    export_cols = ['respondent_id', DEPT_COL, WEIGHT_COL, 'sentiment_overall', 'themes', 'quote_short']
     export_cols += all_norm_cols  # All normalized 0-10 columns
     export_cols += [f'{col}_Bucket' for col in all_norm_cols]  # All bucket columns
 
     # Filter to only existing columns
     export_cols = [col for col in export_cols if col in df.columns]
-
-    buckets_detail_df = df[export_cols].copy()
-
-    # Convert lists to JSON strings for CSV export
-    buckets_detail_df['themes'] = buckets_detail_df['themes'].apply(lambda x: json.dumps(x) if isinstance(x, list) else x)
-    buckets_detail_df['theme_sentiments'] = buckets_detail_df['theme_sentiments'].apply(lambda x: json.dumps(x) if isinstance(x, list) else x)
-
-    # Export to CSV
-    buckets_detail_df.to_csv('output_buckets_detail.csv', index=False)
-    print("[OK] Exported: output_buckets_detail.csv")
-
-    kpi_overall_df.to_csv('output_kpi_overall.csv', index=False)
-    print("[OK] Exported: output_kpi_overall.csv")
-
-    kpi_by_dept_df.to_csv('output_kpi_by_department.csv', index=False)
-    print("[OK] Exported: output_kpi_by_department.csv")
-
-    themes_overall_df.to_csv('output_themes_overall.csv', index=False)
-    print("[OK] Exported: output_themes_overall.csv")
-
-    themes_by_dept_df.to_csv('output_themes_by_department.csv', index=False)
-    print("[OK] Exported: output_themes_by_department.csv")
+    category_cols = [DEPT_COL, 'sentiment_overall'] + [f'{col}_Bucket' for col in all_norm_cols]
+
+    written = ['output_buckets_detail.parquet']
+    buckets_detail = respondent_table(df[export_cols], category_cols=category_cols)
+    write_respondents(buckets_detail, 'output_buckets_detail.parquet')
+    print("[OK] Exported: output_buckets_detail.parquet")
+
+    if write_csv:
+        write_compat_csv(buckets_detail, 'output_buckets_detail.csv')
+        written.append('output_buckets_detail.csv')
+        print("[OK] Exported: output_buckets_detail.csv (compatibility)")
+
+    tables = [(kpi_overall_df, 'output_kpi_overall.csv'), (kpi_by_dept_df, 'output_kpi_by_department.csv'),
+              (themes_overall_df, 'output_themes_overall.csv'), (themes_by_dept_df, 'output_themes_by_department.csv'),
+              (topics_df, 'output_topics.csv')]
+    if weighting is not None:
+        tables.append((weighting, 'output_weighting.csv'))
+    for table, path in tables:
+        table.to_csv(path, index=False)
+        written.append(path)
+        print(f"[OK] Exported: {path}")
 
     # Also export as JSON
     outputs_json = {
         'kpi_overall': kpi_overall_df.to_dict(orient='records'),
         'kpi_by_department': kpi_by_dept_df.to_dict(orient='records'),
         'themes_overall': themes_overall_df.to_dict(orient='records'),
-        'themes_by_department': themes_by_dept_df.to_dict(orient='records')
+        'themes_by_department': themes_by_dept_df.to_dict(orient='records'),
+        'topics': topics_df.to_dict(orient='records')
     }
 
     with open('output_analytics_summary.json', 'w') as f:
         json.dump(outputs_json, f, indent=2)
+    written.append('output_analytics_summary.json')
     print("[OK] Exported: output_analytics_summary.json")
 
-    # ========================================================================
-    # F) EXECUTIVE SUMMARY
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("F) EXECUTIVE SUMMARY")
-    print("=" * 80)
-
+    # --- Persist wave to the multi-wave store ---
+    store_kpis = pd.concat([kpi_overall_df.assign(department=OVERALL), kpi_by_dept_df], ignore_index=True)
+    store_kpis = store_kpis.rename(columns={'mean_0_10': 'mean_score', 'top2_box_pct': 'positive_pct'})
+    store_kpis['scale'] = '0-10'
+    period = (df['Timestamp'].min(), df['Timestamp'].max()) if 'Timestamp' in df.columns else (None, None)
+    with SurveyStore() as store:
+        n_values, n_kpis = store.ingest_wave(WAVE_ID, SURVEY_NAME, df, store_kpis, all_norm_cols,
+                                             department_col=DEPT_COL, label='Staff Development Day 2025', period=period)
+    print(f"[OK] Stored wave {WAVE_ID}: {n_values} respondent scores, {n_kpis} KPI cells")
+
+    return {path: file_digest(path) for path in written}
+
+def outputs_intact(digests):
+    """A cached outputs stage only counts if every file (and the store) is still on disk, unchanged"""
+    files_ok = all(os.path.exists(path) and file_digest(path) == digest for path, digest in digests.items())
+    return files_ok and os.path.exists(DEFAULT_STORE_PATH)
+
+def build_executive_summary(kpi_overall_df, kpi_by_dept_df, themes_overall_df, dept_replicates):
+    """Executive summary points, in order"""
     summary = []
 
     # Overall satisfaction
@@ -622,16 +474,18 @@ def main():
     bottom_metrics = kpi_overall_df.nsmallest(3, 'mean_0_10')
     summary.append(f"Lowest-rated elements: {bottom_metrics.iloc[0]['metric']} ({bottom_metrics.iloc[0]['mean_0_10']}/10), {bottom_metrics.iloc[1]['metric']} ({bottom_metrics.iloc[1]['mean_0_10']}/10), {bottom_metrics.iloc[2]['metric']} ({bottom_metrics.iloc[2]['mean_0_10']}/10)")
 
-    # Department differences
+    # Department differences (only gaps significant after Holm correction across all department pairs)
     dept_variance = kpi_by_dept_df[kpi_by_dept_df['metric'] == 'Overall_NPS'].copy()
-    if len(dept_variance) > 1:
-        max_dept = dept_variance.loc[dept_variance['mean_0_10'].idxmax()]
-        min_dept = dept_variance.loc[dept_variance['mean_0_10'].idxmin()]
-        variance = max_dept['mean_0_10'] - min_dept['mean_0_10']
-        if variance > 1.0:
-            summary.append(f"Department variance: {max_dept['department']} highest ({max_dept['mean_0_10']}/10) vs {min_dept['department']} lowest ({min_dept['mean_0_10']}/10) - {variance:.1f} point gap")
+    if len(dept_variance) > 1 and 'Overall_NPS' in dept_replicates:
+        dept_n = dict(zip(dept_variance['department'], dept_variance['n_responses']))
+        gaps = significant_gaps(dept_replicates['Overall_NPS'], min_n=MIN_DEPT_N_FOR_GAPS, group_n=dept_n)
+        if len(gaps) > 0:
+            top_gap = gaps.iloc[0]
+            high = dept_variance[dept_variance['department'] == top_gap['group_a']].iloc[0]
+            low = dept_variance[dept_variance['department'] == top_gap['group_b']].iloc[0]
+            summary.append(f"Department variance: {high['department']} ({high['mean_0_10']}/10, n={high['n_responses']}) vs {low['department']} ({low['mean_0_10']}/10, n={low['n_responses']}) - {top_gap['diff']:.1f} point gap (95% CI {top_gap['diff_ci_low']:.1f} to {top_gap['diff_ci_high']:.1f}, Holm-adjusted p={top_gap['p_adjusted']:.3f}); {len(gaps)} statistically meaningful department gap(s) in total after correcting for all pairwise comparisons")
         else:
-            summary.append(f"Department satisfaction relatively consistent across units (variance <1.0 point)")
+            summary.append(f"No statistically meaningful department differences in overall satisfaction (no pairwise gap significant at 5% after Holm correction; departments with n<{MIN_DEPT_N_FOR_GAPS} excluded)")
 
     # Suggestions theme
     suggestions_theme = themes_overall_df[themes_overall_df['theme'] == 'Suggestions/Requests']
@@ -657,6 +511,150 @@ def main():
         summary.append(f"Positive overall response - address timing concerns and content depth for improvement")
     else:
         summary.append(f"Event requires significant improvements - review all elements for 2026")
+    return summary
+
+# ============================================================================
+# MAIN ANALYSIS
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Staff Development Day 2025 survey analytics')
+    parser.add_argument('--input', default=INPUT_PATH)
+    parser.add_argument('--backend', default='pandas', choices=sorted(BACKENDS),
+                        help='Engine for the normalize, KPI and theme stages (pandas is the reference)')
+    parser.add_argument('--csv', action='store_true',
+                        help='Also write output_buckets_detail.csv with JSON-encoded lists (legacy consumers)')
+    parser.add_argument('--roster', default=os.environ.get('PII_ROSTER'),
+                        help='Names to redact from comments, one per line (env PII_ROSTER)')
+    parser.add_argument('--margins', default=os.environ.get('SURVEY_MARGINS'),
+                        help='Headcount margins to rake to: CSV of margin, category, headcount (env SURVEY_MARGINS)')
+    parser.add_argument('--topics', type=int, default=N_TOPICS, help='Topics to discover in the open-ended feedback')
+    parser.add_argument('--cache-dir', default=DEFAULT_DIR, help='Stage cache directory (env STAGE_CACHE_DIR)')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute every stage')
+    args = parser.parse_args()
+    cache = StageCache(args.cache_dir, enabled=not args.no_cache)
+
+    print("=" * 80)
+    print("STAFF DEVELOPMENT DAY 2025 - COMPREHENSIVE SURVEY ANALYTICS")
+    print("=" * 80)
+
+    # Load data (keyed by the file's bytes)
+    raw, ingest_key = cache.run('ingest', stage_ingest, args.input, deps=[file_digest(args.input)],
+                                config={'version': CACHE_VERSION}, code=[pii_redaction])
+
+    print(f"\nLoaded {len(raw)} responses (backend: {args.backend})")
+
+    # ========================================================================
+    # A) NORMALIZE ALL SCALES
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("A) NORMALIZING ALL SCALES TO 0-10")
+    print("=" * 80)
+
+    scale_config = {'nps': NPS_COLS, 'quality': QUALITY_COLS, 'likert': LIKERT_COLS,
+                    'scales': [NPS_SCALE, QUALITY_SCALE, AGREEMENT_SCALE], 'backend': args.backend}
+    scores, normalize_key = cache.run('normalize', stage_normalize, raw, args.backend, deps=[ingest_key],
+                                      config=scale_config, code=[scale_columns, survey_backends])
+
+    # ========================================================================
+    # B) BUCKETIZATION
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("B) APPLYING BUCKETIZATION")
+    print("=" * 80)
+
+    buckets, bucket_key = cache.run('bucketize', stage_bucketize, scores, deps=[normalize_key],
+                                    code=[nps_buckets, sat_buckets])
+
+    # ========================================================================
+    # C) SENTIMENT & THEMES
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("C) ANALYZING SENTIMENT & THEMES")
+    print("=" * 80)
+
+    text_config = {'columns': [FEEDBACK_COL, FUTURE_COL], 'themes': THEME_KEYWORDS, 'positive': POSITIVE_WORDS,
+                   'negative': NEGATIVE_WORDS, 'negation': NEGATION_WORDS, 'redact': REDACT_NAMES}
+    roster_deps = [file_digest(args.roster)] if args.roster else []
+    text, text_key = cache.run('text', stage_text, raw, args.roster, deps=[ingest_key] + roster_deps, config=text_config,
+                               code=[detect_sentiment, extract_themes, pii_redaction, quote_selection, topic_discovery])
+
+    df = pd.concat([raw, scores, buckets, text], axis=1)
+    all_norm_cols = list(NPS_COLS.keys()) + list(QUALITY_COLS.keys()) + list(LIKERT_COLS.keys())
+
+    sentiment_counts = df['sentiment_overall'].value_counts()
+    print(f"\nSentiment Distribution:")
+    for sent, count in sentiment_counts.items():
+        print(f"  {sent}: {count} ({count/len(df)*100:.1f}%)")
+
+    # Count theme prevalence
+    all_themes = [theme for themes_list in df['themes'] for theme in themes_list]
+    theme_counts = Counter(all_themes)
+    print(f"\nTop Themes:")
+    for theme, count in theme_counts.most_common(10):
+        print(f"  {theme}: {count} mentions ({count/len(df)*100:.1f}%)")
+
+    # Discovered topics (unsupervised), to catch what the keyword taxonomy misses
+    topics_df, topic_key = cache.run('topics', stage_topics, text[['combined_feedback', 'themes']], args.topics,
+                                     deps=[text_key], config={'topics': args.topics}, code=[topic_discovery])
+    print(f"\nDiscovered Topics:")
+    for _, topic in topics_df.iterrows():
+        flag = ' [emerging]' if topic['emerging'] else f" (~{topic['closest_theme']} {topic['closest_theme_pct']:.0f}%)"
+        print(f"  {topic['topic']}. {topic['top_terms']}: {topic['prevalence_pct']:.1f}%{flag}")
+
+    # ========================================================================
+    # D) AGGREGATIONS
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("D) GENERATING AGGREGATIONS")
+    print("=" * 80)
+
+    # Survey weights: respondents raked to headcount margins so no department counts for more than its share
+    weight_col, weighting, weight_deps = None, None, []
+    if args.margins:
+        (weights, weighting), weight_key = cache.run('weights', stage_weights, raw, args.margins,
+                                                     deps=[ingest_key, file_digest(args.margins)],
+                                                     config={'columns': MARGIN_COLUMNS}, code=[survey_weights])
+        df[WEIGHT_COL] = weights
+        weight_col, weight_deps = WEIGHT_COL, [weight_key]
+    weighted_cols = [weight_col] if weight_col else []
+
+    (kpi_overall_df, kpi_by_dept_df, dept_replicates), kpi_key = cache.run(
+        'kpi_cube', stage_kpis, df[[DEPT_COL] + all_norm_cols + weighted_cols], all_norm_cols, args.backend, weight_col,
+        deps=[ingest_key, normalize_key] + weight_deps,
+        config={'replicates': BOOTSTRAP_REPLICATES, 'backend': args.backend, 'weight': weight_col},
+        code=[survey_backends, survey_stats])
+
+    (themes_overall_df, themes_by_dept_df), theme_key = cache.run(
+        'theme_cube', stage_themes,
+        df[[DEPT_COL, 'sentiment_overall', 'themes', 'quote_short', 'combined_feedback'] + weighted_cols],
+        args.backend, weight_col, deps=[ingest_key, text_key] + weight_deps,
+        config={'taxonomy': THEME_TAXONOMY, 'backend': args.backend, 'quotes': N_QUOTES, 'weight': weight_col},
+        code=[survey_backends, add_quotes, quote_selection, topic_discovery])
+
+    # ========================================================================
+    # E) OUTPUTS
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("E) EXPORTING OUTPUTS")
+    print("=" * 80)
+
+    cache.run('outputs', stage_outputs, df, all_norm_cols, kpi_overall_df, kpi_by_dept_df, themes_overall_df,
+              themes_by_dept_df, topics_df, weighting, args.csv,
+              deps=[ingest_key, normalize_key, bucket_key, text_key, topic_key, kpi_key, theme_key] + weight_deps,
+              config={'csv': args.csv, 'cwd': os.getcwd(), 'wave': WAVE_ID, 'store': os.path.abspath(DEFAULT_STORE_PATH)}, code=[respondent_export, survey_store],
+              valid=outputs_intact)
+
+    # ========================================================================
+    # F) EXECUTIVE SUMMARY
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("F) EXECUTIVE SUMMARY")
+    print("=" * 80)
+
+    summary, _ = cache.run('summary', build_executive_summary, kpi_overall_df, kpi_by_dept_df, themes_overall_df,
+                           dept_replicates, deps=[kpi_key, theme_key], config={'min_dept_n': MIN_DEPT_N_FOR_GAPS},
+                           code=[survey_stats])
 
     # Print summary
     print("\nEXECUTIVE SUMMARY (12 Key Points):\n")
@@ -671,6 +669,7 @@ def main():
             f.write(f"{i}. {point}\n\n")
 
     print("[OK] Exported: output_executive_summary.txt")
+    print(f"\n{cache.report()}")
 
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
@@ -684,7 +683,16 @@ def main():
     print("- Top-2 Box = scores >=8/10")
     print("- Sentiment analysis uses keyword matching with negation handling")
     print("- Theme detection based on predefined taxonomy with keyword matching")
+    print(f"- Topic discovery: TF-IDF + NMF ({args.topics} topics); a topic is 'emerging' when most of its comments carry no taxonomy theme")
     print("- Combined both open-ended feedback fields for comprehensive analysis")
+    print("- Names, e-mails, phone numbers and IDs redacted from comments before topics, quotes and exports")
+    print(f"- Quotes: sentences (max 25 words) closest to each theme cell's TF-IDF centroid, up to {N_QUOTES} per cell with near-duplicates penalized (MMR)")
+    print(f"- Mean and NPS CIs: 95% percentile bootstrap ({BOOTSTRAP_REPLICATES} Poisson replicates); Top-2 Box CIs: Wilson score interval")
+    print(f"- Department gaps reported only when significant at 5% after Holm correction across all department pairs "
+          f"(bootstrap p-values; point-estimate differences; n>={MIN_DEPT_N_FOR_GAPS})")
+    if weight_col:
+        print("- KPIs, NPS and theme prevalence weighted by raking to headcount margins (output_weighting.csv); "
+              "n_responses stays the raw count, n_effective is the Kish effective sample size")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,155 @@
+"""
+Backend Benchmark - pandas vs Polars vs DuckDB on Identical Inputs
+Times the normalize, KPI and theme stages and checks every backend against the pandas reference
+
+Usage:
+    python benchmark_backends.py [--rows 1000000] [--repeat 3] [--parquet] [--weighted]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from survey_backends import available_backends, get_backend, kpi_table, theme_table
+
+# ============================================================================
+# SYNTHETIC EXPORT
+# ============================================================================
+
+AGREEMENT = {'strongly agree': 5, 'agree': 4, 'neither': 3, 'disagree': 2, 'strongly disagree': 1}
+ANSWERS = ['Strongly agree', 'Agree', 'Neither', 'Disagree', 'Strongly disagree', None]
+THEMES = ['Timing', 'Speakers', 'Content', 'Networking', 'Venue', 'Other']
+SENTIMENT_LABELS = ['Positive', 'Neutral', 'Negative']
+
+N_NPS = 6
+N_AGREEMENT = 18
+N_GROUPS = 25
+
+def synthetic_export(n_rows, seed=7):
+    """Wide respondent frame shaped like the staff-dev export after text analytics"""
+    rng = np.random.default_rng(seed)
+    data = {'department': pd.Categorical.from_codes(rng.integers(0, N_GROUPS, n_rows),
+                                                    [f'Department {i:02d}' for i in range(N_GROUPS)])}
+    for i in range(N_NPS):
+        nps = rng.integers(0, 11, n_rows).astype(float)
+        nps[rng.random(n_rows) < 0.05] = np.nan
+        data[f'nps_{i}'] = nps
+    for i in range(N_AGREEMENT):
+        data[f'agree_{i}'] = pd.Series(np.array(ANSWERS, dtype=object)[rng.integers(0, len(ANSWERS), n_rows)], dtype='string')
+
+    theme_bits = rng.random((n_rows, len(THEMES))) < 0.25
+    themes = np.array(THEMES, dtype=object)
+    data['themes'] = [list(themes[row]) for row in theme_bits]
+    data['sentiment_overall'] = np.array(SENTIMENT_LABELS, dtype=object)[rng.integers(0, 3, n_rows)]
+    data['quote_short'] = np.where(rng.random(n_rows) < 0.6, 'Sample feedback sentence', '')
+    data['weight'] = rng.gamma(4.0, 0.25, n_rows)
+    return pd.DataFrame(data)
+
+def scale_columns():
+    columns = {f'NPS_{i}': (f'nps_{i}', {'points': (0, 10)}) for i in range(N_NPS)}
+    columns.update({f'Agree_{i}': (f'agree_{i}', {'points': (1, 5), 'map': AGREEMENT}) for i in range(N_AGREEMENT)})
+    return columns
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_stages(backend, raw_source, frame_source, columns, weight_col=None):
+    """All stages on one backend; returns (timings, finished tables)"""
+    metrics = list(columns)
+    nps_metrics = [m for m in metrics if m.startswith('NPS')]
+    timings = {}
+
+    start = time.perf_counter()
+    normalized = backend.normalize(raw_source, columns)
+    timings['normalize'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kpis = kpi_table(backend.kpi_sums(frame_source, metrics, weight_col=weight_col), metrics, nps_metrics)
+    kpis_by_group = kpi_table(backend.kpi_sums(frame_source, metrics, 'department', weight_col), metrics, nps_metrics,
+                              'department')
+    timings['kpi'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    themes = theme_table(*backend.theme_sums(frame_source, weight_col=weight_col), THEMES)
+    themes_by_group = theme_table(*backend.theme_sums(frame_source, 'department', weight_col), THEMES, 'department')
+    timings['themes'] = time.perf_counter() - start
+
+    return timings, {'normalized': normalized, 'kpis': kpis, 'kpis_by_group': kpis_by_group,
+                     'themes': themes, 'themes_by_group': themes_by_group}
+
+def same_tables(reference, candidate):
+    for name, expected in reference.items():
+        actual = candidate[name]
+        if name == 'normalized':
+            if not np.array_equal(expected.to_numpy(), actual.to_numpy(), equal_nan=True):
+                return False
+            continue
+        expected = expected.reset_index(drop=True).astype({col: str for col in ('department',) if col in expected})
+        actual = actual.reset_index(drop=True).astype({col: str for col in ('department',) if col in actual})
+        try:
+            pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+        except AssertionError:
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare survey execution backends on identical inputs')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3, help='Best-of-N timing per stage')
+    parser.add_argument('--backends', nargs='+', default=available_backends())
+    parser.add_argument('--parquet', action='store_true', help='Also run every backend from a Parquet file')
+    parser.add_argument('--weighted', action='store_true', help='Weighted KPI and theme sums (survey weight column)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("SURVEY BACKEND BENCHMARK")
+    print("=" * 80)
+
+    frame = synthetic_export(args.rows)
+    columns = scale_columns()
+    raw_cols = [orig for orig, _ in columns.values()]
+    scored = pd.concat([frame[['department', 'themes', 'sentiment_overall', 'quote_short', 'weight']],
+                        get_backend('pandas').normalize(frame, columns)], axis=1)
+    weight_col = 'weight' if args.weighted else None
+    print(f"\nRows: {args.rows:,} | Scored items: {len(columns)} | Groups: {N_GROUPS} | CPU cores: {os.cpu_count()}"
+          f"{' | weighted' if args.weighted else ''}")
+
+    sources = [('memory', frame, scored)]
+    tmp_dir = None
+    if args.parquet:
+        tmp_dir = tempfile.TemporaryDirectory()
+        raw_path = os.path.join(tmp_dir.name, 'raw.parquet')
+        scored_path = os.path.join(tmp_dir.name, 'scored.parquet')
+        frame[raw_cols].to_parquet(raw_path, index=False)
+        scored.to_parquet(scored_path, index=False)
+        sources.append(('parquet', raw_path, scored_path))
+
+    reference = None
+    rows = []
+    for source_name, raw_source, frame_source in sources:
+        for name in args.backends:
+            backend = get_backend(name)
+            best = {}
+            for _ in range(args.repeat):
+                timings, tables = run_stages(backend, raw_source, frame_source, columns, weight_col)
+                best = {stage: min(t, best.get(stage, t)) for stage, t in timings.items()}
+            if reference is None:
+                reference = tables
+            rows.append({'source': source_name, 'backend': name, **{f'{k}_s': round(v, 3) for k, v in best.items()},
+                         'total_s': round(sum(best.values()), 3), 'matches_pandas': same_tables(reference, tables)})
+
+    results = pd.DataFrame(rows)
+    print()
+    print(results.to_string(index=False))
+    if not results['matches_pandas'].all():
+        print("\n[!] Some backends disagree with the pandas reference")
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+"""
+Cube Service - Local HTTP Slice Queries over KPI and Theme Cubes
+Dashboards fetch only the department/session/metric/wave they show, with ETags, gzip and an LRU of rendered responses
+
+Usage:
+    python cube_service.py [--data ../../outputs/staff-dev-2025 ../../static/lds-survey-dashboard] [--port 8765]
+
+Endpoints (GET or HEAD, JSON):
+    /v1/tables                          every cube table: columns, rows, last modified
+    /v1/tables/<name>?metric=X&session=Y    rows of one table; any column filters, repeat a key for IN
+    /v1/kpis?survey=&wave=&department=&metric=   KPI cells from the multi-wave store
+    /v1/waves?survey=                   ingested waves
+
+Tables are the cube CSVs in the --data folders (output_kpi_*.csv, output_themes_*.csv,
+*_kpi_cube.csv, *_themes_cube.csv, ...) and are re-read when the file changes.
+Add &columns=a,b to project columns.
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from survey_store import DEFAULT_STORE_PATH, SurveyStore
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_DATA_DIRS = [os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'outputs', 'staff-dev-2025')]
+TABLE_PATTERNS = ('output_kpi_*.csv', 'output_themes_*.csv', '*_cube.csv')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+LRU_ENTRIES = 512
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+# Request line + headers beyond this are rejected rather than buffered
+MAX_HEADER_BYTES = 16384
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+class CubeTables:
+    """CSV cubes by name, reloaded when a file's size or mtime changes"""
+
+    def __init__(self, data_dirs):
+        self.data_dirs = data_dirs
+        self.tables = {}  # name -> (path, signature, (frame, text view for filtering))
+
+    def discover(self):
+        """name -> path for every cube file currently in the data folders"""
+        found = {}
+        for data_dir in self.data_dirs:
+            for pattern in TABLE_PATTERNS:
+                for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+                    found.setdefault(os.path.splitext(os.path.basename(path))[0], path)
+        return found
+
+    def get(self, name):
+        """((frame, text view), mtime) for a table, or None; one stat per call keeps hits cheap"""
+        entry = self.tables.get(name)
+        path = entry[0] if entry else self.discover().get(name)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.tables.pop(name, None)
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if entry is None or entry[1] != signature:
+            frame = pd.read_csv(path, keep_default_na=False, na_values=[''])
+            self.tables[name] = entry = (path, signature, (frame, frame.astype(str)))
+        return entry[2], stat.st_mtime
+
+def slice_table(table, filters, columns=None):
+    """Equality / IN filters on any columns (compared as text), then optional projection"""
+    frame, text = table
+    mask = pd.Series(True, index=frame.index)
+    for column, values in filters.items():
+        if column not in frame.columns:
+            raise KeyError(column)
+        mask &= text[column].isin(values)
+    result = frame[mask.to_numpy()]
+    if columns:
+        missing = [col for col in columns if col not in frame.columns]
+        if missing:
+            raise KeyError(missing[0])
+        result = result[columns]
+    return result
+
+def to_records(frame):
+    """JSON rows with NaN as null"""
+    return json.loads(frame.to_json(orient='records'))
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class Rendered:
+    """One response body, rendered once and reused until its source changes"""
+
+    __slots__ = ('body', 'gzipped', 'etag', 'gzip_etag', 'last_modified')
+
+    def __init__(self, payload, last_modified):
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.gzipped = gzip.compress(self.body, GZIP_LEVEL) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.gzip_etag = self.etag[:-1] + '-gzip"'  # a different representation needs its own strong validator
+        self.last_modified = int(last_modified)
+
+class ResponseLRU:
+    """Rendered responses keyed by (route, source version, canonical query)"""
+
+    def __init__(self, max_entries=LRU_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        rendered = self.entries.get(key)
+        if rendered is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return rendered
+
+    def put(self, key, rendered):
+        self.entries[key] = rendered
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class CubeService:
+    """Routes slice queries to the cube tables or the survey store"""
+
+    def __init__(self, data_dirs, store_path=DEFAULT_STORE_PATH, lru_entries=LRU_ENTRIES):
+        self.tables = CubeTables(data_dirs)
+        self.store_path = store_path
+        self.store = None
+        self.cache = ResponseLRU(lru_entries)
+
+    def _store(self):
+        if self.store is None:
+            if not os.path.exists(self.store_path):
+                raise HTTPError(404, f'No survey store at {self.store_path}')
+            self.store = SurveyStore(self.store_path)
+        return self.store
+
+    def render(self, path, query):
+        """Rendered response for a GET, from the LRU when its source is unchanged"""
+        params = {key: values for key, values in parse_qs(query, keep_blank_values=True).items()}
+        canonical = tuple(sorted((key, tuple(sorted(values))) for key, values in params.items()))
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+
+        if parts == ['v1', 'tables']:
+            tables = self.tables.discover()
+            version = tuple((name, os.stat(file_path).st_mtime_ns) for name, file_path in tables.items())
+            key = ('tables', version)
+            return self._cached(key, lambda: self._table_index(tables))
+
+        if len(parts) == 3 and parts[:2] == ['v1', 'tables']:
+            loaded = self.tables.get(parts[2])
+            if loaded is None:
+                raise HTTPError(404, f'Unknown table {parts[2]}')
+            table, mtime = loaded
+            key = ('table', parts[2], mtime, canonical)
+            return self._cached(key, lambda: self._table_slice(parts[2], table, mtime, params))
+
+        if parts in (['v1', 'kpis'], ['v1', 'waves']):
+            store = self._store()
+            key = (parts[1], store.version(), canonical)
+            return self._cached(key, lambda: self._store_slice(store, parts[1], params))
+
+        raise HTTPError(404, f'No route for {path}')
+
+    def _cached(self, key, build):
+        rendered = self.cache.get(key)
+        if rendered is None:
+            rendered = build()
+            self.cache.put(key, rendered)
+        return rendered
+
+    def _table_index(self, tables):
+        index = []
+        newest = 0
+        for name in tables:
+            (frame, _), mtime = self.tables.get(name)
+            newest = max(newest, mtime)
+            index.append({'name': name, 'columns': list(frame.columns), 'rows': len(frame),
+                          'last_modified': formatdate(mtime, usegmt=True)})
+        return Rendered({'tables': index}, newest)
+
+    def _table_slice(self, name, table, mtime, params):
+        params = dict(params)
+        columns = [col for value in params.pop('columns', []) for col in value.split(',') if col]
+        try:
+            result = slice_table(table, params, columns)
+        except KeyError as exc:
+            raise HTTPError(400, f'Table {name} has no column {exc.args[0]}')
+        return Rendered({'table': name, 'rows': to_records(result)}, mtime)
+
+    def _store_slice(self, store, route, params):
+        unknown = set(params) - ({'survey', 'wave', 'department', 'metric'} if route == 'kpis' else {'survey'})
+        if unknown:
+            raise HTTPError(400, f'Unknown filter(s): {", ".join(sorted(unknown))}')
+        if route == 'waves':
+            result = store.waves(params['survey'][0] if 'survey' in params else None)
+        else:
+            result = store.kpis(**{key: values for key, values in params.items()})
+        return Rendered({route: to_records(result)}, os.path.getmtime(self.store_path))
+
+    # ------------------------------------------------------------------------
+    # HTTP/1.1
+    # ------------------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        """One keep-alive connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 431, self._error_body(431, 'Headers too large'), keep_alive=False)
+                    return
+                except asyncio.IncompleteReadError:
+                    return
+                keep_alive = await self._respond(writer, head)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, head):
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            await self._send(writer, 400, self._error_body(400, 'Malformed request line'), keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+        if method not in ('GET', 'HEAD'):
+            await self._send(writer, 405, self._error_body(405, f'{method} not allowed'), keep_alive,
+                             extra={'Allow': 'GET, HEAD'})
+            return keep_alive
+
+        url = urlsplit(target)
+        try:
+            rendered = self.render(url.path, url.query)
+        except HTTPError as exc:
+            await self._send(writer, exc.status, self._error_body(exc.status, str(exc)), keep_alive)
+            return keep_alive
+        except Exception as exc:
+            await self._send(writer, 500, self._error_body(500, str(exc)), keep_alive)
+            return keep_alive
+
+        use_gzip = rendered.gzipped is not None and 'gzip' in headers.get('accept-encoding', '')
+        etag = rendered.gzip_etag if use_gzip else rendered.etag
+        validators = {'ETag': etag, 'Last-Modified': formatdate(rendered.last_modified, usegmt=True),
+                      'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if self._not_modified(headers, etag, rendered.last_modified):
+            await self._send(writer, 304, b'', keep_alive, extra=validators, head_only=True)
+            return keep_alive
+
+        body = rendered.body
+        if use_gzip:
+            body = rendered.gzipped
+            validators['Content-Encoding'] = 'gzip'
+        await self._send(writer, 200, body, keep_alive, extra=validators, head_only=method == 'HEAD')
+        return keep_alive
+
+    @staticmethod
+    def _not_modified(headers, etag, last_modified):
+        """If-None-Match (against the ETag of the encoding being sent) wins over If-Modified-Since (RFC 9110)"""
+        if 'if-none-match' in headers:
+            tags = [tag.strip().removeprefix('W/') for tag in headers['if-none-match'].split(',')]
+            return etag in tags or '*' in tags
+        if 'if-modified-since' in headers:
+            try:
+                since = parsedate_to_datetime(headers['if-modified-since']).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return last_modified <= since
+        return False
+
+    @staticmethod
+    def _error_body(status, message):
+        return json.dumps({'status': status, 'error': message}).encode('utf-8')
+
+    @staticmethod
+    async def _send(writer, status, body, keep_alive, extra=None, head_only=False):
+        headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body)),
+                   'Access-Control-Allow-Origin': '*', 'Connection': 'keep-alive' if keep_alive else 'close'}
+        if status == 304:
+            headers.pop('Content-Type')
+            headers.pop('Content-Length')
+        headers.update(extra or {})
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}'] + [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"[OK] Serving {len(service.tables.discover())} cube tables on http://{host}:{port}/v1/tables")
+    async with server:
+        await server.serve_forever()
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve KPI/theme cube slices to the dashboards')
+    parser.add_argument('--data', nargs='+', default=DEFAULT_DATA_DIRS, help='Folders holding cube CSVs')
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help='Multi-wave survey store for /v1/kpis')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--lru', type=int, default=LRU_ENTRIES, help='Rendered responses kept in memory')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("CUBE SERVICE")
+    print("=" * 80)
+    service = CubeService(args.data, args.store, args.lru)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\nStopped (LRU: {service.cache.hits} hits, {service.cache.misses} misses)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Dashboard Assets - Content-Hashed Data Files for the Static Dashboards
+Builds each dashboard's data as a minified, hash-named JSON file and points the page at it
+
+Usage:
+    python dashboard_assets.py [--dashboard ndr-checkin engagement-chat lds-survey] [--check]
+
+A dashboard page carries one tag per data asset:
+
+    <link rel="preload" as="fetch" crossorigin data-asset="ndr_data" href="data/ndr_data.3f9c1e07ab.json">
+
+The build reads the asset's editable source (pretty JSON, or a CSV read as
+d3.csv would see it, every value a string), writes data/<name>.<hash>.json and
+rewrites only that href. The page's markup and its data are cached
+independently: a data change renames the JSON and leaves the HTML bytes as they
+were apart from one attribute, so both can be served with long-lived,
+immutable cache headers. Superseded hashed files are removed. --check exits 1
+when a page or asset is stale, without writing anything.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'static'))
+HASH_LENGTH = 10
+
+# dashboard -> (folder under static/, page, {asset name: source path relative to the folder})
+DASHBOARDS = {
+    'ndr-checkin': ('ndr-checkin-dashboard', 'index.html', {'ndr_data': 'data/ndr_data.json'}),
+    'engagement-chat': ('engagement-chat-dashboard', 'index.html', {'engagement_data': 'data/engagement_data.json'}),
+    'lds-survey': ('lds-survey-dashboard', 'index.html', {'lds_survey': 'lds_survey_clean.csv'}),
+}
+ASSET_DIR = 'data'
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def read_source(path):
+    """Asset payload: parsed JSON, or CSV rows as {column: string} records"""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def minify(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def asset_name(name, body):
+    return f'{name}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}.json'
+
+def link_pattern(name):
+    return re.compile(rf'(<link\b[^>]*\bdata-asset="{re.escape(name)}"[^>]*\bhref=")([^"]*)(")')
+
+def referenced(html, name):
+    """href of the page's tag for an asset, or None"""
+    match = link_pattern(name).search(html)
+    return match[2] if match else None
+
+def write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+def stale_assets(folder, name, keep):
+    """Hashed files of an asset other than keep"""
+    asset_dir = os.path.join(folder, ASSET_DIR)
+    pattern = re.compile(rf'^{re.escape(name)}\.[0-9a-f]{{{HASH_LENGTH}}}\.json$')
+    return [os.path.join(asset_dir, entry) for entry in sorted(os.listdir(asset_dir))
+            if pattern.match(entry) and entry != keep] if os.path.isdir(asset_dir) else []
+
+def build_dashboard(key, static_dir=STATIC_DIR, check=False):
+    """[(asset, href, changed)] for one dashboard; writes nothing when check is set"""
+    folder_name, page, assets = DASHBOARDS[key]
+    folder = os.path.join(static_dir, folder_name)
+    page_path = os.path.join(folder, page)
+    with open(page_path, encoding='utf-8') as f:
+        html = f.read()
+
+    results = []
+    updated = html
+    for name, source in assets.items():
+        body = minify(read_source(os.path.join(folder, source)))
+        href = f'{ASSET_DIR}/{asset_name(name, body)}'
+        if referenced(updated, name) is None:
+            raise ValueError(f'{page_path} has no <link data-asset="{name}"> tag')
+        asset_path = os.path.join(folder, href)
+        changed = referenced(updated, name) != href or not os.path.exists(asset_path)
+        results.append((name, href, changed))
+        if check:
+            continue
+        os.makedirs(os.path.dirname(asset_path), exist_ok=True)
+        if not os.path.exists(asset_path):
+            write_atomic(asset_path, body)
+        updated = link_pattern(name).sub(lambda match: match[1] + href + match[3], updated)
+        for path in stale_assets(folder, name, os.path.basename(href)):
+            os.remove(path)
+
+    if not check and updated != html:
+        write_atomic(page_path, updated.encode('utf-8'))
+    return results
+
+def dashboard_for(folder):
+    """Registered dashboard served from folder (e.g. a spec's publish directory), or None"""
+    name = os.path.basename(os.path.normpath(os.path.abspath(folder)))
+    return next((key for key, (folder_name, _, _) in DASHBOARDS.items() if folder_name == name), None)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Build content-hashed data assets for the static dashboards')
+    parser.add_argument('--dashboard', nargs='+', choices=sorted(DASHBOARDS), default=sorted(DASHBOARDS))
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    parser.add_argument('--check', action='store_true', help='Only report stale pages/assets (exit 1 if any)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("DASHBOARD DATA ASSETS")
+    print("=" * 80)
+
+    stale = 0
+    for key in args.dashboard:
+        print(f"\n{key}:")
+        for name, href, changed in build_dashboard(key, args.static_dir, args.check):
+            size = os.path.getsize(os.path.join(args.static_dir, DASHBOARDS[key][0], href)) if not args.check else None
+            if args.check:
+                print(f"  {'[!] stale' if changed else '[OK] current'}: {name} -> {href}")
+            else:
+                print(f"  [OK] {'Built' if changed else 'Current'}: {href} ({size / 1024:.1f} KB)")
+            stale += changed
+    if args.check and stale:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""
+Export Fetcher - Resumable, Incremental Pulls from a Qualtrics-Style Response Export API
+Start export -> poll -> stream the zip to disk, verified and appended to a local CSV past a stored watermark
+
+Usage:
+    python export_fetcher.py SV_abc123=../../outputs/90day-survey/90-day-survey-analysis.csv [SV_def456 ...]
+        [--base-url https://ca1.qualtrics.com] [--workers 4] [--full]
+
+QUALTRICS_API_TOKEN and QUALTRICS_BASE_URL supply the credentials and data-center
+host. Each survey keeps a state file (watermark plus any in-flight job), so an
+interrupted run picks up where it stopped. A job still being prepared is polled
+again, and a half-downloaded zip resumes with a Range request. Only responses
+recorded in [watermark, run start) are exported, and they are appended to the
+survey's CSV after its three header rows are checked.
+"""
+
+import argparse
+import csv
+import hashlib
+import http.client
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_BASE_URL = os.environ.get('QUALTRICS_BASE_URL', 'http://127.0.0.1:8766')
+DEFAULT_TOKEN = os.environ.get('QUALTRICS_API_TOKEN', 'mock-token')
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'outputs', 'exports')
+
+HEADER_ROWS = 3
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+CHUNK_BYTES = 1 << 20
+TIMEOUT_SECONDS = 60
+RETRIES = 5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POLL_START_SECONDS = 0.5
+POLL_MAX_SECONDS = 5.0
+
+# ============================================================================
+# HTTP POOL
+# ============================================================================
+
+class FetchError(Exception):
+    pass
+
+class ConnectionPool:
+    """Keep-alive connections to one host, shared by the fetch threads"""
+
+    def __init__(self, base_url, size=4, timeout=TIMEOUT_SECONDS):
+        url = urlsplit(base_url)
+        self.https = url.scheme == 'https'
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def _connect(self):
+        self.opened += 1
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool only if the exchange completed"""
+        with self.slots:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            self.idle.put(conn)
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, headers, body) with retries on dropped connections, 429 and 5xx"""
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        headers = {**(headers or {}), **({'Content-Type': 'application/json'} if data is not None else {})}
+        for attempt in range(RETRIES):
+            try:
+                with self.connection() as conn:
+                    conn.request(method, self.prefix + path, body=data, headers=headers)
+                    response = conn.getresponse()
+                    payload = response.read()
+            except (http.client.HTTPException, ConnectionError, TimeoutError) as exc:
+                error = exc  # a stale keep-alive socket fails here; the retry opens a new one
+            else:
+                if response.status not in RETRY_STATUSES:
+                    return response.status, dict(response.getheaders()), payload
+                error = FetchError(f'{method} {path}: HTTP {response.status}')
+                retry_after = response.getheader('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    time.sleep(int(retry_after))
+                    continue
+            time.sleep(min(2 ** attempt * 0.25, 8))
+        raise FetchError(f'{method} {path} failed after {RETRIES} attempts: {error}')
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {'watermark': None, 'job': None}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(path, state):
+    """Atomic replace so a crash never leaves half a state file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+# ============================================================================
+# FETCHER
+# ============================================================================
+
+class ExportFetcher:
+    """Incremental export-job client for any number of surveys"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, token=DEFAULT_TOKEN, output_dir=DEFAULT_OUTPUT_DIR, pool_size=4,
+                 poll_start=POLL_START_SECONDS):
+        self.pool = ConnectionPool(base_url, pool_size)
+        self.headers = {'X-API-TOKEN': token}
+        self.output_dir = output_dir
+        self.state_dir = os.path.join(output_dir, '.fetch_state')
+        self.poll_start = poll_start
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _call(self, method, path, body=None):
+        status, _, payload = self.pool.request(method, path, body, self.headers)
+        message = json.loads(payload or b'{}')
+        if status != 200:
+            error = message.get('meta', {}).get('error', {}).get('errorMessage', '')
+            raise FetchError(f'{method} {path}: HTTP {status} {error}'.strip())
+        return message['result']
+
+    def fetch(self, survey_id, output_path=None, full=False):
+        """
+        Bring one survey's CSV up to date; returns a summary dict.
+
+        Steps persist to the state file as they complete: job started,
+        file ready, zip verified, rows appended and watermark advanced.
+        """
+        output_path = output_path or os.path.join(self.output_dir, f'{survey_id}.csv')
+        state_path = os.path.join(self.state_dir, f'{survey_id}.json')
+        state = {'watermark': None, 'job': None} if full else load_state(state_path)
+        started = time.perf_counter()
+        resumed = state['job'] is not None
+        route = f'/API/v3/surveys/{survey_id}/export-responses'
+
+        if state['job'] is None:
+            end_date = datetime.now(timezone.utc).strftime(ISO_FORMAT)
+            options = {'format': 'csv', 'endDate': end_date}
+            if state['watermark']:
+                options['startDate'] = state['watermark']
+            result = self._call('POST', route, options)
+            state['job'] = {'progress_id': result['progressId'], 'end_date': end_date, 'file_id': None}
+            save_state(state_path, state)
+
+        job = state['job']
+        if job['file_id'] is None:
+            job['file_id'] = self._wait_for_file(route, job['progress_id'])
+            save_state(state_path, state)
+
+        zip_path = os.path.join(self.state_dir, f"{survey_id}.{job['file_id']}.zip")
+        n_bytes, digest = self._download(f"{route}/{job['file_id']}/file", zip_path)
+        n_rows = append_export(zip_path, output_path, replace=state['watermark'] is None)
+
+        state['watermark'] = job['end_date']
+        state['job'] = None
+        save_state(state_path, state)
+        os.remove(zip_path)
+
+        elapsed = time.perf_counter() - started
+        return {'survey': survey_id, 'new_responses': n_rows, 'zip_bytes': n_bytes, 'sha256': digest[:16],
+                'seconds': round(elapsed, 2), 'mb_per_s': round(n_bytes / 1e6 / elapsed, 2) if elapsed else None,
+                'resumed': resumed, 'watermark': state['watermark'], 'output': output_path}
+
+    def _wait_for_file(self, route, progress_id):
+        delay = self.poll_start
+        while True:
+            result = self._call('GET', f'{route}/{progress_id}')
+            if result['status'] == 'complete':
+                return result['fileId']
+            if result['status'] == 'failed':
+                raise FetchError(f'Export {progress_id} failed on the server')
+            time.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX_SECONDS)
+
+    def _download(self, path, zip_path):
+        """Stream to <zip>.part, resuming with Range after drops; returns (bytes, sha256)"""
+        part_path = zip_path + '.part'
+        if os.path.exists(zip_path):
+            return os.path.getsize(zip_path), _sha256(zip_path)
+
+        for attempt in range(RETRIES):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {**self.headers, **({'Range': f'bytes={offset}-'} if offset else {})}
+            try:
+                with self.pool.connection() as conn:
+                    conn.request('GET', self.pool.prefix + path, headers=headers)
+                    response = conn.getresponse()
+                    expected = response.getheader('X-Checksum-Sha256')
+                    if response.status == 416:
+                        response.read()
+                        # The .part already holds every byte (killed before the rename); verify it below
+                        if response.getheader('Content-Range', '') != f'bytes */{offset}':
+                            os.remove(part_path)
+                            continue
+                    elif response.status not in (200, 206):
+                        response.read()
+                        raise FetchError(f'GET {path}: HTTP {response.status}')
+                    else:
+                        mode = 'ab' if response.status == 206 else 'wb'  # 200 means the server ignored Range
+                        with open(part_path, mode) as f:
+                            while True:
+                                block = response.read(CHUNK_BYTES)
+                                if not block:
+                                    break
+                                f.write(block)
+                        if response.length:  # body ended early without an exception
+                            raise http.client.IncompleteRead(b'', response.length)
+            except (http.client.HTTPException, ConnectionError, TimeoutError):
+                time.sleep(min(2 ** attempt * 0.25, 8))
+                continue
+
+            digest = _sha256(part_path)
+            if (expected and digest != expected) or not _zip_ok(part_path):
+                os.remove(part_path)  # a bad splice; start this file over
+                continue
+            os.replace(part_path, zip_path)
+            return os.path.getsize(zip_path), digest
+        raise FetchError(f'Download of {path} did not complete after {RETRIES} attempts')
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _zip_ok(path):
+    """Every member's CRC checks out"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip() is None
+    except zipfile.BadZipFile:
+        return False
+
+# ============================================================================
+# MERGE
+# ============================================================================
+
+def append_export(zip_path, output_path, replace=False):
+    """
+    Append the export's data rows to output_path; returns rows appended.
+
+    The first export (or replace) becomes the file as-is. Later ones must carry
+    the same header rows, since a changed survey needs a full re-pull. Rows whose
+    ResponseId is already in the file are skipped, so re-appending a zip after a
+    kill between the rename and the state save adds nothing. The merged file is
+    written beside the target and renamed over it.
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        member = next(name for name in archive.namelist() if name.lower().endswith('.csv'))
+        with archive.open(member) as raw:
+            text = raw.read().decode('utf-8-sig')
+    rows = csv.reader(text.splitlines(keepends=True))
+    header = [next(rows) for _ in range(HEADER_ROWS)]
+    data_rows = list(rows)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix='.tmp')
+    os.close(fd)
+    try:
+        if replace or not os.path.exists(output_path):
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(header + data_rows)
+        else:
+            with open(output_path, newline='', encoding='utf-8-sig') as f:
+                existing = csv.reader(f)
+                if [next(existing) for _ in range(HEADER_ROWS)][0] != header[0]:
+                    raise FetchError(f'{os.path.basename(output_path)}: survey columns changed; re-run with --full')
+                if 'ResponseId' in header[0]:
+                    id_col = header[0].index('ResponseId')
+                    seen = {row[id_col] for row in existing if len(row) > id_col}
+                    data_rows = [row for row in data_rows if row[id_col] not in seen]
+            shutil.copyfile(output_path, tmp_path)
+            with open(tmp_path, 'a', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(data_rows)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(data_rows)
+
+def fetch_all(fetcher, targets, workers=4, full=False):
+    """Fetch several surveys concurrently over the shared pool; one summary per survey"""
+    def one(target):
+        survey_id, output_path = target
+        try:
+            return fetcher.fetch(survey_id, output_path, full=full)
+        except FetchError as exc:
+            return {'survey': survey_id, 'error': str(exc)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, targets))
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally fetch survey responses through the export API')
+    parser.add_argument('surveys', nargs='+', help='SURVEY_ID or SURVEY_ID=output.csv')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='Data-center URL (env QUALTRICS_BASE_URL)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='Default CSV location and fetch state')
+    parser.add_argument('--workers', type=int, default=4, help='Surveys fetched at once (also the connection pool size)')
+    parser.add_argument('--full', action='store_true', help='Ignore the watermark and re-pull everything')
+    args = parser.parse_args()
+
+    targets = [tuple(item.split('=', 1)) if '=' in item else (item, None) for item in args.surveys]
+    fetcher = ExportFetcher(args.base_url, DEFAULT_TOKEN, args.output_dir, pool_size=args.workers)
+
+    print("=" * 80)
+    print("EXPORT FETCHER")
+    print("=" * 80)
+    started = time.perf_counter()
+    results = fetch_all(fetcher, targets, args.workers, args.full)
+    elapsed = time.perf_counter() - started
+
+    total_bytes = 0
+    for result in results:
+        if 'error' in result:
+            print(f"[!] {result['survey']}: {result['error']}")
+            continue
+        total_bytes += result['zip_bytes']
+        resumed = ' (resumed)' if result['resumed'] else ''
+        print(f"[OK] {result['survey']}: {result['new_responses']} new responses, {result['zip_bytes']:,} bytes "
+              f"in {result['seconds']}s{resumed} -> {result['output']} (watermark {result['watermark']})")
+    print(f"\nTotal: {total_bytes / 1e6:.2f} MB in {elapsed:.2f}s ({total_bytes / 1e6 / elapsed:.2f} MB/s), "
+          f"{fetcher.pool.opened} connection(s) opened")
+
+if __name__ == '__main__':
+    main()
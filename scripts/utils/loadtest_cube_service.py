@@ -0,0 +1,187 @@
+"""
+Cube Service Load Test - Open-Loop Latency at a Fixed Request Rate
+Sends slice queries on a fixed schedule and reports p50/p90/p99 latency
+
+Usage:
+    python loadtest_cube_service.py [--url http://127.0.0.1:8765] [--rate 500] [--duration 10]
+
+Requests are scheduled at fixed intervals, whether or not earlier ones have
+returned. Latency is measured from the scheduled send time, so a stalled server
+shows up in the tail instead of quietly lowering the rate. URLs are every
+single-column slice of every table the service lists (department, session,
+metric, ...), sampled at random.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SLICE_COLUMNS = ('department', 'session', 'unit', 'metric', 'theme', 'grouping')
+MAX_VALUES_PER_COLUMN = 50
+
+# ============================================================================
+# HTTP CLIENT
+# ============================================================================
+
+class Connection:
+    """Keep-alive HTTP/1.1 connection; one request in flight at a time"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, headers=None):
+        """(status, headers, body) for a GET"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ')[1])
+        response_headers = {}
+        for line in head[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                response_headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(response_headers.get('content-length', 0)))
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+async def slice_urls(conn):
+    """One URL per (table, column, value) for the common slice dimensions"""
+    _, _, body = await conn.request('/v1/tables')
+    urls = []
+    for table in json.loads(body)['tables']:
+        _, _, body = await conn.request(f"/v1/tables/{quote(table['name'])}")
+        rows = json.loads(body)['rows']
+        for column in SLICE_COLUMNS:
+            if column not in table['columns']:
+                continue
+            values = sorted({str(row[column]) for row in rows if row[column] is not None})[:MAX_VALUES_PER_COLUMN]
+            urls += [f"/v1/tables/{quote(table['name'])}?{column}={quote(value)}" for value in values]
+    return urls
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+async def run_load(host, port, urls, rate, duration, connections, revalidate, use_gzip, seed=7):
+    """Latencies (seconds) and status counts for an open-loop run"""
+    rng = random.Random(seed)
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(Connection(host, port))
+    etags = {}
+    latencies = []
+    statuses = {}
+
+    async def one(url, scheduled):
+        conn = await pool.get()
+        headers = {'Accept-Encoding': 'gzip'} if use_gzip else {}
+        if revalidate and url in etags:
+            headers['If-None-Match'] = etags[url]
+        try:
+            status, response_headers, _ = await conn.request(url, headers)
+            if 'etag' in response_headers:
+                etags[url] = response_headers['etag']
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            conn.close()
+            status = type(exc).__name__
+        finally:
+            pool.put_nowait(conn)
+        latencies.append(time.perf_counter() - scheduled)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    n_requests = int(rate * duration)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    tasks = []
+    for i in range(n_requests):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(rng.choice(urls), scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    while not pool.empty():
+        pool.get_nowait().close()
+    return np.array(latencies), statuses, elapsed
+
+def summarize(latencies, statuses, elapsed, rate):
+    ms = latencies * 1000
+    return {
+        'target_rps': rate,
+        'achieved_rps': round(len(latencies) / elapsed, 1),
+        'requests': len(latencies),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p90_ms': round(float(np.percentile(ms, 90)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=lambda item: str(item[0]))}
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+async def main_async(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    probe = Connection(host, port)
+    urls = await slice_urls(probe)
+    probe.close()
+    if not urls:
+        raise SystemExit('The service lists no sliceable tables')
+    print(f"\nSlice URLs: {len(urls)} | Rate: {args.rate}/s | Duration: {args.duration}s | Connections: {args.connections}")
+
+    latencies, statuses, elapsed = await run_load(host, port, urls, args.rate, args.duration, args.connections,
+                                                  args.revalidate, not args.no_gzip)
+    summary = summarize(latencies, statuses, elapsed, args.rate)
+    print()
+    for key, value in summary.items():
+        print(f"  {key}: {value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n[OK] Exported: {args.json}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the cube service at a fixed request rate')
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--rate', type=float, default=500, help='Requests per second (open loop)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load')
+    parser.add_argument('--connections', type=int, default=32, help='Keep-alive connections in the pool')
+    parser.add_argument('--revalidate', action='store_true', help='Send If-None-Match once an ETag is known (browser reloads)')
+    parser.add_argument('--no-gzip', action='store_true')
+    parser.add_argument('--json', help='Also write the summary to this file')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("CUBE SERVICE LOAD TEST")
+    print("=" * 80)
+    asyncio.run(main_async(args))
+
+if __name__ == '__main__':
+    main()
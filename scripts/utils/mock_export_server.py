@@ -0,0 +1,273 @@
+"""
+Mock Export Server - Offline Stand-In for a Qualtrics-Style Response Export API
+Start export -> poll progress -> download zip, with recorded-date windows, Range resume and injected failures
+
+Usage:
+    python mock_export_server.py [--port 8766] [--surveys SV_90day SV_pulse] [--responses 5000] [--drop-every 3]
+
+Routes (X-API-TOKEN required):
+    POST /API/v3/surveys/<surveyId>/export-responses                {"format": "csv", "startDate": ..., "endDate": ...}
+    GET  /API/v3/surveys/<surveyId>/export-responses/<progressId>   -> percentComplete, status, fileId
+    GET  /API/v3/surveys/<surveyId>/export-responses/<fileId>/file  -> zip (Range supported)
+
+Responses are resampled from a real export's rows (default: the 90-day CSV) with
+fresh ResponseIds and RecordedDates spread evenly over --days, so fetched files
+run through the same specs as a manual download. startDate is inclusive and
+endDate exclusive.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import zipfile
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'outputs', '90day-survey',
+                                '90-day-survey-analysis.csv')
+DEFAULT_TOKEN = 'mock-token'
+HEADER_ROWS = 3
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+RECORDED_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+EXPORT_ROUTE = re.compile(r'^/API/v3/surveys/(?P<survey>[^/]+)/export-responses(?:/(?P<job>[^/]+)(?P<file>/file)?)?$')
+
+# ============================================================================
+# SYNTHETIC RESPONSES
+# ============================================================================
+
+def read_template(path):
+    """(three header rows, data rows) of a Qualtrics CSV export"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    return rows[:HEADER_ROWS], rows[HEADER_ROWS:]
+
+def synthetic_responses(header, template_rows, survey_id, n_responses, days, arrive_over=0, seed=7):
+    """n resampled rows with unique ResponseIds, sorted by RecordedDate (the last ones may lie in the future)"""
+    names = header[0]
+    recorded_col = names.index('RecordedDate')
+    id_col = names.index('ResponseId')
+    rng = random.Random(f'{survey_id}:{seed}')
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    start = now - timedelta(days=days)
+    end = now + timedelta(seconds=arrive_over)
+    step = (end - start) / max(n_responses, 1)
+
+    rows = []
+    for i in range(n_responses):
+        row = list(rng.choice(template_rows))
+        recorded = start + step * i
+        row[recorded_col] = recorded.strftime(RECORDED_FORMAT)
+        row[id_col] = f'R_{hashlib.sha1(f"{survey_id}:{i}".encode()).hexdigest()[:15]}'
+        rows.append((recorded, row))
+    return rows
+
+def parse_iso(value):
+    return datetime.strptime(value, ISO_FORMAT).replace(tzinfo=timezone.utc) if value else None
+
+def export_zip(survey_id, header, rows, start_date, end_date):
+    """Zip holding one CSV of the responses recorded in [start_date, end_date)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerows(header)
+    n_rows = 0
+    for recorded, row in rows:
+        if (start_date is None or recorded >= start_date) and (end_date is None or recorded < end_date):
+            writer.writerow(row)
+            n_rows += 1
+    payload = io.BytesIO()
+    with zipfile.ZipFile(payload, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f'{survey_id}.csv', buffer.getvalue().encode('utf-8'))
+    return payload.getvalue(), n_rows
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class MockExportState:
+    """Surveys, export jobs and built files shared by all handler threads"""
+
+    def __init__(self, surveys, token, polls_to_complete, drop_every):
+        self.surveys = surveys  # survey id -> (header, rows)
+        self.token = token
+        self.polls_to_complete = polls_to_complete
+        self.drop_every = drop_every
+        self.jobs = {}   # progress id -> job dict
+        self.files = {}  # file id -> zip bytes
+        self.downloads = 0
+        self.lock = threading.Lock()
+
+    def start_job(self, survey_id, options):
+        with self.lock:
+            progress_id = f'ES_{len(self.jobs) + 1:08d}'
+            self.jobs[progress_id] = {'survey': survey_id, 'polls': 0, 'file_id': None,
+                                      'start': parse_iso(options.get('startDate')), 'end': parse_iso(options.get('endDate'))}
+        return progress_id
+
+    def poll(self, survey_id, progress_id):
+        with self.lock:
+            job = self.jobs.get(progress_id)
+            if job is None or job['survey'] != survey_id:
+                return None
+            job['polls'] += 1
+            if job['polls'] >= self.polls_to_complete and job['file_id'] is None:
+                header, rows = self.surveys[survey_id]
+                data, _ = export_zip(survey_id, header, rows, job['start'], job['end'])
+                job['file_id'] = f'{hashlib.sha256(data).hexdigest()[:32]}-def'
+                self.files[job['file_id']] = data
+            percent = min(100.0, 100.0 * job['polls'] / self.polls_to_complete)
+            return {'percentComplete': percent, 'status': 'complete' if job['file_id'] else 'inProgress',
+                    **({'fileId': job['file_id']} if job['file_id'] else {})}
+
+    def should_drop(self):
+        with self.lock:
+            self.downloads += 1
+            return bool(self.drop_every) and self.downloads % self.drop_every == 0
+
+class ExportHandler(BaseHTTPRequestHandler):
+    """Qualtrics-shaped JSON envelopes over HTTP/1.1 keep-alive"""
+
+    protocol_version = 'HTTP/1.1'
+    state = None  # MockExportState, set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, result=None, error=None):
+        meta = {'httpStatus': f'{status} - {self.responses[status][0]}', 'requestId': hashlib.sha1(os.urandom(8)).hexdigest()[:12]}
+        if error:
+            meta['error'] = {'errorMessage': error}
+        body = json.dumps({'result': result, 'meta': meta} if result is not None else {'meta': meta}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        if self.headers.get('X-API-TOKEN') != self.state.token:
+            self._json(401, error='Invalid API token')
+            return None
+        match = EXPORT_ROUTE.match(self.path.split('?')[0])
+        if match is None or match['survey'] not in self.state.surveys:
+            self._json(404, error='Unknown survey or route')
+            return None
+        return match
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        options = json.loads(self.rfile.read(length) or b'{}')
+        match = self._route()
+        if match is None:
+            return
+        if match['job'] is not None:
+            self._json(404, error='Unknown route')
+        elif options.get('format', 'csv') != 'csv':
+            self._json(400, error='Only format=csv is mocked')
+        else:
+            progress_id = self.state.start_job(match['survey'], options)
+            self._json(200, {'progressId': progress_id, 'percentComplete': 0.0, 'status': 'inProgress'})
+
+    def do_GET(self):
+        match = self._route()
+        if match is None:
+            return
+        if match['job'] is None:
+            self._json(404, error='Unknown route')
+        elif match['file']:
+            self._send_file(match['job'])
+        else:
+            progress = self.state.poll(match['survey'], match['job'])
+            if progress is None:
+                self._json(404, error='Unknown progressId')
+            else:
+                self._json(200, progress)
+
+    def _send_file(self, file_id):
+        data = self.state.files.get(file_id)
+        if data is None:
+            self._json(404, error='Unknown fileId')
+            return
+        start = 0
+        byte_range = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if byte_range and int(byte_range[1]) >= len(data):
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(data)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if byte_range:
+            start = int(byte_range[1])
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Length', str(len(data) - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('X-Checksum-Sha256', hashlib.sha256(data).hexdigest())
+        self.end_headers()
+
+        body = data[start:]
+        if self.state.should_drop():
+            # Simulate a dropped connection halfway through the body
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+def make_server(host, port, state):
+    handler = type('BoundExportHandler', (ExportHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock Qualtrics-style export API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--surveys', nargs='+', default=['SV_90day'])
+    parser.add_argument('--responses', type=int, default=5000, help='Responses per survey')
+    parser.add_argument('--days', type=float, default=365, help='RecordedDates are spread over this many days up to now')
+    parser.add_argument('--arrive-over', type=float, default=0,
+                        help='Spread part of the responses over the next N seconds, so repeated fetches find new ones')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='Qualtrics CSV whose rows are resampled')
+    parser.add_argument('--token', default=DEFAULT_TOKEN)
+    parser.add_argument('--polls', type=int, default=3, help='Progress polls before an export completes')
+    parser.add_argument('--drop-every', type=int, default=0, help='Cut every Nth file download halfway (tests resume)')
+    args = parser.parse_args()
+
+    header, template_rows = read_template(args.template)
+    surveys = {survey_id: (header, synthetic_responses(header, template_rows, survey_id, args.responses, args.days,
+                                                             args.arrive_over))
+               for survey_id in args.surveys}
+    state = MockExportState(surveys, args.token, args.polls, args.drop_every)
+
+    print("=" * 80)
+    print("MOCK EXPORT SERVER")
+    print("=" * 80)
+    print(f"\n{len(surveys)} survey(s) x {args.responses} responses on http://{args.host}:{args.port} (token: {args.token})")
+    server = make_server(args.host, args.port, state)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+"""
+Notebook Analysis - Single-Pass AST Audit of Notebook Code Cells
+Parses each code cell once and extracts functions, imports, call sites, data-quality operations and complexity
+
+Usage:
+    python notebook_analysis.py notebook.ipynb [--no-cache] [--cache PATH]
+
+    from notebook_analysis import CellCache, analyze_notebook
+    from notebook_reader import read_notebook
+    report = analyze_notebook(read_notebook(path)['cells'], CellCache())
+    report['functions'], report['plots'], report['data_quality'], report['complexity']
+
+Each code cell is parsed with ast once (IPython line magics, shell escapes and
+help lookups are blanked first; cells under a non-Python cell magic such as
+%%bash are skipped) and one visitor collects everything the auditors ask about.
+Function detection sees lambdas, methods and async defs; plot and pandas call
+sites are resolved through the notebook's imports, so `import seaborn as s`
+or `from matplotlib import pyplot` are found as readily as `plt.`/`sns.`.
+Per-cell results depend on the source alone and are cached by its sha256, so
+re-auditing a notebook only parses the cells that changed.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+from notebook_reader import read_notebook
+from stage_cache import DEFAULT_DIR, code_digest, config_digest
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CACHE_PATH = os.path.join(DEFAULT_DIR, 'notebook-cells.json')
+
+# Cell magics whose body is still Python
+PYTHON_CELL_MAGICS = {'time', 'timeit', 'capture', 'prun', 'debug', 'writefile'}
+# %x / !x / x = !cmd / x = %magic / x? / ??x
+MAGIC_LINE = re.compile(r'^(\s*)(?:[%!]|\?\??\w|\w[\w.]*\?\??\s*$|[\w, ]+=\s*[%!])')
+
+PLOT_MODULES = ('matplotlib', 'seaborn', 'plotly', 'altair', 'bokeh')
+PANDAS_MODULES = ('pandas',)
+# DataFrame/Series methods counted as pandas call sites when the receiver is not a module
+PANDAS_METHODS = {
+    'read_csv', 'read_excel', 'read_parquet', 'merge', 'join', 'concat', 'groupby', 'agg', 'aggregate',
+    'pivot_table', 'pivot', 'melt', 'apply', 'value_counts', 'sort_values', 'describe', 'info', 'head',
+    'query', 'assign', 'rename', 'astype', 'to_datetime', 'reset_index', 'set_index', 'loc', 'iloc',
+}
+# Methods that draw when called on a DataFrame/Series (df.plot(), df.plot.bar(), df.hist())
+FRAME_PLOT_METHODS = {'plot', 'hist', 'boxplot', 'scatter_matrix'}
+DATA_QUALITY_METHODS = {
+    'isna': 'missing check', 'isnull': 'missing check', 'notna': 'missing check', 'notnull': 'missing check',
+    'dropna': 'drop missing', 'fillna': 'impute', 'interpolate': 'impute',
+    'duplicated': 'duplicate check', 'drop_duplicates': 'drop duplicates',
+}
+# Statistics a fillna argument is recognized as (df.fillna(df.median()), x.fillna(x.mean()))
+IMPUTE_STRATEGIES = {'median', 'mean', 'mode', 'ffill', 'bfill', 'pad', 'backfill'}
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def cell_source(cell):
+    """A notebook cell's source as one string (nbformat stores a list of lines)"""
+    source = cell.get('source', '')
+    return ''.join(source) if isinstance(source, list) else source
+
+def strip_magics(source):
+    """(python source, magics) with IPython-only lines blanked to `pass`, or (None, magics) for a non-Python cell"""
+    lines = source.split('\n')
+    first = lines[0].strip() if lines else ''
+    magics = []
+    if first.startswith('%%'):
+        name = first[2:].split()[0] if len(first) > 2 else ''
+        magics.append(f'%%{name}')
+        if name not in PYTHON_CELL_MAGICS:
+            return None, magics
+        lines[0] = ''
+    for i, line in enumerate(lines):
+        match = MAGIC_LINE.match(line)
+        if match:
+            magics.append(line.strip())
+            lines[i] = f'{match[1]}pass'
+    return '\n'.join(lines), magics
+
+def call_chain(node):
+    """Dotted receiver chain of a call target, e.g. 'df.groupby().plot.bar', or None for computed receivers"""
+    parts = []
+    while True:
+        if isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        elif isinstance(node, ast.Call):
+            parts.append('()')
+            node = node.func
+        elif isinstance(node, ast.Subscript):
+            parts.append('[]')
+            node = node.value
+        elif isinstance(node, ast.Name):
+            parts.append(node.id)
+            break
+        else:
+            return None
+    return '.'.join(reversed(parts)).replace('.()', '()').replace('.[]', '[]')
+
+def impute_strategy(call):
+    """Statistic a fillna(...) call imputes with, if recognizable"""
+    for arg in [*call.args, *(keyword.value for keyword in call.keywords if keyword.arg in ('value', 'method'))]:
+        if isinstance(arg, ast.Call) and isinstance(arg.func, ast.Attribute) and arg.func.attr in IMPUTE_STRATEGIES:
+            return arg.func.attr
+        if isinstance(arg, ast.Constant) and arg.value in IMPUTE_STRATEGIES:
+            return arg.value
+        if isinstance(arg, ast.Constant):
+            return 'constant'
+    return None
+
+class CellVisitor(ast.NodeVisitor):
+    """One walk over a cell collecting definitions, imports, calls and complexity"""
+
+    BRANCHES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.comprehension,
+                ast.Assert, ast.match_case)
+    BLOCKS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try, ast.FunctionDef,
+              ast.AsyncFunctionDef, ast.ClassDef)
+
+    def __init__(self):
+        self.functions = []
+        self.imports = {}
+        self.bindings = {}  # name -> call chain it was last assigned from (fig, ax = plt.subplots())
+        self.calls = []
+        self.data_quality = []
+        self.branches = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.scopes = []  # open function records, innermost last
+        self.classes = []
+
+    def _branch(self, count=1):
+        self.branches += count
+        if self.scopes:
+            self.scopes[-1]['complexity'] += count
+
+    def generic_visit(self, node):
+        if isinstance(node, self.BRANCHES):
+            self._branch()
+        elif isinstance(node, ast.BoolOp):
+            self._branch(len(node.values) - 1)
+        block = isinstance(node, self.BLOCKS)
+        if block:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+        super().generic_visit(node)
+        if block:
+            self.depth -= 1
+
+    def _function(self, node, kind, name):
+        record = {'name': name, 'kind': kind, 'line': node.lineno, 'complexity': 1,
+                  'args': len(node.args.posonlyargs) + len(node.args.args) + len(node.args.kwonlyargs)}
+        if self.classes and kind != 'lambda':
+            record['kind'] = 'method'
+            record['class'] = self.classes[-1]
+        self.functions.append(record)
+        self.scopes.append(record)
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    def visit_FunctionDef(self, node):
+        self._function(node, 'function', node.name)
+
+    def visit_AsyncFunctionDef(self, node):
+        self._function(node, 'async function', node.name)
+
+    def visit_Lambda(self, node):
+        self._function(node, 'lambda', getattr(node, 'assigned_to', '<lambda>'))
+
+    def visit_Assign(self, node):
+        # f = lambda x: ... is a named helper, as reusable as a def
+        if isinstance(node.value, ast.Lambda) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            node.value.assigned_to = node.targets[0].id
+        chain = call_chain(node.value.func) if isinstance(node.value, ast.Call) else None
+        if chain is not None:
+            for target in node.targets:
+                for name in (target.elts if isinstance(target, ast.Tuple) else [target]):
+                    if isinstance(name, ast.Name):
+                        self.bindings[name.id] = f'{chain}()'
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        self.classes.append(node.name)
+        self.generic_visit(node)
+        self.classes.pop()
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.imports[alias.asname] = alias.name
+            else:
+                root = alias.name.split('.')[0]
+                self.imports[root] = root
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name != '*':
+                self.imports[alias.asname or alias.name] = f'{node.module}.{alias.name}' if node.module else alias.name
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        chain = call_chain(node.func)
+        if chain is not None:
+            self.calls.append([chain, node.lineno])
+        method = node.func.attr if isinstance(node.func, ast.Attribute) else None
+        if method in DATA_QUALITY_METHODS:
+            check = {'op': method, 'kind': DATA_QUALITY_METHODS[method], 'line': node.lineno}
+            if method == 'fillna':
+                check['strategy'] = impute_strategy(node)
+            elif method in ('dropna', 'drop_duplicates', 'duplicated'):
+                subset = next((keyword for keyword in node.keywords if keyword.arg == 'subset'), None)
+                check['subset'] = subset is not None
+            self.data_quality.append(check)
+        self.generic_visit(node)
+
+def analyze_cell(source):
+    """JSON-ready audit of one code cell's source"""
+    python, magics = strip_magics(source)
+    result = {'parsed': False, 'magics': magics, 'functions': [], 'imports': {}, 'bindings': {}, 'calls': [],
+              'data_quality': [],
+              'complexity': {'statements': 0, 'max_depth': 0, 'cyclomatic': 1}}
+    if python is None:
+        result['error'] = f'non-Python cell ({magics[0]})'
+        return result
+    try:
+        tree = ast.parse(python)
+    except SyntaxError as exc:
+        result['error'] = f'SyntaxError line {exc.lineno}: {exc.msg}'
+        return result
+
+    visitor = CellVisitor()
+    visitor.visit(tree)
+    result.update({
+        'parsed': True,
+        'functions': visitor.functions,
+        'imports': visitor.imports,
+        'bindings': visitor.bindings,
+        'calls': visitor.calls,
+        'data_quality': visitor.data_quality,
+        'complexity': {'statements': sum(isinstance(node, ast.stmt) for node in ast.walk(tree)),
+                       'max_depth': visitor.max_depth, 'cyclomatic': 1 + visitor.branches},
+    })
+    return result
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def analyzer_version():
+    """Changes whenever the cell analysis code or its vocabularies change"""
+    code = code_digest([strip_magics, call_chain, impute_strategy, CellVisitor, analyze_cell])
+    return config_digest({'code': code, 'magics': sorted(PYTHON_CELL_MAGICS), 'pattern': MAGIC_LINE.pattern,
+                          'data_quality': DATA_QUALITY_METHODS, 'impute': sorted(IMPUTE_STRATEGIES)})
+
+class CellCache:
+    """Per-cell analysis results keyed by the sha256 of the cell source, persisted as one JSON file"""
+
+    def __init__(self, path=CACHE_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.version = analyzer_version()
+        self.entries = {}
+        self.hits = self.misses = 0
+        self.dirty = False
+        if enabled:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('version') == self.version:
+                    self.entries = stored['cells']
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def analyze(self, source):
+        key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        result = analyze_cell(source)
+        if self.enabled:
+            self.entries[key] = result
+            self.dirty = True
+        return result
+
+    def save(self):
+        if not (self.enabled and self.dirty):
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'cells': self.entries}, f, separators=(',', ':'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+# ============================================================================
+# NOTEBOOK
+# ============================================================================
+
+def module_of(chain, names):
+    """Fully qualified target of a call chain whose root is a known name, else None"""
+    root, _, rest = chain.partition('.')
+    base = root.split('(')[0].split('[')[0]
+    if base not in names:
+        return None
+    return names[base] + root[len(base):] + ('.' + rest if rest else '')
+
+def classify_call(chain, names):
+    """'plot', 'pandas' or None for one call site, given the names the notebook has bound so far"""
+    qualified = module_of(chain, names)
+    top = qualified.split('.')[0] if qualified else None
+    if top in PLOT_MODULES:
+        return 'plot'
+    parts = [part.split('(')[0].split('[')[0] for part in chain.split('.')[1:]]
+    if any(part in FRAME_PLOT_METHODS for part in parts):
+        return 'plot'
+    if top in PANDAS_MODULES or (top is None and parts and parts[-1] in PANDAS_METHODS):
+        return 'pandas'
+    return None
+
+def analyze_notebook(cells, cache=None, save=True):
+    """Audit of a notebook's cells (nbformat dicts), each code cell parsed at most once
+
+    Batch callers pass save=False and call cache.save() once at the end.
+    """
+    cache = cache or CellCache(enabled=False)
+    report = {'cells': {}, 'imports': {}, 'functions': [], 'plots': [], 'pandas': [], 'data_quality': [],
+              'magics': [], 'unparsed': [],
+              'complexity': {'statements': 0, 'max_depth': 0, 'cyclomatic': 0, 'max_function_complexity': 0}}
+    imports = report['imports']
+    names = {}  # imports plus variables bound to their call results (ax -> matplotlib.pyplot.subplots())
+    for index, cell in enumerate(cells):
+        if cell.get('cell_type') != 'code':
+            continue
+        source = cell_source(cell)
+        if not source.strip():
+            continue
+        result = cache.analyze(source)
+        report['cells'][index] = result
+        if not result['parsed']:
+            report['unparsed'].append((index, result['error']))
+        imports.update(result['imports'])
+        names.update(result['imports'])
+        for name, chain in result['bindings'].items():
+            qualified = module_of(chain, names)
+            if qualified is not None:
+                names[name] = qualified
+            else:
+                names.pop(name, None)
+        report['magics'].extend((index, magic) for magic in result['magics'])
+        report['functions'].extend((index, function) for function in result['functions'])
+        report['data_quality'].extend((index, check) for check in result['data_quality'])
+        for chain, line in result['calls']:
+            kind = classify_call(chain, names)
+            if kind == 'plot':
+                report['plots'].append((index, chain, line))
+            elif kind == 'pandas':
+                report['pandas'].append((index, chain, line))
+        totals = report['complexity']
+        totals['statements'] += result['complexity']['statements']
+        totals['max_depth'] = max(totals['max_depth'], result['complexity']['max_depth'])
+        totals['cyclomatic'] += result['complexity']['cyclomatic']
+        totals['max_function_complexity'] = max([totals['max_function_complexity'],
+                                                 *(f['complexity'] for f in result['functions'])])
+    if save:
+        cache.save()
+    return report
+
+def cells_with(report, key):
+    """Sorted indices of the cells contributing to a report list"""
+    return sorted({entry[0] for entry in report[key]})
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-pass AST audit of a notebook\'s code cells')
+    parser.add_argument('notebook')
+    parser.add_argument('--cache', default=CACHE_PATH, help='Per-cell result cache (JSON)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every cell')
+    args = parser.parse_args()
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    nb = read_notebook(args.notebook)
+    cache = CellCache(args.cache, enabled=not args.no_cache)
+    report = analyze_notebook(nb['cells'], cache)
+
+    print("=" * 80)
+    print("NOTEBOOK CODE ANALYSIS")
+    print("=" * 80)
+    print(f"\nCode cells parsed: {len(report['cells'])} ({cache.hits} from cache, {cache.misses} parsed)")
+    for index, error in report['unparsed']:
+        print(f"  [!] Cell {index}: {error}")
+
+    print(f"\nFunctions: {len(report['functions'])}")
+    for index, function in report['functions']:
+        owner = f"{function['class']}." if 'class' in function else ''
+        print(f"  Cell {index}: {function['kind']} {owner}{function['name']} "
+              f"({function['args']} args, complexity {function['complexity']})")
+
+    print(f"\nImports: {', '.join(f'{alias}={module}' for alias, module in sorted(report['imports'].items()))}")
+    print(f"\nPlot call sites: {len(report['plots'])} in {len(cells_with(report, 'plots'))} cells")
+    print(f"pandas call sites: {len(report['pandas'])} in {len(cells_with(report, 'pandas'))} cells")
+
+    print(f"\nData-quality operations: {len(report['data_quality'])}")
+    for index, check in report['data_quality']:
+        detail = f" ({check['strategy']})" if check.get('strategy') else ''
+        print(f"  Cell {index}: {check['op']}{detail} - {check['kind']}")
+
+    totals = report['complexity']
+    print(f"\nComplexity: {totals['statements']} statements, cyclomatic {totals['cyclomatic']}, "
+          f"max nesting {totals['max_depth']}, most complex function {totals['max_function_complexity']}")
+
+if __name__ == '__main__':
+    main()
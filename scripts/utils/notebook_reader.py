@@ -0,0 +1,128 @@
+"""
+Notebook Reader - Streaming .ipynb Reader That Skips Heavy Outputs
+Yields each cell's type, source and output metadata without keeping image payloads
+
+Usage:
+    from notebook_reader import read_notebook, iter_cells
+    nb = read_notebook(path)              # {'cells': [...]}, indexable like json.load's nb['cells']
+    for cell in iter_cells(path): ...     # one cell at a time
+
+    python notebook_reader.py notebook.ipynb    # outline and timing
+
+Each cell is {'cell_type', 'source', 'outputs'} where outputs lists
+{'output_type', 'mime_types', 'images'} (plus 'name' for streams and 'ename' for
+errors). The file is parsed as a stream of JSON events (ijson): every output
+string, base64 charts included, is still decoded, but payloads are discarded
+as they go by rather than kept, so memory stays flat however many charts a
+submission carries. Without ijson the reader falls back to json.load and
+strips the outputs afterwards.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CELL = 'cells.item'
+OUTPUT = 'cells.item.outputs.item'
+# Scalar output fields kept as metadata
+OUTPUT_FIELDS = ('output_type', 'name', 'ename')
+
+# ============================================================================
+# READER
+# ============================================================================
+
+def output_summary(output):
+    """Metadata of one nbformat output dict"""
+    mime_types = sorted(output.get('data', {}))
+    summary = {field: output[field] for field in OUTPUT_FIELDS if field in output}
+    summary['mime_types'] = mime_types
+    summary['images'] = sum(mime.startswith('image/') for mime in mime_types)
+    return summary
+
+def _iter_cells_loaded(f):
+    for cell in json.load(f).get('cells', []):
+        yield {'cell_type': cell.get('cell_type'), 'source': cell.get('source', ''),
+               'outputs': [output_summary(output) for output in cell.get('outputs', [])]}
+
+def _iter_cells_streamed(f):
+    cell = output = None
+    for prefix, event, value in ijson.parse(f):
+        if prefix == CELL:
+            if event == 'start_map':
+                cell = {'cell_type': None, 'source': '', 'outputs': []}
+            elif event == 'end_map':
+                yield cell
+                cell = None
+        elif cell is None:
+            continue
+        elif prefix == 'cells.item.cell_type':
+            cell['cell_type'] = value
+        elif prefix == 'cells.item.source':
+            # A single string, or the start of a list of lines
+            if event == 'string':
+                cell['source'] = value
+            elif event == 'start_array':
+                cell['source'] = []
+        elif prefix == 'cells.item.source.item':
+            cell['source'].append(value)
+        elif prefix == OUTPUT:
+            if event == 'start_map':
+                output = {'mime_types': [], 'images': 0}
+            elif event == 'end_map':
+                output['mime_types'].sort()
+                cell['outputs'].append(output)
+                output = None
+        elif output is not None and prefix == 'cells.item.outputs.item.data' and event == 'map_key':
+            output['mime_types'].append(value)
+            output['images'] += value.startswith('image/')
+        elif output is not None and prefix.startswith('cells.item.outputs.item.') and \
+                prefix[len(OUTPUT) + 1:] in OUTPUT_FIELDS and event == 'string':
+            output[prefix[len(OUTPUT) + 1:]] = value
+
+def iter_cells(path):
+    """Cells of a notebook in order, each {'cell_type', 'source', 'outputs': [metadata]}"""
+    with open(path, 'rb') as f:
+        yield from (_iter_cells_streamed(f) if ijson is not None else _iter_cells_loaded(f))
+
+def read_notebook(path):
+    """Lightweight notebook dict: every cell's type, source and output metadata"""
+    return {'cells': list(iter_cells(path))}
+
+def image_count(cell):
+    return sum(output['images'] for output in cell.get('outputs', []))
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream a notebook\'s cells without loading output payloads')
+    parser.add_argument('notebook')
+    args = parser.parse_args()
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    start = time.perf_counter()
+    nb = read_notebook(args.notebook)
+    elapsed = time.perf_counter() - start
+
+    cells = nb['cells']
+    print("=" * 80)
+    print("NOTEBOOK OUTLINE")
+    print("=" * 80)
+    print(f"\nRead {len(cells)} cells in {elapsed:.2f}s ({'streamed' if ijson is not None else 'json.load'})")
+    for kind in ('markdown', 'code', 'raw'):
+        print(f"  {kind}: {sum(cell['cell_type'] == kind for cell in cells)}")
+    print(f"  outputs: {sum(len(cell['outputs']) for cell in cells)}, images: {sum(image_count(cell) for cell in cells)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Notebook Similarity - MinHash/LSH Index of Shared Code Across Submissions
+Finds notebooks that share chunks of code without comparing every pair
+
+Usage:
+    from notebook_similarity import SimilarityIndex
+    index = SimilarityIndex(template_sources=starter_cells)
+    index.add_many({name: [(cell index, source), ...], ...}, workers=4)
+    pairs = index.similar_pairs()
+
+Each code cell is tokenized with IPython magics blanked, comments dropped,
+string literals collapsed and local identifiers canonicalized to one token, so
+renaming variables does not hide a copied cell; keywords, builtins, attribute
+and method names (.groupby, .merge) and numbers are kept. Token 5-grams are
+hashed and summarized by a 128-value MinHash signature computed in one NumPy
+broadcast per cell (signatures are computed in a process pool). Shingles of a
+starter template are removed first, so code every candidate was handed does
+not count as shared. Cells in a bucket that spans a large share of the cohort
+are treated as boilerplate (imports, read_csv, df.head()) whether or not there
+is a template: they never pair and are left out of the overlap.
+
+Cell signatures are banded for locality-sensitive hashing (16 bands of 8 rows):
+cells whose code is similar land in a common bucket with high probability, so
+candidate pairs come from bucket collisions in near-linear time rather than from
+all n^2/2 notebook pairs. Candidates are verified on their signatures; a
+notebook pair is reported with its matching cells and the estimated Jaccard
+overlap of the two notebooks' non-boilerplate code (the MinHash of a union is
+the element-wise minimum of its parts' MinHashes).
+"""
+
+import builtins
+import keyword
+import re
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from notebook_analysis import strip_magics
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16                 # 16 bands x 8 rows: cells 70% similar collide with p = 0.61, 80% with p = 0.95
+MIN_SHINGLES = 8           # cells shorter than this (a lone import, df.head()) are not indexed
+CELL_THRESHOLD = 0.7       # estimated Jaccard at which two cells count as matching
+# A bucket spanning more than this share of the cohort (and at least COMMON_FLOOR notebooks) holds
+# boilerplate every submission has (imports, read_csv); it is skipped rather than paired quadratically
+COMMON_SHARE = 0.1
+COMMON_FLOOR = 5
+MERSENNE = (1 << 31) - 1   # hash prime; keeps a * x + b inside uint64
+SEED = 20240611
+
+KEPT_NAMES = set(keyword.kwlist) | set(dir(builtins)) | {'self', 'cls'}
+# One regex lexer pass (several times faster than the tokenize module); whitespace falls between matches
+TOKEN = re.compile('|'.join([
+    r'(?P<comment>#[^\n]*)',
+    r'(?P<string>[rRbBuUfF]{0,2}(?:"""[\s\S]*?(?:"""|$)' r"|'''[\s\S]*?(?:'''|$)" r'|"(?:\\.|[^"\\\n])*"?'
+    r"|'(?:\\.|[^'\\\n])*'?))",
+    r'(?P<number>(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?[jJ]?)',
+    r'(?P<name>[^\W\d]\w*)',
+    r'(?P<op>\*\*=?|//=?|>>=?|<<=?|->|:=|[-+*/%@&|^<>!=]=|[-+*/%@&|^~<>=.,:;()\[\]{}])',
+]))
+
+# ============================================================================
+# SIGNATURES
+# ============================================================================
+
+def normalized_tokens(source):
+    """Token stream of a code cell with local identifiers and string literals canonicalized"""
+    python, _ = strip_magics(source)
+    if python is None:
+        return []
+    tokens, previous = [], None
+    for match in TOKEN.finditer(python):
+        kind, text = match.lastgroup, match[0]
+        if kind == 'comment':
+            continue
+        if kind == 'string':
+            tokens.append('STR')
+        elif kind == 'name' and text not in KEPT_NAMES and previous != '.':
+            tokens.append('ID')
+        else:
+            tokens.append(text)
+        previous = text
+    return tokens
+
+def shingle_hashes(source):
+    """Sorted unique 31-bit hashes of a cell's token 5-grams"""
+    tokens = normalized_tokens(source)
+    grams = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 0))}
+    return np.unique(np.fromiter((zlib.crc32(gram.encode('utf-8')) % MERSENNE for gram in grams),
+                                 dtype=np.uint64, count=len(grams)))
+
+def permutations(num_perm=NUM_PERM, seed=SEED):
+    """(a, b) of the universal hash family h(x) = (a x + b) mod p"""
+    rng = np.random.default_rng(seed)
+    return (rng.integers(1, MERSENNE, num_perm, dtype=np.uint64),
+            rng.integers(0, MERSENNE, num_perm, dtype=np.uint64))
+
+def minhash(hashes, a, b):
+    """MinHash signature of a set of shingle hashes (all MERSENNE for an empty set)"""
+    if len(hashes) == 0:
+        return np.full(len(a), MERSENNE, dtype=np.uint64)
+    return ((a[:, None] * hashes[None, :] + b[:, None]) % MERSENNE).min(axis=1)
+
+def cell_signatures(cells, template_hashes=None):
+    """[(cell index, shingle count, signature)] for the indexable code cells of one notebook"""
+    a, b = permutations()
+    signatures = []
+    for index, source in cells:
+        hashes = shingle_hashes(source)
+        if template_hashes is not None and len(template_hashes):
+            hashes = np.setdiff1d(hashes, template_hashes, assume_unique=True)
+        if len(hashes) >= MIN_SHINGLES:
+            signatures.append((index, len(hashes), minhash(hashes, a, b)))
+    return signatures
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class SimilarityIndex:
+    """Cell-level MinHash signatures of many notebooks, banded into LSH buckets"""
+
+    def __init__(self, template_sources=(), bands=BANDS, cell_threshold=CELL_THRESHOLD):
+        if NUM_PERM % bands:
+            raise ValueError(f'{bands} bands do not divide a {NUM_PERM}-value signature')
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.cell_threshold = cell_threshold
+        template = [shingle_hashes(source) for source in template_sources]
+        self.template_hashes = np.unique(np.concatenate(template)) if template else None
+        self.names = []
+        self.cells = {}       # notebook -> [cell index]
+        self.signatures = {}  # notebook -> (n_cells, NUM_PERM) array
+        self.buckets = defaultdict(set)
+
+    def add(self, name, signatures):
+        """Index one notebook's [(cell index, shingle count, signature)]"""
+        self.names.append(name)
+        self.cells[name] = [index for index, _, _ in signatures]
+        matrix = np.array([signature for _, _, signature in signatures], dtype=np.uint64).reshape(-1, NUM_PERM)
+        self.signatures[name] = matrix
+        for row, signature in enumerate(matrix):
+            for band, chunk in enumerate(signature.reshape(self.bands, self.rows)):
+                self.buckets[band, chunk.tobytes()].add((name, row))
+
+    def add_many(self, notebooks, workers=None):
+        """Signature and index {name: [(cell index, source)]} in a process pool"""
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(name, pool.submit(cell_signatures, cells, self.template_hashes))
+                       for name, cells in notebooks.items()]
+            for name, future in futures:
+                self.add(name, future.result())
+
+    def _is_common(self, members):
+        return len({name for name, _ in members}) > max(COMMON_FLOOR, COMMON_SHARE * len(self.names))
+
+    def boilerplate(self):
+        """{notebook: bool per indexed cell} marking cells that share a bucket with a large share of the cohort"""
+        flags = {name: np.zeros(len(self.cells[name]), dtype=bool) for name in self.names}
+        for members in self.buckets.values():
+            if self._is_common(members):
+                for name, row in members:
+                    flags[name][row] = True
+        return flags
+
+    def candidate_pairs(self, boilerplate=None):
+        """{(notebook a, notebook b): {(row a, row b)}} of non-boilerplate cells sharing an LSH bucket"""
+        boilerplate = self.boilerplate() if boilerplate is None else boilerplate
+        candidates = defaultdict(set)
+        for members in self.buckets.values():
+            if len(members) < 2 or self._is_common(members):
+                continue
+            for (name_a, row_a), (name_b, row_b) in combinations(sorted(members), 2):
+                if name_a != name_b and not boilerplate[name_a][row_a] and not boilerplate[name_b][row_b]:
+                    candidates[name_a, name_b].add((row_a, row_b))
+        return candidates
+
+    def similar_pairs(self, min_cells=1, min_overlap=0.0):
+        """Notebook pairs with matching cells, most similar first"""
+        pairs = []
+        boilerplate = self.boilerplate()
+        for (name_a, name_b), rows in self.candidate_pairs(boilerplate).items():
+            left, right = self.signatures[name_a], self.signatures[name_b]
+            row_a, row_b = map(np.array, zip(*sorted(rows)))
+            scores = (left[row_a] == right[row_b]).mean(axis=1)
+            matches, used_a, used_b = [], set(), set()
+            for k in np.argsort(-scores, kind='stable'):
+                if scores[k] < self.cell_threshold:
+                    break
+                if row_a[k] in used_a or row_b[k] in used_b:
+                    continue  # each cell matches at most one cell of the other notebook
+                used_a.add(row_a[k])
+                used_b.add(row_b[k])
+                matches.append({'cell_a': self.cells[name_a][row_a[k]], 'cell_b': self.cells[name_b][row_b[k]],
+                                'similarity': round(float(scores[k]), 3)})
+            # Shared boilerplate would otherwise dominate the union of two short notebooks
+            own_a, own_b = left[~boilerplate[name_a]], right[~boilerplate[name_b]]
+            overlap = float((own_a.min(axis=0) == own_b.min(axis=0)).mean())
+            if len(matches) >= min_cells and overlap >= min_overlap:
+                pairs.append({
+                    'notebook_a': name_a, 'notebook_b': name_b,
+                    'overlap': round(overlap, 3),
+                    'matched_cells': len(matches),
+                    'share_a': round(len(matches) / len(left), 3),
+                    'share_b': round(len(matches) / len(right), 3),
+                    'matches': sorted(matches, key=lambda match: match['cell_a']),
+                })
+        return sorted(pairs, key=lambda pair: (-pair['overlap'], -pair['matched_cells'], pair['notebook_a']))
@@ -0,0 +1,288 @@
+"""
+Payload Invariants - Declarative Integrity Gate for Generated Dashboard Data
+Checks a dashboard payload's tables against vectorized invariants before it is written
+
+Usage:
+    python payload_invariants.py staff-dev outputs/staff-dev-2025/dashboard_data.json
+    python payload_invariants.py onboarding onboarding_data.json
+    python payload_invariants.py ndr-checkin static/ndr-checkin-dashboard/data/ndr_data.json
+
+In a pipeline, call assert_payload(payload, 'staff-dev') just before the JSON
+write; a violation raises PayloadInvariantError and nothing is published.
+
+A rule set names the payload's tables (dotted paths: a list of records becomes a
+frame, a mapping becomes a one-row frame), the scalars its rules may reference
+as @name, and optional derived tables (joins/rollups across tables). Each
+invariant is a pandas expression over one table: a row-wise expression must hold
+for every row (rows excluded by `where` are skipped), an aggregate one such as
+`count.sum() == @total_responses` must hold once. The NDR rules mirror the
+generic checks in static/ndr-checkin-dashboard/scripts/verify-data.mjs, which
+still owns the page-level and copy checks.
+"""
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Published percentages carry one decimal, each independently rounded
+PCT_TOLERANCE = 0.2
+MAX_REPORTED_ROWS = 5
+# Columns that name a row in failure messages
+LABEL_COLUMNS = ('department', 'metric', 'name', 'question', 'quarter', 'variable', 'theme', 'q', 'label')
+
+Invariant = namedtuple('Invariant', ['table', 'expr', 'where'], defaults=[None])
+
+class PayloadInvariantError(ValueError):
+    """A generated payload violates one or more invariants"""
+
+    def __init__(self, ruleset, failures):
+        self.failures = failures
+        super().__init__(f'{ruleset} payload failed {len(failures)} invariant(s):\n  ' + '\n  '.join(failures))
+
+def pct_range(table, *columns):
+    return [Invariant(table, f'{column}.between(0, 100)', f'{column}.notna()') for column in columns]
+
+def pct_total(table, *columns, where=None):
+    return Invariant(table, f"abs({' + '.join(columns)} - 100) <= {PCT_TOLERANCE}", where)
+
+# ============================================================================
+# RULE SETS
+# ============================================================================
+
+def staff_dev_rollups(tables):
+    """Department sizes, the department KPI cube rolled up per metric, and department cells joined to sizes"""
+    # Weighted theme tables carry weighted_mentions (weights average 1); unweighted mentions are their own
+    themes = tables['themes_overall']
+    if 'weighted_mentions' not in themes.columns:
+        themes = themes.assign(weighted_mentions=themes['mentions'])
+    departments = tables['departments'].T.reset_index()
+    departments.columns = ['department', 'department_size']
+    rollup = (tables['kpi_by_department'].groupby('metric', as_index=False)['n_responses'].sum()
+              .rename(columns={'n_responses': 'n_departments'})
+              .merge(tables['all_metrics'][['metric', 'n_responses']], on='metric', how='outer'))
+    return {
+        'theme_shares': themes,
+        'department_sizes': departments,
+        'kpi_rollup': rollup,
+        'department_kpis': tables['kpi_by_department'].merge(departments, on='department', how='left'),
+        'department_themes': tables['themes_by_department'].merge(departments, on='department', how='left'),
+        'department_cards': tables['department_comparison'].merge(departments, on='department', how='left'),
+    }
+
+NPS_CUBE = [
+    'mean_0_10.between(0, 10)',
+    'n_responses.between(1, @total_responses)',
+    'nps_score.between(-100, 100)',
+]
+
+STAFF_DEV = {
+    'tables': {
+        'departments': 'metadata.departments',
+        'nps': 'overall_metrics.nps',
+        'sessions': 'session_performance',
+        'department_comparison': 'department_comparison',
+        'themes_overall': 'themes.overall',
+        'themes_by_department': 'themes.by_department',
+        'kpi_by_department': 'kpi_by_department',
+        'all_metrics': 'all_metrics',
+        'sentiment': 'sentiment_distribution',
+    },
+    'scalars': {'total_responses': 'metadata.total_responses'},
+    'derive': staff_dev_rollups,
+    'invariants': [
+        # KPI cube: overall and by department
+        *[Invariant(table, expr, expr.split('.')[0] + '.notna()')
+          for table in ('all_metrics', 'kpi_by_department') for expr in NPS_CUBE],
+        *[rule for table in ('all_metrics', 'kpi_by_department')
+          for rule in pct_range(table, 'top2_box_pct', 'promoter_pct', 'passive_pct', 'detractor_pct')],
+        *[pct_total(table, 'promoter_pct', 'passive_pct', 'detractor_pct', where='promoter_pct.notna()')
+          for table in ('all_metrics', 'kpi_by_department')],
+        *[Invariant(table, f'abs(promoter_pct - detractor_pct - nps_score) <= {PCT_TOLERANCE}', 'nps_score.notna()')
+          for table in ('all_metrics', 'kpi_by_department')],
+        Invariant('all_metrics', 'metric.is_unique'),
+        Invariant('kpi_rollup', 'n_departments == n_responses'),
+        Invariant('department_kpis', 'n_responses <= department_size'),
+        # Cards drawn from the cube
+        *[pct_total(table, 'promoters', 'passives', 'detractors') for table in ('nps', 'sessions', 'department_comparison')],
+        *[Invariant(table, f'abs(promoters - detractors - {nps}) <= {PCT_TOLERANCE}')
+          for table, nps in (('nps', 'nps_value'), ('sessions', 'nps'), ('department_comparison', 'nps'))],
+        Invariant('department_cards', 'respondents <= department_size'),
+        # Themes
+        *[rule for table in ('themes_overall', 'themes_by_department')
+          for rule in pct_range(table, 'prevalence_pct', 'pos_pct', 'neu_pct', 'neg_pct')],
+        *[pct_total(table, 'pos_pct', 'neu_pct', 'neg_pct', where='mentions > 0')
+          for table in ('themes_overall', 'themes_by_department')],
+        Invariant('theme_shares', f'abs(weighted_mentions / @total_responses * 100 - prevalence_pct) <= {PCT_TOLERANCE}'),
+        Invariant('department_themes', 'mentions <= department_size'),
+        # Respondent counts
+        Invariant('department_sizes', 'department_size.sum() == @total_responses'),
+        Invariant('sentiment', 'positive + neutral + negative == @total_responses'),
+    ],
+}
+
+def onboarding_trend_scores(tables):
+    """Quarterly trend scores in long form"""
+    return {'trend_scores': tables['trends'].melt(id_vars='quarter').dropna()}
+
+ONBOARDING = {
+    'tables': {
+        'date_range': 'summary.dateRange',
+        'quality': 'summary.responseQuality',
+        'satisfaction': 'satisfactionScores',
+        'trends': 'timeTrends',
+        'years': 'responsesByYear',
+        'liked': 'likedThemes',
+        'improvement': 'improvementThemes',
+    },
+    'scalars': {'total_responses': 'summary.totalResponses', 'overall_satisfaction': 'summary.overallSatisfaction'},
+    'derive': onboarding_trend_scores,
+    'invariants': [
+        Invariant('satisfaction', 'score.between(1, 5)'),
+        *pct_range('satisfaction', 'positiveRate'),
+        Invariant('satisfaction', 'responses.between(1, @total_responses)'),
+        Invariant('satisfaction', 'question.is_unique'),
+        Invariant('satisfaction', 'positiveRate.max() == @overall_satisfaction'),
+        Invariant('quality', 'respondents - excluded == @total_responses'),
+        Invariant('date_range', 'start <= end'),
+        Invariant('trends', 'quarter.is_monotonic_increasing and quarter.is_unique'),
+        Invariant('trend_scores', 'value.between(1, 5)'),
+        Invariant('years', 'count.sum() == @total_responses'),
+        Invariant('years', 'year.is_unique'),
+        *[rule for table in ('liked', 'improvement') for rule in pct_range(table, 'percentage')],
+        *[Invariant(table, 'count.between(1, @total_responses)') for table in ('liked', 'improvement')],
+    ],
+}
+
+NDR_CHECKIN = {
+    'tables': {
+        'kpis_30': 'thirtyDay.kpis',
+        'kpis_6m': 'sixMonth.kpis',
+        'sentiment_30': 'thirtyDay.sentiment',
+        'sentiment_6m': 'sixMonth.sentiment',
+        'roadblocks_30': 'thirtyDay.roadblockBreakdown',
+        'roadblocks_6m': 'sixMonth.roadblockBreakdown',
+        'questions_90': 'ninetyDay.questionScores',
+        'distribution_90': 'ninetyDay.responseDistribution.rows',
+        'mapped': 'overview.mappedMetrics',
+    },
+    'invariants': [
+        *[rule for stage in ('30', '6m') for rule in (
+            Invariant(f'kpis_{stage}', 'label.count() == 7'),
+            Invariant(f'sentiment_{stage}', 'q.count() == 10'),
+            Invariant(f'sentiment_{stage}', 'positive + mixed == 100'),
+            Invariant(f'sentiment_{stage}', 'flag == ((positive < 60) | (mixed > 40))'),
+            *pct_range(f'kpis_{stage}', 'pct'),
+            Invariant(f'roadblocks_{stage}', 'pct.sum() == 100'),
+        )],
+        Invariant('questions_90', 'q.count() == 11'),
+        Invariant('questions_90', 'score.between(1, 5)'),
+        *pct_range('questions_90', 'positivePct'),
+        # Categories are rounded independently from integer counts: +/-2 points
+        Invariant('distribution_90', 'abs(sa + a + d + sd - 100) <= 2'),
+        Invariant('mapped', 'metric.count() == 7'),
+    ],
+}
+
+RULESETS = {
+    'staff-dev': STAFF_DEV,
+    'onboarding': ONBOARDING,
+    'ndr-checkin': NDR_CHECKIN,
+}
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def resolve(payload, path):
+    value = payload
+    for key in path.split('.'):
+        value = value[key]
+    return value
+
+def frame(value):
+    """A list of records as a frame, a mapping as a one-row frame"""
+    return pd.DataFrame(value) if isinstance(value, list) else pd.DataFrame([value])
+
+def payload_tables(payload, ruleset):
+    """(tables, scalars) a rule set's invariants are evaluated against"""
+    rules = RULESETS[ruleset]
+    tables = {name: frame(resolve(payload, path)) for name, path in rules['tables'].items()}
+    scalars = {name: resolve(payload, path) for name, path in rules.get('scalars', {}).items()}
+    if 'derive' in rules:
+        tables.update(rules['derive'](tables))
+    return tables, scalars
+
+def evaluate(rule, table, scalars):
+    """Labels of the rows violating a rule ([] when it holds); [None] for a failed aggregate rule"""
+    if rule.where is not None:
+        table = table[table.eval(rule.where, engine='python', local_dict=scalars).astype(bool)]
+    if table.empty:
+        return []
+    result = table.eval(rule.expr, engine='python', local_dict=scalars)
+    if isinstance(result, pd.Series):
+        return list(result.index[~result.fillna(False).astype(bool)])
+    return [] if bool(result) else [None]
+
+def describe(rule, table, rows):
+    labels = [column for column in LABEL_COLUMNS if column in table.columns]
+    where = f' (where {rule.where})' if rule.where else ''
+    if rows == [None]:
+        return f'{rule.table}: {rule.expr}{where}'
+    shown = [' / '.join(str(table.at[row, column]) for column in labels) if labels else f'row {row}'
+             for row in rows[:MAX_REPORTED_ROWS]]
+    more = f' +{len(rows) - MAX_REPORTED_ROWS} more' if len(rows) > MAX_REPORTED_ROWS else ''
+    return f"{rule.table}: {rule.expr}{where} -> {', '.join(shown)}{more}"
+
+def check_payload(payload, ruleset):
+    """Descriptions of every violated invariant ([] when the payload is sound)"""
+    try:
+        tables, scalars = payload_tables(payload, ruleset)
+    except (KeyError, TypeError) as exc:
+        return [f'missing table or field: {exc}']
+    failures = []
+    for rule in RULESETS[ruleset]['invariants']:
+        table = tables[rule.table]
+        try:
+            rows = evaluate(rule, table, scalars)
+        except Exception as exc:  # an unknown column is a broken payload, not a crash
+            failures.append(f'{rule.table}: {rule.expr} -> {type(exc).__name__}: {exc}')
+            continue
+        if rows:
+            failures.append(describe(rule, table, rows))
+    return failures
+
+def assert_payload(payload, ruleset):
+    """Raise PayloadInvariantError unless every invariant holds; returns the number checked"""
+    failures = check_payload(payload, ruleset)
+    if failures:
+        raise PayloadInvariantError(ruleset, failures)
+    return len(RULESETS[ruleset]['invariants'])
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a generated dashboard payload against its invariants')
+    parser.add_argument('ruleset', choices=sorted(RULESETS))
+    parser.add_argument('payload', help='Payload JSON file')
+    args = parser.parse_args()
+
+    with open(args.payload, encoding='utf-8') as f:
+        payload = json.load(f)
+    failures = check_payload(payload, args.ruleset)
+    for failure in failures:
+        print(f"[!] {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"[OK] {args.payload}: {len(RULESETS[args.ruleset]['invariants'])} invariants hold")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+PII Redaction - One-Pass Scrubbing of Names, E-mails, Phones and IDs
+Redacts open-ended comments before quotes and topics reach any export
+
+Usage:
+    from pii_redaction import Redactor, is_pii_column
+    redactor = Redactor(names=['nancy', 'claudia'], roster=os.environ.get('PII_ROSTER'))
+    df['comment'] = redactor.redact_series(df['comment'])
+    print(redactor.report())
+
+    python pii_redaction.py comments.csv --column feedback [--roster roster.txt] [--output redacted.csv]
+    python -m doctest pii_redaction.py      # examples in Redactor, including word-like roster names
+
+Every pattern (e-mail addresses, phone numbers, long numeric and Qualtrics
+response IDs, and people's names) is one alternation in a single compiled
+regex, so each comment is scanned once whatever the number of rules. Names come
+from the script's own list plus an optional roster file (one person per line,
+or a CSV whose first column holds names; every part of a full name is
+redacted). The script's names match in any case; roster names match only as
+capitalised words, since many are also ordinary words (May, Mark, Will,
+Grant, Hope). They are compiled into a prefix trie, so a roster of thousands of
+names costs about as much as a handful. Matches become [EMAIL], [PHONE], [ID]
+or [NAME] and are counted per kind.
+
+With pyarrow installed, a column is prefiltered in C first: RE2 scans for '@',
+digit runs, 'R_' and any name as a substring of the lower-cased text (names in
+groups small enough for RE2's DFA). Only comments that can hold a match go
+through the Python regex, so most comments cost almost nothing and redaction
+can stay on for every run.
+
+Export columns that identify the respondent (recipient e-mail and name, IP
+address, latitude/longitude, form e-mail) are listed in PII_COLUMNS; readers
+drop them before parsing.
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from qualtrics_reader import PII_COLUMNS as QUALTRICS_PII_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Qualtrics export names and ImportIds, plus the Google Forms e-mail column
+PII_COLUMNS = QUALTRICS_PII_COLUMNS | {'Email Address', 'Email'}
+
+PLACEHOLDERS = {'email': '[EMAIL]', 'phone': '[PHONE]', 'id': '[ID]', 'name': '[NAME]'}
+
+# Alternatives are tried in this order at each position
+PATTERNS = {
+    'email': r'\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+',
+    'phone': r'(?:\+?\b1[\s.-]?)?(?:\(\d{3}\)\s?|\b\d{3}[\s.-])\d{3}[\s.-]?\d{4}\b',
+    'id': r'\bR_[A-Za-z0-9]{10,}\b|\b\d{3}-\d{2}-\d{4}\b|\b\d{7,}\b',
+}
+# Every e-mail, phone number and ID contains one of these (RE2 prefilter)
+PREFILTER = r'@|\d{3}|R_'
+
+MIN_NAME_LENGTH = 3
+PREFILTER_NAMES = 400      # names per RE2 prefilter scan (larger alternations fall off the DFA)
+
+# ============================================================================
+# PATTERN
+# ============================================================================
+
+def is_pii_column(name):
+    return str(name).strip() in PII_COLUMNS
+
+def load_roster(path):
+    """Names from a roster file (one name per line, or names in a CSV's first column)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = [row[0] for row in csv.reader(f) if row and row[0].strip()]
+    if rows and rows[0].strip().lower() in ('name', 'names', 'full name'):
+        rows = rows[1:]
+    return [row.strip() for row in rows]
+
+def capitalized(part):
+    """A roster spelling as it appears in running text: MAY and may become May; McDonald stays as written"""
+    return part.title() if part in (part.lower(), part.upper()) else part
+
+def _trie_pattern(words):
+    """Regex matching any of the words, factored into a prefix trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = node.pop('', False)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+class Redactor:
+    """
+    Compiled multi-pattern redactor with running counts per kind.
+
+    The script's names match in any case, roster names (a file or a list of
+    full names) only capitalised, so word-like names leave the words alone:
+
+    >>> redactor = Redactor(['nancy'], roster=['May Jensen', 'Mark Olsen', 'Will Grant'])
+    >>> redactor.redact("We may need to mark this; Will said the grant will help nancy")
+    'We may need to mark this; [NAME] said the grant will help [NAME]'
+    >>> redactor.redact("May Jensen and Mr. Grant, call 574-555-0100")
+    '[NAME] [NAME] and Mr. [NAME], call [PHONE]'
+    """
+
+    def __init__(self, names=(), roster=None):
+        if isinstance(roster, str):
+            roster = load_roster(roster)
+        roster = [capitalized(part) for name in roster or () for part in re.split(r"[\s,]+", name.strip()) if part]
+        self.names = sorted({name.lower() for name in names if len(name) >= MIN_NAME_LENGTH})
+        self.roster_names = sorted({name for name in roster if len(name) >= MIN_NAME_LENGTH})
+        parts = [f'(?P<{kind}>{pattern})' for kind, pattern in PATTERNS.items()]
+        alternatives = ([f'(?i:{_trie_pattern(self.names)})'] if self.names else []) + \
+                       ([_trie_pattern(self.roster_names)] if self.roster_names else [])
+        if alternatives:
+            parts.append(rf"(?P<name>\b(?:{'|'.join(alternatives)})\b)")
+        self.pattern = re.compile('|'.join(parts))
+        lowered = sorted({name.lower() for name in self.names + self.roster_names})
+        self.name_filters = ['|'.join(map(re.escape, lowered[i:i + PREFILTER_NAMES]))
+                             for i in range(0, len(lowered), PREFILTER_NAMES)]
+        self.counts = Counter()
+
+    def _replace(self, match):
+        self.counts[match.lastgroup] += 1
+        return PLACEHOLDERS[match.lastgroup]
+
+    def redact(self, text):
+        """One comment, redacted (non-strings pass through)"""
+        return self.pattern.sub(self._replace, text) if isinstance(text, str) else text
+
+    def candidates(self, values):
+        """Positions of the comments that can hold a match (all of them without pyarrow)"""
+        if pa is None:
+            return np.arange(len(values))
+        arr = pa.array(pd.Series(values, dtype='string'), type=pa.string(), from_pandas=True)
+        hit = pc.match_substring_regex(arr, PREFILTER)
+        lowered = pc.utf8_lower(arr)
+        for names in self.name_filters:
+            hit = pc.or_(hit, pc.match_substring_regex(lowered, names))
+        return np.flatnonzero(hit.fill_null(False).to_numpy(zero_copy_only=False))
+
+    def redact_series(self, values):
+        """A column of comments, redacted; blanks stay blank"""
+        values = pd.Series(values)
+        out = values.copy()
+        rows = self.candidates(values)
+        out.iloc[rows] = values.iloc[rows].map(self.redact, na_action='ignore')
+        return out
+
+    def redact_frame(self, df, columns):
+        """Copy of df with the given columns redacted and {column: redactions}"""
+        out = df.copy()
+        per_column = {}
+        for col in columns:
+            before = sum(self.counts.values())
+            out[col] = self.redact_series(df[col])
+            per_column[col] = sum(self.counts.values()) - before
+        return out, per_column
+
+    def report(self):
+        total = sum(self.counts.values())
+        detail = ', '.join(f'{kind} {self.counts[kind]}' for kind in PLACEHOLDERS if self.counts[kind])
+        return f"Redacted {total} PII match(es)" + (f" ({detail})" if detail else '')
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Redact names, e-mails, phone numbers and IDs from open-ended columns')
+    parser.add_argument('input', help='CSV with one response per row')
+    parser.add_argument('--column', action='append', required=True, help='Open-ended column (repeat for several)')
+    parser.add_argument('--roster', default=os.environ.get('PII_ROSTER'), help='Names to redact (env PII_ROSTER)')
+    parser.add_argument('--output', default='redacted.csv')
+    args = parser.parse_args()
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    df = pd.read_csv(args.input, usecols=lambda c: not is_pii_column(c))
+    redactor = Redactor(roster=args.roster)
+
+    start = time.perf_counter()
+    df, per_column = redactor.redact_frame(df, args.column)
+    elapsed = time.perf_counter() - start
+
+    print(f"{redactor.report()} in {len(df)} rows, {elapsed:.2f}s ({len(redactor.roster_names)} roster names)")
+    for col, count in per_column.items():
+        print(f"  {col}: {count}")
+    df.to_csv(args.output, index=False)
+    print(f"[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Qualtrics Reader - Typed Projection over Qualtrics CSV Exports
+Builds the schema from the three header rows and reads only the requested columns
+"""
+
+import csv
+import json
+import warnings
+
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HEADER_ROWS = 3
+
+# Qualtrics writes every timestamp in one fixed layout
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    DEFAULT_ENGINE = 'pyarrow'
+except ImportError:
+    pa = None
+    DEFAULT_ENGINE = 'c'
+
+# Respondent-identifying export columns (export names and ImportIds); never read unless asked for explicitly
+PII_COLUMNS = frozenset({
+    'RecipientEmail', 'RecipientFirstName', 'RecipientLastName', 'ExternalReference',
+    'IPAddress', 'LocationLatitude', 'LocationLongitude',
+    'recipientEmail', 'recipientFirstName', 'recipientLastName', 'externalDataReference',
+    'ipAddress', 'locationLatitude', 'locationLongitude',
+})
+
+COLUMN_KINDS = ('text', 'likert', 'datetime', 'int', 'float', 'bool')
+
+# Answer scales, lowest first; a Likert column becomes an ordered categorical of the scale its answers fit
+LIKERT_SCALES = [
+    ['Strongly disagree', 'Disagree', 'Neither agree nor disagree', 'Agree', 'Strongly agree'],
+    ['Strong disagree', 'Disagree', 'Neither agree nor disagree', 'Agree', 'Strongly agree'],  # 90-day Q14 wording
+    ['No', 'Yes'],
+]
+
+# Parse-time dtypes for the pandas C engine (datetimes/booleans are converted afterwards)
+PANDAS_DTYPES = {
+    'text': 'string',
+    'likert': 'category',
+    'datetime': 'string',
+    'int': 'Int64',
+    'float': 'float64',
+    'bool': 'string'
+}
+
+def _arrow_types():
+    """Parse-time Arrow types; Likert answers are dictionary-encoded as they are read"""
+    return {
+        'text': pa.string(),
+        'likert': pa.dictionary(pa.int32(), pa.string()),
+        'datetime': pa.timestamp('s'),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_()
+    }
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+def read_schema(path):
+    """
+    One row per export column from the three Qualtrics header rows.
+
+    Row 1 is the export name (Q4, StartDate, ...), row 2 the question text and
+    row 3 a JSON blob whose ImportId (QID4, startDate, ...) is stable across
+    re-exports, column reordering and question renumbering.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        names, texts, meta = (next(reader) for _ in range(HEADER_ROWS))
+
+    rows = []
+    for position, (name, text, raw) in enumerate(zip(names, texts, meta)):
+        try:
+            info = json.loads(raw)
+        except ValueError:
+            info = {}
+        rows.append({
+            'position': position,
+            'name': name,
+            'text': text,
+            'import_id': info.get('ImportId', name),
+            'time_zone': info.get('timeZone')
+        })
+
+    schema = pd.DataFrame(rows)
+    # Export names repeat (e.g. a question and its text entry); ImportIds do not
+    dupes = schema['import_id'].duplicated(keep=False)
+    schema.loc[dupes, 'import_id'] = schema.loc[dupes, 'import_id'] + '#' + schema.loc[dupes, 'position'].astype(str)
+    return schema
+
+def resolve_columns(schema, columns):
+    """Map {output name: (selector, kind)} to schema rows; selectors match ImportId first, then export name"""
+    by_import = dict(zip(schema['import_id'], schema.index))
+    by_name = schema.drop_duplicates('name', keep=False).set_index('name')['import_id'].to_dict()
+
+    resolved = {}
+    missing = []
+    for out_name, (selector, kind) in columns.items():
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"Unknown column kind '{kind}' for {out_name}")
+        if selector in by_import:
+            resolved[out_name] = (selector, kind)
+        elif selector in by_name:
+            resolved[out_name] = (by_name[selector], kind)
+        else:
+            missing.append(f'{out_name} ({selector})')
+
+    if missing:
+        raise KeyError(f"Columns not found in export: {', '.join(missing)}")
+    return resolved
+
+# ============================================================================
+# READER
+# ============================================================================
+
+def _read_arrow(path, names, kinds):
+    """Projected read with pyarrow.csv: only requested columns are converted"""
+    types = _arrow_types()
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(skip_rows=HEADER_ROWS, column_names=names),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(kinds),
+            column_types={col: types[kind] for col, kind in kinds.items()},
+            timestamp_parsers=[DATETIME_FORMAT],
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas()
+
+def _read_pandas(path, names, kinds):
+    """Same projection through the pandas C parser"""
+    return pd.read_csv(path, header=None, skiprows=HEADER_ROWS, names=names, usecols=list(kinds),
+                       dtype={col: PANDAS_DTYPES[kind] for col, kind in kinds.items()})
+
+def likert_dtype(values):
+    """Ordered dtype of the first scale holding every answer, else the sorted answers (unordered, with a warning)"""
+    answers = set(values.dropna().astype(str))
+    for scale in LIKERT_SCALES:
+        if answers <= set(scale):
+            return pd.CategoricalDtype(scale, ordered=True)
+    warnings.warn(f"Likert column {values.name} fits no known answer scale ({', '.join(sorted(answers))}); "
+                  f"left unordered")
+    return pd.CategoricalDtype(sorted(answers), ordered=False)
+
+def _finish_column(values, kind):
+    """Bring either engine's output to the same pandas dtypes"""
+    if kind == 'likert':
+        return values.astype(str).where(values.notna()).astype(likert_dtype(values))
+    if kind == 'datetime':
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values, format=DATETIME_FORMAT, errors='coerce')
+        return values.astype('datetime64[ns]')
+    if kind == 'bool':
+        if pd.api.types.is_bool_dtype(values):
+            return values.astype('boolean')
+        return values.str.lower().map({'true': True, 'false': False}).astype('boolean')
+    if kind == 'int':
+        return values.astype('Int64')
+    if kind == 'float':
+        return values.astype('float64')
+    return values.astype('string')
+
+def read_qualtrics(path, columns, complete_only=False, engine=DEFAULT_ENGINE, allow_pii=False):
+    """
+    Read a projection of a Qualtrics export with explicit types.
+
+    columns maps output name -> (ImportId or export name, kind), where kind is
+    one of text, likert, datetime, int, float or bool. Unrequested columns are
+    never converted, and PII columns (recipient e-mail and name, IP address,
+    location) are dropped even when requested unless allow_pii is set. Likert
+    columns come back as the same ordered categorical (the full answer scale,
+    lowest first) from either engine. With complete_only, rows with
+    Finished != True or Progress != 100 are dropped.
+    """
+    schema = read_schema(path)
+    resolved = resolve_columns(schema, columns)
+    if not allow_pii:
+        names = dict(zip(schema['import_id'], schema['name']))
+        pii = [out for out, (import_id, _) in resolved.items() if {import_id, names[import_id]} & PII_COLUMNS]
+        if pii:
+            warnings.warn(f"Dropped PII columns: {', '.join(pii)} (pass allow_pii=True to read them)")
+            resolved = {out: spec for out, spec in resolved.items() if out not in pii}
+
+    kinds = {import_id: kind for import_id, kind in resolved.values()}
+    if complete_only:
+        for required, kind in (('finished', 'bool'), ('progress', 'int')):
+            if required not in set(schema['import_id']):
+                raise KeyError(f"complete_only needs the '{required}' column")
+            kinds.setdefault(required, kind)
+
+    names = list(schema['import_id'])
+    raw = _read_arrow(path, names, kinds) if engine == 'pyarrow' else _read_pandas(path, names, kinds)
+    raw = pd.DataFrame({col: _finish_column(raw[col], kind) for col, kind in kinds.items()})
+
+    if complete_only:
+        keep = raw['finished'].fillna(False).astype(bool) & (raw['progress'] == 100).fillna(False)
+        raw = raw[keep.to_numpy()].reset_index(drop=True)
+
+    return pd.DataFrame({out_name: raw[import_id] for out_name, (import_id, _) in resolved.items()})
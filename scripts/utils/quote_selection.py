@@ -0,0 +1,142 @@
+"""
+Quote Selection - Centroid + MMR Representative Quotes per Theme Cell
+Picks the sentences closest to what a theme's (or theme x department's) comments say
+
+Usage:
+    from quote_selection import select_quotes, theme_cells
+    membership, cells = theme_cells(df['themes'], df['department'])
+    cell_quotes, respondent_quotes = select_quotes(df['combined_feedback'], membership)
+
+Every comment is split into sentences (capped at MAX_WORDS words) and the
+sentences form one sparse TF-IDF matrix. A cell's centroid is the mean of its
+respondents' sentence vectors (each respondent weighted equally), so the
+centroids of every cell come from one sparse product (cells x respondents x
+sentences), and every sentence is scored against every centroid with one more.
+Sentences shorter than MIN_WORDS ("N/A", "Great job") are never picked.
+
+Quotes are then chosen by maximal marginal relevance: the most central sentence
+first, then sentences balancing centrality against similarity to the quotes
+already picked (never two from one respondent, never near-duplicates). Each
+round picks one quote for every cell at once, so selection costs n_quotes
+vectorized passes, not a loop per cell.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from topic_discovery import tfidf_matrix
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+N_QUOTES = 3
+MAX_WORDS = 25
+MIN_WORDS = 4              # shorter sentences are throwaways
+DIVERSITY = 0.3            # MMR weight of redundancy with quotes already picked (0 = centrality only)
+DUPLICATE_SIMILARITY = 0.8 # cosine above which a sentence repeats a picked quote
+
+SENTENCE = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+
+# ============================================================================
+# CANDIDATES
+# ============================================================================
+
+def cap_words(text, max_words=MAX_WORDS):
+    """First max_words words of a sentence, with an ellipsis when cut"""
+    words = text.split()
+    return text if len(words) <= max_words else ' '.join(words[:max_words]) + '...'
+
+def candidate_sentences(comments, max_words=MAX_WORDS):
+    """One row per sentence: respondent position, capped text and word count"""
+    comments = pd.Series(comments, dtype=object).fillna('').astype(str).reset_index(drop=True)
+    sentences = comments.str.strip().str.split(SENTENCE, regex=True).explode().str.strip()
+    sentences = sentences[sentences.fillna('') != '']
+    words = sentences.str.split().str.len().to_numpy()
+    text = sentences.to_numpy(dtype=object).copy()
+    long = np.flatnonzero(words > max_words)
+    text[long] = [cap_words(sentence, max_words) for sentence in text[long]]
+    return pd.DataFrame({'respondent': sentences.index.to_numpy(), 'text': text, 'words': words})
+
+def theme_cells(themes, groups=None):
+    """Respondent x cell membership (sparse) and cell labels: theme, or (group, theme)"""
+    exploded = pd.Series(list(themes), dtype=object).explode().dropna()
+    if groups is None:
+        labels = exploded
+    else:
+        labels = pd.Series(list(zip(pd.Series(groups).to_numpy()[exploded.index], exploded)), index=exploded.index)
+    codes, cells = pd.factorize(labels)
+    membership = sparse.csr_matrix((np.ones(len(codes), dtype=np.float32), (exploded.index.to_numpy(), codes)),
+                                   shape=(len(themes), len(cells)))
+    membership.data[:] = 1  # a theme listed twice still counts once
+    return membership, list(cells)
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def _row_dots(X, a, b):
+    """Cosine of rows a[i] and b[i] of an L2-normalized sparse matrix"""
+    return np.asarray(X[a].multiply(X[b]).sum(axis=1)).ravel()
+
+def select_quotes(comments, membership, n_quotes=N_QUOTES, max_words=MAX_WORDS, diversity=DIVERSITY):
+    """(up to n_quotes per membership column, most central first; best quote per respondent)"""
+    membership = sparse.csr_matrix(membership, dtype=np.float32)
+    n_respondents, n_cells = membership.shape
+    candidates = candidate_sentences(comments, max_words)
+    respondent_quotes = np.full(n_respondents, '', dtype=object)
+    cell_quotes = [[] for _ in range(n_cells)]
+    if candidates.empty:
+        return cell_quotes, respondent_quotes
+
+    tf = tfidf_matrix(candidates['text'], min_df=1)
+    X = tf.matrix[tf.rows]
+    respondent = candidates['respondent'].to_numpy()
+    per_respondent = np.bincount(respondent, minlength=n_respondents)
+    owner = sparse.csr_matrix((1 / per_respondent[respondent], (np.arange(len(candidates)), respondent)),
+                              shape=(len(candidates), n_respondents), dtype=np.float32)
+
+    # Centroids of every cell in one product, then every sentence against every centroid
+    centroids = (membership.T @ owner.T @ X).toarray()
+    norms = np.linalg.norm(centroids, axis=1)
+    centroids /= np.where(norms > 0, norms, 1)[:, None]
+    scores = np.asarray(X @ centroids.T)
+
+    # Scored (sentence, cell) entries: sentences of respondents in the cell
+    entry_cell = (owner.astype(bool).astype(np.float32) @ membership).tocoo()
+    cand, cell = entry_cell.row, entry_cell.col
+    relevance = scores[cand, cell]
+    alive = (relevance > 0) & (candidates['words'].to_numpy()[cand] >= MIN_WORDS)
+    penalty = np.zeros(len(cand), dtype=np.float32)
+
+    for _ in range(n_quotes):
+        live = np.flatnonzero(alive)
+        if len(live) == 0:
+            break
+        mmr = (1 - diversity) * relevance[live] - diversity * penalty[live]
+        order = live[np.lexsort((-mmr, cell[live]))]
+        winners = order[np.unique(cell[order], return_index=True)[1]]
+        chosen = np.full(n_cells, -1)
+        chosen[cell[winners]] = cand[winners]
+        for c, k in zip(cell[winners], cand[winners]):
+            cell_quotes[c].append(candidates['text'].iat[k])
+
+        # Redundancy with the cell's new quote; its respondent and near-duplicates are out
+        alive[winners] = False
+        live = np.flatnonzero(alive & (chosen[cell] >= 0))
+        similarity = _row_dots(X, cand[live], chosen[cell[live]])
+        penalty[live] = np.maximum(penalty[live], similarity)
+        alive[live] &= (respondent[cand[live]] != respondent[chosen[cell[live]]]) & (similarity < DUPLICATE_SIMILARITY)
+
+    # Each respondent's own most central sentence (first sentence when none qualifies)
+    eligible = (relevance > 0) & (candidates['words'].to_numpy()[cand] >= MIN_WORDS)
+    ranked = np.lexsort((-relevance[eligible], respondent[cand[eligible]]))
+    best = cand[eligible][ranked]
+    first_of = np.unique(respondent[best], return_index=True)
+    fallback = np.unique(respondent, return_index=True)
+    respondent_quotes[fallback[0]] = candidates['text'].to_numpy()[fallback[1]]
+    respondent_quotes[first_of[0]] = candidates['text'].to_numpy()[best[first_of[1]]]
+    return cell_quotes, respondent_quotes
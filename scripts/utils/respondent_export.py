@@ -0,0 +1,81 @@
+"""
+Respondent Export - Nested Parquet for Respondent-Level Detail
+Themes as list<string>, theme sentiments as list<struct<theme, sentiment>>, categoricals
+dictionary-encoded, with row-group statistics for predicate pushdown
+"""
+
+import json
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Row groups small enough that min/max statistics can skip most of a large export
+ROW_GROUP_SIZE = 65536
+COMPRESSION = 'zstd'
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def theme_sentiments(themes, sentiments):
+    """
+    list<struct<theme, sentiment>> built from the flat theme values.
+
+    Every theme a respondent mentions carries that respondent's overall
+    sentiment; the struct array reuses the themes' offsets, so nothing loops
+    over rows in Python.
+    """
+    sentiments = pc.cast(sentiments, pa.string()) if pa.types.is_dictionary(sentiments.type) else sentiments
+    parents = pc.list_parent_indices(themes)
+    structs = pa.StructArray.from_arrays([pc.list_flatten(themes), sentiments.take(parents)], names=['theme', 'sentiment'])
+    return pa.ListArray.from_arrays(themes.offsets, structs, mask=themes.is_null())
+
+def respondent_table(df, list_col='themes', sentiment_col='sentiment_overall', category_cols=(), id_col='respondent_id'):
+    """Arrow table of the respondent frame with native nested and dictionary types"""
+    fields = {}
+    for col in df.columns:
+        if col == list_col:
+            fields[col] = pa.array(df[col], type=pa.list_(pa.string()))
+        elif col in category_cols:
+            fields[col] = pa.array(df[col].astype('string'), type=pa.string()).dictionary_encode()
+        elif col == id_col:
+            fields[col] = pa.array(df[col], type=pa.int32())
+        else:
+            fields[col] = pa.Array.from_pandas(df[col])
+
+    if list_col in fields and sentiment_col in fields:
+        nested = theme_sentiments(fields[list_col], fields[sentiment_col])
+        names = list(fields)
+        position = names.index(list_col) + 1
+        fields = dict(list(fields.items())[:position] + [('theme_sentiments', nested)] + list(fields.items())[position:])
+    return pa.table(fields)
+
+# ============================================================================
+# WRITE / READ
+# ============================================================================
+
+def write_respondents(table, path, row_group_size=ROW_GROUP_SIZE):
+    """Parquet with dictionary pages for categoricals and per-column statistics"""
+    dictionary_cols = [field.name for field in table.schema if pa.types.is_dictionary(field.type)]
+    pq.write_table(table, path, compression=COMPRESSION, use_dictionary=dictionary_cols or True,
+                   write_statistics=True, row_group_size=row_group_size)
+
+def read_respondents(path, columns=None, filters=None):
+    """
+    Projected, filtered read; filters use pyarrow's DNF form, e.g.
+    [('Overall_NPS_Bucket', '=', 'Detractor')], and skip row groups by statistics.
+    """
+    return pq.read_table(path, columns=columns, filters=filters)
+
+def write_compat_csv(table, path):
+    """Legacy CSV with list columns as JSON strings (opt-in; consumers must json.loads)"""
+    frame = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            frame[field.name] = [json.dumps(value) for value in table.column(field.name).to_pylist()]
+    frame.to_csv(path, index=False)
@@ -0,0 +1,195 @@
+"""
+Response Quality - Speeder, Straight-Liner and Consistency Screening
+Per-respondent quality indicators computed as array operations over the whole export
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LIKERT_SCORES = {
+    'Strongly agree': 5,
+    'Agree': 4,
+    'Neither agree nor disagree': 3,
+    'Disagree': 2,
+    'Strongly disagree': 1,
+    'Strong disagree': 1,
+    'Yes': 5,
+    'No': 1
+}
+
+POSITIVE_ANSWERS = ['Strongly agree', 'Agree', 'Yes']
+
+DURATION_COL = 'Duration (in seconds)'
+
+# Speeders: robust z of log duration within cohort, or an absolute per-item floor
+SPEEDER_Z = -2.0
+MIN_SECONDS_PER_ITEM = 2.0
+
+# Cohorts smaller than this are scored against the pooled duration distribution
+MIN_COHORT_N = 8
+
+# Straight-lining needs at least this many answered items to be meaningful
+MIN_ITEMS_FOR_PATTERN = 5
+
+# Reverse-keyed item vs. the rest of the battery, on the 1-5 scale
+INCONSISTENCY_GAP = 3.0
+
+# Each flag halves a respondent's weight; this many flags excludes them
+FLAG_WEIGHT = 0.5
+EXCLUDE_AT_FLAGS = 2
+
+# ============================================================================
+# INDICATORS
+# ============================================================================
+
+def score_matrix(df, item_cols, mapping=LIKERT_SCORES):
+    """Respondents x items matrix of 1-5 scores (NaN for blank/unmapped)"""
+    return np.column_stack([df[col].map(mapping).to_numpy(dtype=float) for col in item_cols])
+
+def longest_run(scores):
+    """Longest run of identical consecutive answers per respondent (blanks break runs)"""
+    n_items = scores.shape[1]
+    run = np.where(np.isnan(scores[:, 0]), 0, 1)
+    best = run.copy()
+    for j in range(1, n_items):
+        same = scores[:, j] == scores[:, j - 1]
+        run = np.where(np.isnan(scores[:, j]), 0, np.where(same, run + 1, 1))
+        best = np.maximum(best, run)
+    return best
+
+def duration_z(duration, cohort=None, min_cohort_n=MIN_COHORT_N):
+    """Robust z-score (median/MAD) of log duration, within cohort where cohorts are large enough"""
+    log_d = np.log(pd.to_numeric(duration, errors='coerce').where(lambda s: s > 0))
+    pooled_med = log_d.median()
+    pooled_mad = (log_d - pooled_med).abs().median() * 1.4826
+
+    if cohort is None:
+        med = pd.Series(pooled_med, index=log_d.index)
+        mad = pd.Series(pooled_mad, index=log_d.index)
+    else:
+        groups = log_d.groupby(cohort)
+        med = groups.transform('median')
+        mad = (log_d - med).abs().groupby(cohort).transform('median') * 1.4826
+        small = groups.transform('count') < min_cohort_n
+        med = med.where(~small, pooled_med)
+        mad = mad.where(~small, pooled_mad)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((log_d - med) / mad.replace(0, np.nan)).to_numpy()
+
+def assess_quality(df, item_cols, reverse_items=(), cohort_col=None, duration_col=DURATION_COL):
+    """
+    Quality indicators, flags and a weight for every respondent.
+
+    All indicators are column operations over the (respondents x items) score
+    matrix; only longest_run steps across the item axis.
+    """
+    scores = score_matrix(df, item_cols)
+    answered = ~np.isnan(scores)
+    n_answered = answered.sum(axis=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        variance = np.nanvar(scores, axis=1)
+    runs = longest_run(scores)
+
+    duration = pd.to_numeric(df[duration_col], errors='coerce')
+    cohort = df[cohort_col] if cohort_col else None
+    dur_z = duration_z(duration, cohort)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sec_per_item = duration.to_numpy(dtype=float) / n_answered
+
+    # Reverse-keyed items should move against the rest of the battery
+    reverse_idx = [item_cols.index(col) for col in reverse_items if col in item_cols]
+    forward_idx = [j for j in range(len(item_cols)) if j not in reverse_idx]
+    if reverse_idx:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            reversed_mean = np.nanmean(6 - scores[:, reverse_idx], axis=1)
+            forward_mean = np.nanmean(scores[:, forward_idx], axis=1)
+        reverse_gap = np.abs(reversed_mean - forward_mean)
+    else:
+        reverse_gap = np.full(len(df), np.nan)
+
+    enough = n_answered >= MIN_ITEMS_FOR_PATTERN
+    speeder = (dur_z <= SPEEDER_Z) | (sec_per_item < MIN_SECONDS_PER_ITEM)
+    straightliner = enough & (runs >= n_answered)
+    inconsistent = enough & (reverse_gap >= INCONSISTENCY_GAP)
+
+    n_flags = speeder.astype(int) + straightliner.astype(int) + inconsistent.astype(int)
+    weight = np.where(n_flags >= EXCLUDE_AT_FLAGS, 0.0, FLAG_WEIGHT ** n_flags)
+
+    return pd.DataFrame({
+        'duration_seconds': duration.to_numpy(),
+        'duration_z': np.round(dur_z, 2),
+        'seconds_per_item': np.round(sec_per_item, 1),
+        'n_answered': n_answered,
+        'longest_run': runs,
+        'answer_variance': np.round(variance, 3),
+        'reverse_gap': np.round(reverse_gap, 2),
+        'speeder': speeder,
+        'straightliner': straightliner,
+        'inconsistent': inconsistent,
+        'n_flags': n_flags,
+        'quality_weight': weight
+    }, index=df.index)
+
+# ============================================================================
+# KPI SENSITIVITY
+# ============================================================================
+
+def _kpis(scores, positive, weights):
+    """Weighted mean score and positive rate per item column"""
+    valid = ~np.isnan(scores)
+    w = weights[:, None] * valid
+    total = w.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (w * np.nan_to_num(scores)).sum(axis=0) / total
+        pos = (w * positive).sum(axis=0) / total * 100
+    return mean, pos, valid[weights > 0].sum(axis=0)
+
+def kpi_sensitivity(df, item_cols, quality, reverse_items=()):
+    """How each item's mean and positive rate move when suspect responses are down-weighted or dropped"""
+    scores = score_matrix(df, item_cols)
+    positive = np.column_stack([df[col].isin(POSITIVE_ANSWERS).to_numpy() for col in item_cols]).astype(float)
+    for j, col in enumerate(item_cols):
+        if col in reverse_items:
+            positive[:, j] = scores[:, j] <= 2     # disagreeing is positive; "Neither" (3) is not
+
+    weights = quality['quality_weight'].to_numpy(dtype=float)
+    raw_mean, raw_pos, raw_n = _kpis(scores, positive, np.ones(len(df)))
+    wtd_mean, wtd_pos, _ = _kpis(scores, positive, weights)
+    kept_mean, kept_pos, kept_n = _kpis(scores, positive, (weights > 0).astype(float))
+
+    table = pd.DataFrame({
+        'item': item_cols,
+        'n_raw': raw_n,
+        'n_kept': kept_n,
+        'mean_raw': raw_mean,
+        'mean_weighted': wtd_mean,
+        'mean_excluded': kept_mean,
+        'positive_raw': raw_pos,
+        'positive_weighted': wtd_pos,
+        'positive_excluded': kept_pos
+    })
+    table['mean_delta'] = table['mean_weighted'] - table['mean_raw']
+    table['positive_delta'] = table['positive_weighted'] - table['positive_raw']
+    return table.round({'mean_raw': 2, 'mean_weighted': 2, 'mean_excluded': 2, 'mean_delta': 2,
+                        'positive_raw': 1, 'positive_weighted': 1, 'positive_excluded': 1, 'positive_delta': 1})
+
+def summarize_flags(quality):
+    """Counts of each flag for console reports"""
+    return {
+        'respondents': len(quality),
+        'speeders': int(quality['speeder'].sum()),
+        'straightliners': int(quality['straightliner'].sum()),
+        'inconsistent': int(quality['inconsistent'].sum()),
+        'down_weighted': int(((quality['quality_weight'] > 0) & (quality['quality_weight'] < 1)).sum()),
+        'excluded': int((quality['quality_weight'] == 0).sum())
+    }
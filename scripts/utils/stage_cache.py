@@ -0,0 +1,139 @@
+"""
+Stage Cache - Content-Addressed Memoization for Pipeline Stages
+Each stage result is keyed by its upstream keys, its config and the source of its code
+
+A stage key is a hash of (stage name, upstream stage keys, config, code), and the
+ingest key is a hash of the input file's bytes, so keys form a Merkle chain:
+editing a lexicon invalidates the stages that read it and everything downstream,
+while untouched branches are loaded from disk. Entries are pickles under
+STAGE_CACHE_DIR, evicted least-recently-used once the directory exceeds its budget.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_DIR = os.environ.get('STAGE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'survey-stages'))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('STAGE_CACHE_MAX_MB', 512)) * 1024 * 1024)
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def file_digest(path, block_size=1 << 20):
+    """sha256 of a file's contents (streamed)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def config_digest(config):
+    """Stable hash of plain config (dicts, lists, strings, numbers)"""
+    text = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def code_digest(objects):
+    """Hash of the source of functions, classes or modules a stage depends on"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(repr(obj).encode('utf-8'))
+    return digest.hexdigest()
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class StageCache:
+    """On-disk stage memoization with a size-bounded, least-recently-used store"""
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+        if enabled:
+            os.makedirs(root, exist_ok=True)
+
+    def key(self, stage, deps=(), config=None, code=()):
+        """Content address of one stage execution"""
+        parts = {'stage': stage, 'deps': list(deps), 'config': config_digest(config), 'code': code_digest(code)}
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, f'{stage}-{key[:24]}.pkl')
+
+    def run(self, stage, fn, *args, deps=(), config=None, code=(), valid=None, **kwargs):
+        """
+        Return (result, key) for fn(*args, **kwargs), loading it when the key is cached.
+
+        fn is always part of the code fingerprint; code lists anything else the
+        stage calls. valid(result) may reject a cached entry (e.g. output files
+        that were deleted since).
+        """
+        key = self.key(stage, deps, config, [fn, *code])
+        path = self._path(stage, key)
+
+        if self.enabled and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                result = None
+            else:
+                if valid is None or valid(result):
+                    os.utime(path)
+                    self.hits.append(stage)
+                    return result, key
+
+        result = fn(*args, **kwargs)
+        self.misses.append(stage)
+        if self.enabled:
+            self._store(path, result)
+            self.evict(keep=path)
+        return result, key
+
+    def _store(self, path, result):
+        """Atomic write so an interrupted run never leaves a truncated entry"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def entries(self):
+        """(path, size, last used) for every cached stage result"""
+        out = []
+        for name in os.listdir(self.root):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.root, name)
+                stat = os.stat(path)
+                out.append((path, stat.st_size, stat.st_mtime))
+        return out
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the store fits in max_bytes"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+    def report(self):
+        """One line for the console: which stages were reused"""
+        reused = ', '.join(self.hits) or 'none'
+        return f"Stage cache: {len(self.hits)} reused ({reused}), {len(self.misses)} recomputed"
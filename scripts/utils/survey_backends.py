@@ -0,0 +1,449 @@
+"""
+Survey Backends - Pluggable Engines for the Normalize / KPI / Theme Stages
+pandas is the reference; Polars (lazy, multi-threaded) and DuckDB (SQL) compute the same sums
+
+Every backend turns a respondent frame into additive sums (counts, totals,
+bucket tallies, theme mentions). The final percentages and rounding happen once,
+in pandas, on those small tables, so all engines publish identical numbers.
+A source may be a pandas DataFrame or a path to a Parquet file, which Polars and
+DuckDB scan without materializing it in pandas first.
+
+Given a weight column (survey weights from survey_weights.rake), every sum is
+weighted and the raw response count and sum of squared weights come along, so
+the finished tables carry weighted estimates, unweighted counts and the Kish
+effective sample size.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bucket rules on the 0-10 scale (same as the staff-dev bucketization)
+TOP2_MIN = 8.0
+DETRACTOR_MAX = 6.0
+PASSIVE_MAX = 8.0
+
+# Respondent-frame columns produced by the text analytics stage
+THEMES_COL = 'themes'
+SENTIMENT_COL = 'sentiment_overall'
+QUOTE_COL = 'quote_short'
+SENTIMENTS = {'positive': 'Positive', 'neutral': 'Neutral', 'negative': 'Negative'}
+
+KPI_SUMS = ['n', 'total', 'top2', 'detractor', 'passive', 'promoter']
+THEME_SUMS = ['mentions'] + list(SENTIMENTS)
+# Extra sums of a weighted run: unweighted count and sum of squared weights (effective n)
+WEIGHTED_SUMS = ['responses', 'weight_sq']
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+def _is_0_10(scale):
+    """0-10 scales pass through untouched (x / 10 * 10 is not exact in every engine)"""
+    return tuple(scale['points']) == (0, 10)
+
+def _arrow_ready(frame, columns):
+    """Mixed-type object columns (Excel answers) become strings; list columns are kept"""
+    out = frame[columns].copy()
+    for col in columns:
+        if out[col].dtype == object:
+            first = out[col].dropna().head(1)
+            if not (len(first) and isinstance(first.iloc[0], (list, tuple, np.ndarray))):
+                out[col] = out[col].astype('string')
+    return out
+
+# ============================================================================
+# PANDAS (REFERENCE)
+# ============================================================================
+
+class PandasBackend:
+    """Column-at-a-time pandas/NumPy; the reference every other backend must match"""
+
+    name = 'pandas'
+
+    def _frame(self, source, columns):
+        return pd.read_parquet(source, columns=columns) if _is_path(source) else source[columns]
+
+    def normalize(self, source, columns):
+        """{new: (raw column, scale)} -> 0-10 scores; numeric answers in range win, text goes through the map"""
+        raw = self._frame(source, list(dict.fromkeys(orig for orig, _ in columns.values())))
+        out = {}
+        for new_col, (orig, scale) in columns.items():
+            low, high = scale['points']
+            # Each distinct answer is parsed once, then broadcast back through the codes
+            codes, uniques = pd.factorize(raw[orig])
+            answers = pd.Series(uniques, dtype=object)
+            numeric = pd.to_numeric(answers, errors='coerce')
+            native = numeric.where((numeric >= low) & (numeric <= high))
+            if scale.get('map'):
+                text = answers.astype('string').str.strip().str.lower()
+                native = native.fillna(text.map(scale['map']).astype(float))
+            native = native if _is_0_10(scale) else (native - low) / (high - low) * 10
+            values = np.append(native.to_numpy(dtype=float), np.nan)
+            out[new_col] = values[codes]
+        return pd.DataFrame(out, index=raw.index)
+
+    def kpi_sums(self, source, metrics, group_col=None, weight_col=None):
+        """Long (group, metric) table of KPI_SUMS (weighted, plus WEIGHTED_SUMS, with a weight column)"""
+        frame = self._frame(source, metrics + ([group_col] if group_col else []) + ([weight_col] if weight_col else []))
+        scores = frame[metrics]
+        stats = {
+            'n': scores.notna(),
+            'total': scores.fillna(0),
+            'top2': scores >= TOP2_MIN,
+            'detractor': scores <= DETRACTOR_MAX,
+            'passive': (scores > DETRACTOR_MAX) & (scores <= PASSIVE_MAX),
+            'promoter': scores > PASSIVE_MAX
+        }
+        if weight_col:
+            weights = frame[weight_col].astype(float)
+            stats = {stat: wide.mul(weights, axis=0) for stat, wide in stats.items()}
+            stats['responses'] = scores.notna()
+            stats['weight_sq'] = scores.notna().mul(weights ** 2, axis=0)
+
+        if not group_col:
+            return pd.DataFrame({'metric': metrics, **{stat: wide.sum().to_numpy() for stat, wide in stats.items()}})
+
+        keys = frame[group_col]
+        parts = {stat: wide.groupby(keys, sort=False).sum().stack() for stat, wide in stats.items()}
+        sums = pd.DataFrame(parts).rename_axis([group_col, 'metric']).reset_index()
+        first_row = pd.Series(np.arange(len(frame)), index=frame.index).groupby(keys, sort=False).min()
+        return sums.merge(first_row.rename('first_row').reset_index(), on=group_col)
+
+    def theme_sums(self, source, group_col=None, weight_col=None):
+        """(theme counts, group sizes): mentions and sentiment tallies per (group, theme), weighted with a weight column"""
+        cols = [THEMES_COL, SENTIMENT_COL, QUOTE_COL] + ([group_col] if group_col else []) + ([weight_col] if weight_col else [])
+        frame = self._frame(source, cols).reset_index(drop=True)
+        weight = frame[weight_col].astype(float) if weight_col else 1
+        frame = frame.assign(row=np.arange(len(frame)), weight=weight, weight_sq=weight ** 2, **{
+            key: (frame[SENTIMENT_COL] == label).astype(int) * weight for key, label in SENTIMENTS.items()
+        })
+        keys = [group_col] if group_col else []
+
+        exploded = frame.explode(THEMES_COL).dropna(subset=[THEMES_COL])
+        exploded = exploded[keys + [THEMES_COL, 'row', 'weight', QUOTE_COL] + list(SENTIMENTS)].rename(columns={THEMES_COL: 'theme'})
+        mentions = {'mentions': ('weight', 'sum'), 'responses': ('row', 'size')} if weight_col else {'mentions': ('row', 'size')}
+        counts = exploded.groupby(keys + ['theme'], sort=False).agg(**mentions, **{
+            key: (key, 'sum') for key in SENTIMENTS
+        }).reset_index()
+        quoted = exploded[exploded[QUOTE_COL].fillna('').astype(str) != '']
+        quotes = quoted.groupby(keys + ['theme'], sort=False)[QUOTE_COL].first().rename('sample_quote').reset_index()
+        counts = counts.merge(quotes, on=keys + ['theme'], how='left')
+
+        if group_col:
+            sizes = {'respondents': ('weight', 'sum'), 'weight_sq': ('weight_sq', 'sum')} if weight_col else {'respondents': ('row', 'size')}
+            sizes = frame.dropna(subset=[group_col]).groupby(group_col, sort=False).agg(
+                **sizes, first_row=('row', 'min')).reset_index()
+        elif weight_col:
+            sizes = pd.DataFrame({'respondents': [frame['weight'].sum()], 'weight_sq': [frame['weight_sq'].sum()]})
+        else:
+            sizes = pd.DataFrame({'respondents': [len(frame)]})
+        return counts, sizes
+
+# ============================================================================
+# POLARS
+# ============================================================================
+
+class PolarsBackend:
+    """Lazy Polars plans; the query optimizer prunes columns and runs on all cores"""
+
+    name = 'polars'
+
+    def __init__(self):
+        if pl is None:
+            raise ImportError('The polars backend needs the polars package')
+
+    def _scan(self, source, columns):
+        if _is_path(source):
+            return pl.scan_parquet(source).select(columns)
+        import pyarrow as pa
+        return pl.from_arrow(pa.Table.from_pandas(_arrow_ready(source, columns), preserve_index=False)).lazy()
+
+    def normalize(self, source, columns):
+        raw_cols = list(dict.fromkeys(orig for orig, _ in columns.values()))
+        lazy = self._scan(source, raw_cols)
+        schema = lazy.collect_schema()
+        exprs = []
+        for new_col, (orig, scale) in columns.items():
+            low, high = scale['points']
+            if schema[orig].is_numeric():
+                native = pl.col(orig).cast(pl.Float64)
+                text = None
+            else:
+                text = pl.col(orig).cast(pl.Utf8).str.strip_chars()
+                native = text.cast(pl.Float64, strict=False)
+            native = pl.when(native.is_between(low, high)).then(native).otherwise(None)
+            if scale.get('map') and text is not None:
+                mapped = text.str.to_lowercase().replace_strict(scale['map'], default=None, return_dtype=pl.Float64)
+                native = native.fill_null(mapped)
+            exprs.append((native if _is_0_10(scale) else (native - low) / (high - low) * 10).alias(new_col))
+        result = lazy.select(exprs).collect().to_pandas()
+        if not _is_path(source):
+            result.index = source.index
+        return result.astype(float)
+
+    def kpi_sums(self, source, metrics, group_col=None, weight_col=None):
+        keys = [group_col] if group_col else []
+        weights = [weight_col] if weight_col else []
+        lazy = self._scan(source, metrics + keys + weights).with_row_index('row')
+        long = lazy.unpivot(on=metrics, index=keys + weights + ['row'], variable_name='metric', value_name='score')
+        if group_col:
+            long = long.filter(pl.col(group_col).is_not_null())
+        score = pl.col('score').fill_nan(None)
+        buckets = {
+            'n': score.is_not_null(),
+            'top2': score >= TOP2_MIN,
+            'detractor': score <= DETRACTOR_MAX,
+            'passive': (score > DETRACTOR_MAX) & (score <= PASSIVE_MAX),
+            'promoter': score > PASSIVE_MAX
+        }
+        if weight_col:
+            w = pl.col(weight_col).cast(pl.Float64)
+            stats = [w.filter(rule).sum().alias(stat) for stat, rule in buckets.items()]
+            stats += [(score * w).sum().alias('total'), score.count().alias('responses'),
+                      (w * w).filter(score.is_not_null()).sum().alias('weight_sq')]
+        else:
+            stats = [score.count().alias('n'), score.sum().alias('total')]
+            stats += [rule.sum().alias(stat) for stat, rule in buckets.items() if stat != 'n']
+        sums = long.group_by(keys + ['metric']).agg(*stats, pl.col('row').min().alias('first_row')).collect().to_pandas()
+        return sums if group_col else sums.drop(columns='first_row')
+
+    def theme_sums(self, source, group_col=None, weight_col=None):
+        keys = [group_col] if group_col else []
+        lazy = self._scan(source, [THEMES_COL, SENTIMENT_COL, QUOTE_COL] + keys + ([weight_col] if weight_col else []))
+        lazy = lazy.with_row_index('row')
+        exploded = lazy.explode(THEMES_COL).filter(pl.col(THEMES_COL).is_not_null()).rename({THEMES_COL: 'theme'})
+        quote = pl.col(QUOTE_COL)
+        if weight_col:
+            w = pl.col(weight_col).cast(pl.Float64)
+            tallies = [w.sum().alias('mentions'), pl.len().alias('responses'),
+                       *[w.filter(pl.col(SENTIMENT_COL) == label).sum().alias(key) for key, label in SENTIMENTS.items()]]
+            size = [w.sum().alias('respondents'), (w * w).sum().alias('weight_sq')]
+        else:
+            tallies = [pl.len().alias('mentions'),
+                       *[(pl.col(SENTIMENT_COL) == label).sum().alias(key) for key, label in SENTIMENTS.items()]]
+            size = [pl.len().alias('respondents')]
+        counts = exploded.group_by(keys + ['theme']).agg(
+            *tallies,
+            quote.filter(quote.fill_null('') != '').first().alias('sample_quote')
+        ).collect().to_pandas()
+
+        if group_col:
+            sizes = lazy.filter(pl.col(group_col).is_not_null()).group_by(group_col).agg(
+                *size, pl.col('row').min().alias('first_row')).collect().to_pandas()
+        else:
+            sizes = lazy.select(*size).collect().to_pandas()
+        return counts, sizes
+
+# ============================================================================
+# DUCKDB
+# ============================================================================
+
+def _ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+class DuckDBBackend:
+    """The same stages as SQL over a registered frame or read_parquet()"""
+
+    name = 'duckdb'
+
+    def __init__(self, con=None):
+        if duckdb is None:
+            raise ImportError('The duckdb backend needs the duckdb package')
+        self.con = con or duckdb.connect()
+
+    def _relation(self, source, columns):
+        if _is_path(source):
+            return f'read_parquet({_literal(os.fspath(source))})'
+        import pyarrow as pa
+        table = pa.Table.from_pandas(_arrow_ready(source, columns), preserve_index=False)
+        self.con.register('survey_frame', table)
+        return 'survey_frame'
+
+    def normalize(self, source, columns):
+        raw_cols = list(dict.fromkeys(orig for orig, _ in columns.values()))
+        relation = self._relation(source, raw_cols)
+        selects = []
+        for new_col, (orig, scale) in columns.items():
+            low, high = scale['points']
+            text = f'trim(CAST({_ident(orig)} AS VARCHAR))'
+            numeric = f'TRY_CAST({text} AS DOUBLE)'
+            native = f'CASE WHEN {numeric} BETWEEN {low} AND {high} THEN {numeric} END'
+            if scale.get('map'):
+                cases = ' '.join(f'WHEN {_literal(k)} THEN {float(v)}' for k, v in scale['map'].items())
+                native = f'coalesce({native}, CASE lower({text}) {cases} END)'
+            scaled = native if _is_0_10(scale) else f'({native} - {low}) / {high - low} * 10'
+            selects.append(f'{scaled} AS {_ident(new_col)}')
+        result = self.con.execute(f'SELECT {", ".join(selects)} FROM {relation}').df()
+        if not _is_path(source):
+            result.index = source.index
+        return result.astype(float)
+
+    def kpi_sums(self, source, metrics, group_col=None, weight_col=None):
+        keys = [group_col] if group_col else []
+        relation = self._relation(source, metrics + keys + ([weight_col] if weight_col else []))
+        key_sql = ''.join(f'{_ident(k)}, ' for k in keys)
+        weight = f'CAST({_ident(weight_col)} AS DOUBLE)' if weight_col else '1'
+        unpivot = ' UNION ALL '.join(
+            f"SELECT {key_sql}row, {weight} AS weight, {_literal(m)} AS metric, "
+            f"nullif(CAST({_ident(m)} AS DOUBLE), 'NaN'::DOUBLE) AS score FROM numbered"
+            for m in metrics
+        )
+        buckets = {
+            'n': 'score IS NOT NULL',
+            'top2': f'score >= {TOP2_MIN}',
+            'detractor': f'score <= {DETRACTOR_MAX}',
+            'passive': f'score > {DETRACTOR_MAX} AND score <= {PASSIVE_MAX}',
+            'promoter': f'score > {PASSIVE_MAX}'
+        }
+        if weight_col:
+            stats = [f'coalesce(sum(weight) FILTER (WHERE {rule}), 0) AS {stat}' for stat, rule in buckets.items()]
+            stats += ['coalesce(sum(score * weight), 0) AS total', 'count(score) AS responses',
+                      'coalesce(sum(weight * weight) FILTER (WHERE score IS NOT NULL), 0) AS weight_sq']
+        else:
+            stats = ['count(score) AS n', 'coalesce(sum(score), 0) AS total']
+            stats += [f'count(CASE WHEN {rule} THEN 1 END) AS {stat}' for stat, rule in buckets.items() if stat != 'n']
+        where = f'WHERE {_ident(group_col)} IS NOT NULL' if group_col else ''
+        sql = f"""
+            WITH numbered AS (SELECT *, row_number() OVER () - 1 AS row FROM {relation}),
+                 long AS ({unpivot}),
+                 cells AS (
+                    SELECT {key_sql}metric, {', '.join(stats)}, min(row) AS first_row
+                    FROM long {where}
+                    GROUP BY {key_sql}metric
+                 )
+            SELECT * FROM cells
+        """
+        sums = self.con.execute(sql).df()
+        return sums if group_col else sums.drop(columns='first_row')
+
+    def theme_sums(self, source, group_col=None, weight_col=None):
+        keys = [group_col] if group_col else []
+        relation = self._relation(source, [THEMES_COL, SENTIMENT_COL, QUOTE_COL] + keys + ([weight_col] if weight_col else []))
+        key_sql = ''.join(f'{_ident(k)}, ' for k in keys)
+        weight = f'CAST({_ident(weight_col)} AS DOUBLE)' if weight_col else '1'
+        if weight_col:
+            tallies = ', '.join(['sum(weight) AS mentions', 'count(*) AS responses'] + [
+                f'coalesce(sum(weight) FILTER (WHERE {_ident(SENTIMENT_COL)} = {_literal(label)}), 0) AS {key}'
+                for key, label in SENTIMENTS.items()])
+            size = 'sum(weight) AS respondents, sum(weight * weight) AS weight_sq'
+        else:
+            tallies = ', '.join(['count(*) AS mentions'] + [
+                f'count(CASE WHEN {_ident(SENTIMENT_COL)} = {_literal(label)} THEN 1 END) AS {key}'
+                for key, label in SENTIMENTS.items()])
+            size = 'count(*) AS respondents'
+        numbered = f'SELECT *, {weight} AS weight, row_number() OVER () - 1 AS row FROM {relation}'
+        sql = f"""
+            WITH numbered AS ({numbered}),
+                 exploded AS (SELECT {key_sql}row, weight, {_ident(SENTIMENT_COL)}, {_ident(QUOTE_COL)} AS quote,
+                                     unnest({_ident(THEMES_COL)}) AS theme FROM numbered)
+            SELECT {key_sql}theme, {tallies},
+                   arg_min(quote, row) FILTER (WHERE coalesce(quote, '') <> '') AS sample_quote
+            FROM exploded WHERE theme IS NOT NULL
+            GROUP BY {key_sql}theme
+        """
+        counts = self.con.execute(sql).df()
+        if group_col:
+            sizes = self.con.execute(f"""
+                WITH numbered AS ({numbered})
+                SELECT {_ident(group_col)}, {size}, min(row) AS first_row
+                FROM numbered WHERE {_ident(group_col)} IS NOT NULL GROUP BY {_ident(group_col)}
+            """).df()
+        else:
+            sizes = self.con.execute(f'WITH numbered AS ({numbered}) SELECT {size} FROM numbered').df()
+        return counts, sizes
+
+# ============================================================================
+# REGISTRY + SHARED FINISHING
+# ============================================================================
+
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend, 'duckdb': DuckDBBackend}
+
+def get_backend(name='pandas'):
+    """Instantiate a backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'; choose from {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+def available_backends():
+    """Backends whose engine is importable here"""
+    return ['pandas'] + [name for name, module in (('polars', pl), ('duckdb', duckdb)) if module is not None]
+
+def kpi_table(sums, metrics, nps_metrics, group_col=None):
+    """Overall or per-group KPI rows from KPI_SUMS (identical for every backend); weighted sums add n_effective"""
+    weighted = 'weight_sq' in sums.columns
+    table = sums.copy()
+    table[KPI_SUMS] = table[KPI_SUMS].astype(float)
+    table['metric_order'] = table['metric'].map({m: i for i, m in enumerate(metrics)})
+    if group_col:
+        table = table[table['n'] > 0].sort_values(['first_row', 'metric_order'])
+    else:
+        table = table.sort_values('metric_order')
+
+    n = table['n'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, table['total'] / n, np.nan)
+        pct = {stat: np.where(n > 0, table[stat] / n * 100, 0.0) for stat in ('top2', 'detractor', 'passive', 'promoter')}
+
+    out = pd.DataFrame({'metric': table['metric'].to_numpy()})
+    if group_col:
+        out.insert(0, group_col, table[group_col].to_numpy())
+    out['mean_0_10'] = np.round(mean, 2)
+    out['top2_box_pct'] = np.round(pct['top2'], 1)
+    out['n_responses'] = (table['responses'].to_numpy() if weighted else n).astype(int)
+    if weighted:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['n_effective'] = np.round(np.where(n > 0, n ** 2 / table['weight_sq'].to_numpy(dtype=float), 0.0), 1)
+
+    is_nps = out['metric'].isin(list(nps_metrics)).to_numpy()
+    for stat in ('detractor', 'passive', 'promoter'):
+        out[f'{stat}_pct'] = np.where(is_nps, np.round(pct[stat], 1), np.nan)
+    out['nps_score'] = out['promoter_pct'] - out['detractor_pct']
+    if not is_nps.any():
+        out = out.drop(columns=['detractor_pct', 'passive_pct', 'promoter_pct', 'nps_score'])
+    return out
+
+def theme_table(counts, sizes, taxonomy, group_col=None):
+    """Overall (with a sample quote) or per-group theme rows in taxonomy order; weighted sums add n_effective"""
+    weighted = 'responses' in counts.columns
+    counts = counts[counts['theme'].isin(taxonomy)].copy()
+    counts['theme_order'] = counts['theme'].map({t: i for i, t in enumerate(taxonomy)})
+    if group_col:
+        counts = counts.merge(sizes, on=group_col).sort_values(['first_row', 'theme_order'])
+    else:
+        counts = counts.assign(**sizes.iloc[0].to_dict()).sort_values('theme_order')
+
+    mentions = counts['mentions'].to_numpy(dtype=float)
+    respondents = counts['respondents'].to_numpy(dtype=float)
+    out = pd.DataFrame({'theme': counts['theme'].to_numpy()})
+    if group_col:
+        out.insert(0, group_col, counts[group_col].to_numpy())
+    out['prevalence_pct'] = np.round(mentions / respondents * 100, 1)
+    out['mentions'] = (counts['responses'].to_numpy() if weighted else mentions).astype(int)
+    if weighted:
+        # Weighted mentions, and the effective n of the respondents the prevalence is taken over
+        out['weighted_mentions'] = np.round(mentions, 1)
+        out['n_effective'] = np.round(respondents ** 2 / counts['weight_sq'].to_numpy(dtype=float), 1)
+    for key in SENTIMENTS:
+        out[f'{key[:3]}_pct'] = np.round(counts[key].to_numpy(dtype=float) / mentions * 100, 1)
+    if not group_col:
+        out['sample_quote'] = counts['sample_quote'].fillna('').to_numpy()
+        out = out.sort_values('prevalence_pct', ascending=False)
+    return out
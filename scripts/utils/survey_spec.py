@@ -0,0 +1,579 @@
+"""
+Survey Spec - Declarative Survey Pipelines
+Compiles a YAML/TOML survey spec into a load -> normalize -> score -> aggregate plan
+
+Usage:
+    python survey_spec.py ../specs/lds_survey.yaml [--input FILE] [--output-dir DIR] [--store]
+    python survey_spec.py ../specs/ninety_day.yaml --chunksize 250000 --workers 4
+"""
+
+import argparse
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# BUILT-IN SCALES
+# ============================================================================
+
+# Every scale maps raw answers onto its native points, then onto 0-10.
+# top_box_min is the 0-10 threshold counted as Top-2 Box for that scale.
+BUILTIN_SCALES = {
+    'agreement': {
+        'points': [1, 5],
+        'top_box_min': 7.5,
+        'map': {
+            'strongly agree': 5, 'agree': 4, 'tend to agree': 4,
+            'neither': 3, 'neutral': 3, 'neither agree nor disagree': 3,
+            'tend to disagree': 2, 'disagree': 2,
+            'strongly disagree': 1, 'strong disagree': 1
+        }
+    },
+    'quality': {
+        'points': [1, 5],
+        'top_box_min': 7.5,
+        'map': {'excellent': 5, 'very good': 4, 'good': 4, 'fair': 3, 'poor': 2, 'very poor': 1}
+    },
+    'nps': {
+        'points': [0, 10],
+        'top_box_min': 8.0
+    },
+    'five_point': {
+        'points': [1, 5],
+        'top_box_min': 7.5
+    },
+    'yes_no': {
+        'points': [1, 5],
+        'top_box_min': 7.5,
+        'map': {'yes': 5, 'no': 1}
+    }
+}
+
+ROLES = ('group', 'score', 'text', 'date', 'id', 'duration')
+PERIODS = ('year', 'quarter', 'month', 'fiscal_year')
+
+# Chunked mode: collapse accumulated partials after this many chunks
+MERGE_EVERY = 16
+
+# ============================================================================
+# MERGEABLE SKETCHES
+# ============================================================================
+
+# Durations go into log-spaced buckets with 1% relative error; bucket counts
+# add across chunks, so the merged sketch is the sketch of the whole export.
+# Scores need no sketch: their 0-10 values are few and are tallied exactly.
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+DURATION_QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+def sketch_values(values):
+    """Bucket representative for each value (0 for non-positive, NaN for missing)"""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.ceil(np.log(values) / np.log(SKETCH_GAMMA))
+        rep = 2 * SKETCH_GAMMA ** k / (SKETCH_GAMMA + 1)
+    return np.where(values > 0, rep, np.where(values <= 0, 0.0, np.nan))
+
+def tally_quantile(tallies, keys, q):
+    """
+    Quantile q per group of a (keys..., value, count) tally frame.
+
+    Uses the same linear interpolation between order statistics as
+    Series.quantile, so exact tallies reproduce the in-memory answer.
+    """
+    group_keys = keys or ['_all']
+    tallies = tallies[tallies['count'] > 0].assign(_all=0).sort_values(group_keys + ['value'], kind='stable')
+    groups = tallies.groupby(group_keys, sort=False)['count']
+    end = groups.cumsum()
+    start = end - tallies['count']
+    rank = (groups.transform('sum') - 1) * q
+    lo, hi = np.floor(rank), np.ceil(rank)
+
+    at_lo = tallies.loc[(start <= lo) & (lo < end), group_keys + ['value']].assign(frac=(rank - lo)[(start <= lo) & (lo < end)])
+    at_hi = tallies.loc[(start <= hi) & (hi < end), group_keys + ['value']].rename(columns={'value': 'value_hi'})
+    merged = at_lo.merge(at_hi, on=group_keys, how='left')
+    merged['quantile'] = merged['value'] + (merged['value_hi'] - merged['value']) * merged['frac']
+    return merged[keys + ['quantile']]
+
+# ============================================================================
+# SPEC LOADING
+# ============================================================================
+
+def load_spec(path):
+    """Read a YAML or TOML survey spec"""
+    if str(path).endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        import yaml
+        with open(path, encoding='utf-8') as f:
+            spec = yaml.safe_load(f)
+    spec['_base_dir'] = os.path.dirname(os.path.abspath(path))
+    return spec
+
+def _validate(spec):
+    """Fail early on specs that cannot compile"""
+    for key in ('survey', 'source', 'columns'):
+        if key not in spec:
+            raise ValueError(f"Survey spec is missing required key '{key}'")
+
+    scales = {**BUILTIN_SCALES, **spec.get('scales', {})}
+    names = set()
+    for raw_col, col_spec in spec['columns'].items():
+        role = col_spec.get('role')
+        if role not in ROLES:
+            raise ValueError(f"Column '{raw_col}': role must be one of {ROLES}, got {role!r}")
+        if role == 'score' and col_spec.get('scale') not in scales:
+            raise ValueError(f"Column '{raw_col}': unknown scale {col_spec.get('scale')!r}")
+        for period in col_spec.get('periods', []):
+            if period not in PERIODS:
+                raise ValueError(f"Column '{raw_col}': unknown period {period!r}")
+        name = col_spec.get('name', raw_col)
+        if name in names:
+            raise ValueError(f"Duplicate column name '{name}' in spec")
+        names.add(name)
+
+# ============================================================================
+# COMPILED PLAN
+# ============================================================================
+
+class SurveyPlan:
+    """A compiled survey spec: one read, projected columns, vectorized stages"""
+
+    def __init__(self, spec):
+        _validate(spec)
+        self.spec = spec
+        self.survey = spec['survey']
+        self.title = spec.get('title', self.survey)
+        self.source = spec['source']
+        self.scales = {**BUILTIN_SCALES, **spec.get('scales', {})}
+        self.prefix = spec.get('outputs', {}).get('prefix', self.survey)
+
+        self.columns = {raw: {**col, 'name': col.get('name', raw)} for raw, col in spec['columns'].items()}
+        self.by_role = {role: [raw for raw, col in self.columns.items() if col['role'] == role] for role in ROLES}
+
+        self.scores = [self.columns[raw]['name'] for raw in self.by_role['score']]
+        self.nps_scores = [self.columns[raw]['name'] for raw in self.by_role['score'] if self.columns[raw]['scale'] == 'nps']
+        self.texts = [self.columns[raw]['name'] for raw in self.by_role['text']]
+        self.themes = {text: {theme: [kw.lower() for kw in kws] for theme, kws in lexicon.items()}
+                       for text, lexicon in spec.get('themes', {}).items()}
+
+        self.dimensions = [self.columns[raw]['name'] for raw in self.by_role['group']]
+        for raw in self.by_role['date']:
+            self.dimensions += [f"{self.columns[raw]['name']}_{period}" for period in self.columns[raw].get('periods', [])]
+        self.groupings = [list(g) for g in spec.get('groupings', [])] or [[dim] for dim in self.dimensions]
+        for grouping in self.groupings:
+            for dim in grouping:
+                if dim not in self.dimensions:
+                    raise ValueError(f"Grouping references unknown dimension '{dim}'")
+
+        self.filter_cols = [f['column'] for f in self.source.get('filters', [])]
+        self.usecols = list(dict.fromkeys(list(self.columns) + self.filter_cols))
+        self.dtypes = self._read_dtypes()
+
+    def _read_dtypes(self):
+        """Explicit read dtypes so nothing is inferred row by row"""
+        dtypes = {}
+        for raw, col in self.columns.items():
+            if col['role'] == 'group':
+                dtypes[raw] = 'category'
+            elif col['role'] in ('text', 'id'):
+                dtypes[raw] = 'string'
+            elif col['role'] == 'score' and 'map' in self.scales[col['scale']]:
+                dtypes[raw] = 'category'
+        return dtypes
+
+    # ------------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------------
+
+    def source_path(self, override=None):
+        path = override or self.source['path']
+        return path if os.path.isabs(path) else os.path.join(self.spec['_base_dir'], path)
+
+    def load(self, path=None):
+        """Single projected read plus row filters"""
+        path = self.source_path(path)
+        header = self.source.get('header_row', 0)
+        skip = self.source.get('skip_rows', [])
+
+        if self.source.get('format', 'csv') == 'excel':
+            raw = pd.read_excel(path, sheet_name=self.source.get('sheet', 0), header=header,
+                                skiprows=skip or None, usecols=lambda c: c in self.usecols)
+            raw = raw.astype({col: dtype for col, dtype in self.dtypes.items() if col in raw.columns})
+        else:
+            raw = pd.read_csv(path, header=header, skiprows=skip or None,
+                              usecols=lambda c: c in self.usecols, dtype=self.dtypes)
+        return self._filter(self._check_columns(raw, path))
+
+    def iter_chunks(self, path=None, chunksize=100000):
+        """The same projected read in fixed-size batches, filtered batch by batch"""
+        path = self.source_path(path)
+        if self.source.get('format', 'csv') == 'excel':
+            raise ValueError('Chunked mode needs a CSV source; Excel workbooks cannot be streamed')
+
+        reader = pd.read_csv(path, header=self.source.get('header_row', 0), skiprows=self.source.get('skip_rows', []) or None,
+                             usecols=lambda c: c in self.usecols, dtype=self.dtypes, chunksize=chunksize)
+        with reader:
+            for raw in reader:
+                raw = self._filter(self._check_columns(raw, path))
+                if len(raw):
+                    yield raw
+
+    def _check_columns(self, raw, path):
+        missing = [col for col in self.usecols if col not in raw.columns]
+        if missing:
+            raise KeyError(f"Source {os.path.basename(path)} is missing spec columns: {missing}")
+        return raw
+
+    def _filter(self, raw):
+        """Row filters from the spec (row-local, so safe per chunk)"""
+        keep = np.ones(len(raw), dtype=bool)
+        for flt in self.source.get('filters', []):
+            values = raw[flt['column']]
+            if 'equals' in flt:
+                target = flt['equals']
+                if isinstance(target, bool):
+                    values = values.astype(str).str.strip().str.lower().map({'true': True, 'false': False, '1': True, '0': False})
+                elif isinstance(target, (int, float)):
+                    values = pd.to_numeric(values, errors='coerce')
+                keep &= (values == target).fillna(False).to_numpy(dtype=bool)
+            if 'in' in flt:
+                keep &= values.isin(flt['in']).to_numpy()
+            if 'min' in flt:
+                keep &= (pd.to_numeric(values, errors='coerce') >= flt['min']).fillna(False).to_numpy(dtype=bool)
+            if 'max' in flt:
+                keep &= (pd.to_numeric(values, errors='coerce') <= flt['max']).fillna(False).to_numpy(dtype=bool)
+        return raw[keep].reset_index(drop=True)
+
+    # ------------------------------------------------------------------------
+    # Normalize + score
+    # ------------------------------------------------------------------------
+
+    def _scale_to_10(self, raw_values, col):
+        """Map one raw column onto 0-10 without per-row Python"""
+        scale = self.scales[col['scale']]
+        low, high = scale['points']
+
+        if 'map' in scale:
+            series = raw_values.astype('category')
+            lookup = {str(k).lower(): v for k, v in scale['map'].items()}
+            cat_values = series.cat.categories.astype(str).str.strip().str.lower().map(lookup).to_numpy(dtype=float)
+            codes = series.cat.codes.to_numpy()
+            native = np.where(codes >= 0, cat_values[np.clip(codes, 0, None)] if len(cat_values) else np.nan, np.nan)
+        else:
+            native = pd.to_numeric(raw_values, errors='coerce').to_numpy(dtype=float)
+            native = np.where((native >= low) & (native <= high), native, np.nan)
+
+        scaled = (native - low) / (high - low) * 10
+        return 10 - scaled if col.get('reverse') else scaled
+
+    def normalize(self, raw):
+        """Typed respondent frame: dimensions, 0-10 scores, text, derived periods"""
+        out = {}
+        for raw_col, col in self.columns.items():
+            name = col['name']
+            if col['role'] == 'score':
+                out[name] = self._scale_to_10(raw[raw_col], col)
+            elif col['role'] == 'date':
+                dates = pd.to_datetime(raw[raw_col], format=col.get('format'), errors='coerce')
+                out[name] = dates
+                for period in col.get('periods', []):
+                    if period == 'year':
+                        out[f'{name}_year'] = dates.dt.year.astype('Int64').astype(str)
+                    elif period == 'quarter':
+                        out[f'{name}_quarter'] = dates.dt.to_period('Q').astype(str)
+                    elif period == 'month':
+                        out[f'{name}_month'] = dates.dt.to_period('M').astype(str)
+                    else:
+                        start_month = col.get('fiscal_year_start_month', 7)
+                        fy = dates.dt.year + (dates.dt.month >= start_month).astype(int)
+                        out[f'{name}_fiscal_year'] = 'FY' + (fy % 100).astype('Int64').astype(str).str.zfill(2)
+            elif col['role'] == 'text':
+                out[name] = raw[raw_col].fillna('')
+            elif col['role'] == 'duration':
+                out[name] = pd.to_numeric(raw[raw_col], errors='coerce').to_numpy(dtype=float)
+            else:
+                out[name] = raw[raw_col]
+
+        df = pd.DataFrame(out)
+        for dim in self.dimensions:
+            df[dim] = df[dim].astype('category')
+        return df
+
+    def theme_hits(self, df):
+        """Respondent x theme boolean frame (one compiled regex per theme)"""
+        hits = {}
+        for text, lexicon in self.themes.items():
+            lowered = df[text].str.lower()
+            for theme, keywords in lexicon.items():
+                pattern = '|'.join(re.escape(kw) for kw in keywords)
+                hits[f'{text}:{theme}'] = lowered.str.contains(pattern, regex=True).fillna(False).to_numpy(dtype=bool)
+        return pd.DataFrame(hits, index=df.index)
+
+    # ------------------------------------------------------------------------
+    # Aggregate
+    # ------------------------------------------------------------------------
+
+    @property
+    def grain(self):
+        """Dimensions of the finest grouping grain"""
+        return list(dict.fromkeys(dim for grouping in self.groupings for dim in grouping))
+
+    def part_keys(self):
+        """Key columns of each partial; every other column is an additive count or sum"""
+        dims = self.grain
+        return {
+            'kpi': dims + ['metric'],
+            'scores': dims + ['metric', 'value'],
+            'themes': dims,
+            'durations': dims + ['value']
+        }
+
+    def partials(self, df):
+        """One pass over respondents into mergeable sums at the finest grouping grain"""
+        dims = self.grain
+        keys = self.part_keys()
+        scores = df[self.scores].to_numpy(dtype=float)
+        valid = ~np.isnan(scores)
+        n_rows, n_metrics = scores.shape
+        thresholds = np.array([self.scales[self.columns[raw]['scale']]['top_box_min'] for raw in self.by_role['score']])
+
+        long = pd.DataFrame({dim: np.repeat(df[dim].astype(str).to_numpy(), n_metrics) for dim in dims})
+        long['metric'] = np.tile(self.scores, n_rows)
+        long['n'] = valid.reshape(-1).astype(int)
+        long['sum'] = np.where(valid, scores, 0).reshape(-1)
+        long['sumsq'] = np.where(valid, scores ** 2, 0).reshape(-1)
+        long['top2'] = (valid & (scores >= thresholds)).reshape(-1).astype(int)
+        long['promoter'] = (valid & (scores >= 9)).reshape(-1).astype(int)
+        long['detractor'] = (valid & (scores <= 6)).reshape(-1).astype(int)
+        parts = {'kpi': long.groupby(keys['kpi'], sort=False)[['n', 'sum', 'sumsq', 'top2', 'promoter', 'detractor']].sum().reset_index()}
+
+        # Exact tallies of each 0-10 value (scales have a handful of points)
+        answered = long[long['n'] == 1].assign(value=lambda x: np.round(x['sum'], 4), count=1)
+        parts['scores'] = answered.groupby(keys['scores'], sort=False)['count'].sum().reset_index()
+
+        hits = self.theme_hits(df)
+        theme_frame = pd.concat([df[dims].astype(str).reset_index(drop=True), hits.reset_index(drop=True).astype(int)], axis=1)
+        theme_frame['respondents'] = 1
+        parts['themes'] = theme_frame.groupby(keys['themes'], sort=False).sum(numeric_only=True).reset_index()
+
+        if self.by_role['duration']:
+            name = self.columns[self.by_role['duration'][0]]['name']
+            durations = df[dims].astype(str).reset_index(drop=True)
+            durations['value'] = sketch_values(df[name])
+            durations['count'] = 1
+            durations = durations.dropna(subset=['value'])
+            parts['durations'] = durations.groupby(keys['durations'], sort=False)['count'].sum().reset_index()
+
+        parts['respondents'] = len(df)
+        return parts
+
+    def merge_partials(self, parts_list):
+        """Reduce per-chunk partials: concatenate in chunk order and re-sum by key"""
+        keys = self.part_keys()
+        merged = {'respondents': sum(parts['respondents'] for parts in parts_list)}
+        for name, part_keys in keys.items():
+            frames = [parts[name] for parts in parts_list if name in parts]
+            if frames:
+                merged[name] = pd.concat(frames, ignore_index=True).groupby(part_keys, sort=False).sum().reset_index()
+        return merged
+
+    def roll_up(self, parts):
+        """KPI, theme and duration cubes for every grouping plus the overall row"""
+        dims = self.grain
+        kpi_base, score_base, theme_base = parts['kpi'], parts['scores'], parts['themes']
+        kpi_parts = []
+        theme_parts = []
+        duration_parts = []
+
+        for grouping in [[]] + self.groupings:
+            label = ' x '.join(grouping) if grouping else 'overall'
+
+            kpi = kpi_base.groupby(grouping + ['metric'], sort=False)[['n', 'sum', 'sumsq', 'top2', 'promoter', 'detractor']].sum().reset_index()
+            tallies = score_base.groupby(grouping + ['metric', 'value'], sort=False)['count'].sum().reset_index()
+            medians = tally_quantile(tallies, grouping + ['metric'], 0.5).rename(columns={'quantile': 'median_0_10'})
+            kpi = kpi.merge(medians, on=grouping + ['metric'], how='left')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                kpi['mean_0_10'] = np.round(kpi['sum'] / kpi['n'], 2)
+                variance = (kpi['sumsq'] - kpi['sum'] ** 2 / kpi['n']).clip(lower=0) / (kpi['n'] - 1)
+                kpi['std_0_10'] = np.round(np.sqrt(variance.where(kpi['n'] > 1)), 2)
+                kpi['top2_box_pct'] = np.round(kpi['top2'] / kpi['n'] * 100, 1)
+                kpi['promoter_pct'] = np.round(kpi['promoter'] / kpi['n'] * 100, 1)
+                kpi['detractor_pct'] = np.round(kpi['detractor'] / kpi['n'] * 100, 1)
+            kpi['median_0_10'] = np.round(kpi['median_0_10'], 2)
+            is_nps = kpi['metric'].isin(self.nps_scores)
+            kpi.loc[~is_nps, ['promoter_pct', 'detractor_pct']] = np.nan
+            kpi['nps_score'] = np.round(kpi['promoter_pct'] - kpi['detractor_pct'], 1)
+            kpi = kpi.rename(columns={'n': 'n_responses'}).drop(columns=['sum', 'sumsq', 'top2', 'promoter', 'detractor'])
+            kpi.insert(0, 'grouping', label)
+            kpi_parts.append(kpi[kpi['n_responses'] > 0])
+
+            if len(theme_base.columns) > len(dims) + 1:
+                theme_cols = [col for col in theme_base.columns if col not in dims]
+                if grouping:
+                    themes = theme_base.groupby(grouping, sort=False)[theme_cols].sum().reset_index()
+                else:
+                    themes = theme_base[theme_cols].sum().to_frame().T
+                themes = themes.melt(id_vars=grouping + ['respondents'], var_name='text_theme', value_name='mentions')
+                themes[['text', 'theme']] = themes['text_theme'].str.split(':', n=1, expand=True)
+                themes['prevalence_pct'] = np.round(themes['mentions'] / themes['respondents'] * 100, 1)
+                themes = themes.drop(columns=['text_theme'])
+                themes.insert(0, 'grouping', label)
+                theme_parts.append(themes[themes['mentions'] > 0])
+
+            if 'durations' in parts:
+                sketch = parts['durations'].groupby(grouping + ['value'], sort=False)['count'].sum().reset_index()
+                durations = sketch.assign(_all=0).groupby(grouping or ['_all'], sort=False)['count'].sum().reset_index()
+                durations = durations.drop(columns='_all', errors='ignore').rename(columns={'count': 'n_responses'})
+                for stat, q in DURATION_QUANTILES.items():
+                    values = tally_quantile(sketch, grouping, q).rename(columns={'quantile': f'duration_{stat}_s'})
+                    if grouping:
+                        durations = durations.merge(values, on=grouping, how='left')
+                    else:
+                        durations[f'duration_{stat}_s'] = values[f'duration_{stat}_s'].iloc[0]
+                    durations[f'duration_{stat}_s'] = np.round(durations[f'duration_{stat}_s'], 1)
+                durations.insert(0, 'grouping', label)
+                duration_parts.append(durations)
+
+        kpi_cube = pd.concat(kpi_parts, ignore_index=True)
+        kpi_cube = kpi_cube[['grouping'] + [dim for dim in dims if dim in kpi_cube.columns]
+                            + ['metric', 'n_responses', 'mean_0_10', 'median_0_10', 'std_0_10',
+                               'top2_box_pct', 'promoter_pct', 'detractor_pct', 'nps_score']]
+        cubes = {'kpi_cube': kpi_cube}
+
+        if theme_parts:
+            theme_cube = pd.concat(theme_parts, ignore_index=True)
+            cubes['themes_cube'] = theme_cube[['grouping'] + [dim for dim in dims if dim in theme_cube.columns]
+                                              + ['text', 'theme', 'respondents', 'mentions', 'prevalence_pct']]
+        if duration_parts:
+            duration_cube = pd.concat(duration_parts, ignore_index=True)
+            cubes['durations_cube'] = duration_cube[['grouping'] + [dim for dim in dims if dim in duration_cube.columns]
+                                                    + ['n_responses'] + [f'duration_{stat}_s' for stat in DURATION_QUANTILES]]
+        return cubes
+
+    def aggregate(self, df):
+        """All cubes for an in-memory respondent frame"""
+        return self.roll_up(self.partials(df))
+
+    # ------------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------------
+
+    def run(self, path=None):
+        """Execute the whole plan in memory; returns (respondents, cubes)"""
+        raw = self.load(path)
+        df = self.normalize(raw)
+        return df, self.aggregate(df)
+
+    def run_chunked(self, path=None, chunksize=100000, workers=1):
+        """
+        Out-of-core execution; returns (number of respondents, cubes).
+
+        Each chunk is normalized and reduced to partials (in a process pool
+        when workers > 1), partials are merged in chunk order, and the same
+        roll-up as the in-memory path runs once on the merged sums.
+        """
+        pending = []
+        for parts in self._map_chunks(self.iter_chunks(path, chunksize), workers):
+            pending.append(parts)
+            if len(pending) >= MERGE_EVERY:
+                pending = [self.merge_partials(pending)]
+        if not pending:
+            raise ValueError('No responses left after the spec filters')
+        merged = self.merge_partials(pending)
+        return merged['respondents'], self.roll_up(merged)
+
+    def _map_chunks(self, chunks, workers):
+        """Partials per chunk in input order, with a bounded number of chunks in flight"""
+        if workers <= 1:
+            for raw in chunks:
+                yield self.partials(self.normalize(raw))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+            in_flight = deque()
+            for raw in chunks:
+                in_flight.append(pool.submit(_chunk_partials, raw))
+                if len(in_flight) >= 2 * workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+# Worker-process state: the plan is sent once per worker, not once per chunk
+_WORKER_PLAN = None
+
+def _init_worker(plan):
+    global _WORKER_PLAN
+    _WORKER_PLAN = plan
+
+def _chunk_partials(raw):
+    return _WORKER_PLAN.partials(_WORKER_PLAN.normalize(raw))
+
+def compile_spec(spec_or_path):
+    """Compile a spec dict or spec file into a SurveyPlan"""
+    spec = load_spec(spec_or_path) if isinstance(spec_or_path, (str, os.PathLike)) else spec_or_path
+    spec.setdefault('_base_dir', os.getcwd())
+    return SurveyPlan(spec)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a declarative survey spec')
+    parser.add_argument('spec')
+    parser.add_argument('--input', help='Override the source path in the spec')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--store', action='store_true', help='Also ingest the overall KPI rows into the survey store')
+    parser.add_argument('--wave', help='Wave id for --store (default: the spec\'s survey name, replaced on every run)')
+    parser.add_argument('--chunksize', type=int, help='Stream the source in batches of this many rows (out-of-core mode)')
+    parser.add_argument('--workers', type=int, default=1, help='Processes reducing chunks in --chunksize mode')
+    args = parser.parse_args()
+    if args.chunksize and args.store:
+        parser.error('--store needs respondent rows; run without --chunksize')
+
+    plan = compile_spec(args.spec)
+    print("=" * 80)
+    print(f"{plan.title.upper()} - SPEC PIPELINE")
+    print("=" * 80)
+
+    if args.chunksize:
+        n_responses, cubes = plan.run_chunked(args.input, args.chunksize, args.workers)
+        print(f"\nStreamed {n_responses} responses in chunks of {args.chunksize:,} ({args.workers} worker(s))")
+    else:
+        df, cubes = plan.run(args.input)
+        print(f"\nLoaded {len(df)} responses ({len(plan.usecols)} projected columns)")
+    kpi_cube = cubes['kpi_cube']
+    print(f"[OK] Normalized {len(plan.scores)} scored items to 0-10")
+    print(f"[OK] KPI cube: {len(kpi_cube)} cells across {len(plan.groupings) + 1} groupings")
+    if 'themes_cube' in cubes:
+        print(f"[OK] Theme cube: {len(cubes['themes_cube'])} cells")
+    if 'durations_cube' in cubes:
+        print(f"[OK] Duration cube: {len(cubes['durations_cube'])} cells")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, cube in cubes.items():
+        if len(cube):
+            out_path = os.path.join(args.output_dir, f'{plan.prefix}_{name}.csv')
+            cube.to_csv(out_path, index=False)
+            print(f"[OK] Exported: {out_path}")
+
+    if args.store:
+        from survey_store import OVERALL, SurveyStore
+        overall = kpi_cube[kpi_cube['grouping'] == 'overall'].rename(columns={'mean_0_10': 'mean_score', 'top2_box_pct': 'positive_pct'})
+        overall = overall.assign(department=OVERALL, scale='0-10')
+        wave_id = args.wave or plan.survey
+        respondents = df.reset_index().rename(columns={'index': 'respondent_id'})
+        with SurveyStore() as store:
+            store.ingest_wave(wave_id, plan.survey, respondents, overall, plan.scores, label=plan.title)
+        print(f"[OK] Stored wave {wave_id}")
+
+if __name__ == '__main__':
+    main()
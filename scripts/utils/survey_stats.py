@@ -0,0 +1,251 @@
+"""
+Survey Statistics - Uncertainty Estimates for KPI Cells
+Batched bootstrap confidence intervals and Wilson intervals for proportions
+"""
+
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+N_REPLICATES = 10000
+CONFIDENCE = 0.95
+RANDOM_SEED = 2025
+
+# Cells are resampled in blocks so the (cells x replicates) matrix stays small
+CELL_BLOCK_SIZE = 256
+
+# ============================================================================
+# WILSON INTERVALS
+# ============================================================================
+
+def _z_score(confidence):
+    """Two-sided normal quantile for the given confidence level"""
+    return NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+def wilson_interval(successes, totals, confidence=CONFIDENCE):
+    """Wilson score interval for proportions (vectorized, returns 0-100 pct)"""
+    successes = np.asarray(successes, dtype=float)
+    totals = np.asarray(totals, dtype=float)
+    z = _z_score(confidence)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / totals
+        denom = 1 + z ** 2 / totals
+        center = (p + z ** 2 / (2 * totals)) / denom
+        half = z * np.sqrt(p * (1 - p) / totals + z ** 2 / (4 * totals ** 2)) / denom
+
+    low = np.where(totals > 0, np.clip(center - half, 0, 1) * 100, np.nan)
+    high = np.where(totals > 0, np.clip(center + half, 0, 1) * 100, np.nan)
+    return low, high
+
+# ============================================================================
+# BATCHED BOOTSTRAP
+# ============================================================================
+
+def poisson_weights(n_respondents, n_replicates=N_REPLICATES, seed=RANDOM_SEED):
+    """Respondents x replicates Poisson(1) resampling weights"""
+    rng = np.random.default_rng(seed)
+    return rng.poisson(1.0, size=(n_respondents, n_replicates)).astype(np.float32)
+
+def _cell_indicators(df, metric_cols, group_col=None):
+    """Build per-cell (group x metric) valid masks and values as column blocks"""
+    values = df[metric_cols].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+
+    if group_col is None:
+        groups = np.array(['Overall'], dtype=object)
+        group_ind = np.ones((len(df), 1), dtype=float)
+    else:
+        codes, groups = pd.factorize(df[group_col])
+        group_ind = np.zeros((len(df), len(groups)), dtype=float)
+        has_group = codes >= 0
+        group_ind[np.flatnonzero(has_group), codes[has_group]] = 1.0
+
+    # Columns ordered (group, metric): cell c = g * n_metrics + m
+    cell_valid = (group_ind[:, :, None] * valid[:, None, :]).reshape(len(df), -1)
+    cell_values = np.tile(values, (1, len(groups)))
+    return groups, cell_valid, cell_values
+
+def _percentiles(replicates, alpha):
+    """Row-wise percentile bounds, NaN for cells with no usable replicates"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low, high = np.nanpercentile(replicates, [alpha, 100 - alpha], axis=1)
+    return low, high
+
+def bootstrap_kpi_cells(df, metric_cols, nps_cols=(), group_col=None,
+                        n_replicates=N_REPLICATES, confidence=CONFIDENCE,
+                        seed=RANDOM_SEED, keep_replicates=(), weight_col=None):
+    """
+    Bootstrap every (group x metric) cell in one batched pass.
+
+    Mean, Top-2 Box and NPS replicates are all ratio estimators over the same
+    Poisson weight matrix, so each block of cells costs three matrix products.
+    With a survey weight column the Poisson weights are scaled by it, and the
+    Wilson interval is taken on the weighted share at the Kish effective n.
+    Returns (cells_df, replicates) where replicates maps metric name to the
+    groups, their point-estimate means and a (groups x replicates) array of
+    replicate means, for metrics in keep_replicates.
+    """
+    metric_cols = [col for col in metric_cols if col in df.columns]
+    groups, cell_valid, cell_values = _cell_indicators(df, metric_cols, group_col)
+    n_cells = cell_valid.shape[1]
+    n_metrics = len(metric_cols)
+
+    weights = poisson_weights(len(df), n_replicates, seed)
+    if weight_col is not None:
+        survey_weights = df[weight_col].to_numpy(dtype=float)
+        weights *= survey_weights.astype(np.float32)[:, None]
+    alpha = (1 - confidence) / 2 * 100
+    nps_mask = np.tile(np.isin(metric_cols, list(nps_cols)), len(groups))
+
+    mean_low = np.full(n_cells, np.nan)
+    mean_high = np.full(n_cells, np.nan)
+    nps_low = np.full(n_cells, np.nan)
+    nps_high = np.full(n_cells, np.nan)
+    kept = {metric: np.full((len(groups), n_replicates), np.nan) for metric in keep_replicates if metric in metric_cols}
+    kept_cells = {g * n_metrics + metric_cols.index(metric): (metric, g) for metric in kept for g in range(len(groups))}
+
+    for start in range(0, n_cells, CELL_BLOCK_SIZE):
+        block = slice(start, min(start + CELL_BLOCK_SIZE, n_cells))
+        v = cell_valid[:, block].astype(np.float32)
+        x = cell_values[:, block].astype(np.float32)
+
+        counts = v.T @ weights
+        sums = (v * x).T @ weights
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / counts
+        mean_low[block], mean_high[block] = _percentiles(means, alpha)
+
+        if nps_mask[block].any():
+            promoters = (v * (x >= 9)).T @ weights
+            detractors = (v * (x <= 6)).T @ weights
+            with np.errstate(divide='ignore', invalid='ignore'):
+                nps = (promoters - detractors) / counts * 100
+            low, high = _percentiles(nps, alpha)
+            nps_low[block] = np.where(nps_mask[block], low, np.nan)
+            nps_high[block] = np.where(nps_mask[block], high, np.nan)
+
+        for c in range(block.start, block.stop):
+            if c in kept_cells:
+                metric, g = kept_cells[c]
+                kept[metric][g] = means[c - block.start]
+
+    # Point estimates and Wilson intervals come straight from the cell masks
+    n = cell_valid.sum(axis=0)
+    top2 = (cell_valid * (cell_values >= 8.0)).sum(axis=0)
+    trials = n
+    if weight_col is not None:
+        w = survey_weights[:, None]
+        weighted_n = (cell_valid * w).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trials = weighted_n ** 2 / (cell_valid * w ** 2).sum(axis=0)
+            top2 = (cell_valid * w * (cell_values >= 8.0)).sum(axis=0) / weighted_n * trials
+    top2_low, top2_high = wilson_interval(top2, trials, confidence)
+
+    cell_weights = cell_valid if weight_col is None else cell_valid * survey_weights[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        point = (cell_weights * cell_values).sum(axis=0) / cell_weights.sum(axis=0)
+
+    cells = pd.DataFrame({
+        'group': np.repeat(groups, n_metrics),
+        'metric': np.tile(metric_cols, len(groups)),
+        'n_responses': n.astype(int),
+        'mean_ci_low': np.round(mean_low, 2),
+        'mean_ci_high': np.round(mean_high, 2),
+        'top2_ci_low': np.round(top2_low, 1),
+        'top2_ci_high': np.round(top2_high, 1),
+        'nps_ci_low': np.round(nps_low, 1),
+        'nps_ci_high': np.round(nps_high, 1)
+    })
+
+    # Fully empty cells have no estimate and no interval
+    empty = cells['n_responses'] == 0
+    cells.loc[empty, ['mean_ci_low', 'mean_ci_high', 'nps_ci_low', 'nps_ci_high']] = np.nan
+
+    replicates = {metric: {'groups': list(groups), 'point': point[metric_cols.index(metric)::n_metrics], 'values': reps}
+                  for metric, reps in kept.items()}
+    return cells, replicates
+
+# ============================================================================
+# GAP TESTING
+# ============================================================================
+
+def holm_adjust(p_values):
+    """Holm step-down adjusted p-values (family-wise error control, any dependence)"""
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    order = np.argsort(p_values)
+    stepped = np.maximum.accumulate(p_values[order] * (m - np.arange(m)))
+    adjusted = np.empty(m)
+    adjusted[order] = np.minimum(stepped, 1.0)
+    return adjusted
+
+def significant_gaps(group_replicates, confidence=CONFIDENCE, min_n=None, group_n=None, adjust='holm'):
+    """
+    Pairwise group differences that stay significant after a multiplicity correction.
+
+    group_replicates is {'groups': [...], 'point': [...], 'values': (groups x replicates)}.
+    Groups are disjoint respondent sets, so replicate columns are independent
+    draws and the difference of two rows is a draw of the difference. Each
+    pair gets the point-estimate difference, its percentile CI and a two-sided
+    bootstrap p-value; across all pairs tested the p-values are Holm-adjusted
+    (adjust='bonferroni' or None for the alternatives), and a gap is kept
+    when the adjusted p-value is below 1 - confidence.
+    """
+    columns = ['group_a', 'group_b', 'diff', 'diff_ci_low', 'diff_ci_high', 'p_value', 'p_adjusted']
+    groups = list(group_replicates['groups'])
+    point = np.asarray(group_replicates['point'], dtype=float)
+    values = group_replicates['values']
+    alpha = (1 - confidence) / 2 * 100
+
+    keep = np.ones(len(groups), dtype=bool)
+    if min_n is not None and group_n is not None:
+        keep = np.array([group_n.get(g, 0) >= min_n for g in groups])
+
+    idx = np.flatnonzero(keep & ~np.isnan(point) & ~np.all(np.isnan(values), axis=1))
+    if len(idx) < 2:
+        return pd.DataFrame(columns=columns)
+
+    a, b = np.triu_indices(len(idx), k=1)
+    diffs = values[idx[a]] - values[idx[b]]
+    low, high = _percentiles(diffs, alpha)
+
+    # Two-sided bootstrap p-value: twice the smaller tail beyond zero (+1 so it is never 0)
+    usable = (~np.isnan(diffs)).sum(axis=1)
+    below = np.minimum((diffs <= 0).sum(axis=1), (diffs >= 0).sum(axis=1))
+    p_values = np.minimum(1.0, 2 * (below + 1) / (usable + 1))
+    if adjust == 'holm':
+        p_adjusted = holm_adjust(p_values)
+    elif adjust == 'bonferroni':
+        p_adjusted = np.minimum(1.0, p_values * len(p_values))
+    elif adjust is None:
+        p_adjusted = p_values
+    else:
+        raise ValueError(f"Unknown adjustment '{adjust}' (use 'holm', 'bonferroni' or None)")
+
+    gaps = pd.DataFrame({
+        'group_a': [groups[i] for i in idx[a]],
+        'group_b': [groups[i] for i in idx[b]],
+        'diff': np.round(point[idx[a]] - point[idx[b]], 2),
+        'diff_ci_low': np.round(low, 2),
+        'diff_ci_high': np.round(high, 2),
+        'p_value': np.round(p_values, 4),
+        'p_adjusted': np.round(p_adjusted, 4)
+    })
+    gaps = gaps[p_adjusted < 1 - confidence].copy()
+
+    # Orient every pair so group_a is the higher-scoring unit
+    flip = gaps['diff'] < 0
+    gaps.loc[flip, ['group_a', 'group_b']] = gaps.loc[flip, ['group_b', 'group_a']].to_numpy()
+    gaps.loc[flip, 'diff'] = -gaps.loc[flip, 'diff']
+    gaps.loc[flip, ['diff_ci_low', 'diff_ci_high']] = -gaps.loc[flip, ['diff_ci_high', 'diff_ci_low']].to_numpy()
+    return gaps.sort_values('diff', ascending=False).reset_index(drop=True)
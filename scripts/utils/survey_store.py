@@ -0,0 +1,289 @@
+"""
+Survey Store - Persistent Multi-Wave Analytical Store
+Respondent-level scores and KPI cubes for every survey wave in one embedded database
+
+Usage:
+    python survey_store.py waves
+    python survey_store.py trend --survey staff-dev --metric Overall_NPS
+    python survey_store.py compare staff-dev-2025 staff-dev-2026 [--department "College of Science"]
+"""
+
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_STORE_PATH = os.environ.get('SURVEY_STORE', 'survey_store.sqlite')
+
+# Department label used for whole-survey rows in the KPI cube
+OVERALL = 'All'
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS waves (
+        wave_id TEXT PRIMARY KEY,
+        survey TEXT NOT NULL,
+        label TEXT,
+        period_start TEXT,
+        period_end TEXT,
+        n_respondents INTEGER,
+        ingested_at TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS responses (
+        wave_id TEXT NOT NULL,
+        respondent_id TEXT NOT NULL,
+        department TEXT,
+        metric TEXT NOT NULL,
+        value DOUBLE
+    )''',
+    '''CREATE TABLE IF NOT EXISTS kpis (
+        wave_id TEXT NOT NULL,
+        department TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        mean_score DOUBLE,
+        positive_pct DOUBLE,
+        n_responses INTEGER,
+        nps_score DOUBLE,
+        scale TEXT
+    )''',
+    # Bumped in every ingest transaction; version() for HTTP validators and response caches
+    'CREATE TABLE IF NOT EXISTS store_revision (revision INTEGER NOT NULL)',
+    'INSERT INTO store_revision SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM store_revision)',
+    'CREATE INDEX IF NOT EXISTS idx_waves_survey ON waves (survey)',
+    'CREATE INDEX IF NOT EXISTS idx_responses_wave ON responses (wave_id, department, metric)',
+    'CREATE INDEX IF NOT EXISTS idx_responses_metric ON responses (metric, wave_id)',
+    'CREATE INDEX IF NOT EXISTS idx_kpis_wave ON kpis (wave_id, department, metric)',
+    'CREATE INDEX IF NOT EXISTS idx_kpis_metric ON kpis (metric, department, wave_id)'
+]
+
+KPI_COLUMNS = ['wave_id', 'department', 'metric', 'mean_score', 'positive_pct', 'n_responses', 'nps_score', 'scale']
+
+def department_labels(values):
+    """Department labels as stripped text; missing and blank ones become None (stored as NULL)"""
+    text = pd.Series(values, dtype='string').str.strip()
+    return text.astype(object).where(text.fillna('') != '', None).to_numpy()
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class SurveyStore:
+    """Embedded store over SQLite (default) or DuckDB (*.duckdb paths)"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.is_duckdb = str(path).endswith('.duckdb')
+
+        if self.is_duckdb:
+            import duckdb
+            self.con = duckdb.connect(str(path))
+        else:
+            self.con = sqlite3.connect(str(path))
+            self.con.execute('PRAGMA journal_mode=WAL')
+            self.con.execute('PRAGMA synchronous=NORMAL')
+
+        for statement in SCHEMA:
+            self.con.execute(statement)
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _query(self, sql, params=()):
+        """Run a read query and return a DataFrame"""
+        if self.is_duckdb:
+            return self.con.execute(sql, list(params)).df()
+        return pd.read_sql_query(sql, self.con, params=list(params))
+
+    # ------------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------------
+
+    def ingest_wave(self, wave_id, survey, respondents, kpis, metric_cols,
+                    department_col=None, respondent_col='respondent_id',
+                    label=None, period=(None, None)):
+        """
+        Replace one wave's respondent rows and KPI cube.
+
+        respondents is wide (one row per respondent, one column per metric);
+        it is melted to (respondent, department, metric, value) here.
+        kpis must carry the KPI_COLUMNS names except wave_id.
+        """
+        metric_cols = [col for col in metric_cols if col in respondents.columns]
+        wide = pd.DataFrame({
+            'respondent_id': respondents[respondent_col].astype(str).to_numpy(),
+            'department': department_labels(respondents[department_col]) if department_col else OVERALL
+        })
+        values = respondents[metric_cols].to_numpy(dtype=float)
+        n_rows, n_metrics = values.shape
+
+        long = pd.DataFrame({
+            'wave_id': wave_id,
+            'respondent_id': np.repeat(wide['respondent_id'].to_numpy(), n_metrics),
+            'department': np.repeat(wide['department'].to_numpy(), n_metrics),
+            'metric': np.tile(metric_cols, n_rows),
+            'value': values.reshape(-1)
+        })
+        long = long[long['value'].notna()]
+        long['department'] = long['department'].astype(object).where(long['department'].notna(), None)
+
+        kpi_rows = kpis.copy()
+        kpi_rows['wave_id'] = wave_id
+        if 'department' in kpi_rows.columns:
+            kpi_rows['department'] = department_labels(kpi_rows['department'])
+        for col in KPI_COLUMNS:
+            if col not in kpi_rows.columns:
+                kpi_rows[col] = None
+        kpi_rows = kpi_rows[KPI_COLUMNS].astype(object).where(kpi_rows[KPI_COLUMNS].notna(), None)
+
+        wave_row = (wave_id, survey, label or wave_id,
+                    None if period[0] is None else str(period[0]),
+                    None if period[1] is None else str(period[1]),
+                    int(n_rows), datetime.now().isoformat(timespec='seconds'))
+
+        # One transaction on both engines (a DuckDB cursor is a separate connection, so use the connection itself)
+        cur = self.con if self.is_duckdb else self.con.cursor()
+        cur.execute('BEGIN TRANSACTION')
+        try:
+            for table in ('responses', 'kpis', 'waves'):
+                cur.execute(f'DELETE FROM {table} WHERE wave_id = ?', [wave_id])
+            cur.execute('INSERT INTO waves VALUES (?, ?, ?, ?, ?, ?, ?)', wave_row)
+            cur.executemany('INSERT INTO responses VALUES (?, ?, ?, ?, ?)',
+                            long.itertuples(index=False, name=None))
+            cur.executemany(f'INSERT INTO kpis VALUES ({", ".join("?" * len(KPI_COLUMNS))})',
+                            kpi_rows.itertuples(index=False, name=None))
+            cur.execute('UPDATE store_revision SET revision = revision + 1')
+            self.con.commit()
+        except Exception:
+            self.con.rollback()
+            raise
+        return len(long), len(kpi_rows)
+
+    # ------------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------------
+
+    def waves(self, survey=None):
+        """List ingested waves, oldest first"""
+        sql = 'SELECT * FROM waves'
+        params = []
+        if survey:
+            sql += ' WHERE survey = ?'
+            params.append(survey)
+        return self._query(sql + ' ORDER BY period_start, wave_id', params)
+
+    def trend(self, survey, metric, department=OVERALL):
+        """One metric across every wave of a survey"""
+        sql = '''
+            SELECT w.wave_id, w.label, w.period_start, k.department, k.metric,
+                   k.mean_score, k.positive_pct, k.nps_score, k.n_responses
+            FROM kpis k JOIN waves w ON w.wave_id = k.wave_id
+            WHERE w.survey = ? AND k.metric = ? AND k.department = ?
+            ORDER BY w.period_start, w.wave_id
+        '''
+        return self._query(sql, [survey, metric, department])
+
+    def compare(self, wave_a, wave_b, metric=None, department=OVERALL):
+        """Side-by-side KPIs for two waves with deltas (b minus a)"""
+        sql = '''
+            SELECT a.department, a.metric,
+                   a.mean_score AS mean_a, b.mean_score AS mean_b,
+                   b.mean_score - a.mean_score AS mean_delta,
+                   a.positive_pct AS positive_a, b.positive_pct AS positive_b,
+                   b.positive_pct - a.positive_pct AS positive_delta,
+                   a.nps_score AS nps_a, b.nps_score AS nps_b,
+                   a.n_responses AS n_a, b.n_responses AS n_b
+            FROM kpis a JOIN kpis b
+              ON a.department = b.department AND a.metric = b.metric
+            WHERE a.wave_id = ? AND b.wave_id = ?
+        '''
+        params = [wave_a, wave_b]
+        if department is not None:
+            sql += ' AND a.department = ?'
+            params.append(department)
+        if metric is not None:
+            sql += ' AND a.metric = ?'
+            params.append(metric)
+        return self._query(sql + ' ORDER BY a.department, a.metric', params)
+
+    def kpis(self, survey=None, wave=None, department=None, metric=None):
+        """KPI cube slice; each filter is a value or a list of values"""
+        sql = '''
+            SELECT w.survey, k.wave_id, w.label, w.period_start, k.department, k.metric,
+                   k.mean_score, k.positive_pct, k.nps_score, k.n_responses, k.scale
+            FROM kpis k JOIN waves w ON w.wave_id = k.wave_id
+            WHERE 1 = 1
+        '''
+        params = []
+        for column, value in (('w.survey', survey), ('k.wave_id', wave), ('k.department', department), ('k.metric', metric)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            sql += f' AND {column} IN ({", ".join("?" * len(values))})'
+            params.extend(values)
+        return self._query(sql + ' ORDER BY w.period_start, k.wave_id, k.department, k.metric', params)
+
+    def version(self):
+        """Store revision, incremented by every ingest (for HTTP validators and response caches)"""
+        return str(self.con.execute('SELECT revision FROM store_revision').fetchone()[0])
+
+    def respondents(self, wave_id, metric=None, department=None):
+        """Respondent-level scores for one wave"""
+        sql = 'SELECT respondent_id, department, metric, value FROM responses WHERE wave_id = ?'
+        params = [wave_id]
+        if department is not None:
+            sql += ' AND department = ?'
+            params.append(department)
+        if metric is not None:
+            sql += ' AND metric = ?'
+            params.append(metric)
+        return self._query(sql, params)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the multi-wave survey store')
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    waves_cmd = sub.add_parser('waves')
+    waves_cmd.add_argument('--survey')
+
+    trend_cmd = sub.add_parser('trend')
+    trend_cmd.add_argument('--survey', required=True)
+    trend_cmd.add_argument('--metric', required=True)
+    trend_cmd.add_argument('--department', default=OVERALL)
+
+    compare_cmd = sub.add_parser('compare')
+    compare_cmd.add_argument('wave_a')
+    compare_cmd.add_argument('wave_b')
+    compare_cmd.add_argument('--metric')
+    compare_cmd.add_argument('--department', default=OVERALL)
+
+    args = parser.parse_args()
+    with SurveyStore(args.store) as store:
+        if args.command == 'waves':
+            result = store.waves(args.survey)
+        elif args.command == 'trend':
+            result = store.trend(args.survey, args.metric, args.department)
+        else:
+            result = store.compare(args.wave_a, args.wave_b, args.metric, args.department)
+
+    print(result.to_string(index=False) if len(result) else 'No matching rows')
+
+if __name__ == '__main__':
+    main()
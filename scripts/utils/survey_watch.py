@@ -0,0 +1,408 @@
+"""
+Survey Watch - Drop-Folder Daemon for Spec Pipelines
+Debounces new exports, matches each to its survey spec and republishes that spec's dashboard payloads
+
+Usage:
+    python survey_watch.py ~/Downloads [more folders] [--specs '../specs/*.yaml'] [--once]
+
+A file is picked up once its size and mtime have held still for --settle seconds
+(browsers and Excel write in pieces). Settled files are matched to the spec whose
+projected columns they contain; a burst of drops for one spec coalesces into a
+single run on the newest export. Runs go through the stage cache, so only the
+stages whose inputs changed are recomputed, and every published file is swapped
+in with an atomic rename.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from dashboard_assets import DASHBOARDS, build_dashboard, dashboard_for
+from stage_cache import DEFAULT_DIR, StageCache, file_digest
+from survey_spec import compile_spec, sketch_values, tally_quantile
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'specs')
+DEFAULT_PUBLISH_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'outputs', 'watch')
+
+POLL_SECONDS = 0.5
+SETTLE_SECONDS = 2.0
+
+EXPORT_FORMATS = {'.csv': 'csv', '.xlsx': 'excel', '.xls': 'excel'}
+# Lock files and in-progress downloads never match, whatever their extension
+PARTIAL_PATTERNS = ('~$*', '.~lock*', '*.crdownload', '*.part', '*.partial', '*.download', '*.tmp')
+
+# Columns outputs.publish_requires may ask for on an NPS score column: <raw>_numeric / <raw>_category
+NPS_CATEGORIES = [(9, 'Promoter'), (7, 'Passive'), (0, 'Detractor')]   # lowest score of each category
+NO_RESPONSE = 'No Response'
+
+# ============================================================================
+# SPEC MATCHING
+# ============================================================================
+
+def load_plans(spec_glob):
+    """Compiled plans for every spec file matching the glob"""
+    return [compile_spec(path) for path in sorted(glob.glob(spec_glob))]
+
+def export_format(path):
+    """'csv' / 'excel' for candidate exports, None for anything to ignore"""
+    name = os.path.basename(path)
+    if any(fnmatch.fnmatch(name, pattern) for pattern in PARTIAL_PATTERNS):
+        return None
+    return EXPORT_FORMATS.get(os.path.splitext(name)[1].lower())
+
+def read_header(path, fmt, header_row):
+    """Column names only; no data rows are parsed"""
+    if fmt == 'excel':
+        return set(pd.read_excel(path, header=header_row, nrows=0).columns)
+    return set(pd.read_csv(path, header=header_row, nrows=0).columns)
+
+def match_spec(path, plans):
+    """
+    The plan this export belongs to, or None.
+
+    A spec matches when the file has its format, passes its optional
+    source.match filename glob and contains every projected column; the
+    spec needing the most columns wins, so a superset export is not
+    claimed by a looser spec.
+    """
+    fmt = export_format(path)
+    headers = {}
+    best = None
+    for plan in plans:
+        if plan.source.get('format', 'csv') != fmt:
+            continue
+        pattern = plan.source.get('match')
+        if pattern and not fnmatch.fnmatch(os.path.basename(path), pattern):
+            continue
+        header_row = plan.source.get('header_row', 0)
+        if header_row not in headers:
+            try:
+                headers[header_row] = read_header(path, fmt, header_row)
+            except (ValueError, OSError, pd.errors.ParserError):
+                headers[header_row] = set()
+        if set(plan.usecols) <= headers[header_row] and (best is None or len(plan.usecols) > len(best.usecols)):
+            best = plan
+    return best
+
+# ============================================================================
+# INCREMENTAL REFRESH
+# ============================================================================
+
+def spec_config(plan, *keys):
+    """The parts of a spec a stage reads (never its file location)"""
+    spec = plan.spec
+    config = {key: spec.get(key) for key in keys}
+    if 'source' in config:
+        config['source'] = {k: v for k, v in spec['source'].items() if k not in ('path', 'match')}
+    return config
+
+def refresh(plan, path, cache):
+    """
+    Load -> normalize -> cubes for one export through the stage cache.
+
+    Returns (cubes key, respondents, cubes). An export whose bytes were seen
+    before, or a spec edit that only touches themes or groupings, reuses the
+    upstream stages.
+    """
+    name = plan.survey
+    df_raw, load_key = cache.run(f'{name}.load', plan.load, path, deps=[file_digest(path)],
+                                 config=spec_config(plan, 'source', 'columns'),
+                                 code=[plan._check_columns, plan._filter])
+    df, norm_key = cache.run(f'{name}.normalize', plan.normalize, df_raw, deps=[load_key],
+                             config=spec_config(plan, 'columns', 'scales'), code=[plan._scale_to_10])
+    cubes, cube_key = cache.run(f'{name}.cubes', plan.aggregate, df, deps=[norm_key],
+                                config=spec_config(plan, 'columns', 'scales', 'themes', 'groupings'),
+                                code=[plan.theme_hits, plan.partials, plan.merge_partials, plan.roll_up,
+                                      sketch_values, tally_quantile])
+    return cube_key, df, cubes
+
+# ============================================================================
+# ATOMIC PUBLISH
+# ============================================================================
+
+def publish_dir(plan, default_root):
+    """outputs.publish (relative to the spec) or <default_root>/<survey>"""
+    target = plan.spec.get('outputs', {}).get('publish')
+    if target is None:
+        return os.path.join(default_root, plan.survey)
+    return target if os.path.isabs(target) else os.path.join(plan.spec['_base_dir'], target)
+
+def _replace(target_dir, name, write):
+    """Write into a temp file beside the target, then rename over it"""
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=f'.{name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; dashboards are served to others
+        os.replace(tmp_path, os.path.join(target_dir, name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _nps_category(scores):
+    """Promoter / Passive / Detractor by 0-10 score, No Response when blank"""
+    category = pd.Series(NO_RESPONSE, index=scores.index, dtype=object)
+    for low, label in reversed(NPS_CATEGORIES):
+        category[scores >= low] = label
+    return category
+
+def published_source(plan, path):
+    """
+    The export with the derived columns outputs.publish_requires names.
+
+    A dashboard that reads the published export may need columns Qualtrics
+    does not write: <raw>_numeric (the 0-10 answer) and <raw>_category
+    (Promoter / Passive / Detractor) of an NPS score column. Those are added;
+    any other required column must already be in the export, or nothing is
+    published. Returns None when the export can be copied as is.
+    """
+    required = plan.spec.get('outputs', {}).get('publish_requires', [])
+    if not required:
+        return None
+    header, skip = plan.source.get('header_row', 0), plan.source.get('skip_rows', []) or None
+    if plan.source.get('format', 'csv') == 'excel':
+        raw = pd.read_excel(path, sheet_name=plan.source.get('sheet', 0), header=header, skiprows=skip, dtype=str)
+    else:
+        raw = pd.read_csv(path, header=header, skiprows=skip, dtype=str, keep_default_na=False, na_values=[''])
+
+    nps_columns = {raw_col for raw_col in plan.by_role['score'] if plan.columns[raw_col]['scale'] == 'nps'}
+    for col in required:
+        base, _, kind = col.rpartition('_')
+        if base not in nps_columns or kind not in ('numeric', 'category'):
+            continue
+        low, high = plan.scales['nps']['points']
+        scores = pd.to_numeric(raw[base], errors='coerce')
+        scores = scores.where((scores >= low) & (scores <= high))
+        raw[col] = scores if kind == 'numeric' else _nps_category(scores)
+
+    missing = [col for col in required if col not in raw.columns]
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} lacks columns the dashboard needs and none can be derived: {missing}; "
+                         f"not published")
+    return raw
+
+def publish(plan, path, n_respondents, cubes, default_root):
+    """
+    Swap in every payload for one spec; returns the files written.
+
+    Cube CSVs and (with outputs.publish_source) the export itself go first and
+    <prefix>_dashboard.json last, so a reader that sees the new manifest also
+    sees the files it describes. The export gains the derived columns
+    outputs.publish_requires names, and is checked for the rest before
+    anything is written. Each file is replaced atomically.
+    """
+    target_dir = publish_dir(plan, default_root)
+    source_name = plan.spec.get('outputs', {}).get('publish_source')
+    source = published_source(plan, path) if source_name else None
+    os.makedirs(target_dir, exist_ok=True)
+    written = []
+
+    if source_name:
+        if source is None:
+            _replace(target_dir, source_name, lambda tmp: shutil.copyfile(path, tmp))
+        else:
+            _replace(target_dir, source_name, lambda tmp: source.to_csv(tmp, index=False))
+        written.append(source_name)
+
+    for cube_name, cube in cubes.items():
+        if len(cube):
+            file_name = f'{plan.prefix}_{cube_name}.csv'
+            _replace(target_dir, file_name, lambda tmp, cube=cube: cube.to_csv(tmp, index=False))
+            written.append(file_name)
+
+    manifest = {
+        'survey': plan.survey,
+        'title': plan.title,
+        'source_file': os.path.basename(path),
+        'refreshed_at': datetime.now().isoformat(timespec='seconds'),
+        'n_respondents': int(n_respondents),
+        'files': written,
+        'cubes': {cube_name: json.loads(cube.to_json(orient='records')) for cube_name, cube in cubes.items()}
+    }
+    manifest_name = f'{plan.prefix}_dashboard.json'
+
+    def write_manifest(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    _replace(target_dir, manifest_name, write_manifest)
+    written.append(manifest_name)
+
+    # A dashboard that loads the export through a hashed data asset gets it rebuilt
+    dashboard = dashboard_for(target_dir)
+    if dashboard and source_name in DASHBOARDS[dashboard][2].values():
+        for _, href, changed in build_dashboard(dashboard, os.path.dirname(os.path.abspath(target_dir))):
+            if changed:
+                written.append(href)
+    return target_dir, written
+
+def process(plan, path, cache_dir, default_root, last_key=None):
+    """One coalesced run (blocking; called off the event loop). Returns the cubes key."""
+    cache = StageCache(cache_dir)
+    start = time.perf_counter()
+    cube_key, df, cubes = refresh(plan, path, cache)
+    if cube_key == last_key:
+        print(f"[OK] {plan.survey}: {os.path.basename(path)} changes no cube; nothing to publish ({cache.report()})")
+        return cube_key
+    target_dir, written = publish(plan, path, len(df), cubes, default_root)
+    elapsed = time.perf_counter() - start
+    print(f"[OK] {plan.survey}: published {len(written)} files to {target_dir} in {elapsed:.2f}s ({cache.report()})")
+    return cube_key
+
+# ============================================================================
+# WATCHER
+# ============================================================================
+
+class DropWatcher:
+    """Polls drop folders, debounces partial writes and coalesces bursts per spec"""
+
+    def __init__(self, folders, plans, cache_dir=DEFAULT_DIR, publish_root=DEFAULT_PUBLISH_ROOT,
+                 settle=SETTLE_SECONDS, poll=POLL_SECONDS):
+        self.folders = folders
+        self.plans = plans
+        self.cache_dir = cache_dir
+        self.publish_root = publish_root
+        self.settle = settle
+        self.poll = poll
+
+        self.seen = {}       # path -> (size, mtime) already handled
+        self.changing = {}   # path -> ((size, mtime), monotonic time of last change)
+        self.ready = {}      # survey -> (plan, path, mtime) newest settled export awaiting a run
+        self.running = {}    # survey -> asyncio.Task
+        self.published = {}  # survey -> cubes key of the last publish
+
+    def scan(self):
+        """Current (size, mtime) of every candidate export in the drop folders"""
+        found = {}
+        for folder in self.folders:
+            try:
+                entries = list(os.scandir(folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_file() and export_format(entry.path):
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_size, stat.st_mtime)
+        return found
+
+    def mark_existing(self):
+        """Treat whatever is already in the folders as handled (default on startup)"""
+        self.seen.update(self.scan())
+
+    async def settle_files(self, now):
+        """Move files that stopped changing into the per-spec ready set"""
+        found = self.scan()
+        for path in list(self.changing):
+            if path not in found:
+                del self.changing[path]  # removed or renamed before it settled
+        for path, signature in found.items():
+            if self.seen.get(path) == signature:
+                continue
+            previous = self.changing.get(path)
+            if previous is None or previous[0] != signature:
+                self.changing[path] = (signature, now)
+
+        for path, (signature, since) in list(self.changing.items()):
+            if now - since < self.settle:
+                continue
+            del self.changing[path]
+            self.seen[path] = signature
+            plan = await asyncio.to_thread(match_spec, path, self.plans)
+            if plan is None:
+                print(f"[!] {os.path.basename(path)}: no spec matches its columns; ignored")
+                continue
+            queued = self.ready.get(plan.survey)
+            if queued and queued[2] > signature[1]:
+                print(f"[OK] {plan.survey}: {os.path.basename(path)} superseded by {os.path.basename(queued[1])}")
+                continue
+            if queued:
+                print(f"[OK] {plan.survey}: {os.path.basename(queued[1])} superseded by {os.path.basename(path)}")
+            self.ready[plan.survey] = (plan, path, signature[1])
+
+    def start_runs(self):
+        """Run every ready spec once the folders are quiet and its previous run is done"""
+        if self.changing:
+            return  # still receiving a burst; wait so it lands in one run
+        for survey in list(self.ready):
+            task = self.running.get(survey)
+            if task is not None and not task.done():
+                continue
+            plan, path, _ = self.ready.pop(survey)
+            self.running[survey] = asyncio.create_task(self._run(plan, path))
+
+    async def _run(self, plan, path):
+        try:
+            self.published[plan.survey] = await asyncio.to_thread(
+                process, plan, path, self.cache_dir, self.publish_root, self.published.get(plan.survey))
+        except Exception as exc:  # keep watching; the next drop gets a fresh attempt
+            print(f"[!] {plan.survey}: {os.path.basename(path)} failed: {exc}")
+
+    async def drain(self):
+        """Wait for in-flight runs (used by --once and on shutdown)"""
+        if self.running:
+            await asyncio.gather(*self.running.values())
+
+    async def watch(self, once=False):
+        """Poll until cancelled; with once, stop after the current contents are published"""
+        while True:
+            now = time.monotonic()
+            await self.settle_files(now)
+            self.start_runs()
+            if once and not self.changing and not self.ready:
+                await self.drain()
+                if not self.ready:
+                    return
+            await asyncio.sleep(self.poll)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch drop folders and refresh survey dashboards')
+    parser.add_argument('folders', nargs='+')
+    parser.add_argument('--specs', default=os.path.join(SPEC_DIR, '*.yaml'), help='Glob of survey specs to match against')
+    parser.add_argument('--publish-root', default=DEFAULT_PUBLISH_ROOT,
+                        help='Where specs without outputs.publish are published (one folder per survey)')
+    parser.add_argument('--cache-dir', default=DEFAULT_DIR, help='Stage cache directory (env STAGE_CACHE_DIR)')
+    parser.add_argument('--settle', type=float, default=SETTLE_SECONDS, help='Seconds a file must stay unchanged')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS)
+    parser.add_argument('--existing', action='store_true', help='Also process files already in the folders')
+    parser.add_argument('--once', action='store_true', help='Process the current contents and exit (implies --existing)')
+    args = parser.parse_args()
+
+    plans = load_plans(args.specs)
+    if not plans:
+        parser.error(f'No specs match {args.specs}')
+
+    print("=" * 80)
+    print("SURVEY WATCH")
+    print("=" * 80)
+    print(f"\nFolders: {', '.join(args.folders)}")
+    print(f"Specs: {', '.join(plan.survey for plan in plans)}")
+
+    watcher = DropWatcher(args.folders, plans, args.cache_dir, args.publish_root, args.settle, args.poll)
+    if not (args.existing or args.once):
+        watcher.mark_existing()
+
+    try:
+        asyncio.run(watcher.watch(once=args.once))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Survey Weights - Raking (Iterative Proportional Fitting) to Headcount Margins
+Weights respondents so every department (and role, where the export has one) counts in proportion to its headcount
+
+Usage:
+    from survey_weights import effective_n, load_margins, rake
+    raking = rake(df, load_margins('headcounts.csv'), columns={'department': DEPT_COL})
+    df['weight'] = raking.weights
+
+    python survey_weights.py responses.csv headcounts.csv [--column department="Dept column"] [--output weights.csv]
+
+Headcounts are a CSV with one row per category: margin, category, headcount
+(for example "department,Finance,42"). A margin names a respondent column, or
+is mapped to one with columns=. Margins the export does not carry are skipped
+with a warning, so one headcount file serves every survey.
+
+Each respondent's category in each margin is one column of an integer code
+matrix (respondents x margins): the column indices of the respondent x category
+indicator matrix, without materializing it. A raking sweep rescales the weights
+margin by margin with one bincount and one gather, so a sweep costs O(respondents
+x margins) however many categories (or cells of a cross-classification) there
+are; all margins are checked for convergence with a single bincount over the
+whole matrix. With one margin, raking is post-stratification and converges in
+one sweep. Respondents with no category in a margin (blank, or not on the
+headcount list) keep their weight through that margin; those whose answer is
+not on the list are counted in a warning. Categories nobody answered from are
+dropped with a warning.
+
+Weights are scaled to a mean of 1, so weighted counts read as respondents.
+Estimates made with them report the Kish effective sample size,
+(sum w)^2 / sum w^2: the number of unweighted responses with the same precision.
+"""
+
+import argparse
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6           # largest relative gap between a weighted margin share and its target
+
+MARGIN_COLUMNS = ['margin', 'category', 'headcount']
+
+Raking = namedtuple('Raking', ['weights', 'margins', 'iterations', 'converged'])
+
+# ============================================================================
+# MARGINS
+# ============================================================================
+
+def load_margins(path):
+    """{margin: {category: headcount}} from a margin, category, headcount CSV"""
+    table = pd.read_csv(path, dtype={'margin': str, 'category': str})
+    missing = [col for col in MARGIN_COLUMNS if col not in table.columns]
+    if missing:
+        raise ValueError(f"{path} needs the columns {MARGIN_COLUMNS} (missing {missing})")
+    table['margin'] = table['margin'].str.strip()
+    table['category'] = table['category'].str.strip()
+    table = table.groupby(['margin', 'category'], sort=False)['headcount'].sum().reset_index()
+    return {margin: dict(zip(rows['category'], rows['headcount'].astype(float)))
+            for margin, rows in table.groupby('margin', sort=False)}
+
+def effective_n(weights):
+    """Kish effective sample size (sum w)^2 / sum w^2"""
+    weights = np.asarray(weights, dtype=float)
+    return float(weights.sum() ** 2 / (weights ** 2).sum()) if len(weights) else 0.0
+
+def _code_matrix(df, margins, columns):
+    """(respondents x margins codes into the stacked categories, margin of each category, target shares, report rows)"""
+    codes, margin_of, shares, rows, offset = [], [], [], [], 0
+    for margin, headcounts in margins.items():
+        col = columns.get(margin, margin)
+        if col not in df.columns:
+            warnings.warn(f"Margin '{margin}' skipped: no column '{col}' in the responses")
+            continue
+        answers = df[col].astype('string').str.strip()
+        categories = pd.Index([c for c, count in headcounts.items() if count > 0])
+        code = categories.get_indexer(answers.fillna('\0'))
+        answered = np.bincount(code[code >= 0], minlength=len(categories))
+        if not answered.any():
+            warnings.warn(f"Margin '{margin}' skipped: no respondent matches a category")
+            continue
+        unmatched = answers.fillna('').ne('').to_numpy() & (code < 0)
+        if unmatched.any():
+            listed = ', '.join(f'{value} ({count})' for value, count in answers[unmatched].value_counts().head(5).items())
+            warnings.warn(f"Margin '{margin}': {int(unmatched.sum())} respondent(s) in categories not on the headcount "
+                          f"list keep their weight through it ({listed})")
+        empty = categories[answered == 0]
+        if len(empty):
+            warnings.warn(f"Margin '{margin}': no respondents from {', '.join(empty)}; dropped from its targets")
+        kept = np.flatnonzero(answered > 0)
+        remap = np.full(len(categories), -1)
+        remap[kept] = np.arange(len(kept)) + offset
+        codes.append(np.where(code >= 0, remap[code], -1))
+        margin_of.append(np.full(len(kept), len(codes) - 1))
+
+        counts = np.array([headcounts[c] for c in categories[kept]])
+        shares.append(counts / counts.sum())
+        rows.append(pd.DataFrame({'margin': margin, 'category': categories[kept], 'headcount': counts.astype(int),
+                                  'respondents': answered[kept]}))
+        offset += len(kept)
+    if not codes:
+        return np.empty((len(df), 0), dtype=int), np.empty(0, dtype=int), np.empty(0), []
+    return np.column_stack(codes), np.concatenate(margin_of), np.concatenate(shares), rows
+
+# ============================================================================
+# RAKING
+# ============================================================================
+
+def _category_totals(codes, weights, n_categories):
+    """Weighted respondents in every category of every margin (one bincount over the code matrix)"""
+    matched = codes >= 0
+    spread = np.broadcast_to(weights[:, None], codes.shape)
+    return np.bincount(codes[matched], weights=spread[matched], minlength=n_categories)
+
+def rake(df, margins, columns=None, base_weights=None, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """Raking weights (mean 1) matching each margin's headcount shares, with a per-category report"""
+    codes, margin_of, shares, rows = _code_matrix(df, margins, columns or {})
+    n = len(df)
+    weights = np.ones(n) if base_weights is None else np.asarray(base_weights, dtype=float).copy()
+    weights = weights / weights.mean()
+    n_categories = len(shares)
+    margin_codes = [(codes[:, m] >= 0, codes[:, m]) for m in range(codes.shape[1])]
+
+    iterations, converged, gap = 0, codes.shape[1] == 0, 0.0
+    while not converged and iterations < max_iterations:
+        for matched, code in margin_codes:
+            # This margin's categories are the only non-zero totals
+            totals = np.bincount(code[matched], weights=weights[matched], minlength=n_categories)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                factor = np.where(totals > 0, shares * totals.sum() / totals, 1.0)
+            weights[matched] *= factor[code[matched]]
+        iterations += 1
+        totals = _category_totals(codes, weights, n_categories)
+        gap = np.abs(totals / np.bincount(margin_of, weights=totals)[margin_of] / shares - 1).max()
+        converged = bool(gap < tolerance)
+    if not converged:
+        warnings.warn(f"Raking stopped after {iterations} sweeps without matching every margin (gap {gap:.2g})")
+
+    weights *= n / weights.sum()
+    if not rows:
+        return Raking(weights, pd.DataFrame(columns=MARGIN_COLUMNS), iterations, converged)
+    report = pd.concat(rows, ignore_index=True)
+    totals = _category_totals(codes, weights, n_categories)
+    report['target_pct'] = np.round(shares * 100, 1)
+    report['sample_pct'] = np.round(report['respondents'] / report.groupby('margin')['respondents'].transform('sum') * 100, 1)
+    report['weighted_pct'] = np.round(totals / np.bincount(margin_of, weights=totals)[margin_of] * 100, 1)
+    report['mean_weight'] = np.round(totals / report['respondents'].to_numpy(), 2)
+    return Raking(weights, report, iterations, converged)
+
+def summarize_raking(raking):
+    """One-line summary: sweeps, weight range, effective sample size and design effect"""
+    weights = raking.weights
+    n_eff = effective_n(weights)
+    status = f"{raking.iterations} sweep(s)" if raking.converged else f"not converged after {raking.iterations} sweeps"
+    return (f"Raked to {raking.margins['margin'].nunique() if len(raking.margins) else 0} margin(s), {status}; "
+            f"weights {weights.min():.2f}-{weights.max():.2f}, effective n {n_eff:.1f} of {len(weights)} "
+            f"(design effect {len(weights) / n_eff:.2f})")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Rake survey respondents to headcount margins')
+    parser.add_argument('responses', help='CSV with one row per respondent')
+    parser.add_argument('margins', help='CSV of margin, category, headcount')
+    parser.add_argument('--column', action='append', default=[], metavar='MARGIN=COLUMN',
+                        help='Respondent column of a margin when the names differ (repeat for several)')
+    parser.add_argument('--output', default='weights.csv')
+    args = parser.parse_args()
+
+    columns = dict(pair.split('=', 1) for pair in args.column)
+    df = pd.read_csv(args.responses, dtype=str)
+    raking = rake(df, load_margins(args.margins), columns=columns)
+
+    print("=" * 80)
+    print("SURVEY WEIGHTS - RAKING TO HEADCOUNT MARGINS")
+    print("=" * 80)
+    print(f"\n{summarize_raking(raking)}\n")
+    print(raking.margins.to_string(index=False))
+    pd.DataFrame({'weight': np.round(raking.weights, 6)}, index=df.index).to_csv(args.output, index_label='row')
+    print(f"\n[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Topic Discovery - Sparse TF-IDF + Mini-Batch NMF Over Open-Ended Comments
+Finds the themes a comment archive is about without a hand-curated keyword list
+
+Usage:
+    from topic_discovery import discover_topics
+    topics, assignments = discover_topics(comments, n_topics=8, labels=theme_flags)
+
+    python topic_discovery.py comments.csv --column feedback [--column future] [--topics 8]
+                                           [--keywords themes.json] [--output topics.csv]
+
+Comments are lower-cased and deduplicated first ("N/A", "Great job" are fitted
+once, weighted by how often they occur), tokenized with one regex pass and
+counted into a sparse document-term matrix. Terms in fewer than MIN_DF comments
+or more than MAX_DF of them are dropped; weights are sublinear TF x smoothed IDF
+with rows L2-normalized. The matrix is factorized by non-negative matrix
+factorization (Frobenius loss, multiplicative updates); above BATCH_SIZE
+distinct comments the topic-term matrix is fitted online from mini-batches
+(running sufficient statistics with a forgetting factor), so cost grows
+linearly with the archive.
+
+Each topic is reported with its top terms, its share of comments (by dominant
+topic), representative comments and, when taxonomy flags are given, the
+existing theme it overlaps most and the share of its comments no theme tagged.
+A topic most of whose comments fall outside the taxonomy is flagged as emerging.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import defaultdict, namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+N_TOPICS = 8
+MIN_DF = 2                 # comments a term must appear in
+MAX_DF = 0.5               # share of comments above which a term is background
+MAX_FEATURES = 20000
+TOP_TERMS = 8
+N_REPRESENTATIVE = 3
+MIN_REPRESENTATIVE_WORDS = 4   # shorter comments are only used when nothing longer is left
+
+BATCH_SIZE = 4096          # distinct comments per mini-batch; smaller corpora are fitted in full
+MAX_EPOCHS = 5
+FORGET = 0.7               # weight the statistics of one epoch ago keep
+W_ITERATIONS = 30          # multiplicative updates of a batch's comment-topic weights
+FULL_ITERATIONS = 300
+TOLERANCE = 1e-4           # relative change of the topic-term matrix that ends full-batch fitting...
+EPOCH_TOLERANCE = 0.02     # ...and mini-batch fitting, measured once per epoch
+SEED = 2025
+EPS = 1e-10
+
+EMERGING_UNTAGGED_SHARE = 50.0   # % of a topic's comments outside the taxonomy
+
+TOKEN = re.compile(r"[a-z][a-z0-9]*(?:'[a-z]+)?|\n")
+CHUNK = 100000             # distinct comments tokenized per regex pass
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being below
+between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during each
+etc even ever every few for from further get gets getting got had hadn't has hasn't have haven't having he
+he'd he'll he's her here here's hers herself him himself his how how's however i i'd i'll i'm i've if in into
+is isn't it it's its itself just let's like lot lots me more most much mustn't my myself n na no nor not
+nothing of off on once one only or other ought our ours ourselves out over own really same shan't she she'd
+she'll she's should shouldn't so some such than that that's the their theirs them themselves then there
+there's these they they'd they'll they're they've thing things this those through to too under until up
+us very was wasn't we we'd we'll we're we've well were weren't what what's when when's where where's which
+while who who's whom why why's will with won't would wouldn't yes you you'd you'll you're you've your yours
+yourself yourselves
+""".split())
+
+TfidfMatrix = namedtuple('TfidfMatrix', ['matrix', 'terms', 'rows', 'weights', 'texts'])
+
+# ============================================================================
+# TF-IDF
+# ============================================================================
+
+def tfidf_matrix(comments, min_df=MIN_DF, max_df=MAX_DF, max_features=MAX_FEATURES):
+    """Sparse TF-IDF over the distinct comments; rows maps every comment to its distinct row"""
+    comments = pd.Series(comments, dtype=object).fillna('').astype(str)
+    lowered = comments.str.lower().str.replace('’', "'", regex=False).str.replace('\n', ' ', regex=False)
+    rows, distinct = pd.factorize(lowered)
+    distinct = distinct.tolist()
+    weights = np.bincount(rows, minlength=len(distinct)).astype(np.float64)
+    # Original text of each distinct comment (its first occurrence)
+    texts = comments.to_numpy()[np.unique(rows, return_index=True)[1]]
+
+    # Comments are tokenized in chunks joined by newlines (term 0), so the regex and the vocabulary
+    # lookup run in C rather than once per comment
+    vocab = defaultdict()
+    vocab.default_factory = vocab.__len__
+    vocab['\n']
+    ids = np.concatenate([np.fromiter(map(vocab.__getitem__, TOKEN.findall('\n'.join(distinct[start:start + CHUNK]) + '\n')),
+                                      dtype=np.int64)
+                          for start in range(0, len(distinct), CHUNK)] or [np.zeros(0, dtype=np.int64)])
+    ends = ids == 0
+    terms = np.array(list(vocab), dtype=object)
+    counts = sparse.csr_matrix((np.ones(len(ids) - ends.sum(), dtype=np.float32),
+                                ((np.cumsum(ends) - ends)[~ends], ids[~ends])),
+                               shape=(len(distinct), len(terms)))
+    counts.sum_duplicates()
+
+    # Document frequency counts every comment, duplicates included
+    doc_freq = np.bincount(counts.indices, weights=np.repeat(weights, np.diff(counts.indptr)), minlength=len(terms))
+    n_comments = len(comments)
+    keep = (doc_freq >= min_df) & (doc_freq <= max(max_df * n_comments, min_df))
+    keep &= np.fromiter((len(term) > 2 and term not in STOP_WORDS for term in terms), dtype=bool, count=len(terms))
+    kept = np.flatnonzero(keep)
+    if len(kept) > max_features:
+        kept = np.sort(kept[np.argsort(-doc_freq[kept], kind='stable')[:max_features]])
+
+    matrix = counts[:, kept].tocsr()
+    matrix.data = (1 + np.log(matrix.data)).astype(np.float32)
+    idf = (np.log((1 + n_comments) / (1 + doc_freq[kept])) + 1).astype(np.float32)
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sparse.diags(1 / np.where(norms > 0, norms, 1)).astype(np.float32) @ matrix
+    return TfidfMatrix(matrix.tocsr(), terms[kept], rows, weights, texts)
+
+# ============================================================================
+# NMF
+# ============================================================================
+
+def _solve_w(X, H, W=None, iterations=W_ITERATIONS):
+    """Comment-topic weights for fixed topics by multiplicative updates"""
+    XHt = np.asarray(X @ H.T)
+    HHt = H @ H.T
+    if W is None:
+        W = np.full(XHt.shape, np.sqrt(max(float(XHt.mean()), EPS) / H.shape[0]), dtype=H.dtype)
+    for _ in range(iterations):
+        W *= XHt / (W @ HHt + EPS)
+    return W
+
+def _init_topics(X, n_topics, rng, seeds_per_topic=5):
+    """Each topic starts as the mean of a few random non-empty comments, plus noise"""
+    nonempty = np.flatnonzero(np.diff(X.indptr))
+    picks = rng.choice(nonempty, size=(n_topics, min(seeds_per_topic, len(nonempty))), replace=len(nonempty) < n_topics * seeds_per_topic)
+    H = np.vstack([np.asarray(X[seeds].mean(axis=0)).ravel() for seeds in picks]).astype(np.float32)
+    return H + rng.random(H.shape, dtype=np.float32) * float(H.mean()) * 0.1 + EPS
+
+def nmf(X, n_topics=N_TOPICS, batch_size=BATCH_SIZE, max_epochs=MAX_EPOCHS, seed=SEED):
+    """W (comments x topics), H (topics x terms) with X ~ W H; H rows scaled to unit L2"""
+    rng = np.random.default_rng(seed)
+    n_rows = X.shape[0]
+    H = _init_topics(X, n_topics, rng)
+
+    if n_rows <= batch_size:
+        W = None
+        for i in range(FULL_ITERATIONS):
+            W = _solve_w(X, H, W, iterations=1)
+            previous = H.copy()
+            H *= np.asarray(X.T @ W).T / ((W.T @ W) @ H + EPS)
+            if i % 10 == 9 and np.linalg.norm(H - previous) < TOLERANCE * np.linalg.norm(H):
+                break
+    else:
+        A = np.zeros_like(H)
+        B = np.zeros((n_topics, n_topics), dtype=H.dtype)
+        rho = FORGET ** (batch_size / n_rows)
+        for _ in range(max_epochs):
+            previous = H.copy()
+            order = rng.permutation(n_rows)
+            for start in range(0, n_rows, batch_size):
+                batch = np.sort(order[start:start + batch_size])
+                Xb = X[batch]
+                Wb = _solve_w(Xb, H)
+                A = rho * A + np.asarray(Xb.T @ Wb).T
+                B = rho * B + Wb.T @ Wb
+                H *= A / (B @ H + EPS)
+            if np.linalg.norm(H - previous) < EPOCH_TOLERANCE * np.linalg.norm(H):
+                break
+
+    scale = np.linalg.norm(H, axis=1)
+    H /= np.where(scale > 0, scale, 1)[:, None]
+    W = np.vstack([_solve_w(X[start:start + 65536], H) for start in range(0, n_rows, 65536)])
+    return W, H
+
+# ============================================================================
+# TOPICS
+# ============================================================================
+
+def keyword_flags(comments, keywords):
+    """Comment x theme flags by substring match, as the keyword taxonomies tag comments"""
+    lowered = pd.Series(comments, dtype=object).fillna('').astype(str).str.lower()
+    return pd.DataFrame({theme: lowered.str.contains('|'.join(map(re.escape, words)), regex=True)
+                         for theme, words in keywords.items()})
+
+def describe_topics(tf, W, H, labels=None, top_terms=TOP_TERMS, n_representative=N_REPRESENTATIVE):
+    """One row per topic: terms, prevalence, representative comments and taxonomy overlap"""
+    n_topics = H.shape[0]
+    totals = W.sum(axis=1)
+    dominant = np.where(totals > 0, W.argmax(axis=1), -1)
+    strength = np.divide(W.max(axis=1), totals, out=np.zeros_like(totals), where=totals > 0)
+    topic_of_comment = dominant[tf.rows]
+    n_words = np.fromiter((len(text.split()) for text in tf.texts), dtype=np.int64, count=len(tf.texts))
+
+    if labels is not None:
+        flags = np.asarray(labels, dtype=bool)
+        themes = list(labels.columns)
+        assigned = topic_of_comment >= 0
+        overlap = np.zeros((n_topics, len(themes)))
+        np.add.at(overlap, topic_of_comment[assigned], flags[assigned])
+        untagged = np.bincount(topic_of_comment[assigned], weights=~flags[assigned].any(axis=1), minlength=n_topics)
+
+    sizes = np.bincount(topic_of_comment[topic_of_comment >= 0], minlength=n_topics)
+    records = []
+    for t in np.argsort(-sizes, kind='stable'):
+        members = np.flatnonzero(dominant == t)
+        score = W[members, t] * strength[members] * (n_words[members] >= MIN_REPRESENTATIVE_WORDS)
+        picks = members[np.argsort(-score, kind='stable')[:n_representative]]
+        record = {
+            'topic': len(records) + 1,
+            'top_terms': ', '.join(tf.terms[np.argsort(-H[t], kind='stable')[:top_terms]]),
+            'comments': int(sizes[t]),
+            'prevalence_pct': round(100 * sizes[t] / max(len(tf.rows), 1), 1),
+        }
+        if labels is not None:
+            share = 100 * overlap[t] / max(sizes[t], 1)
+            best = int(share.argmax()) if len(themes) else None
+            record['closest_theme'] = themes[best] if best is not None and share[best] > 0 else ''
+            record['closest_theme_pct'] = round(float(share[best]), 1) if best is not None else 0.0
+            record['untagged_pct'] = round(100 * untagged[t] / max(sizes[t], 1), 1)
+            record['emerging'] = bool(record['untagged_pct'] >= EMERGING_UNTAGGED_SHARE)
+        for i in range(n_representative):
+            record[f'example_{i + 1}'] = tf.texts[picks[i]] if i < len(picks) else ''
+        records.append(record)
+
+    # Topic numbers follow the report order (largest first); 0 means no vocabulary term
+    renumber = np.zeros(n_topics + 1, dtype=np.int64)
+    renumber[np.argsort(-sizes, kind='stable')] = np.arange(1, n_topics + 1)
+    return pd.DataFrame(records), renumber[topic_of_comment]
+
+def discover_topics(comments, n_topics=N_TOPICS, labels=None, seed=SEED, **tfidf_options):
+    """(topics table, topic number per comment) for a sequence of comments"""
+    tf = tfidf_matrix(comments, **tfidf_options)
+    n_topics = max(1, min(n_topics, tf.matrix.shape[1], int((tf.matrix.getnnz(axis=1) > 0).sum())))
+    if tf.matrix.nnz == 0:
+        return pd.DataFrame(columns=['topic', 'top_terms', 'comments', 'prevalence_pct']), np.zeros(len(tf.rows), dtype=np.int64)
+    W, H = nmf(tf.matrix.multiply(np.sqrt(tf.weights)[:, None]).tocsr(), n_topics, seed=seed)
+    return describe_topics(tf, W, H, labels)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def read_table(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Discover topics in open-ended comments (TF-IDF + NMF)')
+    parser.add_argument('input', help='CSV, Excel or Parquet file with one comment per row')
+    parser.add_argument('--column', action='append', required=True, help='Open-ended column (repeat to combine)')
+    parser.add_argument('--topics', type=int, default=N_TOPICS)
+    parser.add_argument('--keywords', help='JSON {theme: [keywords]} to measure overlap with an existing taxonomy')
+    parser.add_argument('--output', default='topics.csv')
+    args = parser.parse_args()
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    table = read_table(args.input)
+    comments = table[args.column].fillna('').astype(str).agg(' '.join, axis=1).str.strip()
+    comments = comments[comments != '']
+
+    start = time.perf_counter()
+    labels = None
+    if args.keywords:
+        with open(args.keywords, encoding='utf-8') as f:
+            labels = keyword_flags(comments, json.load(f))
+    topics, _ = discover_topics(comments, args.topics, labels)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 80)
+    print("TOPIC DISCOVERY")
+    print("=" * 80)
+    print(f"\n{len(comments)} comments, {len(topics)} topics in {elapsed:.1f}s")
+    for _, topic in topics.iterrows():
+        flag = '[!]' if topic.get('emerging') else '   '
+        print(f"\n{flag} Topic {topic['topic']} ({topic['prevalence_pct']:.1f}%): {topic['top_terms']}")
+        if 'closest_theme' in topic:
+            print(f"    closest theme: {topic['closest_theme'] or '-'} ({topic['closest_theme_pct']:.0f}%), "
+                  f"untagged: {topic['untagged_pct']:.0f}%")
+        for i in range(1, N_REPRESENTATIVE + 1):
+            if topic[f'example_{i}']:
+                print(f"    \"{topic[f'example_{i}'][:120]}\"")
+
+    topics.to_csv(args.output, index=False)
+    print(f"\n[OK] Exported: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 // Global variables
-let surveyData = [];
-let filteredData = [];
+let cube = null;
+let suppressedKeys = new Set();
+let activeSelection = null;
+let currentView = null;
 let tooltip;
+let reasonsPayload = null;
 
 // Color palette
 const PALETTE = {
@@ -24,29 +27,34 @@ document.addEventListener('DOMContentLoaded', function() {
     setupEventListeners();
 });
 
-// Load CSV data
+// Load the precomputed filter cube (scripts/faculty-survey/faculty_cube.py)
 function loadData() {
     // Use absolute path from site root for GitHub Pages deployment
     // Add timestamp to prevent caching issues
-    const csvPath = '/faculty-survey-dashboard/faculty_survey_data.csv?v=' + Date.now();
+    const cubePath = '/faculty-survey-dashboard/faculty_cube.json?v=' + Date.now();
 
-    Papa.parse(csvPath, {
-        download: true,
-        header: true,
-        dynamicTyping: true,
-        complete: function(results) {
-            surveyData = results.data.filter(d => d.ResponseID); // Remove empty rows
-            filteredData = [...surveyData];
+    d3.json(cubePath)
+        .then(payload => {
+            cube = payload;
+            let key = 0;
+            suppressedKeys = new Set(cube.suppressed_deltas.map(delta => key += delta));
 
             document.getElementById('loadingOverlay').classList.add('hidden');
-            updateDashboard();
-        },
-        error: function(error) {
+            applyFilters();
+        })
+        .catch(error => {
             console.error('Error loading data:', error);
-            console.error('Attempted to load from:', csvPath);
+            console.error('Attempted to load from:', cubePath);
             alert('Error loading survey data. Please check the browser console for details.');
-        }
-    });
+        });
+
+    // Reason labels and combinations (scripts/faculty-survey/faculty_reasons.py); the counts live in the cube
+    d3.json('/faculty-survey-dashboard/faculty_reasons.json?v=' + Date.now())
+        .then(payload => {
+            reasonsPayload = payload;
+            updateChart7();
+        })
+        .catch(error => console.warn('Reasons payload unavailable:', error));
 }
 
 // Setup event listeners
@@ -58,7 +66,7 @@ function setupEventListeners() {
     document.getElementById('resetFilters').addEventListener('click', resetFilters);
 
     // Export Data button
-    document.getElementById('exportData').addEventListener('click', exportFilteredData);
+    document.getElementById('exportData').addEventListener('click', exportFilteredSummary);
 
     // Satisfaction slider
     const slider = document.getElementById('satisfactionSlider');
@@ -90,46 +98,8 @@ function setupEventListeners() {
 
 // Apply filters
 function applyFilters() {
-    filteredData = surveyData.filter(d => {
-        // College filter
-        const collegeSelected = getSelectedValues('collegeFilter');
-        if (!collegeSelected.includes('all') && !collegeSelected.includes(d.College)) {
-            return false;
-        }
-
-        // Gender filter
-        const genderSelected = getSelectedValues('genderFilter');
-        if (!genderSelected.includes('all') && !genderSelected.includes(d.Gender)) {
-            return false;
-        }
-
-        // Rank filter
-        const rankSelected = getSelectedValues('rankFilter');
-        if (!rankSelected.includes('all') && !rankSelected.includes(d.Rank)) {
-            return false;
-        }
-
-        // Discipline filter
-        const disciplineSelected = getSelectedValues('disciplineFilter');
-        if (!disciplineSelected.includes('all') && !disciplineSelected.includes(d.Discipline)) {
-            return false;
-        }
-
-        // Years filter
-        const yearsSelected = getSelectedValues('yearsFilter');
-        if (!yearsSelected.includes('all') && !yearsSelected.includes(d.YearsAtInstitution)) {
-            return false;
-        }
-
-        // Satisfaction threshold
-        const minSatisfaction = parseFloat(document.getElementById('satisfactionSlider').value);
-        if (d.Q8_OverallSatisfaction < minSatisfaction) {
-            return false;
-        }
-
-        return true;
-    });
-
+    activeSelection = currentSelection();
+    currentView = cubeView(activeSelection);
     updateDashboard();
 }
 
@@ -147,8 +117,7 @@ function resetFilters() {
     document.getElementById('satisfactionSlider').value = 1;
     document.getElementById('satisfactionValue').textContent = '1.0';
 
-    filteredData = [...surveyData];
-    updateDashboard();
+    applyFilters();
 }
 
 // Get selected values from multi-select
@@ -157,24 +126,142 @@ function getSelectedValues(selectId) {
     return Array.from(select.selectedOptions).map(opt => opt.value);
 }
 
-// Export filtered data
-function exportFilteredData() {
-    const csv = Papa.unparse(filteredData);
+// Export the published aggregates for the current filters
+function exportFilteredSummary() {
+    if (currentView.suppressed || currentView.stats.n === 0) {
+        alert('Nothing to export: the current filters match too few respondents.');
+        return;
+    }
+
+    const rows = [];
+    cube.dimensions.filter(dim => !dim.cumulative).forEach(dim => {
+        cubeBreakdown(dim.name, dim.values).forEach(d => {
+            rows.push({
+                Dimension: dim.name,
+                Group: d.value,
+                N: d.count,
+                OverallSatisfaction: cubeMean(d.stats, 'Q8_OverallSatisfaction').toFixed(2),
+                WorkLifeBalance: cubeMean(d.stats, 'Q13_WorkLifeBalance').toFixed(2),
+                Belonging: cubeMean(d.stats, 'Q27_Belonging').toFixed(2),
+                PsychologicalSafety: cubeMean(d.stats, 'Q26_PsychologicalSafety').toFixed(2),
+                RetentionRiskPct: (d.stats.n_leaving / d.count * 100).toFixed(1),
+                eNPS: cubeNps(d.stats)
+            });
+        });
+    });
+
+    const csv = Papa.unparse(rows);
     const blob = new Blob([csv], { type: 'text/csv' });
     const url = window.URL.createObjectURL(blob);
     const a = document.createElement('a');
     a.href = url;
-    a.download = `faculty_survey_filtered_${new Date().toISOString().split('T')[0]}.csv`;
+    a.download = `faculty_survey_summary_${new Date().toISOString().split('T')[0]}.csv`;
     document.body.appendChild(a);
     a.click();
     document.body.removeChild(a);
     window.URL.revokeObjectURL(url);
 }
 
+// Cube index lists for the filter panel, one list per dimension (0 = all)
+function currentSelection() {
+    return cube.dimensions.map(dim => {
+        if (dim.cumulative) {
+            // Scores are whole numbers, so a 3.5 threshold keeps the same faculty as 4
+            const level = Math.ceil(parseFloat(document.getElementById(dim.filter).value));
+            return [Math.max(0, dim.values.indexOf(level))];
+        }
+        const selected = getSelectedValues(dim.filter);
+        if (selected.includes('all')) return [0];
+        return selected.map(value => dim.values.indexOf(value) + 1).filter(idx => idx > 0);
+    });
+}
+
+// Sum the cube cells covered by a selection. A single value per filter is one
+// key lookup; multi-selects sum their cells, and a suppressed part hides the view.
+function cubeView(selection) {
+    let keys = [0];
+    selection.forEach((indices, d) => {
+        keys = keys.flatMap(key => indices.map(idx => key + idx * cube.strides[d]));
+    });
+
+    const stats = Object.fromEntries(cube.fields.map(field => [field, 0]));
+    let suppressed = false;
+    keys.forEach(key => {
+        const cell = cube.cells[key];
+        if (cell) {
+            cube.fields.forEach((field, i) => stats[field] += cell[i]);
+        } else if (suppressedKeys.has(key)) {
+            suppressed = true;
+        }
+    });
+    return { stats: stats, suppressed: suppressed };
+}
+
+// Published groups of one dimension within a selection (suppressed/empty groups are dropped)
+function cubeBreakdown(dimName, values, selection = activeSelection) {
+    const d = cube.dimensions.findIndex(dim => dim.name === dimName);
+    const allowed = selection[d];
+
+    return values.map(value => {
+        const idx = cube.dimensions[d].values.indexOf(value) + 1;
+        if (idx === 0 || (!allowed.includes(0) && !allowed.includes(idx))) return null;
+
+        const narrowed = selection.slice();
+        narrowed[d] = [idx];
+        const view = cubeView(narrowed);
+        if (view.suppressed || view.stats.n === 0) return null;
+        return { value: value, stats: view.stats, count: view.stats.n };
+    }).filter(d => d);
+}
+
+function cubeMean(stats, metric) {
+    const n = stats['n:' + metric];
+    return n > 0 ? stats['sum:' + metric] / n : 0;
+}
+
+function cubeNps(stats) {
+    return stats.n_nps > 0 ? Math.round((stats.promoters - stats.detractors) / stats.n_nps * 100) : 0;
+}
+
+// Pearson correlation from the cell's complete-case sums and cross-products
+function cubeCorrelation(stats, a, b) {
+    const n = stats.n_cc;
+    if (n < 2) return 0;
+
+    const cross = stats[`sxy:${a}|${b}`] ?? stats[`sxy:${b}|${a}`];
+    const sx = stats['sx:' + a];
+    const sy = stats['sx:' + b];
+    const num = n * cross - sx * sy;
+    const den = Math.sqrt((n * stats[`sxy:${a}|${a}`] - sx * sx) * (n * stats[`sxy:${b}|${b}`] - sy * sy));
+    return den === 0 ? 0 : num / den;
+}
+
+// Placeholder for a chart whose view falls under the small-cell threshold
+function showSuppressed(chartId, insightId, message) {
+    d3.select('#' + chartId).selectAll('*').remove();
+    d3.select('#' + chartId)
+        .append('div')
+        .attr('class', 'suppressed-note')
+        .text(message || `Fewer than ${cube.min_cell_n} faculty match these filters, or showing them would reveal such a group; results are hidden to protect confidentiality.`);
+    if (insightId) document.getElementById(insightId).innerHTML = '';
+}
+
 // Update entire dashboard
 function updateDashboard() {
+    const n = currentView.stats.n;
+    if (currentView.suppressed || n === 0) {
+        const message = n === 0 && !currentView.suppressed
+            ? 'No faculty match these filters.'
+            : `Fewer than ${cube.min_cell_n} faculty match these filters, or showing them would reveal such a group; results are hidden to protect confidentiality.`;
+        document.getElementById('filterStatus').textContent = message;
+        showSuppressed('kpiContainer', null, message);
+        ['1', '2', '3', '4', '5', '6'].forEach(i => showSuppressed('chart' + i, 'insight' + i, message));
+        updateChart7();
+        return;
+    }
+
     document.getElementById('filterStatus').textContent =
-        `Showing ${filteredData.length} of ${surveyData.length} responses`;
+        `Showing ${n} of ${cube.n_total} responses`;
 
     updateKPIs();
     updateChart1();
@@ -183,26 +270,19 @@ function updateDashboard() {
     updateChart4();
     updateChart5();
     updateChart6();
-}
-
-// Helper function to calculate mean
-function mean(arr) {
-    const filtered = arr.filter(x => x != null && !isNaN(x));
-    return filtered.length > 0 ? filtered.reduce((a, b) => a + b, 0) / filtered.length : 0;
+    updateChart7();
 }
 
 // Update KPIs
 function updateKPIs() {
-    const avgSatisfaction = mean(filteredData.map(d => d.Q8_OverallSatisfaction));
-    const avgBelonging = mean(filteredData.map(d => d.Q27_Belonging));
-    const avgPsychSafety = mean(filteredData.map(d => d.Q26_PsychologicalSafety));
-    const retentionRisk = (filteredData.filter(d => d.Q10_ConsideredLeaving >= 4).length / filteredData.length * 100);
+    const stats = currentView.stats;
+    const avgSatisfaction = cubeMean(stats, 'Q8_OverallSatisfaction');
+    const avgBelonging = cubeMean(stats, 'Q27_Belonging');
+    const avgPsychSafety = cubeMean(stats, 'Q26_PsychologicalSafety');
+    const retentionRisk = stats.n_leaving / stats.n * 100;
 
     // Calculate eNPS
-    const scores = filteredData.map(d => d.Q9_LikelihoodToRecommend);
-    const promoters = scores.filter(s => s >= 4).length;
-    const detractors = scores.filter(s => s <= 2).length;
-    const enps = Math.round((promoters / scores.length * 100) - (detractors / scores.length * 100));
+    const enps = cubeNps(stats);
 
     const html = `
         <div class="kpi-card">
@@ -224,7 +304,7 @@ function updateKPIs() {
             <div class="kpi-value ${retentionRisk < 20 ? 'good' : retentionRisk < 30 ? 'warning' : 'critical'}">
                 ${retentionRisk.toFixed(1)}%
             </div>
-            <div class="kpi-subtitle">${filteredData.filter(d => d.Q10_ConsideredLeaving >= 4).length} faculty at risk</div>
+            <div class="kpi-subtitle">${stats.n_leaving} faculty at risk</div>
         </div>
         <div class="kpi-card">
             <div class="kpi-label">Belonging Score</div>
@@ -242,8 +322,8 @@ function updateKPIs() {
         </div>
         <div class="kpi-card">
             <div class="kpi-label">Sample Size</div>
-            <div class="kpi-value good">${filteredData.length}</div>
-            <div class="kpi-subtitle">${((filteredData.length / surveyData.length) * 100).toFixed(1)}% of total</div>
+            <div class="kpi-value good">${stats.n}</div>
+            <div class="kpi-subtitle">${((stats.n / cube.n_total) * 100).toFixed(1)}% of total</div>
         </div>
     `;
 
@@ -261,15 +341,17 @@ function updateChart1() {
     d3.select('#chart1').selectAll('*').remove();
 
     // Group by college
-    const colleges = Array.from(new Set(filteredData.map(d => d.College))).filter(c => c);
-    const data = colleges.map(college => {
-        const collegeData = filteredData.filter(d => d.College === college);
-        return {
-            college: college,
-            value: mean(collegeData.map(d => d[metric])),
-            count: collegeData.length
-        };
-    }).sort((a, b) => b.value - a.value);
+    const colleges = cube.dimensions.find(dim => dim.name === 'College').values;
+    const data = cubeBreakdown('College', colleges).map(d => ({
+        college: d.value,
+        value: cubeMean(d.stats, metric),
+        count: d.count
+    })).sort((a, b) => b.value - a.value);
+
+    if (data.length === 0) {
+        showSuppressed('chart1', 'insight1');
+        return;
+    }
 
     // Set up dimensions
     const margin = {top: 20, right: 30, bottom: 80, left: 60};
@@ -368,14 +450,20 @@ function updateChart1() {
 
 // Drill down function
 function drillDownByGender(college, metric) {
-    const genderData = ['Man', 'Woman', 'Non-binary'].map(gender => {
-        const subset = filteredData.filter(d => d.College === college && d.Gender === gender);
-        return {
-            gender: gender,
-            value: mean(subset.map(d => d[metric])),
-            count: subset.length
-        };
-    }).filter(d => d.count > 0);
+    const collegeIdx = cube.dimensions.findIndex(dim => dim.name === 'College');
+    const selection = activeSelection.slice();
+    selection[collegeIdx] = [cube.dimensions[collegeIdx].values.indexOf(college) + 1];
+
+    const genderData = cubeBreakdown('Gender', ['Man', 'Woman', 'Non-binary'], selection).map(d => ({
+        gender: d.value,
+        value: cubeMean(d.stats, metric),
+        count: d.count
+    }));
+
+    if (genderData.length === 0) {
+        alert(`${college} - Gender Breakdown:\n\nEvery group is hidden (fewer than ${cube.min_cell_n} faculty, directly or by subtraction).`);
+        return;
+    }
 
     alert(`${college} - Gender Breakdown:\n\n${genderData.map(d =>
         `${d.gender}: ${d.value.toFixed(2)} (n=${d.count})`
@@ -387,16 +475,18 @@ function updateChart2() {
     d3.select('#chart2').selectAll('*').remove();
 
     // Group by college
-    const colleges = Array.from(new Set(filteredData.map(d => d.College))).filter(c => c);
-    const data = colleges.map(college => {
-        const collegeData = filteredData.filter(d => d.College === college);
-        return {
-            college: college,
-            satisfaction: mean(collegeData.map(d => d.Q8_OverallSatisfaction)),
-            retentionRisk: collegeData.filter(d => d.Q10_ConsideredLeaving >= 4).length / collegeData.length * 100,
-            count: collegeData.length
-        };
-    });
+    const colleges = cube.dimensions.find(dim => dim.name === 'College').values;
+    const data = cubeBreakdown('College', colleges).map(d => ({
+        college: d.value,
+        satisfaction: cubeMean(d.stats, 'Q8_OverallSatisfaction'),
+        retentionRisk: d.stats.n_leaving / d.count * 100,
+        count: d.count
+    }));
+
+    if (data.length === 0) {
+        showSuppressed('chart2', 'insight2');
+        return;
+    }
 
     const margin = {top: 20, right: 30, bottom: 60, left: 60};
     const width = document.getElementById('chart2').offsetWidth - margin.left - margin.right;
@@ -550,15 +640,19 @@ function updateChart3() {
         groupField = 'Discipline';
     }
 
-    const data = groups.map(group => {
-        const subset = filteredData.filter(d => d[groupField] === group);
-        const result = { group: group };
+    const data = cubeBreakdown(groupField, groups).map(d => {
+        const result = { group: d.value };
         metrics.forEach(m => {
-            result[m.label] = mean(subset.map(d => d[m.key]));
+            result[m.label] = cubeMean(d.stats, m.key);
         });
-        result.count = subset.length;
+        result.count = d.count;
         return result;
-    }).filter(d => d.count > 0);
+    });
+
+    if (data.length === 0) {
+        showSuppressed('chart3', 'insight3');
+        return;
+    }
 
     const margin = {top: 20, right: 120, bottom: 60, left: 60};
     const width = document.getElementById('chart3').offsetWidth - margin.left - margin.right;
@@ -658,24 +752,18 @@ function updateChart4() {
     d3.select('#chart4').selectAll('*').remove();
 
     const disciplines = ['STEM', 'Social Sciences', 'Humanities', 'Business'];
-    const hoursMap = {
-        '40-49 hours': 45,
-        '50-59 hours': 55,
-        '60-69 hours': 65,
-        '70+ hours': 75
-    };
-
-    const data = disciplines.map(disc => {
-        const subset = filteredData.filter(d => d.Discipline === disc && d.Q14_WeeklyHours);
-        const avgHours = mean(subset.map(d => hoursMap[d.Q14_WeeklyHours] || 55));
-        const over70 = subset.filter(d => d.Q14_WeeklyHours === '70+ hours').length / subset.length * 100;
-        return {
-            discipline: disc,
-            avgHours: avgHours,
-            over70: over70,
-            count: subset.length
-        };
-    }).filter(d => d.count > 0);
+    // Hours bands are mapped to midpoints at build time (cube.hours_map)
+    const data = cubeBreakdown('Discipline', disciplines).filter(d => d.stats.n_hours > 0).map(d => ({
+        discipline: d.value,
+        avgHours: d.stats.sum_hours / d.stats.n_hours,
+        over70: d.stats.n_hours_70 / d.stats.n_hours * 100,
+        count: d.stats.n_hours
+    }));
+
+    if (data.length === 0) {
+        showSuppressed('chart4', 'insight4');
+        return;
+    }
 
     const margin = {top: 20, right: 80, bottom: 60, left: 60};
     const width = document.getElementById('chart4').offsetWidth - margin.left - margin.right;
@@ -777,10 +865,7 @@ function updateChart5() {
     const correlations = [];
     variables.forEach(v1 => {
         variables.forEach(v2 => {
-            const corr = calculateCorrelation(
-                filteredData.map(d => d[v1.key]),
-                filteredData.map(d => d[v2.key])
-            );
+            const corr = cubeCorrelation(currentView.stats, v1.key, v2.key);
             correlations.push({
                 x: v1.label,
                 y: v2.label,
@@ -867,34 +952,6 @@ function updateChart5() {
     `;
 }
 
-// Helper function to calculate correlation
-function calculateCorrelation(x, y) {
-    const validPairs = x.map((xi, i) => [xi, y[i]]).filter(([xi, yi]) =>
-        xi != null && yi != null && !isNaN(xi) && !isNaN(yi)
-    );
-
-    if (validPairs.length < 2) return 0;
-
-    const xVals = validPairs.map(p => p[0]);
-    const yVals = validPairs.map(p => p[1]);
-
-    const xMean = mean(xVals);
-    const yMean = mean(yVals);
-
-    const n = validPairs.length;
-    let num = 0, denX = 0, denY = 0;
-
-    for (let i = 0; i < n; i++) {
-        const xDiff = xVals[i] - xMean;
-        const yDiff = yVals[i] - yMean;
-        num += xDiff * yDiff;
-        denX += xDiff * xDiff;
-        denY += yDiff * yDiff;
-    }
-
-    return denX === 0 || denY === 0 ? 0 : num / Math.sqrt(denX * denY);
-}
-
 // Chart 6: Satisfaction by Years at Institution (Line Chart)
 function updateChart6() {
     d3.select('#chart6').selectAll('*').remove();
@@ -906,15 +963,19 @@ function updateChart6() {
         { key: 'Q27_Belonging', label: 'Belonging', color: '#F59E0B' }
     ];
 
-    const data = yearsOrder.map((year, idx) => {
-        const subset = filteredData.filter(d => d.YearsAtInstitution === year);
-        const result = { years: year, yearIdx: idx };
+    const data = cubeBreakdown('YearsAtInstitution', yearsOrder).map(d => {
+        const result = { years: d.value, yearIdx: yearsOrder.indexOf(d.value) };
         metrics.forEach(m => {
-            result[m.label] = mean(subset.map(d => d[m.key]));
+            result[m.label] = cubeMean(d.stats, m.key);
         });
-        result.count = subset.length;
+        result.count = d.count;
         return result;
-    }).filter(d => d.count > 0);
+    });
+
+    if (data.length === 0) {
+        showSuppressed('chart6', 'insight6');
+        return;
+    }
 
     const margin = {top: 20, right: 150, bottom: 60, left: 60};
     const width = document.getElementById('chart6').offsetWidth - margin.left - margin.right;
@@ -1041,6 +1102,109 @@ function updateChart6() {
     `;
 }
 
+// Chart 7: Reasons for Leaving (reason counts are cube fields, so every filter and suppression applies)
+function updateChart7() {
+    if (!reasonsPayload || !cube || !currentView) return;
+    d3.select('#chart7').selectAll('*').remove();
+
+    const stats = currentView.stats;
+    if (currentView.suppressed || stats.n === 0) {
+        showSuppressed('chart7', 'insight7', stats.n === 0 && !currentView.suppressed ? 'No faculty match these filters.' : undefined);
+        return;
+    }
+
+    const reasons = reasonsPayload.reasons;
+    const totals = {
+        n: stats.n,
+        nLeaving: stats.n_leaving,
+        all: reasons.map(reason => stats['reason:' + reason]),
+        leaving: reasons.map(reason => stats['leaving_reason:' + reason]),
+        pairs: reasonsPayload.combinations['2'].map(([a, b]) => stats[`pair:${reasons[a]}|${reasons[b]}`])
+    };
+
+    const data = reasonsPayload.labels.map((label, i) => ({
+        label: label,
+        all: totals.n ? totals.all[i] / totals.n * 100 : 0,
+        leaving: totals.nLeaving ? totals.leaving[i] / totals.nLeaving * 100 : 0
+    })).sort((a, b) => b.leaving - a.leaving);
+
+    const margin = {top: 20, right: 120, bottom: 40, left: 160};
+    const width = document.getElementById('chart7').offsetWidth - margin.left - margin.right;
+    const height = 350 - margin.top - margin.bottom;
+
+    const svg = d3.select('#chart7')
+        .append('svg')
+        .attr('width', width + margin.left + margin.right)
+        .attr('height', height + margin.top + margin.bottom)
+        .append('g')
+        .attr('transform', `translate(${margin.left},${margin.top})`);
+
+    const y = d3.scaleBand()
+        .domain(data.map(d => d.label))
+        .range([0, height])
+        .padding(0.25);
+
+    const ySub = d3.scaleBand()
+        .domain(['leaving', 'all'])
+        .range([0, y.bandwidth()])
+        .padding(0.1);
+
+    const x = d3.scaleLinear()
+        .domain([0, Math.max(10, d3.max(data, d => Math.max(d.all, d.leaving)))])
+        .nice()
+        .range([0, width]);
+
+    const colors = { leaving: '#EF4444', all: PALETTE.satisfaction };
+
+    ['leaving', 'all'].forEach(series => {
+        svg.selectAll(`.bar-${series}`)
+            .data(data)
+            .enter()
+            .append('rect')
+            .attr('y', d => y(d.label) + ySub(series))
+            .attr('x', 0)
+            .attr('height', ySub.bandwidth())
+            .attr('width', 0)
+            .attr('fill', colors[series])
+            .on('mouseover', function(event, d) {
+                showTooltip(event, `
+                    <strong>${d.label}</strong><br/>
+                    Considered leaving: ${d.leaving.toFixed(1)}% (n = ${totals.nLeaving})<br/>
+                    All respondents: ${d.all.toFixed(1)}% (n = ${totals.n})
+                `);
+            })
+            .on('mouseout', hideTooltip)
+            .transition()
+            .duration(800)
+            .attr('width', d => x(d[series]));
+    });
+
+    svg.append('g')
+        .attr('class', 'axis')
+        .call(d3.axisLeft(y));
+
+    svg.append('g')
+        .attr('class', 'axis')
+        .attr('transform', `translate(0,${height})`)
+        .call(d3.axisBottom(x).ticks(5).tickFormat(d => d + '%'));
+
+    const legend = svg.append('g').attr('transform', `translate(${width + 10}, 0)`);
+    [['leaving', 'Considered leaving'], ['all', 'All respondents']].forEach(([series, text], i) => {
+        legend.append('rect').attr('y', i * 20).attr('width', 12).attr('height', 12).attr('fill', colors[series]);
+        legend.append('text').attr('x', 18).attr('y', i * 20 + 10).style('font-size', '11px').text(text);
+    });
+
+    const top = d3.maxIndex(totals.pairs);
+    const pairText = totals.pairs[top] > 0
+        ? reasonsPayload.combinations['2'][top].map(i => reasonsPayload.labels[i]).join(' + ') + ` (${totals.pairs[top]} faculty)`
+        : 'No reasons selected together';
+
+    document.getElementById('insight7').innerHTML = `
+        <h4>💡 Key Insight</h4>
+        <p>${totals.nLeaving} of ${totals.n} faculty in this selection considered leaving. Most common combination: ${pairText}.</p>
+    `;
+}
+
 // Tooltip functions
 function showTooltip(event, html) {
     tooltip.html(html)
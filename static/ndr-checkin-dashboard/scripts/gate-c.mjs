@@ -34,7 +34,8 @@ function check(name, cond, detail) {
   results.push({ name, pass: !!cond, detail: detail || "" });
 }
 
-const browser = await puppeteer.launch({ executablePath: execPath, headless: "new" });
+// NDR_DATA is fetched from a sibling JSON file, which file:// pages may only do with this flag
+const browser = await puppeteer.launch({ executablePath: execPath, headless: "new", args: ["--allow-file-access-from-files"] });
 try {
   const page = await browser.newPage();
   const consoleErrors = [];